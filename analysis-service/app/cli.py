@@ -0,0 +1,150 @@
+"""
+Tareas de mantenimiento del Analysis Service
+
+Uso:
+    python -m app.cli gc-blobs [--grace-seconds N]
+    python -m app.cli archive-analyses [--batch-size N] [--max-batches N]
+    python -m app.cli apply-retention [--batch-size N]
+    python -m app.cli rebuild-rollups [--batch-size N] [--include-today] [--days N]
+    python -m app.cli backfill-findings [--batch-size N]
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from app.model.analysis_blob_repository import AnalysisBlobRepository
+from app.model.analysis_finding_repository import AnalysisFindingRepository
+from app.model.analysis_rollup_repository import AnalysisRollupRepository
+from app.model.retention_repository import RetentionRepository
+from app.services.mongodb_service import mongodb_service
+
+
+def gc_blobs(args: argparse.Namespace) -> int:
+    """Elimina los blobs de contenido que ningún registro referencia"""
+    deleted = AnalysisBlobRepository().collect_garbage(grace_seconds=args.grace_seconds)
+    print(f"Blobs eliminados: {deleted}")
+    return 0
+
+
+def archive_analyses(args: argparse.Namespace) -> int:
+    """Mueve los análisis con IA antiguos a la colección de archivo"""
+    archived = RetentionRepository().archive_analyses(
+        batch_size=args.batch_size, max_batches=args.max_batches
+    )
+    print(f"Análisis archivados: {archived}")
+    return 0
+
+
+def apply_retention(args: argparse.Namespace) -> int:
+    """Asigna expires_at a los registros anteriores a la política de retención"""
+    updated = RetentionRepository().apply_retention(batch_size=args.batch_size)
+    print(f"Registros actualizados: {updated}")
+    return 0
+
+
+def rebuild_rollups(args: argparse.Namespace) -> int:
+    """Reconstruye los contadores diarios a partir de los registros existentes"""
+    written = AnalysisRollupRepository().rebuild(
+        batch_size=args.batch_size, include_today=args.include_today, days=args.days
+    )
+    print(f"Contadores reconstruidos: {written}")
+    return 0
+
+
+def backfill_findings(args: argparse.Namespace) -> int:
+    """Genera los hallazgos de los análisis con IA existentes"""
+    inserted = AnalysisFindingRepository().backfill(batch_size=args.batch_size)
+    print(f"Hallazgos generados: {inserted}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el parser de argumentos de la CLI"""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli", description="Tareas de mantenimiento del Analysis Service"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gc_parser = subparsers.add_parser(
+        "gc-blobs", help="Elimina blobs de contenido sin referencias"
+    )
+    gc_parser.add_argument(
+        "--grace-seconds",
+        type=int,
+        default=int(os.getenv("ANALYSIS_BLOB_GC_GRACE_SECONDS", "3600")),
+        help="Antigüedad mínima de la última referencia de un blob para eliminarlo",
+    )
+    gc_parser.set_defaults(handler=gc_blobs)
+
+    archive_parser = subparsers.add_parser(
+        "archive-analyses", help="Archiva los análisis con IA más antiguos que el umbral"
+    )
+    archive_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.getenv("ANALYSIS_ARCHIVE_BATCH_SIZE", "500")),
+        help="Registros movidos por lote",
+    )
+    archive_parser.add_argument(
+        "--max-batches", type=int, default=None, help="Límite de lotes por ejecución"
+    )
+    archive_parser.set_defaults(handler=archive_analyses)
+
+    retention_parser = subparsers.add_parser(
+        "apply-retention", help="Asigna la expiración a los registros existentes"
+    )
+    retention_parser.add_argument(
+        "--batch-size", type=int, default=500, help="Registros actualizados por lote"
+    )
+    retention_parser.set_defaults(handler=apply_retention)
+
+    rollups_parser = subparsers.add_parser(
+        "rebuild-rollups", help="Reconstruye los contadores diarios de análisis"
+    )
+    rollups_parser.add_argument(
+        "--batch-size", type=int, default=500, help="Documentos leídos y escritos por lote"
+    )
+    rollups_parser.add_argument(
+        "--include-today",
+        action="store_true",
+        help="Reconstruir también el día actual (solo sin tráfico de escritura)",
+    )
+    rollups_parser.add_argument(
+        "--days",
+        type=int,
+        default=None,
+        help=(
+            "Días hacia atrás a reconstruir (por defecto, la retención más corta; "
+            "0 = todo el historial, reemplaza días cuyos registros ya expiraron)"
+        ),
+    )
+    rollups_parser.set_defaults(handler=rebuild_rollups)
+
+    findings_parser = subparsers.add_parser(
+        "backfill-findings", help="Genera los hallazgos de los análisis con IA existentes"
+    )
+    findings_parser.add_argument(
+        "--batch-size", type=int, default=500, help="Registros leídos por lote"
+    )
+    findings_parser.set_defaults(handler=backfill_findings)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la CLI"""
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+
+    mongodb_service.connect()
+    try:
+        return args.handler(args)
+    finally:
+        mongodb_service.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
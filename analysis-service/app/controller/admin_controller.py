@@ -0,0 +1,235 @@
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import Response, StreamingResponse
+
+from app.model.analysis_model import (
+    ErrorResponse,
+    StorageStatsResponse,
+    TracesData,
+    TracesResponse,
+)
+from app.usecase.admin_usecase import AdminUseCase
+from app.services.logger import Logger
+from app.services.request_context import bind_request_context
+from app.services.auth_middleware import require_admin
+from app.services.log_stream import log_buffer, parse_stream_level
+from app.services.profiler import ProfilerBusyError, parse_profile_format, profile_process
+from app.services.tracing import tracer
+
+# Configurar router
+router = APIRouter()
+
+# Configurar logger
+logger = Logger()
+
+# Logs, trazas y perfiles viven en la memoria de cada worker: el header indica cuál respondió
+WORKER_PID_HEADER = "X-Worker-Pid"
+
+
+def _worker_headers() -> dict:
+    """Header con el PID del worker que atendió la petición"""
+    return {WORKER_PID_HEADER: str(os.getpid())}
+
+
+@router.get(
+    "/admin/storage",
+    response_model=StorageStatsResponse,
+    responses={
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        403: {"model": ErrorResponse, "description": "Acceso restringido a administradores"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Estadísticas de almacenamiento",
+    description="""Retorna el tamaño de datos e índices de las colecciones del servicio y la política de retención configurada. Requiere un usuario incluido en ADMIN_USERS.""",
+    operation_id="get_storage_stats",
+)
+async def get_storage_stats(auth_result: dict = Depends(require_admin)):
+    """
+    Reporta el tamaño de las colecciones y sus índices.
+
+    Returns:
+        StorageStatsResponse: Estadísticas de almacenamiento
+    """
+    try:
+        bind_request_context(handler="AdminController.get_storage_stats")
+
+        use_case = AdminUseCase()
+        return await use_case.get_storage_stats()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al obtener estadísticas: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error en la base de datos")
+
+
+@router.get(
+    "/admin/logs/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Registros de log como Server-Sent Events (un JSON por evento)",
+            "content": {"text/event-stream": {}},
+        },
+        400: {"model": ErrorResponse, "description": "Parámetros inválidos"},
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        403: {"model": ErrorResponse, "description": "Acceso restringido a administradores"},
+    },
+    summary="Logs en tiempo real",
+    description="""Envía los últimos registros de log guardados en memoria y luego los nuevos a medida que se emiten, como Server-Sent Events. Los filtros se evalúan en el servidor. Si el cliente no lee a tiempo se descartan registros y se envía un evento `dropped` con el total. Con varios workers de gunicorn solo se reciben los logs del worker que atiende la conexión, indicado en el header X-Worker-Pid. Requiere un usuario incluido en ADMIN_USERS.""",
+    operation_id="stream_logs",
+)
+async def stream_logs(
+    auth_result: dict = Depends(require_admin),
+    level: Optional[str] = Query(None, description="Nivel mínimo (DEBUG, INFO, WARNING, ERROR)"),
+    request_id: Optional[str] = Query(None, description="Solo registros de este request id"),
+    user: Optional[str] = Query(None, description="Solo registros de este usuario"),
+    backlog: int = Query(100, ge=0, le=10000, description="Registros guardados que se envían al conectar"),
+):
+    """
+    Transmite los logs del servicio en tiempo real.
+
+    El buffer de logs es del proceso: con varios workers solo se transmiten
+    los del worker que atiende la conexión.
+
+    Returns:
+        StreamingResponse: Eventos SSE con un registro JSON cada uno
+    """
+    try:
+        bind_request_context(handler="AdminController.stream_logs")
+
+        min_level = parse_stream_level(level)
+        stream = log_buffer.stream(
+            level=min_level, request_id=request_id, user=user, backlog=backlog
+        )
+        return StreamingResponse(
+            stream,
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+                **_worker_headers(),
+            },
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Error de validación en stream de logs: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado en stream de logs: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router.get(
+    "/admin/profile",
+    response_class=Response,
+    responses={
+        200: {
+            "description": "Perfil del proceso",
+            "content": {"text/plain": {}, "text/html": {}},
+        },
+        400: {"model": ErrorResponse, "description": "Parámetros inválidos"},
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        403: {"model": ErrorResponse, "description": "Acceso restringido a administradores"},
+        409: {"model": ErrorResponse, "description": "Ya hay un perfil en curso"},
+    },
+    summary="Perfil del worker",
+    description="""Muestrea los stacks de todos los hilos del proceso que atiende la petición durante `seconds` segundos, sin detener el tráfico, y retorna los stacks colapsados (compatibles con flamegraph.pl y speedscope) o un reporte HTML. Solo un perfil a la vez por proceso. Con varios workers de gunicorn se perfila solo el worker que recibe la petición, indicado en el header X-Worker-Pid. Requiere un usuario incluido en ADMIN_USERS.""",
+    operation_id="profile_process",
+)
+async def profile_worker(
+    auth_result: dict = Depends(require_admin),
+    seconds: float = Query(10, gt=0, le=120, description="Duración del perfil en segundos"),
+    format: Optional[str] = Query(None, description="collapsed (por defecto) o html"),
+    interval_ms: Optional[float] = Query(
+        None, ge=0.1, le=1000, description="Milisegundos entre muestras (por defecto PROFILER_INTERVAL_MS)"
+    ),
+):
+    """
+    Perfila el proceso durante unos segundos.
+
+    Con varios workers solo se perfila el que atiende la petición.
+
+    Returns:
+        Response: Stacks colapsados o reporte HTML
+    """
+    try:
+        bind_request_context(handler="AdminController.profile_worker", seconds=seconds)
+
+        profile_format = parse_profile_format(format)
+        logger.info(f"Iniciando perfil del proceso por {seconds} s", key="Iniciando perfil del proceso")
+        profiler = await profile_process(
+            seconds, interval_ms / 1000 if interval_ms is not None else None
+        )
+
+        content, media_type = profiler.render(profile_format)
+        return Response(content=content, media_type=media_type, headers=_worker_headers())
+
+    except HTTPException:
+        raise
+    except ProfilerBusyError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        logger.error(f"Error de validación en perfil: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado en perfil: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router.get(
+    "/admin/traces",
+    response_model=TracesResponse,
+    responses={
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        403: {"model": ErrorResponse, "description": "Acceso restringido a administradores"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Trazas recientes",
+    description="""Retorna los últimos spans guardados en memoria por el proceso que atiende la petición (auth, config-service, descifrado, LLM y MongoDB), opcionalmente de una sola traza o petición. Con varios workers de gunicorn solo se ven las trazas que atendió ese worker, indicado en `worker_pid` y en el header X-Worker-Pid. Requiere un usuario incluido en ADMIN_USERS.""",
+    operation_id="get_traces",
+)
+async def get_traces(
+    response: Response,
+    auth_result: dict = Depends(require_admin),
+    trace_id: Optional[str] = Query(None, description="Solo los spans de esta traza"),
+    request_id: Optional[str] = Query(None, description="Solo las trazas de esta petición (X-Request-ID)"),
+    limit: int = Query(100, ge=1, le=2000, description="Máximo de spans"),
+):
+    """
+    Consulta los spans recientes.
+
+    Los spans son los del proceso: con varios workers solo se ven los que
+    atendió el worker que responde.
+
+    Returns:
+        TracesResponse: Spans encontrados
+    """
+    try:
+        # request_id ya identifica a esta petición: los filtros van con otro nombre
+        bind_request_context(
+            handler="AdminController.get_traces",
+            trace_filter=trace_id,
+            request_filter=request_id,
+        )
+
+        spans = tracer.exporter.recent(trace_id=trace_id, request_id=request_id, limit=limit)
+        response.headers.update(_worker_headers())
+        return TracesResponse(
+            success=True,
+            message=f"{len(spans)} spans encontrados",
+            data=TracesData(
+                spans=spans, dropped=tracer.exporter.dropped, worker_pid=os.getpid()
+            ),
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al consultar trazas: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
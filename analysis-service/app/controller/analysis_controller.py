@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Query, HTTPException, Request, Depends
+from datetime import date, datetime, UTC
+from typing import List, Optional
 
-from app.model.analysis_model import AnalysisResponse, ErrorResponse
+from fastapi import APIRouter, Query, HTTPException, Request, Depends, Path
+from fastapi.responses import StreamingResponse
+
+from app.model.analysis_model import (
+    AnalysisResponse,
+    AnalysisDetailResponse,
+    AnalysisHistoryResponse,
+    AnalysisStatsResponse,
+    ErrorResponse,
+)
 from app.usecase.analysis_usecase import AnalysisUseCase
 from app.services.logger import Logger
 from app.services.auth_middleware import auth_middleware
+from app.services.request_context import bind_request_context
 
 # Configurar router
 router = APIRouter()
@@ -124,15 +135,7 @@ async def analyze_file(
         HTTPException: Si el archivo no existe o hay un error interno
     """
     try:
-        # Configurar contexto del logger
-        logger.set_context(
-            "AnalysisController.analyze_file",
-            {
-                "filename": filename,
-                "endpoint": "/analyze",
-                "authenticated": True,  # La autenticación ya fue validada por el middleware global
-            },
-        )
+        bind_request_context(handler="AnalysisController.analyze_file", filename=filename)
 
         logger.info("Iniciando análisis de archivo")
 
@@ -181,3 +184,209 @@ async def analyze_file(
             detail = "Error interno del servidor"
 
         raise HTTPException(status_code=status_code, detail=detail)
+
+
+@router.get(
+    "/analyses",
+    response_model=AnalysisHistoryResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Parámetros inválidos"},
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Historial de análisis",
+    description="""Lista los análisis del usuario autenticado, del más reciente al más antiguo, con paginación por cursor. Incluye los análisis con IA archivados.""",
+    operation_id="list_analyses",
+)
+async def list_analyses(
+    auth_result: dict = Depends(auth_middleware),
+    limit: int = Query(20, ge=1, le=100, description="Tamaño de página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor retornado en next_cursor por la página anterior"
+    ),
+    success: Optional[bool] = Query(
+        None, description="Filtrar por análisis exitosos (true) o fallidos (false)"
+    ),
+    security_level: Optional[List[str]] = Query(
+        None, description="Filtrar por nivel de seguridad (critical, high, medium, low, safe)"
+    ),
+    date_from: Optional[datetime] = Query(None, description="Fecha mínima de creación"),
+    date_to: Optional[datetime] = Query(None, description="Fecha máxima de creación"),
+):
+    """
+    Lista el historial de análisis del usuario.
+
+    Returns:
+        AnalysisHistoryResponse: Página de análisis y cursor de la siguiente
+    """
+    try:
+        bind_request_context(handler="AnalysisController.list_analyses", limit=limit)
+
+        use_case = AnalysisUseCase()
+        return await use_case.get_analyses_by_user(
+            auth_result,
+            limit=limit,
+            cursor=cursor,
+            success=success,
+            security_levels=security_level,
+            date_from=date_from,
+            date_to=date_to,
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Error de validación en historial: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado en historial: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error en la base de datos")
+
+
+@router.get(
+    "/analyses/stats",
+    response_model=AnalysisStatsResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Rango de fechas inválido"},
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Estadísticas de análisis",
+    description="""Retorna, por día, el número de análisis del usuario autenticado por resultado, nivel de seguridad y severidad de los problemas detectados. Se calcula a partir de contadores precalculados, sin recorrer el historial.""",
+    operation_id="get_analysis_stats",
+)
+async def get_analysis_stats(
+    auth_result: dict = Depends(auth_middleware),
+    date_from: Optional[date] = Query(
+        None, description="Primer día (YYYY-MM-DD, UTC); por defecto hace 30 días"
+    ),
+    date_to: Optional[date] = Query(
+        None, description="Último día (YYYY-MM-DD, UTC); por defecto hoy"
+    ),
+):
+    """
+    Obtiene las estadísticas diarias de análisis del usuario.
+
+    Returns:
+        AnalysisStatsResponse: Totales del rango y contadores por día
+    """
+    try:
+        bind_request_context(handler="AnalysisController.get_analysis_stats")
+
+        use_case = AnalysisUseCase()
+        return await use_case.get_analysis_stats(auth_result, date_from, date_to)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Error de validación en estadísticas: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado en estadísticas: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error en la base de datos")
+
+
+@router.get(
+    "/analyses/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Historial en NDJSON (un registro JSON por línea)",
+            "content": {"application/x-ndjson": {}, "application/gzip": {}},
+        },
+        400: {"model": ErrorResponse, "description": "Parámetros inválidos"},
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+    },
+    summary="Exportar historial de análisis",
+    description="""Descarga el historial del usuario autenticado en NDJSON, del más antiguo al más reciente. Los registros se leen de MongoDB y se envían por lotes, por lo que la memoria del servicio no depende del tamaño del historial. Incluye los análisis con IA archivados, sin la lista de problemas.""",
+    operation_id="export_analyses",
+)
+async def export_analyses(
+    auth_result: dict = Depends(auth_middleware),
+    fields: Optional[str] = Query(
+        None,
+        description="Campos separados por coma (analysis_id, success, created_at, filename, gemini_response, error, security_level, safe, problems, content_ref)",
+    ),
+    date_from: Optional[datetime] = Query(None, description="Fecha mínima de creación"),
+    date_to: Optional[datetime] = Query(None, description="Fecha máxima de creación"),
+    gzip: bool = Query(False, description="Comprimir la descarga con gzip (.ndjson.gz)"),
+):
+    """
+    Exporta el historial de análisis del usuario en NDJSON.
+
+    Returns:
+        StreamingResponse: Descarga NDJSON, opcionalmente comprimida
+    """
+    try:
+        bind_request_context(handler="AnalysisController.export_analyses", gzip=gzip)
+
+        field_list = (
+            [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        )
+        use_case = AnalysisUseCase()
+        stream = use_case.export_analyses(
+            auth_result,
+            fields=field_list,
+            date_from=date_from,
+            date_to=date_to,
+            compress=gzip,
+        )
+
+        filename = f"analyses-{datetime.now(UTC).strftime('%Y%m%dT%H%M%SZ')}.ndjson"
+        if gzip:
+            filename += ".gz"
+        return StreamingResponse(
+            stream,
+            media_type="application/gzip" if gzip else "application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Error de validación en exportación: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado en exportación: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router.get(
+    "/analyses/{analysis_id}",
+    response_model=AnalysisDetailResponse,
+    responses={
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        404: {"model": ErrorResponse, "description": "Análisis no encontrado"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Detalle de análisis",
+    description="""Retorna el registro completo de un análisis del usuario autenticado.""",
+    operation_id="get_analysis",
+)
+async def get_analysis(
+    analysis_id: str = Path(..., description="UUID del análisis"),
+    auth_result: dict = Depends(auth_middleware),
+):
+    """
+    Obtiene el detalle de un análisis.
+
+    Args:
+        analysis_id (str): UUID del análisis
+
+    Returns:
+        AnalysisDetailResponse: Registro completo del análisis
+    """
+    try:
+        bind_request_context(handler="AnalysisController.get_analysis", analysis_id=analysis_id)
+
+        use_case = AnalysisUseCase()
+        return await use_case.get_analysis_by_id(analysis_id, auth_result)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Análisis no encontrado: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado al obtener análisis: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error en la base de datos")
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, HTTPException, Depends, Path
+
+from app.model.analysis_model import (
+    AnalysisJobRequest,
+    AnalysisJobResponse,
+    ErrorResponse,
+)
+from app.usecase.analysis_job_usecase import AnalysisJobUseCase
+from app.services.logger import Logger
+from app.services.auth_middleware import auth_middleware
+from app.services.request_context import bind_request_context
+
+# Configurar router
+router = APIRouter()
+
+# Configurar logger
+logger = Logger()
+
+
+@router.post(
+    "/analysis-jobs",
+    status_code=202,
+    response_model=AnalysisJobResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Parámetros inválidos"},
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Crear trabajo de análisis",
+    description="""Registra un análisis para ejecución en segundo plano y retorna inmediatamente el ID del trabajo.""",
+    operation_id="create_analysis_job",
+)
+async def create_analysis_job(
+    job_request: AnalysisJobRequest,
+    auth_result: dict = Depends(auth_middleware),
+):
+    """
+    Registra un trabajo de análisis asíncrono.
+
+    Args:
+        job_request (AnalysisJobRequest): Archivo a analizar y modo de análisis
+
+    Returns:
+        AnalysisJobResponse: Trabajo creado en estado pendiente
+    """
+    try:
+        bind_request_context(
+            handler="AnalysisJobController.create_analysis_job",
+            filename=job_request.filename,
+        )
+        logger.info("Registrando trabajo de análisis")
+
+        use_case = AnalysisJobUseCase()
+        return await use_case.submit(
+            job_request.filename, job_request.enable_ia, auth_result
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Error de validación al crear trabajo: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado al crear trabajo: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error en la base de datos")
+
+
+@router.get(
+    "/analysis-jobs/{job_id}",
+    response_model=AnalysisJobResponse,
+    responses={
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        404: {"model": ErrorResponse, "description": "Trabajo no encontrado"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Consultar trabajo de análisis",
+    description="""Retorna el estado de un trabajo de análisis y su resultado cuando está completado.""",
+    operation_id="get_analysis_job",
+)
+async def get_analysis_job(
+    job_id: str = Path(..., description="ID del trabajo de análisis"),
+    auth_result: dict = Depends(auth_middleware),
+):
+    """
+    Consulta el estado de un trabajo de análisis.
+
+    Args:
+        job_id (str): ID del trabajo
+
+    Returns:
+        AnalysisJobResponse: Estado del trabajo y resultado si está disponible
+    """
+    try:
+        bind_request_context(handler="AnalysisJobController.get_analysis_job", job_id=job_id)
+
+        use_case = AnalysisJobUseCase()
+        return await use_case.get_job(job_id, auth_result)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Trabajo no encontrado: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado al consultar trabajo: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error en la base de datos")
@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+
+from app.model.analysis_model import ErrorResponse, FindingsResponse
+from app.usecase.finding_usecase import FindingUseCase
+from app.services.logger import Logger
+from app.services.request_context import bind_request_context
+from app.services.auth_middleware import auth_middleware
+
+# Configurar router
+router = APIRouter()
+
+# Configurar logger
+logger = Logger()
+
+
+@router.get(
+    "/findings",
+    response_model=FindingsResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Parámetros inválidos"},
+        401: {"model": ErrorResponse, "description": "No autorizado"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+    summary="Hallazgos de análisis",
+    description="""Lista los problemas detectados en los análisis con IA del usuario autenticado, del más reciente al más antiguo, filtrando por severidad, categoría y archivo, con paginación por cursor.""",
+    operation_id="list_findings",
+)
+async def list_findings(
+    auth_result: dict = Depends(auth_middleware),
+    limit: int = Query(20, ge=1, le=100, description="Tamaño de página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor retornado en next_cursor por la página anterior"
+    ),
+    severity: Optional[List[str]] = Query(
+        None, description="Filtrar por severidad (critical, high, medium, low, unknown)"
+    ),
+    category: Optional[List[str]] = Query(
+        None, description="Filtrar por categoría (telnet, ssh, snmp, password, ...)"
+    ),
+    filename: Optional[str] = Query(None, description="Filtrar por nombre de archivo"),
+    date_from: Optional[datetime] = Query(None, description="Fecha mínima del análisis"),
+    date_to: Optional[datetime] = Query(None, description="Fecha máxima del análisis"),
+):
+    """
+    Lista los hallazgos de los análisis del usuario.
+
+    Returns:
+        FindingsResponse: Página de hallazgos y cursor de la siguiente
+    """
+    try:
+        bind_request_context(handler="FindingController.list_findings", limit=limit)
+
+        use_case = FindingUseCase()
+        return await use_case.get_findings(
+            auth_result,
+            limit=limit,
+            cursor=cursor,
+            severities=severity,
+            categories=category,
+            filename=filename,
+            date_from=date_from,
+            date_to=date_to,
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Error de validación en hallazgos: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error inesperado en hallazgos: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error en la base de datos")
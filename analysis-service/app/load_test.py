@@ -0,0 +1,133 @@
+"""
+Prueba de carga local del Analysis Service
+
+Uso:
+    python -m app.load_test [--url URL] [--concurrency N] [--duration S]
+                            [--header "Nombre: valor"]
+
+Mantiene N peticiones en curso durante S segundos y reporta peticiones por
+segundo, latencias (p50, p95, p99) y respuestas por código de estado. Sirve
+para comparar el servidor con distintos valores de WEB_CONCURRENCY.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil de una lista ordenada (vecino más cercano)"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+async def run_load_test(
+    url: str,
+    concurrency: int,
+    duration: float,
+    headers: Optional[Dict[str, str]] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Dict[str, Any]:
+    """
+    Envía peticiones GET a url con concurrency usuarios durante duration segundos
+
+    Args:
+        url: URL a consultar
+        concurrency: Peticiones en curso en todo momento
+        duration: Segundos de prueba
+        headers: Headers de cada petición (p. ej. Authorization)
+        transport: Transporte de httpx (por defecto, red)
+
+    Returns:
+        Dict[str, Any]: Peticiones, throughput, latencias en ms, estados y errores
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        headers=headers, limits=limits, timeout=30.0, transport=transport
+    ) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                request_started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                latencies.append(time.perf_counter() - request_started)
+                statuses[response.status_code] += 1
+
+        await asyncio.gather(*[user() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            name: round(percentile(latencies, fraction) * 1000, 2)
+            for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+        },
+        "statuses": dict(statuses),
+        "errors": dict(errors),
+    }
+
+
+def parse_header(value: str) -> Tuple[str, str]:
+    """Convierte "Nombre: valor" en una tupla (nombre, valor)"""
+    name, separator, header_value = value.partition(":")
+    if not separator or not name.strip():
+        raise argparse.ArgumentTypeError(f"Header inválido: {value!r} (formato 'Nombre: valor')")
+    return name.strip(), header_value.strip()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el parser de argumentos de la prueba de carga"""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.load_test", description="Prueba de carga local del Analysis Service"
+    )
+    parser.add_argument("--url", default="http://localhost:8002/health", help="URL a consultar")
+    parser.add_argument("--concurrency", type=int, default=50, help="Peticiones en curso")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de prueba")
+    parser.add_argument(
+        "--header",
+        type=parse_header,
+        action="append",
+        default=[],
+        help="Header de cada petición, p. ej. 'Authorization: Bearer <token>' (repetible)",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la prueba de carga"""
+    args = build_parser().parse_args(argv)
+    result = asyncio.run(
+        run_load_test(args.url, args.concurrency, args.duration, headers=dict(args.header))
+    )
+
+    latency = result["latency_ms"]
+    print(f"Peticiones: {result['requests']} en {result['elapsed_seconds']} s")
+    print(f"Throughput: {result['requests_per_second']} req/s")
+    print(f"Latencia: p50={latency['p50']} ms p95={latency['p95']} ms p99={latency['p99']} ms")
+    print(f"Estados: {result['statuses']}")
+    if result["errors"]:
+        print(f"Errores: {result['errors']}")
+    return 0 if not result["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
-import uvicorn
 from fastapi import FastAPI, Depends
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from dotenv import load_dotenv
@@ -7,8 +7,21 @@ import os
 import time
 
 from app.controller.analysis_controller import router as analysis_router
+from app.controller.analysis_job_controller import router as analysis_job_router
+from app.controller.admin_controller import router as admin_router
+from app.controller.finding_controller import router as finding_router
 from app.services.auth_middleware import auth_middleware
+from app.services.logger import log_listener
+from app.services.request_context import RequestContextMiddleware
+from app.services.server_timing import ServerTimingMiddleware
+from app.services.profiler import RequestProfilerMiddleware
+from app.services.tracing import TracingMiddleware, tracer
 from app.services.mongodb_service import mongodb_service
+from app.services.analysis_job_worker import analysis_job_worker_pool
+from app.services.analysis_record_writer import analysis_record_writer
+from app.services.readiness_service import readiness_service
+from app.services.metrics import metrics
+from app.services.loop_monitor import loop_monitor
 
 from app.swagger_config import SECURITY_SCHEMES, SERVERS, EXTRA_INFO
 from app.swagger_ui_config import API_INFO, SWAGGER_UI_CONFIG
@@ -31,21 +44,43 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     """Evento que se ejecuta al iniciar la aplicación"""
+    # Los logs se escriben desde un hilo propio, fuera del camino de las peticiones
+    log_listener.start()
+
     try:
         mongodb_service.connect()
         print("✅ Conexión a MongoDB establecida exitosamente")
     except Exception as e:
         print(f"❌ Error al conectar a MongoDB: {str(e)}")
 
+    await analysis_record_writer.start()
+
+    # Retraso del event loop (event_loop_lag_seconds en /metrics)
+    if os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true":
+        await loop_monitor.start()
+
+    # En entorno de test no se inician los workers de trabajos asíncronos
+    if "test" not in os.environ.get("ENVIRONMENT", "").lower():
+        await analysis_job_worker_pool.start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento que se ejecuta al cerrar la aplicación"""
+    await loop_monitor.stop()
+    await analysis_job_worker_pool.stop()
+    # Escribir los registros pendientes antes de cerrar la conexión
+    await analysis_record_writer.stop()
+
     try:
         mongodb_service.disconnect()
         print("✅ Conexión a MongoDB cerrada exitosamente")
     except Exception as e:
         print(f"❌ Error al cerrar conexión a MongoDB: {str(e)}")
 
+    # Escribir los spans y los logs pendientes
+    tracer.exporter.shutdown()
+    log_listener.stop()
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -53,8 +88,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Server-Timing", "X-Worker-Pid"],
 )
 
+# Traza de cada petición (traceparent); queda dentro del contexto para ver el request id
+app.add_middleware(TracingMiddleware)
+
+# Request id, método y ruta de cada petición para los logs
+app.add_middleware(RequestContextMiddleware)
+
+# Desglose por etapa en el header Server-Timing (opcional)
+app.add_middleware(ServerTimingMiddleware)
+
+# Perfil de una petición con ?profile=1 (solo administradores)
+app.add_middleware(RequestProfilerMiddleware)
+
 # Incluir rutas con middleware de autenticación
 app.include_router(
     analysis_router,
@@ -62,6 +110,24 @@ app.include_router(
     tags=["analysis"],
     dependencies=[Depends(auth_middleware)],
 )
+app.include_router(
+    analysis_job_router,
+    prefix="/api/v1",
+    tags=["analysis-jobs"],
+    dependencies=[Depends(auth_middleware)],
+)
+app.include_router(
+    finding_router,
+    prefix="/api/v1",
+    tags=["findings"],
+    dependencies=[Depends(auth_middleware)],
+)
+app.include_router(
+    admin_router,
+    prefix="/api/v1",
+    tags=["admin"],
+    dependencies=[Depends(auth_middleware)],
+)
 
 
 @app.get(
@@ -101,6 +167,74 @@ async def health_check():
     }
 
 
+@app.get(
+    "/health/ready",
+    tags=["health"],
+    summary="Verificar disponibilidad de las dependencias",
+    description=(
+        "Consulta MongoDB, auth-service y config-service en paralelo y reporta "
+        "la latencia de cada uno. El resultado se reutiliza durante "
+        "HEALTH_READY_CACHE_SECONDS segundos."
+    ),
+    response_description="Estado de las dependencias",
+    responses={
+        200: {
+            "description": "Todas las dependencias responden",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "status": "ready",
+                        "service": "analysis-service",
+                        "checked_at": "2024-01-01T00:00:00+00:00",
+                        "cached": False,
+                        "dependencies": {
+                            "mongodb": {"status": "up", "latency_ms": 1.2},
+                            "auth_service": {"status": "up", "latency_ms": 3.4},
+                            "config_service": {"status": "up", "latency_ms": 2.8},
+                        },
+                    }
+                }
+            },
+        },
+        503: {"description": "Alguna dependencia no responde"},
+    },
+)
+async def readiness_check():
+    """
+    Verifica que el servicio pueda atender peticiones.
+
+    Returns:
+        JSONResponse: Estado de las dependencias (503 si alguna no responde)
+    """
+    result = await readiness_service.check()
+    status_code = 200 if result["status"] == "ready" else 503
+    return JSONResponse(status_code=status_code, content=result)
+
+
+@app.get(
+    "/metrics",
+    tags=["health"],
+    summary="Métricas Prometheus",
+    description=(
+        "Métricas en formato de texto de Prometheus: duración por etapa del "
+        "análisis y de la autenticación, aciertos de caché, respuestas de "
+        "respaldo, errores de parseo de Gemini, operaciones en curso y tokens "
+        "consumidos."
+    ),
+    response_class=Response,
+    responses={200: {"content": {"text/plain": {}}}},
+)
+async def metrics_endpoint():
+    """
+    Expone las métricas del servicio para Prometheus.
+
+    Returns:
+        Response: Métricas en formato de texto
+    """
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
 def _add_basic_openapi_info(openapi_schema):
     """Agrega información básica al esquema OpenAPI"""
     openapi_schema["info"]["contact"] = API_INFO["contact"]
@@ -113,7 +247,7 @@ def _add_basic_openapi_info(openapi_schema):
 
 def _is_public_path(path):
     """Determina si una ruta es pública (no requiere autenticación)"""
-    public_paths = ["/health", "/docs", "/redoc", "/openapi.json", "/favicon.ico"]
+    public_paths = ["/health", "/health/ready", "/metrics", "/docs", "/redoc", "/openapi.json", "/favicon.ico"]
     return path in public_paths
 
 def _is_http_method(method):
@@ -165,5 +299,7 @@ app.openapi = custom_openapi
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     port = int(os.getenv("PORT", 8002))
     uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=False)
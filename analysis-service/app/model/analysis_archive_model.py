@@ -0,0 +1,31 @@
+from mongoengine import Document, StringField, BooleanField, DateTimeField, DictField
+from datetime import datetime, UTC
+
+
+class AnalysisArchive(Document):
+    """
+    Modelo para los análisis con IA archivados
+
+    Conserva el mismo _id, uuid y forma de response que el registro original,
+    pero response solo guarda el resumen (sin la lista de problemas).
+    """
+
+    # Campos del documento
+    uuid = StringField(required=True, unique=True)
+    success = BooleanField(required=True)
+    response = DictField(required=True)  # Resumen del análisis
+    user = StringField(required=True)
+    created_at = DateTimeField(required=True)
+    archived_at = DateTimeField(default=lambda: datetime.now(UTC))
+
+    # Configuración de la colección
+    meta = {
+        "collection": "analysis_archive",
+        "indexes": [
+            "uuid",
+            (
+                "user",
+                "created_at",
+            ),
+        ],
+    }
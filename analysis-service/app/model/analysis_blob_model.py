@@ -0,0 +1,26 @@
+from mongoengine import Document, StringField, IntField, DateTimeField, DynamicField
+from datetime import datetime, UTC
+
+
+class AnalysisBlob(Document):
+    """
+    Modelo para el contenido de archivos analizados sin IA
+
+    El contenido se guarda una sola vez, identificado por su SHA-256; los
+    registros de análisis solo guardan la referencia (response.content_ref).
+    """
+
+    # Campos del documento
+    sha256 = StringField(primary_key=True)  # Hash del contenido, también es el _id
+    content = DynamicField(required=True)  # Texto o sobre comprimido (PayloadCodec)
+    size = IntField(required=True)  # Tamaño en bytes del contenido UTF-8 sin comprimir
+    created_at = DateTimeField(default=lambda: datetime.now(UTC))
+    last_referenced_at = DateTimeField(default=lambda: datetime.now(UTC))
+
+    # Configuración de la colección
+    meta = {
+        "collection": "analysis_blobs",
+        "indexes": [
+            "last_referenced_at",  # Candidatos para la recolección de basura
+        ],
+    }
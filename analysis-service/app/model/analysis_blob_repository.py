@@ -0,0 +1,173 @@
+import hashlib
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.model.analysis_blob_model import AnalysisBlob
+from app.model.analysis_record_model import AnalysisRecord
+from app.services.logger import Logger
+from app.services.payload_codec import PayloadCodec, payload_codec
+
+# Campo de response con el que un registro referencia su contenido
+CONTENT_REF_FIELD = "content_ref"
+
+
+def content_digest(content: str) -> str:
+    """Calcula el SHA-256 del contenido en UTF-8"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def externalize_content(
+    response: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Optional[Tuple[str, str]]]:
+    """
+    Separa el contenido en texto plano de una respuesta de análisis sin IA
+
+    Args:
+        response: Respuesta a persistir
+
+    Returns:
+        Tuple: Respuesta con content_ref en lugar del contenido y el blob
+        (sha256, contenido), o la respuesta original y None si no aplica
+    """
+    if not isinstance(response, dict):
+        return response, None
+
+    content = response.get("analysis_data")
+    if response.get("gemini_response") or not isinstance(content, str):
+        return response, None
+
+    digest = content_digest(content)
+    stored = {key: value for key, value in response.items() if key != "analysis_data"}
+    stored[CONTENT_REF_FIELD] = digest
+    stored["content_size"] = len(content.encode("utf-8"))
+    return stored, (digest, content)
+
+
+class AnalysisBlobRepository:
+    """
+    Repositorio para el contenido deduplicado de los análisis
+
+    Los blobs se escriben con upsert: el contenido solo se inserta la primera
+    vez y las siguientes escrituras solo renuevan last_referenced_at. Los blobs
+    que ningún registro referencia se eliminan con collect_garbage. El
+    contenido se comprime con PayloadCodec si supera el umbral configurado.
+    """
+
+    def __init__(self, codec: Optional[PayloadCodec] = None):
+        self.logger = Logger()
+        self.codec = codec or payload_codec
+
+    def store_blobs(self, blobs: Dict[str, str]) -> None:
+        """
+        Guarda (o renueva) un conjunto de blobs en una sola escritura
+
+        Args:
+            blobs: Contenido por SHA-256
+        """
+        if not blobs:
+            return
+
+        now = datetime.now(UTC)
+        operations = [
+            UpdateOne(
+                {"_id": digest},
+                {
+                    "$setOnInsert": {
+                        "content": self.codec.encode(content),
+                        "size": len(content.encode("utf-8")),
+                        "created_at": now,
+                    },
+                    "$set": {"last_referenced_at": now},
+                },
+                upsert=True,
+            )
+            for digest, content in blobs.items()
+        ]
+        AnalysisBlob._get_collection().bulk_write(operations, ordered=False)
+
+    def get_content(self, digest: str) -> Optional[str]:
+        """
+        Obtiene el contenido de un blob por su SHA-256 (búsqueda por _id)
+
+        Args:
+            digest: SHA-256 del contenido
+
+        Returns:
+            Optional[str]: Contenido o None si no existe
+        """
+        blob = AnalysisBlob._get_collection().find_one({"_id": digest}, {"content": 1})
+        return self.codec.decode(blob["content"]) if blob else None
+
+    def resolve_content(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reconstruye la respuesta original de un registro que referencia un blob
+
+        Args:
+            response: Respuesta tal como está guardada en el registro
+
+        Returns:
+            Dict[str, Any]: Respuesta con analysis_data restaurado
+        """
+        digest = response.get(CONTENT_REF_FIELD)
+        if not digest:
+            return response
+
+        content = self.get_content(digest)
+        if content is None:
+            self.logger.warning(f"Blob de contenido no encontrado: {digest}")
+
+        resolved = dict(response)
+        resolved["analysis_data"] = content
+        return resolved
+
+    def collect_garbage(self, grace_seconds: int = 3600, batch_size: int = 500) -> int:
+        """
+        Elimina los blobs que ya no referencia ningún registro
+
+        Solo se consideran blobs no referenciados durante el periodo de gracia,
+        para no borrar un blob cuyo registro todavía está en el buffer de escritura.
+
+        Args:
+            grace_seconds: Antigüedad mínima de la última referencia
+            batch_size: Blobs revisados por consulta
+
+        Returns:
+            int: Número de blobs eliminados
+        """
+        try:
+            blobs = AnalysisBlob._get_collection()
+            records = AnalysisRecord._get_collection()
+            cutoff = datetime.now(UTC) - timedelta(seconds=grace_seconds)
+            ref_field = f"response.{CONTENT_REF_FIELD}"
+            deleted = 0
+            last_id = None
+
+            while True:
+                query: Dict[str, Any] = {"last_referenced_at": {"$lt": cutoff}}
+                if last_id is not None:
+                    query["_id"] = {"$gt": last_id}
+                candidates = [
+                    blob["_id"]
+                    for blob in blobs.find(query, {"_id": 1}).sort("_id", 1).limit(batch_size)
+                ]
+                if not candidates:
+                    break
+                last_id = candidates[-1]
+
+                referenced = set(records.distinct(ref_field, {ref_field: {"$in": candidates}}))
+                orphans = [digest for digest in candidates if digest not in referenced]
+                if orphans:
+                    # Repetir el corte por si un registro nuevo renovó el blob mientras tanto
+                    result = blobs.delete_many(
+                        {"_id": {"$in": orphans}, "last_referenced_at": {"$lt": cutoff}}
+                    )
+                    deleted += result.deleted_count
+
+            self.logger.info(f"Recolección de blobs completada: {deleted} eliminados")
+            return deleted
+
+        except Exception as e:
+            self.logger.error(f"Error al recolectar blobs de contenido: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
@@ -0,0 +1,38 @@
+from mongoengine import Document, StringField, IntField, DateTimeField
+
+
+class AnalysisFinding(Document):
+    """
+    Modelo para un problema detectado en un análisis con IA
+
+    Cada elemento de response.analysis_data.problems se guarda también como un
+    documento propio, con la severidad normalizada y una categoría, para poder
+    filtrar hallazgos por índice sin recorrer ni desenrollar los registros.
+    """
+
+    # Campos del documento
+    analysis_uuid = StringField(required=True)  # UUID del registro de análisis
+    index = IntField(required=True)  # Posición en la lista de problemas
+    user = StringField(required=True)
+    filename = StringField()
+    severity = StringField(required=True)  # Ver app/utils/severity.py
+    category = StringField(required=True)  # Ver app/utils/finding_categories.py
+    problem = StringField()
+    recommendation = StringField()
+    created_at = DateTimeField(required=True)  # created_at del registro de análisis
+
+    # Configuración de la colección
+    meta = {
+        "collection": "analysis_findings",
+        "indexes": [
+            {
+                "fields": ["analysis_uuid", "index"],
+                "unique": True,
+            },  # Un hallazgo por problema: las reescrituras son idempotentes
+            ("user", "-created_at"),
+            ("user", "severity", "-created_at"),
+            ("user", "category", "-created_at"),
+            ("user", "severity", "category", "-created_at"),
+            ("user", "filename", "-created_at"),
+        ],
+    }
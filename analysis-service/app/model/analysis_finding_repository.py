@@ -0,0 +1,210 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from app.model.analysis_finding_model import AnalysisFinding
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.pagination import MAX_PAGE_SIZE, apply_cursor, next_page_cursor, to_naive_utc
+from app.services.logger import Logger
+from app.services.payload_codec import payload_codec
+from app.utils.finding_categories import categorize_finding
+from app.utils.severity import normalize_severity
+
+
+def build_findings(
+    analysis_uuid: str,
+    user: str,
+    success: bool,
+    response: Optional[Dict[str, Any]],
+    created_at: datetime,
+) -> List[Dict[str, Any]]:
+    """
+    Construye un hallazgo por cada problema de un análisis con IA
+
+    Args:
+        analysis_uuid: UUID del registro de análisis
+        user: Usuario que realizó el análisis
+        success: Indica si el análisis fue exitoso
+        response: Respuesta del análisis (con o sin problems comprimido)
+        created_at: Fecha de creación del registro
+
+    Returns:
+        List[Dict[str, Any]]: Documentos de analysis_findings (vacío si no hay problemas)
+    """
+    response = response or {}
+    analysis_data = response.get("analysis_data")
+    if not (success and response.get("gemini_response") and isinstance(analysis_data, dict)):
+        return []
+
+    problems = payload_codec.decode(analysis_data.get("problems")) or []
+    return [
+        {
+            "analysis_uuid": analysis_uuid,
+            "index": index,
+            "user": user,
+            "filename": response.get("filename"),
+            "severity": normalize_severity(problem.get("severity")),
+            "category": categorize_finding(problem.get("problem"), problem.get("recommendation")),
+            "problem": problem.get("problem"),
+            "recommendation": problem.get("recommendation"),
+            "created_at": created_at,
+        }
+        for index, problem in enumerate(problems)
+        if isinstance(problem, dict)
+    ]
+
+
+class AnalysisFindingRepository:
+    """
+    Repositorio para los hallazgos normalizados de los análisis con IA
+    """
+
+    def __init__(self):
+        self.logger = Logger()
+
+    def insert_findings(self, findings: List[Dict[str, Any]]) -> int:
+        """
+        Inserta hallazgos ignorando los que ya existen (analysis_uuid, index)
+
+        Args:
+            findings: Documentos construidos con build_findings
+
+        Returns:
+            int: Número de hallazgos insertados
+        """
+        if not findings:
+            return 0
+        try:
+            result = AnalysisFinding._get_collection().insert_many(findings, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as bulk_error:
+            errors = bulk_error.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            return bulk_error.details.get("nInserted", len(findings) - len(errors))
+
+    def find_findings(
+        self,
+        user: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        severities: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        filename: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Lista los hallazgos de un usuario, del más reciente al más antiguo
+
+        Cada combinación de filtros tiene un índice (user, <filtro>, created_at),
+        y la paginación keyset continúa sobre ese mismo índice.
+
+        Args:
+            user: Usuario autenticado
+            limit: Tamaño de página
+            cursor: Cursor retornado por la página anterior
+            severities: Filtrar por severidad normalizada
+            categories: Filtrar por categoría
+            filename: Filtrar por nombre de archivo exacto
+            date_from: Fecha mínima de creación (inclusive)
+            date_to: Fecha máxima de creación (inclusive)
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: Hallazgos y cursor siguiente
+        """
+        query: Dict[str, Any] = {"user": user}
+        created_at: Dict[str, Any] = {}
+
+        if severities:
+            query["severity"] = {"$in": severities}
+        if categories:
+            query["category"] = {"$in": categories}
+        if filename:
+            query["filename"] = filename
+        if date_from:
+            created_at["$gte"] = to_naive_utc(date_from)
+        if date_to:
+            created_at["$lte"] = to_naive_utc(date_to)
+
+        apply_cursor(query, created_at, cursor)
+        if created_at:
+            query["created_at"] = created_at
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        try:
+            documents = list(
+                AnalysisFinding._get_collection()
+                .find(query)
+                .sort("created_at", -1)
+                .limit(limit + 1)
+            )
+        except Exception as e:
+            self.logger.error(f"Error al consultar hallazgos: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = next_page_cursor(documents, cursor)
+
+        return documents, next_cursor
+
+    def backfill(self, batch_size: int = 500) -> int:
+        """
+        Genera los hallazgos de los análisis con IA guardados antes de esta colección
+
+        Recorre analysis_records por _id en lotes; los hallazgos que ya existen
+        se ignoran, por lo que se puede interrumpir y repetir. Los análisis
+        archivados solo conservan el resumen y no generan hallazgos.
+
+        Args:
+            batch_size: Registros leídos por lote
+
+        Returns:
+            int: Número de hallazgos insertados
+        """
+        try:
+            records = AnalysisRecord._get_collection()
+            query: Dict[str, Any] = {"success": True, "response.gemini_response": True}
+            projection = {
+                "uuid": 1,
+                "user": 1,
+                "success": 1,
+                "created_at": 1,
+                "response.filename": 1,
+                "response.gemini_response": 1,
+                "response.analysis_data.problems": 1,
+            }
+            inserted = 0
+            last_id = None
+
+            while True:
+                batch_query = dict(query, _id={"$gt": last_id}) if last_id else query
+                documents = list(
+                    records.find(batch_query, projection).sort("_id", 1).limit(batch_size)
+                )
+                if not documents:
+                    break
+
+                findings = [
+                    finding
+                    for document in documents
+                    for finding in build_findings(
+                        document["uuid"],
+                        document["user"],
+                        document["success"],
+                        document.get("response"),
+                        document["created_at"],
+                    )
+                ]
+                inserted += self.insert_findings(findings)
+                last_id = documents[-1]["_id"]
+
+            self.logger.info(f"Hallazgos generados: {inserted}")
+            return inserted
+
+        except Exception as e:
+            self.logger.error(f"Error al generar hallazgos: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
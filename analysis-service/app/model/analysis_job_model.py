@@ -0,0 +1,66 @@
+from mongoengine import (
+    Document,
+    StringField,
+    BooleanField,
+    DateTimeField,
+    DictField,
+    IntField,
+)
+from datetime import datetime, UTC
+import uuid
+
+
+# Estados posibles de un trabajo de análisis
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+
+class AnalysisJob(Document):
+    """
+    Modelo para representar los trabajos de análisis asíncronos en MongoDB
+    """
+
+    # Campos del documento
+    uuid = StringField(required=True, unique=True, default=lambda: str(uuid.uuid4()))
+    status = StringField(required=True, default=JOB_STATUS_PENDING)
+    filename = StringField(required=True)
+    enable_ia = BooleanField(default=False)
+    user = StringField(required=True)  # Usuario extraído del token
+    token = StringField()  # Token cifrado para consultar el config-service, se borra al terminar
+    result = DictField()  # AnalysisResponse serializada
+    error = StringField()
+    attempts = IntField(default=0)
+    worker_id = StringField()
+    lease_expires_at = DateTimeField()
+    created_at = DateTimeField(default=lambda: datetime.now(UTC))
+    updated_at = DateTimeField(default=lambda: datetime.now(UTC))
+    started_at = DateTimeField()
+    finished_at = DateTimeField()
+    expires_at = DateTimeField()  # Fijado al terminar; None = no expira
+
+    # Configuración de la colección
+    meta = {
+        "collection": "analysis_jobs",
+        "indexes": [
+            "uuid",
+            (
+                "status",
+                "created_at",
+            ),  # Índice compuesto para reclamar el trabajo pendiente más antiguo
+            (
+                "user",
+                "created_at",
+            ),
+            {
+                "fields": ["expires_at"],
+                "expireAfterSeconds": 0,
+            },  # TTL: MongoDB elimina los trabajos terminados al llegar a expires_at
+        ],
+    }
+
+    def save(self, *args, **kwargs):
+        """Sobrescribe el método save para actualizar updated_at"""
+        self.updated_at = datetime.now(UTC)
+        return super().save(*args, **kwargs)
@@ -0,0 +1,214 @@
+import os
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional
+
+from mongoengine.queryset.visitor import Q
+
+from app.model.analysis_job_model import (
+    AnalysisJob,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED,
+)
+from app.services.encrypt import Encrypt
+from app.services.logger import Logger
+
+
+class AnalysisJobRepository:
+    """
+    Repositorio para manejar las operaciones de MongoDB con los trabajos de análisis
+
+    Los trabajos terminados expiran tras ANALYSIS_JOB_RETENTION_DAYS (0 = no
+    expiran) mediante el índice TTL de expires_at.
+    """
+
+    def __init__(self, retention_days: Optional[int] = None):
+        self.logger = Logger()
+        self.encrypt = Encrypt(os.getenv("ENCRYPTION_KEY", "mi_contraseña_secreta"))
+        self.retention_days = (
+            retention_days
+            if retention_days is not None
+            else int(os.getenv("ANALYSIS_JOB_RETENTION_DAYS", "7"))
+        )
+
+    def create_job(
+        self, filename: str, enable_ia: bool, user: str, token: Optional[str]
+    ) -> AnalysisJob:
+        """
+        Crea un nuevo trabajo de análisis en estado pendiente
+
+        El token se guarda cifrado con ENCRYPTION_KEY; solo el worker que
+        ejecuta el trabajo lo descifra (job_token).
+
+        Args:
+            filename: Nombre del archivo a analizar
+            enable_ia: Indica si se debe utilizar IA para el análisis
+            user: Usuario que solicitó el análisis
+            token: Token con el que se consultará el config-service
+
+        Returns:
+            AnalysisJob: Trabajo creado
+        """
+        try:
+            job = AnalysisJob(
+                filename=filename,
+                enable_ia=enable_ia,
+                user=user,
+                token=self.encrypt.encrypt(token) if token else None,
+            )
+            job.save()
+            self.logger.info(f"Trabajo de análisis creado con UUID: {job.uuid}")
+            return job
+        except Exception as e:
+            self.logger.error(f"Error al crear trabajo de análisis: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+    def job_token(self, job: AnalysisJob) -> Optional[str]:
+        """
+        Descifra el token almacenado en un trabajo
+
+        Args:
+            job: Trabajo reclamado
+
+        Returns:
+            Optional[str]: Token original o None si el trabajo no tiene token
+        """
+        return self.encrypt.decrypt(job.token) if job.token else None
+
+    def get_job(self, job_id: str, user: str) -> Optional[AnalysisJob]:
+        """
+        Obtiene un trabajo por UUID, restringido al usuario que lo creó
+
+        Args:
+            job_id: UUID del trabajo
+            user: Usuario autenticado
+
+        Returns:
+            Optional[AnalysisJob]: Trabajo encontrado o None
+        """
+        return AnalysisJob.objects(uuid=job_id, user=user).first()
+
+    def claim_next_job(
+        self, worker_id: str, lease_seconds: int, max_attempts: int
+    ) -> Optional[AnalysisJob]:
+        """
+        Reclama de forma atómica el trabajo pendiente más antiguo
+
+        Usa findAndModify, por lo que dos workers (o dos réplicas) nunca
+        reciben el mismo trabajo. Los trabajos en ejecución cuyo lease venció
+        (worker caído o reinicio) vuelven a ser reclamables.
+
+        Args:
+            worker_id: Identificador del worker que reclama
+            lease_seconds: Segundos que el worker retiene el trabajo
+            max_attempts: Número máximo de intentos por trabajo
+
+        Returns:
+            Optional[AnalysisJob]: Trabajo reclamado o None si no hay pendientes
+        """
+        now = datetime.now(UTC)
+        claimable = Q(status=JOB_STATUS_PENDING) | (
+            Q(status=JOB_STATUS_RUNNING) & Q(lease_expires_at__lt=now)
+        )
+
+        return (
+            AnalysisJob.objects(claimable & Q(attempts__lt=max_attempts))
+            .order_by("created_at")
+            .modify(
+                new=True,
+                set__status=JOB_STATUS_RUNNING,
+                set__worker_id=worker_id,
+                set__lease_expires_at=now + timedelta(seconds=lease_seconds),
+                set__started_at=now,
+                set__updated_at=now,
+                inc__attempts=1,
+            )
+        )
+
+    def renew_lease(self, job_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """
+        Extiende el lease de un trabajo en ejecución si el worker todavía lo posee
+
+        Args:
+            job_id: UUID del trabajo
+            worker_id: Identificador del worker
+            lease_seconds: Segundos de lease a partir de ahora
+
+        Returns:
+            bool: False si el trabajo ya no pertenece al worker
+        """
+        now = datetime.now(UTC)
+        updated = AnalysisJob.objects(
+            uuid=job_id, worker_id=worker_id, status=JOB_STATUS_RUNNING
+        ).update_one(
+            set__lease_expires_at=now + timedelta(seconds=lease_seconds),
+            set__updated_at=now,
+        )
+        return bool(updated)
+
+    def complete_job(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Marca un trabajo como completado si el worker todavía lo posee
+
+        Returns:
+            bool: True si el trabajo se actualizó, False si el worker perdió el lease
+        """
+        return self._finish_job(
+            job_id, worker_id, JOB_STATUS_COMPLETED, set__result=result
+        )
+
+    def fail_job(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        Marca un trabajo como fallido si el worker todavía lo posee
+
+        Returns:
+            bool: True si el trabajo se actualizó, False si el worker perdió el lease
+        """
+        return self._finish_job(job_id, worker_id, JOB_STATUS_FAILED, set__error=error)
+
+    def fail_exhausted_jobs(self, max_attempts: int) -> int:
+        """
+        Marca como fallidos los trabajos con lease vencido que agotaron sus intentos
+
+        Returns:
+            int: Número de trabajos marcados como fallidos
+        """
+        now = datetime.now(UTC)
+        return AnalysisJob.objects(
+            status=JOB_STATUS_RUNNING,
+            lease_expires_at__lt=now,
+            attempts__gte=max_attempts,
+        ).update(
+            set__status=JOB_STATUS_FAILED,
+            set__error="Se agotaron los intentos de ejecución del trabajo",
+            set__token=None,
+            set__finished_at=now,
+            set__expires_at=self._expires_at(now),
+            set__updated_at=now,
+        )
+
+    def _finish_job(self, job_id: str, worker_id: str, status: str, **updates) -> bool:
+        """Cierra un trabajo en ejecución y descarta el token almacenado"""
+        now = datetime.now(UTC)
+        updated = AnalysisJob.objects(
+            uuid=job_id, worker_id=worker_id, status=JOB_STATUS_RUNNING
+        ).update_one(
+            set__status=status,
+            set__token=None,
+            set__finished_at=now,
+            set__expires_at=self._expires_at(now),
+            set__updated_at=now,
+            **updates,
+        )
+        if not updated:
+            self.logger.warning(
+                f"El trabajo {job_id} ya no pertenece al worker {worker_id}"
+            )
+        return bool(updated)
+
+    def _expires_at(self, finished_at: datetime) -> Optional[datetime]:
+        """Fecha en la que el índice TTL elimina un trabajo terminado"""
+        if self.retention_days <= 0:
+            return None
+        return finished_at + timedelta(days=self.retention_days)
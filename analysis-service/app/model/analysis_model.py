@@ -145,3 +145,250 @@ class ErrorResponse(BaseModel):
             }
         }
     }
+
+
+class AnalysisJobRequest(BaseModel):
+    """Modelo para la solicitud de un trabajo de análisis asíncrono"""
+
+    filename: str = Field(
+        ...,
+        min_length=1,
+        max_length=255,
+        description="Nombre del archivo a analizar (debe existir en el servidor)",
+    )
+    enable_ia: bool = Field(
+        False, description="Indica si se debe utilizar IA para el análisis"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "filename": "show_running.txt",
+                "enable_ia": True,
+            }
+        }
+    }
+
+
+class AnalysisJobData(BaseModel):
+    """Modelo para el estado de un trabajo de análisis"""
+
+    job_id: str = Field(..., description="ID único del trabajo")
+    status: str = Field(
+        ..., description="Estado del trabajo (pending, running, completed, failed)"
+    )
+    filename: str = Field(..., description="Nombre del archivo analizado")
+    enable_ia: bool = Field(..., description="Indica si se utilizó IA")
+    attempts: int = Field(0, ge=0, description="Intentos de ejecución realizados")
+    created_at: Optional[datetime] = Field(None, description="Fecha de creación")
+    started_at: Optional[datetime] = Field(None, description="Fecha de inicio")
+    finished_at: Optional[datetime] = Field(None, description="Fecha de finalización")
+    result: Optional[AnalysisResponse] = Field(
+        None, description="Resultado del análisis cuando el trabajo está completado"
+    )
+    error: Optional[str] = Field(None, description="Error si el trabajo falló")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "job_id": "7b0f8a4e-3c1d-4f55-9b1a-2f6f4f3c9d10",
+                "status": "pending",
+                "filename": "show_running.txt",
+                "enable_ia": True,
+                "attempts": 0,
+                "created_at": EXAMPLE_TIMESTAMP,
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+        }
+    }
+
+
+class AnalysisJobResponse(BaseModel):
+    """Modelo para la respuesta de los endpoints de trabajos de análisis"""
+
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje descriptivo del resultado")
+    data: AnalysisJobData = Field(..., description="Estado del trabajo de análisis")
+
+
+class AnalysisSummary(BaseModel):
+    """Modelo resumido de un registro de análisis para listados"""
+
+    analysis_id: str = Field(..., description="UUID del registro de análisis")
+    filename: Optional[str] = Field(None, description="Nombre del archivo analizado")
+    success: bool = Field(..., description="Indica si el análisis fue exitoso")
+    gemini_response: Optional[bool] = Field(None, description="Indica si se utilizó IA")
+    security_level: Optional[str] = Field(None, description="Nivel de seguridad del análisis")
+    safe: Optional[bool] = Field(None, description="Indica si el archivo es seguro")
+    error: Optional[str] = Field(None, description="Error si el análisis falló")
+    created_at: datetime = Field(..., description="Fecha de creación del registro")
+
+
+class AnalysisHistoryData(BaseModel):
+    """Modelo para una página del historial de análisis"""
+
+    items: List[AnalysisSummary] = Field(..., description="Registros de la página")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor para obtener la siguiente página (None si no hay más)"
+    )
+
+
+class AnalysisHistoryResponse(BaseModel):
+    """Modelo para la respuesta del historial de análisis"""
+
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje descriptivo del resultado")
+    data: AnalysisHistoryData = Field(..., description="Página del historial")
+
+
+class AnalysisDetail(BaseModel):
+    """Modelo para el detalle completo de un registro de análisis"""
+
+    analysis_id: str = Field(..., description="UUID del registro de análisis")
+    user: str = Field(..., description="Usuario que realizó el análisis")
+    success: bool = Field(..., description="Indica si el análisis fue exitoso")
+    response: Dict[str, Any] = Field(..., description="Respuesta almacenada del análisis")
+    created_at: datetime = Field(..., description="Fecha de creación del registro")
+
+
+class AnalysisDetailResponse(BaseModel):
+    """Modelo para la respuesta del detalle de un análisis"""
+
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje descriptivo del resultado")
+    data: AnalysisDetail = Field(..., description="Detalle del análisis")
+
+
+class AnalysisStatsCounters(BaseModel):
+    """Modelo para los contadores de análisis de un día o de un rango"""
+
+    total: int = Field(0, description="Análisis registrados")
+    successful: int = Field(0, description="Análisis exitosos")
+    failed: int = Field(0, description="Análisis con error")
+    with_ia: int = Field(0, description="Análisis exitosos realizados con IA")
+    security_levels: Dict[str, int] = Field(
+        default_factory=dict, description="Análisis con IA por nivel de seguridad"
+    )
+    severities: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Problemas detectados por severidad (critical, high, medium, low, unknown)",
+    )
+
+
+class AnalysisStatsDay(AnalysisStatsCounters):
+    """Modelo para los contadores de un día"""
+
+    day: str = Field(..., description="Día UTC (YYYY-MM-DD)")
+
+
+class AnalysisStatsData(BaseModel):
+    """Modelo para las estadísticas de análisis de un rango de días"""
+
+    date_from: str = Field(..., description="Primer día del rango (YYYY-MM-DD)")
+    date_to: str = Field(..., description="Último día del rango (YYYY-MM-DD)")
+    totals: AnalysisStatsCounters = Field(..., description="Totales del rango")
+    days: List[AnalysisStatsDay] = Field(..., description="Contadores por día con actividad")
+
+
+class AnalysisStatsResponse(BaseModel):
+    """Modelo para la respuesta de estadísticas de análisis"""
+
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje descriptivo del resultado")
+    data: AnalysisStatsData = Field(..., description="Estadísticas del rango")
+
+
+class FindingItem(BaseModel):
+    """Modelo de un hallazgo normalizado de un análisis con IA"""
+
+    analysis_id: str = Field(..., description="UUID del registro de análisis")
+    filename: Optional[str] = Field(None, description="Nombre del archivo analizado")
+    severity: str = Field(
+        ..., description="Severidad normalizada (critical, high, medium, low, unknown)"
+    )
+    category: str = Field(..., description="Categoría del hallazgo (telnet, snmp, password, ...)")
+    problem: Optional[str] = Field(None, description="Descripción del problema")
+    recommendation: Optional[str] = Field(None, description="Recomendación para solucionarlo")
+    created_at: datetime = Field(..., description="Fecha del análisis")
+
+
+class FindingsData(BaseModel):
+    """Modelo para una página de hallazgos"""
+
+    items: List[FindingItem] = Field(..., description="Hallazgos de la página")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor para obtener la siguiente página (None si no hay más)"
+    )
+
+
+class FindingsResponse(BaseModel):
+    """Modelo para la respuesta del listado de hallazgos"""
+
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje descriptivo del resultado")
+    data: FindingsData = Field(..., description="Página de hallazgos")
+
+
+class CollectionStorageStats(BaseModel):
+    """Modelo para el tamaño de una colección y sus índices"""
+
+    collection: str = Field(..., description="Nombre de la colección")
+    count: int = Field(..., description="Número de documentos")
+    size_bytes: int = Field(..., description="Tamaño de los datos sin comprimir")
+    storage_size_bytes: int = Field(..., description="Tamaño en disco de los datos")
+    total_index_size_bytes: int = Field(..., description="Tamaño total de los índices")
+    index_sizes: Dict[str, int] = Field(
+        default_factory=dict, description="Tamaño de cada índice"
+    )
+
+
+class StorageStatsData(BaseModel):
+    """Modelo para las estadísticas de almacenamiento y la política de retención"""
+
+    collections: List[CollectionStorageStats] = Field(
+        ..., description="Estadísticas por colección"
+    )
+    retention: Dict[str, int] = Field(
+        ..., description="Días de retención configurados (0 = desactivado)"
+    )
+
+
+class StorageStatsResponse(BaseModel):
+    """Modelo para la respuesta de estadísticas de almacenamiento"""
+
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje descriptivo del resultado")
+    data: StorageStatsData = Field(..., description="Estadísticas de almacenamiento")
+
+
+class TraceSpan(BaseModel):
+    """Modelo para un span de traza"""
+
+    trace_id: str = Field(..., description="Identificador de la traza (W3C traceparent)")
+    span_id: str = Field(..., description="Identificador del span")
+    parent_id: Optional[str] = Field(None, description="Span padre (None en la raíz local)")
+    name: str = Field(..., description="Operación medida")
+    service: str = Field(..., description="Servicio que registró el span")
+    start_time: str = Field(..., description="Inicio del span (ISO 8601, UTC)")
+    duration_ms: float = Field(..., description="Duración en milisegundos")
+    status: str = Field(..., description="ok o error")
+    attributes: Dict[str, Any] = Field(default_factory=dict, description="Atributos del span")
+
+
+class TracesData(BaseModel):
+    """Modelo para los spans guardados en memoria"""
+
+    spans: List[TraceSpan] = Field(..., description="Spans, del más reciente al más antiguo")
+    dropped: int = Field(..., description="Spans que no se pudieron escribir en el archivo")
+    worker_pid: int = Field(..., description="PID del worker cuyos spans se retornan")
+
+
+class TracesResponse(BaseModel):
+    """Modelo para la respuesta de consulta de trazas"""
+
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje descriptivo del resultado")
+    data: TracesData = Field(..., description="Spans encontrados")
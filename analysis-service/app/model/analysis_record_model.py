@@ -15,6 +15,7 @@ class AnalysisRecord(Document):
     user = StringField(required=True)  # Usuario extraído del token
     created_at = DateTimeField(default=lambda: datetime.now(UTC))
     updated_at = DateTimeField(default=lambda: datetime.now(UTC))
+    expires_at = DateTimeField()  # Fijado por RetentionPolicy; None = no expira
 
     # Configuración de la colección
     meta = {
@@ -27,6 +28,14 @@ class AnalysisRecord(Document):
                 "user",
                 "created_at",
             ),  # Índice compuesto para consultas por usuario y fecha
+            {
+                "fields": ["response.content_ref"],
+                "sparse": True,
+            },  # Referencias a blobs de contenido (recolección de basura)
+            {
+                "fields": ["expires_at"],
+                "expireAfterSeconds": 0,
+            },  # TTL: MongoDB elimina el registro al llegar a expires_at
         ],
     }
 
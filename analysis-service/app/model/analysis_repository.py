@@ -1,26 +1,134 @@
-from typing import Dict, Any
+import heapq
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from app.model.analysis_archive_model import AnalysisArchive
+from app.model.analysis_blob_repository import AnalysisBlobRepository, externalize_content
+from app.model.analysis_finding_repository import AnalysisFindingRepository, build_findings
 from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_rollup_repository import (
+    AnalysisRollupRepository,
+    rollup_day,
+    rollup_increments,
+)
+from app.model.pagination import MAX_PAGE_SIZE, apply_cursor, next_page_cursor, to_naive_utc
+from app.model.retention_policy import retention_policy
 from app.services.logger import Logger
+from app.services.payload_codec import payload_codec
+from app.services.profiler import to_thread
+
+# Campos que se leen en los listados: nunca se carga el payload completo de response
+SUMMARY_PROJECTION = {
+    "uuid": 1,
+    "success": 1,
+    "user": 1,
+    "created_at": 1,
+    "response.filename": 1,
+    "response.gemini_response": 1,
+    "response.error": 1,
+    "response.analysis_data.security_level": 1,
+    "response.analysis_data.safe": 1,
+}
+
+# Campos exportables y su ruta en analysis_records
+EXPORT_FIELDS = {
+    "analysis_id": "uuid",
+    "success": "success",
+    "created_at": "created_at",
+    "filename": "response.filename",
+    "gemini_response": "response.gemini_response",
+    "error": "response.error",
+    "security_level": "response.analysis_data.security_level",
+    "safe": "response.analysis_data.safe",
+    "problems": "response.analysis_data.problems",
+    "content_ref": "response.content_ref",
+}
+
+# Campos exportados si no se indica ninguno (sin la lista de problemas)
+DEFAULT_EXPORT_FIELDS = [
+    "analysis_id",
+    "success",
+    "created_at",
+    "filename",
+    "gemini_response",
+    "error",
+    "security_level",
+    "safe",
+]
+
+
+def _get_path(document: Dict[str, Any], path: str) -> Any:
+    """Lee un campo con notación de punto de un documento proyectado"""
+    value: Any = document
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _merge_by_created_at(
+    sources: List[Iterator[Dict[str, Any]]], descending: bool
+) -> Iterator[Dict[str, Any]]:
+    """
+    Mezcla documentos ya ordenados por created_at de varias colecciones
+
+    Un archivado interrumpido deja el mismo _id en analysis_records y en
+    analysis_archive: se entrega una sola vez.
+    """
+    last_created_at, seen_ids = None, set()
+    merged = heapq.merge(
+        *sources, key=lambda document: document["created_at"], reverse=descending
+    )
+    for document in merged:
+        if document["created_at"] != last_created_at:
+            last_created_at, seen_ids = document["created_at"], set()
+        if document["_id"] in seen_ids:
+            continue
+        seen_ids.add(document["_id"])
+        yield document
 
 
 class AnalysisRepository:
     """
     Repositorio para manejar las operaciones de MongoDB con los registros de análisis
+
+    El historial y la exportación incluyen los análisis con IA archivados
+    (analysis_archive): conservan el _id y los campos del resumen, pero no la
+    lista de problemas.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        blob_repository: Optional[AnalysisBlobRepository] = None,
+        rollup_repository: Optional[AnalysisRollupRepository] = None,
+        finding_repository: Optional[AnalysisFindingRepository] = None,
+    ):
         self.logger = Logger()
+        self.blob_repository = blob_repository or AnalysisBlobRepository()
+        self.rollup_repository = rollup_repository or AnalysisRollupRepository()
+        self.finding_repository = finding_repository or AnalysisFindingRepository()
 
     def save_analysis_record(
-        self, success: bool, response: Dict[str, Any], user: str
+        self,
+        success: bool,
+        response: Dict[str, Any],
+        user: str,
+        record_id: Optional[str] = None,
     ) -> AnalysisRecord:
         """
         Guarda un nuevo registro de análisis en MongoDB
 
+        Si se indica record_id y el registro ya existe (reintento de un
+        trabajo asíncrono), se retorna el existente sin volver a escribir
+        sus contadores ni sus hallazgos.
+
         Args:
             success: Indica si el análisis fue exitoso
             response: Respuesta de Gemini (marshal)
             user: Usuario que realizó el análisis
+            record_id: UUID fijo del registro (por defecto, uno aleatorio)
 
         Returns:
             AnalysisRecord: Registro guardado
@@ -28,11 +136,32 @@ class AnalysisRepository:
         try:
             self.logger.info(f"Guardando registro de análisis para usuario: {user}")
 
+            if record_id:
+                existing = AnalysisRecord.objects(uuid=record_id).first()
+                if existing is not None:
+                    self.logger.info(f"El registro {record_id} ya existe, se omite")
+                    return existing
+
+            increments = rollup_increments(success, response)
+
+            # El contenido sin IA se guarda una vez en su blob; el registro solo lo referencia
+            stored_response, blob = externalize_content(payload_codec.encode_response(response))
+            if blob:
+                digest, content = blob
+                self.blob_repository.store_blobs({digest: content})
+
             # Crear nuevo registro
-            record = AnalysisRecord(success=success, response=response, user=user)
+            record = AnalysisRecord(success=success, response=stored_response, user=user)
+            if record_id:
+                record.uuid = record_id
+            record.expires_at = retention_policy.expires_at(success, stored_response)
 
             # Guardar en MongoDB (mongoengine.save() no es asíncrono)
             record.save()
+            self._apply_rollup(user, record.created_at, increments)
+            self._insert_findings(
+                build_findings(record.uuid, user, success, response, record.created_at)
+            )
 
             self.logger.success(
                 f"Registro guardado exitosamente con UUID: {record.uuid}"
@@ -43,3 +172,267 @@ class AnalysisRepository:
             self.logger.error(f"Error al guardar registro de análisis: {str(e)}")
             # Re-lanzar como una excepción más específica para MongoDB
             raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+    def _apply_rollup(self, user: str, created_at: datetime, increments: Dict[str, int]) -> None:
+        """Incrementa los contadores diarios; un fallo aquí no invalida el registro"""
+        try:
+            self.rollup_repository.apply([(user, rollup_day(created_at), increments)])
+        except Exception as e:
+            self.logger.warning(f"Error al actualizar contadores de análisis: {str(e)}")
+
+    def _insert_findings(self, findings: List[Dict[str, Any]]) -> None:
+        """Guarda los hallazgos del registro; se pueden regenerar con backfill-findings"""
+        try:
+            self.finding_repository.insert_findings(findings)
+        except Exception as e:
+            self.logger.warning(f"Error al guardar hallazgos de análisis: {str(e)}")
+
+    def find_analysis(self, analysis_id: str, user: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene un registro completo por UUID, restringido a su usuario
+
+        Si el registro referencia un blob de contenido se resuelve con una
+        única búsqueda adicional por _id. Los payloads comprimidos solo se
+        descomprimen aquí: los listados nunca los leen. Si el análisis ya se
+        archivó se retorna su resumen.
+
+        Args:
+            analysis_id: UUID del registro
+            user: Usuario autenticado
+
+        Returns:
+            Optional[Dict[str, Any]]: Registro o None si no existe
+        """
+        record = AnalysisRecord._get_collection().find_one(
+            {"uuid": analysis_id, "user": user}
+        )
+        if record is None:
+            return AnalysisArchive._get_collection().find_one(
+                {"uuid": analysis_id, "user": user}
+            )
+
+        if record.get("response"):
+            response = self.blob_repository.resolve_content(record["response"])
+            record["response"] = payload_codec.decode_response(response)
+        return record
+
+    def find_analyses_by_user(
+        self,
+        user: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        success: Optional[bool] = None,
+        security_levels: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Lista los registros de un usuario, del más reciente al más antiguo
+
+        Usa paginación keyset sobre el índice (user, created_at): cada página
+        continúa donde terminó la anterior sin saltar documentos con skip.
+        Cada página consulta también analysis_archive con el mismo filtro y
+        mezcla ambos resultados por fecha.
+
+        Args:
+            user: Usuario autenticado
+            limit: Tamaño de página
+            cursor: Cursor retornado por la página anterior
+            success: Filtrar por registros exitosos o con error
+            security_levels: Filtrar por nivel de seguridad del análisis con IA
+            date_from: Fecha mínima de creación (inclusive)
+            date_to: Fecha máxima de creación (inclusive)
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: Registros resumidos y cursor siguiente
+        """
+        query = self._build_history_query(
+            user, cursor, success, security_levels, date_from, date_to
+        )
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        sources = [
+            list(
+                collection.find(query, SUMMARY_PROJECTION)
+                .sort("created_at", -1)
+                .limit(limit + 1)
+            )
+            for collection in (
+                AnalysisRecord._get_collection(),
+                AnalysisArchive._get_collection(),
+            )
+        ]
+        documents = list(_merge_by_created_at(sources, descending=True))[: limit + 1]
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = next_page_cursor(documents, cursor)
+
+        return documents, next_cursor
+
+    def export_analyses(
+        self,
+        user: str,
+        fields: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre los registros de un usuario para exportarlos, lote a lote
+
+        Lee un cursor de MongoDB ordenado por created_at (índice (user, created_at))
+        con un tamaño de lote fijo: en memoria solo hay un lote a la vez, sin
+        importar cuántos registros se exporten. Los análisis archivados se leen
+        con otro cursor sobre analysis_archive y se mezclan por fecha; no
+        tienen la lista de problemas ni content_ref.
+
+        Args:
+            user: Usuario autenticado
+            fields: Campos de EXPORT_FIELDS a incluir (por defecto DEFAULT_EXPORT_FIELDS)
+            date_from: Fecha mínima de creación (inclusive)
+            date_to: Fecha máxima de creación (inclusive)
+            batch_size: Registros por lote (por defecto ANALYSIS_EXPORT_BATCH_SIZE)
+
+        Yields:
+            List[Dict[str, Any]]: Lote de registros con los campos pedidos
+        """
+        fields = fields or DEFAULT_EXPORT_FIELDS
+        batch_size = batch_size or int(os.getenv("ANALYSIS_EXPORT_BATCH_SIZE", "500"))
+        query = self._build_history_query(user, None, None, None, date_from, date_to)
+        projection = {EXPORT_FIELDS[field]: 1 for field in fields}
+        # created_at y _id ordenan y deduplican la mezcla con el archivo
+        projection["created_at"] = 1
+
+        cursors = [
+            collection.find(query, projection).sort("created_at", 1).batch_size(batch_size)
+            for collection in (
+                AnalysisRecord._get_collection(),
+                AnalysisArchive._get_collection(),
+            )
+        ]
+        try:
+            batch: List[Dict[str, Any]] = []
+            for document in _merge_by_created_at(cursors, descending=False):
+                batch.append(self._to_export_row(document, fields))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            for cursor in cursors:
+                cursor.close()
+
+    @staticmethod
+    def _to_export_row(document: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+        """Aplana un registro proyectado en una fila de exportación"""
+        row = {field: _get_path(document, EXPORT_FIELDS[field]) for field in fields}
+        if "problems" in row:
+            row["problems"] = payload_codec.decode(row["problems"])
+        return row
+
+    def _build_history_query(
+        self,
+        user: str,
+        cursor: Optional[str],
+        success: Optional[bool],
+        security_levels: Optional[List[str]],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+    ) -> Dict[str, Any]:
+        """Construye el filtro de historial; user y created_at van al índice"""
+        query: Dict[str, Any] = {"user": user}
+        created_at: Dict[str, Any] = {}
+
+        if date_from:
+            created_at["$gte"] = to_naive_utc(date_from)
+        if date_to:
+            created_at["$lte"] = to_naive_utc(date_to)
+
+        apply_cursor(query, created_at, cursor)
+
+        if created_at:
+            query["created_at"] = created_at
+        if success is not None:
+            query["success"] = success
+        if security_levels:
+            query["response.analysis_data.security_level"] = {"$in": security_levels}
+
+        return query
+
+
+class AsyncAnalysisRepository:
+    """
+    Repositorio asíncrono para los registros de análisis
+
+    mongoengine/pymongo son síncronos: cada escritura bloquearía el event loop
+    durante todo el round trip a MongoDB. Este repositorio ejecuta las mismas
+    operaciones (mismo documento AnalysisRecord, mismos índices) en el pool de
+    hilos del loop, de modo que las peticiones concurrentes siguen atendiéndose
+    mientras la escritura está en curso.
+    """
+
+    def __init__(self, repository: Optional[AnalysisRepository] = None):
+        self.repository = repository or AnalysisRepository()
+
+    @property
+    def logger(self) -> Logger:
+        return self.repository.logger
+
+    async def save_analysis_record(
+        self,
+        success: bool,
+        response: Dict[str, Any],
+        user: str,
+        record_id: Optional[str] = None,
+    ) -> AnalysisRecord:
+        """
+        Guarda un nuevo registro de análisis en MongoDB sin bloquear el event loop
+
+        Args:
+            success: Indica si el análisis fue exitoso
+            response: Respuesta de Gemini (marshal)
+            user: Usuario que realizó el análisis
+            record_id: UUID fijo del registro (por defecto, uno aleatorio)
+
+        Returns:
+            AnalysisRecord: Registro guardado
+        """
+        return await to_thread(
+            self.repository.save_analysis_record, success, response, user, record_id
+        )
+
+    async def find_analysis(self, analysis_id: str, user: str) -> Optional[Dict[str, Any]]:
+        """Versión asíncrona de AnalysisRepository.find_analysis"""
+        return await to_thread(self.repository.find_analysis, analysis_id, user)
+
+    async def find_analyses_by_user(
+        self, user: str, **filters
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Versión asíncrona de AnalysisRepository.find_analyses_by_user"""
+        return await to_thread(
+            self.repository.find_analyses_by_user, user, **filters
+        )
+
+    async def export_analyses(
+        self, user: str, **filters
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Versión asíncrona de AnalysisRepository.export_analyses
+
+        Cada lote se lee del cursor en el pool de hilos, de modo que el event
+        loop sigue atendiendo peticiones durante la exportación.
+        """
+        batches = self.repository.export_analyses(user, **filters)
+        try:
+            while True:
+                batch = await to_thread(next, batches, None)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            # Si se canceló mientras un hilo lee el cursor, pymongo lo cierra al liberarlo
+            if not batches.gi_running:
+                batches.close()
@@ -0,0 +1,29 @@
+from mongoengine import Document, StringField, IntField, DateTimeField, DictField
+
+
+class AnalysisRollup(Document):
+    """
+    Modelo para los contadores diarios de análisis por usuario
+
+    Se mantiene con $inc al escribir cada registro, de modo que las
+    estadísticas se leen sin recorrer analysis_records.
+    """
+
+    # Campos del documento
+    user = StringField(required=True)
+    day = StringField(required=True)  # Fecha UTC en formato YYYY-MM-DD
+    total = IntField(default=0)
+    successful = IntField(default=0)
+    failed = IntField(default=0)
+    with_ia = IntField(default=0)
+    security_levels = DictField()  # Análisis con IA por nivel de seguridad
+    severities = DictField()  # Problemas detectados por severidad
+    updated_at = DateTimeField()
+
+    # Configuración de la colección
+    meta = {
+        "collection": "analysis_rollups",
+        "indexes": [
+            {"fields": ["user", "day"], "unique": True},
+        ],
+    }
@@ -0,0 +1,236 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, UTC
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne, UpdateOne
+
+from app.model.analysis_archive_model import AnalysisArchive
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_rollup_model import AnalysisRollup
+from app.model.retention_policy import RetentionPolicy, retention_policy
+from app.services.logger import Logger
+from app.services.payload_codec import payload_codec
+from app.utils.severity import count_severities, normalize_security_level
+
+# Incremento de un registro: (usuario, día, contadores)
+RollupEntry = Tuple[str, str, Dict[str, int]]
+
+_COUNTERS = ["total", "successful", "failed", "with_ia"]
+_BUCKETS = ["security_levels", "severities"]
+
+
+def rollup_day(created_at: Optional[datetime]) -> str:
+    """Día UTC (YYYY-MM-DD) al que pertenece un registro"""
+    created_at = created_at or datetime.now(UTC)
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(UTC)
+    return created_at.strftime("%Y-%m-%d")
+
+
+def rollup_increments(success: bool, response: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Calcula los contadores que aporta un registro de análisis
+
+    Args:
+        success: Indica si el análisis fue exitoso
+        response: Respuesta del análisis (con o sin problems comprimido)
+
+    Returns:
+        Dict[str, int]: Incrementos con notación de punto para los buckets
+    """
+    increments = Counter({"total": 1, "successful" if success else "failed": 1})
+    response = response or {}
+    analysis_data = response.get("analysis_data")
+
+    if success and response.get("gemini_response") and isinstance(analysis_data, dict):
+        increments["with_ia"] += 1
+        level = normalize_security_level(analysis_data.get("security_level"))
+        increments[f"security_levels.{level}"] += 1
+
+        severity_counts = analysis_data.get("severity_counts")
+        if severity_counts is None:
+            severity_counts = count_severities(
+                payload_codec.decode(analysis_data.get("problems"))
+            )
+        for severity, count in severity_counts.items():
+            increments[f"severities.{severity}"] += count
+
+    return dict(increments)
+
+
+def day_range(date_from: Optional[date], date_to: Optional[date], default_days: int) -> Tuple[str, str]:
+    """Normaliza un rango de fechas a días YYYY-MM-DD (por defecto, los últimos días)"""
+    end = date_to or datetime.now(UTC).date()
+    start = date_from or end - timedelta(days=default_days - 1)
+    return start.isoformat(), end.isoformat()
+
+
+class AnalysisRollupRepository:
+    """
+    Repositorio para los contadores diarios de análisis por usuario
+    """
+
+    def __init__(self, policy: Optional[RetentionPolicy] = None):
+        self.logger = Logger()
+        self.policy = policy or retention_policy
+
+    def apply(self, entries: Iterable[RollupEntry]) -> None:
+        """
+        Aplica incrementos con upserts $inc, agrupando los del mismo usuario y día
+
+        Args:
+            entries: Incrementos de los registros escritos
+        """
+        merged: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        for user, day, increments in entries:
+            merged[(user, day)].update(increments)
+        if not merged:
+            return
+
+        now = datetime.now(UTC)
+        AnalysisRollup._get_collection().bulk_write(
+            [
+                UpdateOne(
+                    {"user": user, "day": day},
+                    {"$inc": dict(increments), "$set": {"updated_at": now}},
+                    upsert=True,
+                )
+                for (user, day), increments in merged.items()
+            ],
+            ordered=False,
+        )
+
+    def get_stats(self, user: str, day_from: str, day_to: str) -> List[Dict[str, Any]]:
+        """
+        Obtiene los contadores diarios de un usuario en un rango de días
+
+        Lee como máximo un documento por día del rango usando el índice
+        (user, day), independientemente del tamaño del historial.
+
+        Args:
+            user: Usuario autenticado
+            day_from: Primer día (YYYY-MM-DD, inclusive)
+            day_to: Último día (YYYY-MM-DD, inclusive)
+
+        Returns:
+            List[Dict[str, Any]]: Contadores por día en orden ascendente
+        """
+        try:
+            return list(
+                AnalysisRollup._get_collection()
+                .find({"user": user, "day": {"$gte": day_from, "$lte": day_to}}, {"_id": 0})
+                .sort("day", 1)
+            )
+        except Exception as e:
+            self.logger.error(f"Error al obtener estadísticas de análisis: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+    def rebuild(
+        self, batch_size: int = 500, include_today: bool = False, days: Optional[int] = None
+    ) -> int:
+        """
+        Reconstruye los contadores a partir de analysis_records y analysis_archive
+
+        Los registros se leen en lotes del cursor y cada día se reemplaza con
+        sus totales. Por defecto no se toca el día actual, que se sigue
+        actualizando en línea, para no contar dos veces los registros que se
+        escriben mientras corre la reconstrucción.
+
+        Los registros de error y sin IA expiran por TTL sin archivarse, por lo
+        que un día más antiguo que la retención más corta ya no se puede
+        recontar: reemplazarlo borraría esos análisis de las estadísticas. Por
+        defecto solo se reconstruyen los días dentro de esa ventana.
+
+        Args:
+            batch_size: Documentos leídos y contadores escritos por lote
+            include_today: Reconstruir también el día actual
+            days: Días hacia atrás a reconstruir (None = ventana de retención
+                más corta, 0 = todo el historial)
+
+        Returns:
+            int: Número de contadores diarios escritos
+        """
+        try:
+            today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+            created_at: Dict[str, datetime] = {}
+            if not include_today:
+                created_at["$lt"] = today.replace(tzinfo=None)
+            days = self.complete_days() if days is None else days
+            if days > 0:
+                created_at["$gte"] = (today - timedelta(days=days - 1)).replace(tzinfo=None)
+            query = {"created_at": created_at} if created_at else {}
+            projection = {
+                "user": 1,
+                "success": 1,
+                "created_at": 1,
+                "response.gemini_response": 1,
+                "response.analysis_data": 1,
+            }
+            totals: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+
+            for document_class in (AnalysisRecord, AnalysisArchive):
+                cursor = (
+                    document_class._get_collection()
+                    .find(query, projection)
+                    .sort("created_at", 1)
+                    .batch_size(batch_size)
+                )
+                for document in cursor:
+                    key = (document.get("user"), rollup_day(document.get("created_at")))
+                    totals[key].update(
+                        rollup_increments(document.get("success"), document.get("response"))
+                    )
+
+            written = 0
+            now = datetime.now(UTC)
+            items = list(totals.items())
+            collection = AnalysisRollup._get_collection()
+            for start in range(0, len(items), batch_size):
+                collection.bulk_write(
+                    [
+                        ReplaceOne(
+                            {"user": user, "day": day},
+                            self._to_document(user, day, counters, now),
+                            upsert=True,
+                        )
+                        for (user, day), counters in items[start : start + batch_size]
+                    ],
+                    ordered=False,
+                )
+                written += len(items[start : start + batch_size])
+
+            self.logger.info(f"Contadores reconstruidos: {written} días de usuario")
+            return written
+
+        except Exception as e:
+            self.logger.error(f"Error al reconstruir contadores de análisis: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+    def complete_days(self) -> int:
+        """
+        Días hacia atrás (incluido hoy) cuyos registros no empezaron a expirar
+
+        Es la retención más corta entre la de errores y la de registros sin
+        IA; 0 si ninguna de las dos expira.
+        """
+        windows = [days for days in (self.policy.error_days, self.policy.raw_days) if days > 0]
+        return min(windows, default=0)
+
+    @staticmethod
+    def _to_document(
+        user: str, day: str, counters: Counter, now: datetime
+    ) -> Dict[str, Any]:
+        """Convierte contadores con notación de punto en un documento de rollup"""
+        document: Dict[str, Any] = {
+            "user": user,
+            "day": day,
+            "updated_at": now,
+            **{counter: counters.get(counter, 0) for counter in _COUNTERS},
+            **{bucket: {} for bucket in _BUCKETS},
+        }
+        for key, value in counters.items():
+            if "." in key:
+                bucket, name = key.split(".", 1)
+                document[bucket][name] = value
+        return document
+
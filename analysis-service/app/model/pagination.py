@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+# Tamaño máximo de página de los listados paginados por keyset
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, seen_ids: List[ObjectId]) -> str:
+    """
+    Codifica la posición de la última página (keyset)
+
+    Se guarda created_at del último registro y los _id ya retornados con ese
+    mismo created_at, para desempatar sin ordenar por otro campo y así seguir
+    recorriendo solo el índice (user, created_at).
+    """
+    payload = {"c": created_at.isoformat(), "x": [str(oid) for oid in seen_ids]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, List[ObjectId]]:
+    """Decodifica un cursor generado por encode_cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), [ObjectId(oid) for oid in payload["x"]]
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+
+
+def apply_cursor(
+    query: Dict[str, Any], created_at: Dict[str, Any], cursor: Optional[str]
+) -> None:
+    """
+    Restringe una consulta ordenada por created_at descendente a la página siguiente
+
+    Args:
+        query: Filtro de la consulta (recibe el $nin de _id ya retornados)
+        created_at: Rango de created_at de la consulta (recibe el límite superior)
+        cursor: Cursor retornado por la página anterior
+    """
+    if not cursor:
+        return
+    last_created_at, seen_ids = decode_cursor(cursor)
+    upper = created_at.get("$lte")
+    created_at["$lte"] = min(upper, last_created_at) if upper else last_created_at
+    if seen_ids:
+        query["_id"] = {"$nin": seen_ids}
+
+
+def next_page_cursor(documents: List[Dict[str, Any]], cursor: Optional[str]) -> str:
+    """Calcula el cursor de la siguiente página a partir de la última"""
+    last_created_at = documents[-1]["created_at"]
+    seen_ids = [doc["_id"] for doc in documents if doc["created_at"] == last_created_at]
+
+    # Si toda la página comparte created_at con la anterior, arrastrar sus _id
+    if cursor:
+        previous_created_at, previous_ids = decode_cursor(cursor)
+        if previous_created_at == last_created_at:
+            seen_ids = previous_ids + seen_ids
+
+    return encode_cursor(last_created_at, seen_ids)
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """MongoDB guarda fechas UTC sin zona horaria"""
+    if value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
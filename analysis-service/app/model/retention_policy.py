@@ -0,0 +1,78 @@
+import os
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional
+
+
+class RetentionPolicy:
+    """
+    Política de retención de los registros de análisis
+
+    - Registros de error (success=False): expiran tras ANALYSIS_RETENTION_ERROR_DAYS
+    - Registros sin IA (contenido en bruto): expiran tras ANALYSIS_RETENTION_RAW_DAYS
+    - Análisis con IA exitosos: no expiran; tras ANALYSIS_ARCHIVE_AFTER_DAYS se
+      mueven a analysis_archive conservando solo el resumen
+
+    Un valor de 0 días desactiva la regla correspondiente.
+    """
+
+    def __init__(
+        self,
+        error_days: Optional[int] = None,
+        raw_days: Optional[int] = None,
+        archive_after_days: Optional[int] = None,
+    ):
+        self.error_days = (
+            error_days
+            if error_days is not None
+            else int(os.getenv("ANALYSIS_RETENTION_ERROR_DAYS", "30"))
+        )
+        self.raw_days = (
+            raw_days
+            if raw_days is not None
+            else int(os.getenv("ANALYSIS_RETENTION_RAW_DAYS", "90"))
+        )
+        self.archive_after_days = (
+            archive_after_days
+            if archive_after_days is not None
+            else int(os.getenv("ANALYSIS_ARCHIVE_AFTER_DAYS", "180"))
+        )
+
+    def retention_days(self, success: bool, response: Optional[Dict[str, Any]]) -> int:
+        """Días que se conserva un registro antes de expirar (0 = no expira)"""
+        if not success:
+            return self.error_days
+        if not (response or {}).get("gemini_response"):
+            return self.raw_days
+        return 0
+
+    def expires_at(
+        self,
+        success: bool,
+        response: Optional[Dict[str, Any]],
+        created_at: Optional[datetime] = None,
+    ) -> Optional[datetime]:
+        """
+        Calcula la fecha de expiración que usa el índice TTL
+
+        Args:
+            success: Indica si el análisis fue exitoso
+            response: Respuesta almacenada
+            created_at: Fecha de creación (por defecto, ahora)
+
+        Returns:
+            Optional[datetime]: Fecha de expiración o None si el registro no expira
+        """
+        days = self.retention_days(success, response)
+        if days <= 0:
+            return None
+        return (created_at or datetime.now(UTC)) + timedelta(days=days)
+
+    def archive_cutoff(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Fecha antes de la cual los análisis con IA se archivan (None = desactivado)"""
+        if self.archive_after_days <= 0:
+            return None
+        return (now or datetime.now(UTC)) - timedelta(days=self.archive_after_days)
+
+
+# Instancia global configurada desde las variables de entorno
+retention_policy = RetentionPolicy()
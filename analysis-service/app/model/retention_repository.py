@@ -0,0 +1,213 @@
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from app.model.analysis_archive_model import AnalysisArchive
+from app.model.analysis_blob_model import AnalysisBlob
+from app.model.analysis_finding_model import AnalysisFinding
+from app.model.analysis_job_model import AnalysisJob
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_rollup_model import AnalysisRollup
+from app.model.retention_policy import RetentionPolicy, retention_policy
+from app.services.logger import Logger
+from app.services.payload_codec import payload_codec
+from app.utils.severity import count_severities
+
+# Colecciones cuyo tamaño reporta el endpoint de administración
+STORAGE_COLLECTIONS = [
+    AnalysisRecord,
+    AnalysisArchive,
+    AnalysisBlob,
+    AnalysisRollup,
+    AnalysisFinding,
+    AnalysisJob,
+]
+
+
+class RetentionRepository:
+    """
+    Repositorio para la retención, el archivado y las estadísticas de almacenamiento
+    """
+
+    def __init__(self, policy: Optional[RetentionPolicy] = None):
+        self.logger = Logger()
+        self.policy = policy or retention_policy
+
+    def archive_analyses(
+        self, batch_size: int = 500, max_batches: Optional[int] = None
+    ) -> int:
+        """
+        Mueve a analysis_archive los análisis con IA más antiguos que el umbral
+
+        Cada lote se inserta en el archivo y luego se borra de analysis_records.
+        El archivo conserva el _id original, por lo que un lote interrumpido se
+        puede repetir sin duplicar resúmenes.
+
+        Args:
+            batch_size: Registros movidos por lote
+            max_batches: Límite de lotes por ejecución (None = hasta terminar)
+
+        Returns:
+            int: Número de registros archivados
+        """
+        cutoff = self.policy.archive_cutoff()
+        if cutoff is None:
+            return 0
+
+        try:
+            records = AnalysisRecord._get_collection()
+            archive = AnalysisArchive._get_collection()
+            query = {
+                "created_at": {"$lt": cutoff},
+                "success": True,
+                "response.gemini_response": True,
+            }
+            archived = 0
+            batches = 0
+
+            while max_batches is None or batches < max_batches:
+                documents = list(
+                    records.find(query).sort("created_at", 1).limit(batch_size)
+                )
+                if not documents:
+                    break
+
+                self._insert_archive(archive, [self._to_archive(doc) for doc in documents])
+                result = records.delete_many({"_id": {"$in": [doc["_id"] for doc in documents]}})
+                archived += result.deleted_count
+                batches += 1
+
+            self.logger.info(f"Archivado completado: {archived} análisis movidos")
+            return archived
+
+        except Exception as e:
+            self.logger.error(f"Error al archivar análisis: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+    def apply_retention(self, batch_size: int = 500) -> int:
+        """
+        Asigna expires_at a los registros guardados antes de la política de retención
+
+        Returns:
+            int: Número de registros actualizados
+        """
+        expiring = []
+        if self.policy.error_days > 0:
+            expiring.append({"success": False})
+        if self.policy.raw_days > 0:
+            expiring.append({"success": True, "response.gemini_response": {"$ne": True}})
+        if not expiring:
+            return 0
+
+        try:
+            records = AnalysisRecord._get_collection()
+            query = {"expires_at": {"$exists": False}, "$or": expiring}
+            projection = {"success": 1, "created_at": 1, "response.gemini_response": 1}
+            updated = 0
+
+            while True:
+                documents = list(records.find(query, projection).limit(batch_size))
+                if not documents:
+                    break
+
+                records.bulk_write(
+                    [
+                        UpdateOne(
+                            {"_id": doc["_id"]},
+                            {
+                                "$set": {
+                                    "expires_at": self.policy.expires_at(
+                                        doc.get("success"),
+                                        doc.get("response"),
+                                        doc.get("created_at"),
+                                    )
+                                }
+                            },
+                        )
+                        for doc in documents
+                    ],
+                    ordered=False,
+                )
+                updated += len(documents)
+
+            self.logger.info(f"Retención aplicada a {updated} registros existentes")
+            return updated
+
+        except Exception as e:
+            self.logger.error(f"Error al aplicar la política de retención: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+    def collection_stats(self) -> List[Dict[str, Any]]:
+        """
+        Obtiene el tamaño de datos e índices de las colecciones del servicio
+
+        Returns:
+            List[Dict[str, Any]]: Estadísticas por colección
+        """
+        try:
+            db = AnalysisRecord._get_db()
+            stats = []
+            for document_class in STORAGE_COLLECTIONS:
+                name = document_class._get_collection_name()
+                try:
+                    coll_stats = db.command("collStats", name)
+                except OperationFailure:
+                    # La colección todavía no existe
+                    coll_stats = {}
+                stats.append(
+                    {
+                        "collection": name,
+                        "count": coll_stats.get("count", 0),
+                        "size_bytes": coll_stats.get("size", 0),
+                        "storage_size_bytes": coll_stats.get("storageSize", 0),
+                        "total_index_size_bytes": coll_stats.get("totalIndexSize", 0),
+                        "index_sizes": coll_stats.get("indexSizes", {}),
+                    }
+                )
+            return stats
+
+        except Exception as e:
+            self.logger.error(f"Error al obtener estadísticas de almacenamiento: {str(e)}")
+            raise RuntimeError(f"Error de MongoDB: {str(e)}")
+
+    def _insert_archive(self, archive, documents: List[Dict[str, Any]]) -> None:
+        """Inserta resúmenes ignorando los que ya se archivaron en un intento anterior"""
+        try:
+            archive.insert_many(documents, ordered=False)
+        except BulkWriteError as bulk_error:
+            errors = bulk_error.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+
+    @staticmethod
+    def _to_archive(document: Dict[str, Any]) -> Dict[str, Any]:
+        """Construye el resumen archivado de un registro de análisis con IA"""
+        response = document.get("response") or {}
+        analysis_data = response.get("analysis_data")
+        if not isinstance(analysis_data, dict):
+            analysis_data = {}
+        # Las entradas que no son objetos (texto, null) no cuentan como problemas
+        severity_counts = count_severities(payload_codec.decode(analysis_data.get("problems")))
+
+        return {
+            "_id": document["_id"],
+            "uuid": document["uuid"],
+            "success": document["success"],
+            "user": document["user"],
+            "created_at": document["created_at"],
+            "archived_at": datetime.now(UTC),
+            "response": {
+                "filename": response.get("filename"),
+                "gemini_response": True,
+                "timestamp": response.get("timestamp"),
+                "analysis_data": {
+                    "analysis_date": analysis_data.get("analysis_date"),
+                    "security_level": analysis_data.get("security_level"),
+                    "safe": analysis_data.get("safe"),
+                    "problem_count": sum(severity_counts.values()),
+                    "severity_counts": severity_counts,
+                },
+            },
+        }
@@ -0,0 +1,122 @@
+"""
+Configuración del servidor de producción: gunicorn con workers de uvicorn
+
+Uso:
+    gunicorn -c gunicorn.conf.py app.main:app
+
+gunicorn.conf.py toma de aquí los valores y los hooks. Cada worker es un
+proceso con su propio event loop, sus propias conexiones y sus propios
+buffers en memoria (logs, trazas, perfiles); los eventos de startup y
+shutdown de la aplicación se ejecutan en cada worker.
+"""
+import glob
+import os
+from typing import Any, Dict, Iterable
+
+WORKER_CLASS = "app.server_worker.AnalysisUvicornWorker"
+
+
+def default_workers() -> int:
+    """
+    Cantidad de workers por defecto: una por CPU disponible para el proceso
+
+    Usa la afinidad de CPU cuando existe, que en un contenedor limitado con
+    cpusets es menor que os.cpu_count().
+    """
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:  # pragma: no cover - plataformas sin sched_getaffinity
+        return os.cpu_count() or 1
+
+
+def uvicorn_implementations() -> Dict[str, str]:
+    """
+    Event loop y parser HTTP de uvicorn (UVICORN_LOOP / UVICORN_HTTP)
+
+    Por defecto uvloop y httptools. Se eligen de forma explícita porque con
+    "auto" uvicorn vuelve a asyncio y h11 sin avisar si faltan; así un import
+    fallido detiene el arranque. asyncio y h11 siguen disponibles por variable.
+    """
+    return {
+        "loop": os.getenv("UVICORN_LOOP", "uvloop"),
+        "http": os.getenv("UVICORN_HTTP", "httptools"),
+    }
+
+
+def server_settings() -> Dict[str, Any]:
+    """
+    Valores de gunicorn configurados desde variables de entorno
+
+    - WEB_CONCURRENCY: cantidad de workers (por defecto, una por CPU)
+    - PRELOAD_APP: importar la aplicación en el maestro antes de crear los workers
+    - WORKER_MAX_REQUESTS / WORKER_MAX_REQUESTS_JITTER: reciclar cada worker
+      tras N peticiones (más un azar para que no se reinicien todos a la vez)
+    - WORKER_TIMEOUT: segundos sin responder al maestro antes de reiniciar el worker
+    - GRACEFUL_TIMEOUT: segundos para terminar las peticiones en curso al detener
+    - KEEPALIVE: segundos que se mantiene abierta una conexión inactiva
+
+    Returns:
+        Dict[str, Any]: Valores con los nombres de la configuración de gunicorn
+    """
+    return {
+        "bind": f"0.0.0.0:{os.getenv('PORT', '8002')}",
+        "workers": int(os.getenv("WEB_CONCURRENCY") or 0) or default_workers(),
+        "worker_class": WORKER_CLASS,
+        "preload_app": os.getenv("PRELOAD_APP", "true").lower() == "true",
+        "max_requests": int(os.getenv("WORKER_MAX_REQUESTS", "2000")),
+        "max_requests_jitter": int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "200")),
+        "timeout": int(os.getenv("WORKER_TIMEOUT", "60")),
+        "graceful_timeout": int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        "keepalive": int(os.getenv("KEEPALIVE", "5")),
+    }
+
+
+def next_worker_slot(workers: Iterable[Any]) -> int:
+    """
+    Menor número de slot libre entre los workers vivos
+
+    Un worker reciclado recibe el slot del que reemplaza, por lo que los
+    archivos por worker no crecen con cada reinicio.
+    """
+    used = {getattr(worker, "slot", None) for worker in workers}
+    slot = 1
+    while slot in used:
+        slot += 1
+    return slot
+
+
+def prepare_metrics_dir() -> None:
+    """
+    Crea y vacía el directorio de métricas de PROMETHEUS_MULTIPROC_DIR
+
+    Se llama al cargar gunicorn.conf.py: con preload_app la aplicación (y con
+    ella las métricas, que ya escriben en el directorio) se importa antes que
+    cualquier hook del maestro.
+    """
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+
+def pre_fork(server, worker) -> None:
+    """Hook del maestro: asigna al nuevo worker un slot estable"""
+    worker.slot = next_worker_slot(server.WORKERS.values())
+
+
+def post_fork(server, worker) -> None:
+    """Hook del worker: con varios workers cada uno escribe su propio archivo de log"""
+    if server.cfg.workers > 1:
+        from app.services.logger import use_worker_log_file
+
+        use_worker_log_file(worker.slot)
+
+
+def child_exit(server, worker) -> None:
+    """Hook del maestro: descarta los gauges del worker que terminó"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,18 @@
+from uvicorn.workers import UvicornWorker
+
+from app.server import uvicorn_implementations
+
+
+class AnalysisUvicornWorker(UvicornWorker):
+    """
+    Worker de gunicorn que ejecuta la aplicación con uvicorn
+
+    Usa el event loop y el parser HTTP de uvicorn_implementations y espera
+    hasta graceful_timeout a las peticiones en curso al reciclarse o detenerse.
+    """
+
+    CONFIG_KWARGS = uvicorn_implementations()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
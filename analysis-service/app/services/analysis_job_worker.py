@@ -0,0 +1,197 @@
+import asyncio
+import os
+import socket
+from typing import Callable, List, Optional
+
+from app.model.analysis_job_repository import AnalysisJobRepository
+from app.services.logger import Logger
+from app.services.request_context import bind_request_context, reset_request_context
+from app.usecase.analysis_usecase import AnalysisUseCase
+
+
+class AnalysisJobWorkerPool:
+    """
+    Pool de workers en proceso que ejecuta los trabajos de análisis asíncronos
+
+    Cada worker reclama trabajos de MongoDB con findAndModify, por lo que es
+    seguro ejecutar varios workers y varias réplicas del servicio a la vez.
+    Mientras un trabajo se ejecuta, el worker renueva su lease cada tercio de
+    lease_seconds; si lo pierde, otro worker puede retomarlo y el resultado
+    del primero se descarta. El registro de análisis usa el UUID del trabajo,
+    por lo que un reintento no duplica el registro, sus contadores ni sus
+    hallazgos.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[AnalysisJobRepository] = None,
+        use_case_factory: Optional[Callable] = None,
+        workers: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.logger = Logger()
+        self.repository = repository or AnalysisJobRepository()
+        self.use_case_factory = use_case_factory or AnalysisUseCase
+        self.workers = (
+            workers
+            if workers is not None
+            else int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+        )
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else float(os.getenv("ANALYSIS_JOB_POLL_INTERVAL", "2.0"))
+        )
+        self.lease_seconds = (
+            lease_seconds
+            if lease_seconds is not None
+            else int(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "300"))
+        )
+        self.max_attempts = (
+            max_attempts
+            if max_attempts is not None
+            else int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+        )
+        self.heartbeat_interval = max(self.lease_seconds / 3, 1)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        """Indica si el pool tiene workers activos"""
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Inicia los workers en el event loop actual"""
+        if self._tasks or self.workers <= 0:
+            return
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(f"{prefix}-{index}"))
+            for index in range(self.workers)
+        ]
+        self.logger.info(f"Pool de trabajos de análisis iniciado con {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Detiene los workers; los trabajos en curso se retoman al vencer su lease"""
+        if not self._tasks:
+            return
+
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.logger.info("Pool de trabajos de análisis detenido")
+
+    def notify(self) -> None:
+        """Despierta a los workers locales cuando se registra un trabajo nuevo"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run_once(self, worker_id: str) -> bool:
+        """
+        Reclama y ejecuta un único trabajo
+
+        Args:
+            worker_id: Identificador del worker
+
+        Returns:
+            bool: True si se procesó un trabajo, False si no había pendientes
+        """
+        job = await asyncio.to_thread(
+            self.repository.claim_next_job,
+            worker_id,
+            self.lease_seconds,
+            self.max_attempts,
+        )
+        if job is None:
+            return False
+
+        # El worker es de larga duración: el contexto de cada trabajo se restaura al terminar
+        token = bind_request_context(job_id=job.uuid, user=job.user, filename=job.filename)
+        self.logger.info(f"Worker {worker_id} ejecutando trabajo {job.uuid}")
+        heartbeat = asyncio.create_task(self._renew_lease(job.uuid, worker_id))
+
+        try:
+            try:
+                auth_token = await asyncio.to_thread(self.repository.job_token, job)
+                auth_result = {"authenticated": True, "token": auth_token, "user": job.user}
+                use_case = self.use_case_factory()
+                result = await use_case.execute(
+                    job.filename, auth_result, job.enable_ia, record_id=job.uuid
+                )
+                finished = await asyncio.to_thread(
+                    self.repository.complete_job,
+                    job.uuid,
+                    worker_id,
+                    result.model_dump(mode="json"),
+                )
+                if finished:
+                    self.logger.success(f"Trabajo {job.uuid} completado")
+            except Exception as e:
+                self.logger.error(f"Error al ejecutar trabajo {job.uuid}: {str(e)}")
+                finished = await asyncio.to_thread(
+                    self.repository.fail_job, job.uuid, worker_id, str(e)
+                )
+            if not finished:
+                self.logger.warning(
+                    f"Worker {worker_id} perdió el lease del trabajo {job.uuid}; "
+                    "se descarta su resultado"
+                )
+        finally:
+            heartbeat.cancel()
+            reset_request_context(token)
+
+        return True
+
+    async def _renew_lease(self, job_id: str, worker_id: str) -> None:
+        """Renueva el lease del trabajo en curso hasta que se cancela o se pierde"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                renewed = await asyncio.to_thread(
+                    self.repository.renew_lease, job_id, worker_id, self.lease_seconds
+                )
+            except Exception as e:
+                self.logger.error(f"Error al renovar el lease del trabajo {job_id}: {str(e)}")
+                continue
+            if not renewed:
+                self.logger.warning(f"El trabajo {job_id} ya no pertenece al worker {worker_id}")
+                return
+
+    async def _worker_loop(self, worker_id: str) -> None:
+        """Bucle principal de un worker"""
+        while not self._stopping:
+            try:
+                processed = await self.run_once(worker_id)
+                if not processed:
+                    await asyncio.to_thread(
+                        self.repository.fail_exhausted_jobs, self.max_attempts
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error en worker {worker_id}: {str(e)}")
+                processed = False
+
+            if not processed:
+                await self._wait_for_work()
+
+    async def _wait_for_work(self) -> None:
+        """Espera una notificación o el intervalo de sondeo"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+
+# Instancia global del pool de workers
+analysis_job_worker_pool = AnalysisJobWorkerPool()
@@ -0,0 +1,343 @@
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from app.model.analysis_blob_repository import AnalysisBlobRepository, externalize_content
+from app.model.analysis_finding_repository import AnalysisFindingRepository, build_findings
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_rollup_repository import (
+    AnalysisRollupRepository,
+    RollupEntry,
+    rollup_day,
+    rollup_increments,
+)
+from app.model.retention_policy import retention_policy
+from app.services.logger import Logger
+from app.services.payload_codec import payload_codec
+
+# Marca que indica a la tarea de flush que debe terminar
+_STOP = object()
+
+
+class _PendingRecord(NamedTuple):
+    """Registro preparado junto con lo que se escribe a partir de él"""
+
+    document: Dict[str, Any]
+    blob: Optional[Tuple[str, str]]
+    rollup: RollupEntry
+    findings: List[Dict[str, Any]]
+
+
+class AnalysisRecordWriter:
+    """
+    Buffer write-behind para los registros de análisis
+
+    Las peticiones encolan el registro sin procesar y responden sin esperar a
+    MongoDB. Una tarea en segundo plano agrupa los registros, los prepara en
+    un hilo (codificación del payload, blob de contenido y hallazgos) y los
+    inserta con insert_many cuando se alcanza el tamaño de lote o el
+    intervalo de flush. La cola es
+    acotada: si MongoDB se vuelve lento, enqueue espera (backpressure) hasta
+    un tiempo máximo en lugar de acumular memoria sin límite.
+
+    El contenido de los análisis sin IA viaja aparte como blob: cada lote
+    escribe primero sus blobs distintos (upsert) y luego los registros que
+    los referencian. Los contadores diarios por usuario y los hallazgos de
+    analysis_findings se escriben solo para los registros que se escribieron.
+    Un registro cuyo UUID ya existe (reintento de un trabajo asíncrono) se
+    omite sin contarlo como fallo.
+    """
+
+    def __init__(
+        self,
+        collection_provider: Optional[Callable[[], Any]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        enqueue_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        blob_repository: Optional[AnalysisBlobRepository] = None,
+        rollup_repository: Optional[AnalysisRollupRepository] = None,
+        finding_repository: Optional[AnalysisFindingRepository] = None,
+    ):
+        self.logger = Logger()
+        self.collection_provider = collection_provider or AnalysisRecord._get_collection
+        self.blob_repository = blob_repository or AnalysisBlobRepository()
+        self.rollup_repository = rollup_repository or AnalysisRollupRepository()
+        self.finding_repository = finding_repository or AnalysisFindingRepository()
+        self.batch_size = batch_size or int(os.getenv("ANALYSIS_RECORD_BATCH_SIZE", "100"))
+        self.flush_interval = flush_interval or float(
+            os.getenv("ANALYSIS_RECORD_FLUSH_INTERVAL", "0.5")
+        )
+        self.max_pending = max_pending or int(
+            os.getenv("ANALYSIS_RECORD_MAX_PENDING", "10000")
+        )
+        self.enqueue_timeout = enqueue_timeout or float(
+            os.getenv("ANALYSIS_RECORD_ENQUEUE_TIMEOUT", "5.0")
+        )
+        self.max_retries = (
+            max_retries
+            if max_retries is not None
+            else int(os.getenv("ANALYSIS_RECORD_MAX_RETRIES", "2"))
+        )
+        self.written_records = 0
+        self.failed_records = 0
+        self.failure_handlers: List[Callable[[Dict[str, Any], str], None]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+
+    @property
+    def running(self) -> bool:
+        """Indica si el buffer está aceptando registros"""
+        return self._accepting and self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        """Número de registros encolados pendientes de escritura"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Inicia la tarea de flush en el event loop actual"""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+        self._accepting = True
+        self.logger.info(
+            f"Buffer de registros iniciado (lote={self.batch_size}, intervalo={self.flush_interval}s)"
+        )
+
+    async def stop(self) -> None:
+        """Detiene la tarea de flush escribiendo antes todo lo pendiente"""
+        if not self.running:
+            return
+
+        # La marca queda detrás de todos los registros ya encolados
+        self._accepting = False
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self.logger.info("Buffer de registros detenido y vaciado")
+
+    async def enqueue(
+        self,
+        success: bool,
+        response: Dict[str, Any],
+        user: str,
+        record_id: Optional[str] = None,
+    ) -> AnalysisRecord:
+        """
+        Encola un registro de análisis para escritura diferida
+
+        Solo crea el registro con su UUID: la codificación y los hallazgos se
+        calculan en la tarea de flush, fuera del event loop. Si el buffer ya no acepta registros (detenido o deteniéndose), el
+        registro se escribe directamente: encolado detrás de la marca de
+        parada nunca llegaría a MongoDB.
+
+        Args:
+            success: Indica si el análisis fue exitoso
+            response: Respuesta a persistir
+            user: Usuario que realizó el análisis
+            record_id: UUID fijo del registro (por defecto, uno aleatorio)
+
+        Returns:
+            AnalysisRecord: Registro encolado (con UUID ya asignado)
+
+        Raises:
+            RuntimeError: Si el buffer sigue lleno tras el tiempo máximo de espera
+        """
+        record = AnalysisRecord(success=success, response=response, user=user)
+        if record_id:
+            record.uuid = record_id
+
+        if not self._accepting:
+            await self._flush([record])
+            return record
+
+        try:
+            await asyncio.wait_for(self._queue.put(record), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                "Error de MongoDB: buffer de registros lleno, la base de datos no da abasto"
+            )
+
+        return record
+
+    async def _run(self) -> None:
+        """Agrupa registros por tamaño o tiempo y los escribe"""
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # La tarea debe seguir viva: si termina, stop() nunca vaciaría la cola
+                self.logger.error(f"Error al escribir lote de {len(batch)} registros: {str(e)}")
+
+    async def _flush(self, records: List[AnalysisRecord]) -> None:
+        """Prepara y escribe un lote con reintentos y reporta los fallos por registro"""
+        batch = await asyncio.to_thread(self._prepare_batch, records)
+        if not batch:
+            return
+
+        documents = [pending.document for pending in batch]
+        blobs = dict(pending.blob for pending in batch if pending.blob)
+        skipped_indexes = await self._write_with_retries(documents, blobs)
+
+        written = [
+            pending for index, pending in enumerate(batch) if index not in skipped_indexes
+        ]
+        await self._apply_rollups([pending.rollup for pending in written])
+        await self._insert_findings(
+            [finding for pending in written for finding in pending.findings]
+        )
+
+    async def _write_with_retries(
+        self, documents: List[Dict[str, Any]], blobs: Optional[Dict[str, str]]
+    ) -> set:
+        """Escribe el lote y retorna los índices de los registros que no escribió"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self._write_batch, documents, blobs)
+                self.written_records += len(documents)
+                return set()
+            except BulkWriteError as bulk_error:
+                # insert_many no ordenado: los registros sin error ya se escribieron
+                write_errors = bulk_error.details.get("writeErrors", [])
+                duplicates = {
+                    error["index"] for error in write_errors if error.get("code") == 11000
+                }
+                write_errors = [
+                    error for error in write_errors if error.get("code") != 11000
+                ]
+                skipped = {write_error["index"] for write_error in write_errors}
+                if attempt == 0 and duplicates:
+                    # El registro ya existía (un intento anterior del mismo trabajo):
+                    # sus contadores y hallazgos ya se escribieron
+                    self.logger.info(f"Se omiten {len(duplicates)} registros ya existentes")
+                    skipped |= duplicates
+                # En un reintento, una clave duplicada es un registro que ya se escribió
+                self.written_records += len(documents) - len(skipped)
+                for write_error in write_errors:
+                    self._report_failure(
+                        documents[write_error["index"]], write_error.get("errmsg", "")
+                    )
+                return skipped
+            except Exception as e:
+                if attempt < self.max_retries:
+                    self.logger.warning(
+                        f"Error al escribir lote de {len(documents)} registros, reintentando: {str(e)}"
+                    )
+                    await asyncio.sleep(min(0.1 * 2**attempt, 2.0))
+                    continue
+                for document in documents:
+                    self._report_failure(document, str(e))
+        return set(range(len(documents)))
+
+    async def _apply_rollups(self, rollups: List[RollupEntry]) -> None:
+        """Incrementa los contadores diarios; un fallo aquí no afecta a los registros"""
+        if not rollups:
+            return
+        try:
+            await asyncio.to_thread(self.rollup_repository.apply, rollups)
+        except Exception as e:
+            self.logger.warning(
+                f"Error al actualizar contadores de {len(rollups)} registros: {str(e)}"
+            )
+
+    async def _insert_findings(self, findings: List[Dict[str, Any]]) -> None:
+        """Guarda los hallazgos del lote; se pueden regenerar con backfill-findings"""
+        if not findings:
+            return
+        try:
+            await asyncio.to_thread(self.finding_repository.insert_findings, findings)
+        except Exception as e:
+            self.logger.warning(f"Error al guardar {len(findings)} hallazgos: {str(e)}")
+
+    def _prepare_batch(self, records: List[AnalysisRecord]) -> List[_PendingRecord]:
+        """Prepara los registros de un lote (se ejecuta en un hilo)"""
+        batch = []
+        for record in records:
+            try:
+                batch.append(self._prepare(record))
+            except Exception as e:
+                self._report_failure({"uuid": record.uuid, "user": record.user}, str(e))
+        return batch
+
+    @staticmethod
+    def _prepare(record: AnalysisRecord) -> _PendingRecord:
+        """Codifica el payload y calcula el blob, los contadores y los hallazgos"""
+        response = record.response
+        stored_response, blob = externalize_content(payload_codec.encode_response(response))
+        stored = AnalysisRecord(
+            uuid=record.uuid,
+            success=record.success,
+            response=stored_response,
+            user=record.user,
+            created_at=record.created_at,
+            expires_at=retention_policy.expires_at(
+                record.success, stored_response, record.created_at
+            ),
+        )
+        return _PendingRecord(
+            document=stored.to_mongo().to_dict(),
+            blob=blob,
+            rollup=(
+                record.user,
+                rollup_day(record.created_at),
+                rollup_increments(record.success, response),
+            ),
+            findings=build_findings(
+                record.uuid, record.user, record.success, response, record.created_at
+            ),
+        )
+
+    def _write_batch(
+        self, documents: List[Dict[str, Any]], blobs: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Inserta un lote de registros en MongoDB (se ejecuta en un hilo)"""
+        # Los blobs van primero para que ningún registro referencie contenido inexistente
+        if blobs:
+            self.blob_repository.store_blobs(blobs)
+        self.collection_provider().insert_many(documents, ordered=False)
+
+    def _report_failure(self, document: Dict[str, Any], error: str) -> None:
+        """Reporta el fallo de un registro concreto"""
+        self.failed_records += 1
+        self.logger.error(
+            f"Error al guardar registro de análisis {document.get('uuid')}: {error}",
+            {"uuid": document.get("uuid"), "user": document.get("user")},
+        )
+        for handler in self.failure_handlers:
+            try:
+                handler(document, error)
+            except Exception as e:
+                self.logger.error(f"Error en el manejador de fallos de registros: {str(e)}")
+
+
+# Instancia global del buffer de registros
+analysis_record_writer = AnalysisRecordWriter()
@@ -1,6 +1,7 @@
 import aiohttp
 import os
 from app.services.logger import Logger
+from app.services.tracing import tracer
 
 
 class AuthClient:
@@ -22,16 +23,15 @@ class AuthClient:
         Returns:
             bool: True si el token es válido, False en caso contrario
         """
-        self.logger.set_context(
-            "AuthClient.validate_token",
-            {
-                "token_length": len(token) if token else 0,
-                "auth_service_url": self.auth_service_url,
-            },
-        )
-
         try:
-            self.logger.info("Validando token con servicio de autenticación")
+            # Instancia compartida por todas las peticiones: los datos van en el registro
+            self.logger.info(
+                "Validando token con servicio de autenticación",
+                {
+                    "token_length": len(token) if token else 0,
+                    "auth_service_url": self.auth_service_url,
+                },
+            )
 
             # URL del endpoint de validación
             url = f"{self.auth_service_url}/validate"
@@ -39,38 +39,42 @@ class AuthClient:
             # Datos de la petición
             payload = {"token": token}
 
-            # Realizar petición HTTP
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(url, json=payload) as response:
-                    self.logger.info(
-                        f"Respuesta del servicio de autenticación: {response.status}"
-                    )
+            # Realizar petición HTTP propagando la traza
+            with tracer.span("auth_service.validate", **{"http.url": url}) as span:
+                async with aiohttp.ClientSession(timeout=self.timeout) as session:
+                    async with session.post(
+                        url, json=payload, headers=tracer.inject({})
+                    ) as response:
+                        span.set_attribute("http.status_code", response.status)
+                        self.logger.info(
+                            f"Respuesta del servicio de autenticación: {response.status}"
+                        )
 
-                    if response.status == 200:
-                        data = await response.json()
-                        is_valid = data.get("valid", False)
+                        if response.status == 200:
+                            data = await response.json()
+                            is_valid = data.get("valid", False)
 
-                        self.logger.success(
-                            "Token validado exitosamente",
-                            {"valid": is_valid, "response_data": data},
-                        )
+                            self.logger.success(
+                                "Token validado exitosamente",
+                                {"valid": is_valid, "response_data": data},
+                            )
 
-                        return is_valid, data
-                    elif response.status == 401:
-                        self.logger.error(
-                            "Token inválido según el servicio de autenticación"
-                        )
-                        return False, None
-                    elif response.status == 400:
-                        response_data = await response.json()
-                        self.logger.error(f"Error en formato de token: {response_data}")
-                        return False, None
-                    else:
-                        response_text = await response.text()
-                        self.logger.error(
-                            f"Error en validación de token: {response.status} - {response_text}"
-                        )
-                        return False, None
+                            return is_valid, data
+                        elif response.status == 401:
+                            self.logger.error(
+                                "Token inválido según el servicio de autenticación"
+                            )
+                            return False, None
+                        elif response.status == 400:
+                            response_data = await response.json()
+                            self.logger.error(f"Error en formato de token: {response_data}")
+                            return False, None
+                        else:
+                            response_text = await response.text()
+                            self.logger.error(
+                                f"Error en validación de token: {response.status} - {response_text}"
+                            )
+                            return False, None
 
         except aiohttp.ClientConnectorError as e:
             self.logger.error(
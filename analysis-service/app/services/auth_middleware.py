@@ -1,9 +1,14 @@
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+import os
 
 from app.services.auth_client import AuthClient
 from app.services.logger import Logger
+from app.services.metrics import metrics
+from app.services.profiler import start_request_profile
+from app.services.request_context import bind_request_context
+from app.services.tracing import tracer
 
 # Configurar logger
 logger = Logger()
@@ -36,11 +41,7 @@ class AuthMiddleware:
         Raises:
             HTTPException: Si el token es inválido o no se proporciona
         """
-        # Configurar contexto del logger
-        logger.set_context(
-            "AuthMiddleware", {"path": request.url.path, "method": request.method}
-        )
-
+        # La ruta y el método ya están en el contexto de la petición (RequestContextMiddleware)
         # Verificar si la ruta requiere autenticación
         if not self._requires_auth(request.url.path):
             logger.info("Ruta pública, saltando autenticación")
@@ -75,7 +76,11 @@ class AuthMiddleware:
         # Validar token con el servicio de autenticación
         try:
             logger.info("Validando token JWT")
-            is_valid, data = await self.auth_client.validate_token(token)
+            with tracer.span("auth_middleware.validate_token") as span, metrics.track_in_flight(
+                "auth"
+            ), metrics.stage("auth", "validate_token"):
+                is_valid, data = await self.auth_client.validate_token(token)
+                span.set_attribute("valid", bool(is_valid))
 
             if not is_valid:
                 logger.error("Token inválido")
@@ -90,6 +95,10 @@ class AuthMiddleware:
                     },
                 )
 
+            # Los logs del resto de la petición incluyen el usuario autenticado
+            bind_request_context(user=data.get("user"))
+            # Con ?profile=1 el perfil empieza aquí, si el usuario es administrador
+            start_request_profile(data.get("user"), is_admin_user)
             logger.success("Token validado correctamente")
             return {"authenticated": True, "token": token, "user": data.get("user")}
 
@@ -166,3 +175,40 @@ class AuthMiddleware:
 
 # Instancia global del middleware
 auth_middleware = AuthMiddleware()
+
+
+def _admin_users() -> set:
+    """Usuarios con acceso a los endpoints de administración (ADMIN_USERS)"""
+    return {
+        user.strip() for user in os.getenv("ADMIN_USERS", "").split(",") if user.strip()
+    }
+
+
+def is_admin_user(user: Optional[str]) -> bool:
+    """Indica si el usuario está incluido en ADMIN_USERS"""
+    return bool(user) and user in _admin_users()
+
+
+async def require_admin(auth_result: dict = Depends(auth_middleware)) -> dict:
+    """
+    Dependencia que restringe una ruta a los usuarios administradores
+
+    Returns:
+        dict: Información del usuario autenticado
+
+    Raises:
+        HTTPException: 403 si el usuario no está en ADMIN_USERS
+    """
+    if not is_admin_user(auth_result.get("user")):
+        logger.error(f"Acceso de administración denegado para: {auth_result.get('user')}")
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "success": False,
+                "message": "Acceso restringido a administradores",
+                "error_code": "ADMIN_REQUIRED",
+                "detail": "El usuario autenticado no tiene permisos de administración.",
+                "timestamp": logger.get_timestamp(),
+            },
+        )
+    return auth_result
@@ -1,7 +1,6 @@
 import base64
+import hashlib
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import os
 
 
@@ -25,13 +24,9 @@ class Encrypt:
         Returns:
             bytes: Clave derivada de 32 bytes
         """
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,  # 256 bits
-            salt=salt,
-            iterations=100000,
-        )
-        return kdf.derive(self.password)
+        # hashlib libera el GIL durante la derivación (PBKDF2HMAC de cryptography
+        # no), así que con asyncio.to_thread no bloquea el event loop
+        return hashlib.pbkdf2_hmac("sha256", self.password, salt, 100000, 32)  # 256 bits
 
     def encrypt(self, plaintext):
         """
@@ -0,0 +1,52 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class InFlightCoalescer:
+    """
+    Agrupa operaciones asíncronas idénticas que están en curso al mismo tiempo
+
+    La primera petición para una clave (líder) inicia la operación; las que
+    llegan mientras sigue en curso (seguidoras) esperan el mismo resultado en
+    lugar de repetirla. La operación corre en su propia tarea, por lo que si el
+    cliente del líder se desconecta las seguidoras igualmente reciben el resultado.
+    Las operaciones en curso son del proceso: con varios workers de gunicorn,
+    dos peticiones idénticas atendidas por workers distintos no se agrupan.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Ejecuta la operación o se une a la que ya está en curso para la clave
+
+        Args:
+            key: Clave que identifica operaciones equivalentes
+            factory: Función que crea la corrutina a ejecutar
+
+        Returns:
+            Tuple[Any, bool]: Resultado y True si esta llamada fue la líder
+        """
+        task = self._inflight.get(key)
+        is_leader = task is None
+
+        if is_leader:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        result = await asyncio.shield(task)
+
+        # Cada seguidora recibe su propia copia para que nadie mute el resultado compartido
+        return (result if is_leader else copy.deepcopy(result)), is_leader
+
+
+# Instancia global para los análisis con IA en curso
+analysis_coalescer = InFlightCoalescer()
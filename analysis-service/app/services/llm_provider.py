@@ -0,0 +1,59 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+
+class GeminiProvider:
+    """
+    Acceso al SDK de Google Gemini, importado al primer uso
+
+    google.generativeai importa grpc, protobuf y los clientes generados de la
+    API: casi un segundo y decenas de MB por proceso. Importarlo al cargar el
+    servicio lo paga también quien solo usa enable_ia=false; aquí se importa
+    la primera vez que se pide un modelo, desde el hilo donde corre el análisis
+    y no en el event loop.
+    """
+
+    def __init__(self, module_name: str = "google.generativeai"):
+        self._module_name = module_name
+        self._sdk: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Indica si el SDK ya se importó"""
+        return self._sdk is not None
+
+    @property
+    def sdk(self) -> ModuleType:
+        """Módulo del SDK (lo importa la primera vez)"""
+        if self._sdk is None:
+            with self._lock:
+                if self._sdk is None:
+                    self._sdk = importlib.import_module(self._module_name)
+        return self._sdk
+
+    def create_model(self, api_key: str, model_name: str = GEMINI_MODEL):
+        """
+        Configura la API key y crea el modelo
+
+        Args:
+            api_key: API key de Gemini
+            model_name: Nombre del modelo
+
+        Returns:
+            GenerativeModel: Modelo listo para generate_content
+        """
+        self.sdk.configure(api_key=api_key)
+        return self.sdk.GenerativeModel(model_name)
+
+    def generation_config(self, **kwargs):
+        """Crea la configuración de generación (GenerationConfig) con los parámetros dados"""
+        return self.sdk.types.GenerationConfig(**kwargs)
+
+
+# Instancia global usada por AnalysisUseCase
+gemini_provider = GeminiProvider()
@@ -0,0 +1,151 @@
+import gzip
+import os
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from logging.handlers import TimedRotatingFileHandler
+from typing import List, Optional
+
+COMPRESSED_SUFFIX = ".gz"
+
+
+class RotatingLogFileHandler(TimedRotatingFileHandler):
+    """
+    Handler de archivo que rota por tamaño y por tiempo
+
+    Rota cuando el archivo supera max_bytes o cuando vence el intervalo de
+    tiempo (when="none" desactiva la rotación por tiempo). Cada archivo rotado
+    recibe la fecha como sufijo y se comprime con gzip en un hilo propio, junto
+    con la eliminación de las copias que exceden backup_count, por lo que quien
+    escribe el registro nunca espera la compresión.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 0,
+        when: str = "midnight",
+        interval: int = 1,
+        backup_count: int = 0,
+        compress: bool = True,
+        utc: bool = True,
+    ):
+        self.time_rotation = when.lower() != "none"
+        super().__init__(
+            filename,
+            when=when if self.time_rotation else "midnight",
+            interval=interval,
+            backupCount=backup_count,
+            encoding="utf-8",
+            utc=utc,
+        )
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+
+    def shouldRollover(self, record) -> bool:
+        if self.time_rotation and time.time() >= self.rolloverAt:
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        rotated = self._rotated_name()
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, rotated)
+            self._submit(rotated)
+
+        now = int(time.time())
+        if now >= self.rolloverAt:
+            self.rolloverAt = self.computeRollover(now)
+        self.stream = self._open()
+
+    def wait_for_compression(self) -> None:
+        """Espera a que terminen las compresiones en curso"""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        super().close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pending = []
+
+    def _rotated_name(self) -> str:
+        """Nombre del archivo rotado: <archivo>.<AAAAMMDD-HHMMSS-ffffff>"""
+        return f"{self.baseFilename}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+
+    def _submit(self, rotated: str) -> None:
+        """Comprime y depura las copias fuera del hilo que escribe"""
+        if not self.compress:
+            self._delete_old_backups()
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+        self._pending = [future for future in self._pending if not future.done()]
+        self._pending.append(self._executor.submit(self._compress_and_cleanup, rotated))
+
+    def _compress_and_cleanup(self, rotated: str) -> None:
+        """Comprime un archivo rotado y elimina las copias antiguas"""
+        try:
+            with open(rotated, "rb") as source, gzip.open(rotated + COMPRESSED_SUFFIX, "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.remove(rotated)
+        except OSError:
+            # Si no se puede comprimir se conserva el archivo sin comprimir
+            pass
+        self._delete_old_backups()
+
+    def _backups(self) -> List[str]:
+        """Copias rotadas (comprimidas o no), de la más antigua a la más reciente"""
+        directory, base = os.path.split(self.baseFilename)
+        prefix = base + "."
+        names = [name for name in os.listdir(directory) if name.startswith(prefix)]
+        names.sort(key=lambda name: name[: -len(COMPRESSED_SUFFIX)] if name.endswith(COMPRESSED_SUFFIX) else name)
+        return [os.path.join(directory, name) for name in names]
+
+    def _delete_old_backups(self) -> None:
+        """Elimina las copias que exceden backup_count (0 = conservar todas)"""
+        if self.backupCount <= 0:
+            return
+        backups = self._backups()
+        for path in backups[: max(0, len(backups) - self.backupCount)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def build_file_handler(log_dir: str, worker: Optional[int] = None) -> RotatingLogFileHandler:
+    """
+    Crea el handler del archivo de log configurado desde variables de entorno
+
+    Con worker el archivo es analysis-service.worker-<n>.log: cada proceso de
+    gunicorn rota el suyo sin renombrar el archivo en que escriben los demás.
+
+    - LOG_FILE_MAX_BYTES: tamaño máximo antes de rotar (0 = sin límite)
+    - LOG_ROTATE_WHEN / LOG_ROTATE_INTERVAL: rotación por tiempo (midnight, H, D... o none)
+    - LOG_BACKUP_COUNT: archivos rotados que se conservan (0 = todos)
+    - LOG_COMPRESS_BACKUPS: comprimir con gzip los archivos rotados
+    """
+    return RotatingLogFileHandler(
+        os.path.join(
+            log_dir,
+            "analysis-service.log" if worker is None else f"analysis-service.worker-{worker}.log",
+        ),
+        max_bytes=int(os.getenv("LOG_FILE_MAX_BYTES", str(50 * 1024 * 1024))),
+        when=os.getenv("LOG_ROTATE_WHEN", "midnight"),
+        interval=int(os.getenv("LOG_ROTATE_INTERVAL", "1")),
+        backup_count=int(os.getenv("LOG_BACKUP_COUNT", "14")),
+        compress=os.getenv("LOG_COMPRESS_BACKUPS", "true").lower() == "true",
+    )
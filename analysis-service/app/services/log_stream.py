@@ -0,0 +1,231 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+# Niveles que acepta el filtro del stream (el mínimo a partir del cual se envía)
+STREAM_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "SUCCESS": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+
+def parse_stream_level(level: Optional[str]) -> int:
+    """
+    Convierte el filtro de nivel del stream en un nivel de logging
+
+    Args:
+        level: Nombre del nivel mínimo (None = todos)
+
+    Returns:
+        int: Nivel de logging mínimo
+
+    Raises:
+        ValueError: Si el nivel no es válido
+    """
+    if not level:
+        return logging.NOTSET
+    try:
+        return STREAM_LEVELS[level.strip().upper()]
+    except KeyError:
+        raise ValueError(
+            f"Nivel de log inválido: {level}. Valores permitidos: {', '.join(STREAM_LEVELS)}"
+        )
+
+
+class LogSubscription:
+    """
+    Suscriptor del stream de logs con sus filtros y su cola
+
+    Los filtros se evalúan al emitir el registro; los que pasan se entregan a
+    la cola del suscriptor en su event loop. Si la cola está llena el registro
+    se descarta y se cuenta en dropped, así un cliente lento nunca frena a
+    quien escribe los logs.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        level: int = logging.NOTSET,
+        request_id: Optional[str] = None,
+        user: Optional[str] = None,
+        max_pending: int = 1000,
+    ):
+        self.level = level
+        self.request_id = request_id
+        self.user = user
+        self.queue: "asyncio.Queue[logging.LogRecord]" = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self._loop = loop
+
+    def matches(self, record: logging.LogRecord) -> bool:
+        """Indica si el registro cumple los filtros del suscriptor"""
+        if record.levelno < self.level:
+            return False
+        if self.request_id is None and self.user is None:
+            return True
+        request = getattr(record, "request", None) or {}
+        if self.request_id is not None and request.get("request_id") != self.request_id:
+            return False
+        if self.user is not None and request.get("user") != self.user:
+            return False
+        return True
+
+    def offer(self, record: logging.LogRecord) -> None:
+        """Entrega el registro desde cualquier hilo sin esperar"""
+        try:
+            self._loop.call_soon_threadsafe(self._put, record)
+        except RuntimeError:
+            # El event loop del suscriptor ya se cerró
+            pass
+
+    def _put(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class LogBuffer(logging.Handler):
+    """
+    Últimos registros de log en memoria para el stream en tiempo real
+
+    Guarda las referencias a los LogRecord en un deque de tamaño fijo: append
+    es atómico, por lo que no se toma ningún lock al emitir, y el registro
+    solo se serializa cuando un suscriptor lo envía. Sin suscriptores el costo
+    por registro es un append. Los suscriptores se guardan en una tupla que se
+    reemplaza (nunca se modifica) al suscribir o desuscribir.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        super().__init__()
+        self.capacity = max(0, capacity)
+        self._records: Deque[logging.LogRecord] = deque(maxlen=self.capacity)
+        self._subscribers: Tuple[LogSubscription, ...] = ()
+        self._subscribers_lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        """Cantidad de suscriptores activos"""
+        return len(self._subscribers)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Sin el lock del Handler: el deque y la tupla de suscriptores no lo necesitan
+        if not self.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._records.append(record)
+        subscribers = self._subscribers
+        if subscribers:
+            for subscription in subscribers:
+                if subscription.matches(record):
+                    subscription.offer(record)
+
+    def snapshot(self) -> Tuple[logging.LogRecord, ...]:
+        """Copia de los registros guardados, del más antiguo al más reciente"""
+        # tuple() copia el deque sin ceder el GIL, por lo que no ve un append a medias
+        return tuple(self._records)
+
+    def subscribe(self, subscription: LogSubscription) -> None:
+        """Agrega un suscriptor que recibirá los registros nuevos"""
+        with self._subscribers_lock:
+            self._subscribers = self._subscribers + (subscription,)
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        """Quita un suscriptor"""
+        with self._subscribers_lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def render(self, record: logging.LogRecord) -> str:
+        """Serializa el registro con el formatter del handler (JSON de una línea)"""
+        return self.format(record)
+
+    async def stream(
+        self,
+        level: int = logging.NOTSET,
+        request_id: Optional[str] = None,
+        user: Optional[str] = None,
+        backlog: int = 100,
+        heartbeat_seconds: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Eventos Server-Sent Events con los registros que cumplen los filtros
+
+        Primero envía hasta backlog registros guardados y luego los nuevos a
+        medida que se emiten. Envía un comentario cada heartbeat_seconds sin
+        registros y un evento "dropped" con el total descartado cuando el
+        cliente no lee a tiempo.
+
+        Args:
+            level: Nivel mínimo
+            request_id: Solo registros de esta petición
+            user: Solo registros de este usuario
+            backlog: Registros guardados que se envían al conectar
+            heartbeat_seconds: Segundos entre comentarios de keepalive
+            max_pending: Registros que se encolan para el cliente antes de descartar
+
+        Yields:
+            str: Eventos SSE
+        """
+        if heartbeat_seconds is None:
+            heartbeat_seconds = float(os.getenv("LOG_STREAM_HEARTBEAT_SECONDS", "15"))
+        if max_pending is None:
+            max_pending = int(os.getenv("LOG_STREAM_MAX_PENDING", "1000"))
+
+        subscription = LogSubscription(
+            asyncio.get_running_loop(),
+            level=level,
+            request_id=request_id,
+            user=user,
+            max_pending=max_pending,
+        )
+        # Se suscribe antes de copiar el buffer para no perder registros entre
+        # ambos pasos; los que llegan por las dos vías se envían una vez
+        self.subscribe(subscription)
+        try:
+            sent = set()
+            if backlog > 0:
+                history = [record for record in self.snapshot() if subscription.matches(record)]
+                for record in history[-backlog:]:
+                    sent.add(id(record))
+                    yield self._event(record)
+
+            reported = 0
+            while True:
+                try:
+                    record = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if subscription.dropped > reported:
+                    reported = subscription.dropped
+                    yield f"event: dropped\ndata: {json.dumps({'dropped': reported})}\n\n"
+
+                if sent:
+                    if id(record) in sent:
+                        continue
+                    sent.clear()
+                yield self._event(record)
+        finally:
+            self.unsubscribe(subscription)
+
+    def _event(self, record: logging.LogRecord) -> str:
+        return f"data: {self.render(record)}\n\n"
+
+
+# Instancia global agregada a los handlers del logger del servicio
+log_buffer = LogBuffer(int(os.getenv("LOG_STREAM_BUFFER_SIZE", "1000")))
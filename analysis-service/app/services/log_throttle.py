@@ -0,0 +1,172 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# Niveles que se pueden muestrear o limitar; ERROR y superiores nunca se suprimen
+THROTTLED_LEVELS = {
+    logging.DEBUG: "DEBUG",
+    logging.INFO: "INFO",
+    logging.WARNING: "WARNING",
+}
+
+
+class _KeyState:
+    """Estado de muestreo y token bucket de una clave de mensaje"""
+
+    __slots__ = ("seen", "suppressed", "tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.seen = 0
+        self.suppressed = 0
+        self.tokens = tokens
+        self.updated = updated
+
+
+class LogThrottle:
+    """
+    Muestreo y limitación de frecuencia de los mensajes de log por clave
+
+    Por cada nivel (DEBUG, INFO, WARNING) se configura:
+    - LOG_SAMPLE_RATE_<NIVEL>: fracción de mensajes que se escriben por clave
+      (1 = todos; 0.1 = el primero y luego uno de cada 10)
+    - LOG_RATE_LIMIT_<NIVEL>: mensajes por segundo por clave (token bucket con
+      capacidad de un segundo; 0 = sin límite)
+
+    La clave es el mensaje, salvo que el llamador indique una propia (necesario
+    para mensajes con partes variables). Cada LOG_SUPPRESSION_SUMMARY_SECONDS
+    se reporta cuántos mensajes se suprimieron por clave y se reinicia el estado.
+    Si hay más de max_keys claves en una ventana, las nuevas no se limitan.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[int, float]] = None,
+        rate_limits: Optional[Dict[int, float]] = None,
+        summary_seconds: Optional[float] = None,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if sample_rates is None:
+            sample_rates = {
+                level: float(os.getenv(f"LOG_SAMPLE_RATE_{name}", "1"))
+                for level, name in THROTTLED_LEVELS.items()
+            }
+        if rate_limits is None:
+            rate_limits = {
+                level: float(os.getenv(f"LOG_RATE_LIMIT_{name}", "0"))
+                for level, name in THROTTLED_LEVELS.items()
+            }
+
+        # Se escribe uno de cada N mensajes de la clave (N = 1 / tasa)
+        self.sample_every: Dict[int, int] = {
+            level: self._sample_every(rate)
+            for level, rate in sample_rates.items()
+            if level in THROTTLED_LEVELS
+        }
+        self.rate_limits: Dict[int, float] = {
+            level: rate
+            for level, rate in rate_limits.items()
+            if level in THROTTLED_LEVELS and rate > 0
+        }
+        self.summary_seconds = (
+            summary_seconds
+            if summary_seconds is not None
+            else float(os.getenv("LOG_SUPPRESSION_SUMMARY_SECONDS", "60"))
+        )
+        self.max_keys = max_keys
+        self.enabled = any(every != 1 for every in self.sample_every.values()) or bool(
+            self.rate_limits
+        )
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: Dict[Tuple[int, str], _KeyState] = {}
+        self._window_started = clock()
+
+    @staticmethod
+    def _sample_every(rate: float) -> int:
+        """Convierte una tasa de muestreo en 'uno de cada N' (0 = ninguno)"""
+        if rate >= 1:
+            return 1
+        if rate <= 0:
+            return 0
+        return max(1, round(1 / rate))
+
+    def allow(self, level: int, key: str) -> bool:
+        """
+        Indica si un mensaje se debe escribir
+
+        Args:
+            level: Nivel de logging del mensaje
+            key: Clave que agrupa mensajes equivalentes
+
+        Returns:
+            bool: False si el mensaje se suprime por muestreo o por límite
+        """
+        if not self.enabled or level not in THROTTLED_LEVELS:
+            return True
+
+        every = self.sample_every.get(level, 1)
+        limit = self.rate_limits.get(level, 0.0)
+        if every == 1 and not limit:
+            return True
+
+        with self._lock:
+            state = self._states.get((level, key))
+            if state is None:
+                if len(self._states) >= self.max_keys:
+                    return True
+                state = _KeyState(tokens=max(1.0, limit), updated=self._clock())
+                self._states[(level, key)] = state
+
+            state.seen += 1
+            if every != 1 and (every == 0 or (state.seen - 1) % every):
+                state.suppressed += 1
+                return False
+
+            if limit:
+                now = self._clock()
+                state.tokens = min(max(1.0, limit), state.tokens + (now - state.updated) * limit)
+                state.updated = now
+                if state.tokens < 1:
+                    state.suppressed += 1
+                    return False
+                state.tokens -= 1
+
+            return True
+
+    def take_summary(self, force: bool = False) -> Optional[Dict[str, Dict[str, int]]]:
+        """
+        Retorna los mensajes suprimidos si terminó la ventana y reinicia el estado
+
+        Args:
+            force: Retornar el resumen aunque la ventana no haya terminado
+
+        Returns:
+            Optional[Dict[str, Dict[str, int]]]: Suprimidos por nivel y clave,
+            o None si no corresponde reportar o no se suprimió nada
+        """
+        if not self.enabled:
+            return None
+        if not force and self._clock() - self._window_started < self.summary_seconds:
+            return None
+
+        with self._lock:
+            now = self._clock()
+            if not force and now - self._window_started < self.summary_seconds:
+                return None
+
+            summary: Dict[str, Dict[str, int]] = {}
+            for (level, key), state in self._states.items():
+                if state.suppressed:
+                    summary.setdefault(THROTTLED_LEVELS[level], {})[key] = state.suppressed
+            self._states.clear()
+            self._window_started = now
+
+        return summary or None
+
+
+# Instancia global configurada desde las variables de entorno
+log_throttle = LogThrottle()
@@ -1,132 +1,302 @@
 import logging
 import os
-from datetime import datetime
-from typing import Any, Dict, Optional
+import queue
+from contextvars import ContextVar
+from datetime import datetime, UTC
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, List, Optional
 import json
 
+try:  # orjson es opcional: acelera la serialización de los logs
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+from app.services.log_rotation import RotatingLogFileHandler, build_file_handler
+from app.services.log_stream import log_buffer
+from app.services.log_throttle import LogThrottle, log_throttle
+from app.services.request_context import get_request_context
+
+LOGGER_NAME = "analysis-service"
+
+JSON_BACKEND_ORJSON = "orjson"
+JSON_BACKEND_STDLIB = "json"
+
+
+# Contexto de función (set_context) de la tarea actual, común a todos los
+# Logger de la tarea. Cada tarea tiene su propia copia de las variables de
+# contexto, por lo que no se mezcla entre peticiones; el diccionario no se
+# modifica: set_context siempre asigna uno nuevo.
+_function_context: ContextVar[Dict[str, Any]] = ContextVar("logger_function_context", default={})
+
+
+def log_level_from_env() -> int:
+    """Nivel de logging configurado en LOG_LEVEL (INFO si no es válido)"""
+    level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Agrega el contexto de la petición en curso a cada registro
+
+    Se ejecuta en el hilo que emite el registro, antes de encolarlo, por lo que
+    el QueueListener recibe el contexto correcto aunque formatee después.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request"):
+            record.request = get_request_context()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatea cada registro como un objeto JSON de una sola línea
+
+    La serialización ocurre aquí, cuando un handler escribe el registro, y no
+    al llamar al Logger: con el QueueListener se hace fuera del hilo de la
+    petición y los mensajes filtrados por nivel nunca se serializan. Usa orjson
+    si está instalado, salvo que LOG_JSON_BACKEND=json.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        super().__init__()
+        backend = (backend or os.getenv("LOG_JSON_BACKEND", JSON_BACKEND_ORJSON)).lower()
+        self.backend = (
+            JSON_BACKEND_ORJSON
+            if backend == JSON_BACKEND_ORJSON and orjson is not None
+            else JSON_BACKEND_STDLIB
+        )
+        self._dumps: Callable[[Dict[str, Any]], str] = (
+            self._dumps_orjson if self.backend == JSON_BACKEND_ORJSON else self._dumps_json
+        )
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": getattr(record, "log_level", record.levelname),
+            "service": LOGGER_NAME,
+            "message": record.getMessage(),
+            "context": getattr(record, "context", None) or {},
+        }
+
+        request = getattr(record, "request", None)
+        if request:
+            payload["request"] = request
+
+        data = getattr(record, "data", None)
+        if data is not None:
+            payload["data"] = data
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+
+        return self._dumps(payload)
+
+    @staticmethod
+    def _dumps_json(payload: Dict[str, Any]) -> str:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    @classmethod
+    def _dumps_orjson(cls, payload: Dict[str, Any]) -> str:
+        try:
+            return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Casos que orjson no admite (p. ej. enteros de más de 64 bits)
+            return cls._dumps_json(payload)
+
+
 class Logger:
     """Sistema de logging similar al config-service"""
     
+    # Muestreo y límite de frecuencia compartidos por todas las instancias
+    throttle: LogThrottle = log_throttle
+    
     def __init__(self):
-        self._logger = logging.getLogger("analysis-service")
-        self.context: Dict[str, Any] = {}
+        self._logger = logging.getLogger(LOGGER_NAME)
+        # La salida con colores duplica la del StreamHandler, por eso es opcional
+        self.console_print = os.getenv("LOG_CONSOLE_PRINT", "false").lower() == "true"
         self._setup_logger()
     
     def _setup_logger(self):
         """Configura el logger"""
-        # Crear directorio de logs si no existe
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        # Configurar nivel de logging
-        self._logger.setLevel(logging.INFO)
+        if not any(isinstance(f, RequestContextFilter) for f in self._logger.filters):
+            self._logger.addFilter(RequestContextFilter())
         
-        # Evitar duplicación de handlers
+        # Evitar duplicación de handlers; el nivel y el directorio se configuran
+        # una sola vez porque setLevel limpia la caché de niveles de todos los loggers
         if not self._logger.handlers:
-            # Handler para archivo
-            file_handler = logging.FileHandler(f"{log_dir}/analysis-service.log")
-            file_handler.setLevel(logging.INFO)
+            # Crear directorio de logs si no existe
+            log_dir = "logs"
+            if not os.path.exists(log_dir):
+                os.makedirs(log_dir)
+            
+            # El nivel se aplica en el logger para descartar los mensajes antes de formatearlos
+            self._logger.setLevel(log_level_from_env())
+            
+            # Handler para archivo, con rotación por tamaño y tiempo
+            file_handler = build_file_handler(log_dir)
             
             # Handler para consola
             console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.INFO)
             
-            # Formato del log
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
+            # Formato del log: JSON de una línea
+            formatter = JsonFormatter()
             
             file_handler.setFormatter(formatter)
             console_handler.setFormatter(formatter)
+            log_buffer.setFormatter(formatter)
             
             self._logger.addHandler(file_handler)
             self._logger.addHandler(console_handler)
+            # Últimos registros en memoria para el stream de logs en tiempo real
+            self._logger.addHandler(log_buffer)
+    
+    @property
+    def context(self) -> Dict[str, Any]:
+        """Contexto de función de la tarea actual (no debe modificarse)"""
+        return _function_context.get()
+    
+    @context.setter
+    def context(self, value: Dict[str, Any]):
+        _function_context.set(value)
     
     def set_context(self, function_name: str, data: Optional[Dict[str, Any]] = None):
         """
         Establece el contexto para el logging
         
+        El contexto solo es visible en la tarea actual (la petición en curso)
+        y reemplaza al anterior de esa tarea. Es para los Logger creados por
+        petición (casos de uso); los logger compartidos a nivel de módulo
+        vinculan sus datos con bind_request_context o los pasan en data.
+        
         Args:
             function_name: Nombre de la función
             data: Datos adicionales del contexto
         """
-        self.context = {
+        context = {
             "functionName": function_name,
             "timestamp": datetime.now().isoformat()
         }
         
         if data:
-            self.context.update(data)
+            context.update(data)
+        
+        self.context = context
     
-    def _format_message(self, message: str, data: Optional[Any] = None) -> str:
+    def _log(
+        self,
+        level: int,
+        message: str,
+        data: Optional[Any] = None,
+        log_level: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> bool:
         """
-        Formatea el mensaje de log con contexto
+        Emite un registro con el contexto y los datos como atributos
+        
+        El registro guarda referencias a context y data; JsonFormatter los
+        serializa al escribirlo.
         
         Args:
+            level: Nivel de logging
             message: Mensaje principal
             data: Datos adicionales
+            log_level: Nombre del nivel mostrado en el JSON (p. ej. SUCCESS)
+            key: Clave de muestreo y límite (por defecto, el mensaje)
             
         Returns:
-            str: Mensaje formateado
+            bool: False si el nivel está deshabilitado o el mensaje se suprimió
         """
-        log_data = {
-            "message": message,
-            "context": self.context
-        }
+        if not self._logger.isEnabledFor(level):
+            return False
         
-        if data:
-            log_data["data"] = data
+        if self.throttle.enabled:
+            self.log_suppressed()
+            if not self.throttle.allow(level, key or message):
+                return False
         
-        return json.dumps(log_data, ensure_ascii=False, indent=2)
+        extra: Dict[str, Any] = {"context": self.context, "data": data}
+        if log_level:
+            extra["log_level"] = log_level
+        self._logger.log(level, message, extra=extra)
+        return True
     
-    def info(self, message: str, data: Optional[Any] = None):
+    def log_suppressed(self, force: bool = False):
+        """
+        Registra el resumen de mensajes suprimidos por muestreo o límite
+        
+        Args:
+            force: Registrar aunque no haya terminado la ventana del resumen
+        """
+        summary = self.throttle.take_summary(force=force)
+        if summary:
+            self._logger.log(
+                logging.WARNING,
+                "Mensajes de log suprimidos",
+                extra={"context": self.context, "data": summary},
+            )
+    
+    def debug(self, message: str, data: Optional[Any] = None, key: Optional[str] = None):
+        """
+        Registra un mensaje de depuración
+        
+        Args:
+            message: Mensaje a registrar
+            data: Datos adicionales
+            key: Clave de muestreo (para mensajes con partes variables)
+        """
+        self._log(logging.DEBUG, message, data, key=key)
+    
+    def info(self, message: str, data: Optional[Any] = None, key: Optional[str] = None):
         """
         Registra un mensaje de información
         
         Args:
             message: Mensaje a registrar
             data: Datos adicionales
+            key: Clave de muestreo (para mensajes con partes variables)
         """
-        formatted_message = self._format_message(message, data)
-        self._logger.info(formatted_message)
-        print(f"\033[94m[INFO]\033[0m {message}")
+        if self._log(logging.INFO, message, data, key=key) and self.console_print:
+            print(f"\033[94m[INFO]\033[0m {message}")
     
     def error(self, message: str, error: Optional[Any] = None):
         """
-        Registra un mensaje de error
+        Registra un mensaje de error (nunca se muestrea ni se limita)
         
         Args:
             message: Mensaje de error
             error: Detalles del error
         """
-        formatted_message = self._format_message(message, error)
-        self._logger.error(formatted_message)
-        print(f"\033[91m[ERROR]\033[0m {message}")
+        if self._log(logging.ERROR, message, error) and self.console_print:
+            print(f"\033[91m[ERROR]\033[0m {message}")
     
-    def success(self, message: str, data: Optional[Any] = None):
+    def success(self, message: str, data: Optional[Any] = None, key: Optional[str] = None):
         """
         Registra un mensaje de éxito
         
         Args:
             message: Mensaje de éxito
             data: Datos adicionales
+            key: Clave de muestreo (para mensajes con partes variables)
         """
-        formatted_message = self._format_message(message, data)
-        self._logger.info(formatted_message)
-        print(f"\033[92m[SUCCESS]\033[0m {message}")
+        if (
+            self._log(logging.INFO, message, data, log_level="SUCCESS", key=key)
+            and self.console_print
+        ):
+            print(f"\033[92m[SUCCESS]\033[0m {message}")
     
-    def warning(self, message: str, data: Optional[Any] = None):
+    def warning(self, message: str, data: Optional[Any] = None, key: Optional[str] = None):
         """
         Registra un mensaje de advertencia
         
         Args:
             message: Mensaje de advertencia
             data: Datos adicionales
+            key: Clave de muestreo (para mensajes con partes variables)
         """
-        formatted_message = self._format_message(message, data)
-        self._logger.warning(formatted_message)
-        print(f"\033[93m[WARNING]\033[0m {message}")
+        if self._log(logging.WARNING, message, data, key=key) and self.console_print:
+            print(f"\033[93m[WARNING]\033[0m {message}")
     
     def get_timestamp(self) -> str:
         """
@@ -135,4 +305,95 @@ class Logger:
         Returns:
             str: Timestamp en formato ISO
         """
-        return datetime.now().isoformat() 
\ No newline at end of file
+        return datetime.now().isoformat() 
+
+
+def use_worker_log_file(worker: int, logger_name: str = LOGGER_NAME) -> None:
+    """
+    Reemplaza el archivo de log heredado del proceso maestro por uno del worker
+
+    Con preload_app el maestro importa la aplicación y abre el archivo antes de
+    crear los workers; si todos compartieran ese archivo, la rotación de uno
+    renombraría el archivo en que siguen escribiendo los demás.
+
+    Args:
+        worker: Número de slot del worker (estable entre reinicios)
+        logger_name: Logger cuyos handlers se reemplazan
+    """
+    logger = logging.getLogger(logger_name)
+    for handler in list(logger.handlers):
+        if not isinstance(handler, RotatingLogFileHandler):
+            continue
+        worker_handler = build_file_handler(os.path.dirname(handler.baseFilename), worker=worker)
+        worker_handler.setFormatter(handler.formatter)
+        worker_handler.setLevel(handler.level)
+        logger.removeHandler(handler)
+        handler.close()
+        logger.addHandler(worker_handler)
+
+
+class LogListener:
+    """
+    Saca la escritura de los logs del hilo que los emite
+
+    Mientras está iniciado, el logger del servicio solo tiene un QueueHandler
+    que encola cada registro; un QueueListener en su propio hilo los escribe en
+    los handlers de archivo y consola. Al detenerlo se escriben los registros
+    pendientes y se restauran los handlers originales (escritura síncrona),
+    que es lo que usan la CLI y los tests.
+    """
+
+    def __init__(self, logger_name: str = LOGGER_NAME):
+        self._logger_name = logger_name
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(self._queue)
+        self._listener: Optional[QueueListener] = None
+        self._handlers: List[logging.Handler] = []
+
+    @property
+    def running(self) -> bool:
+        """Indica si el listener está iniciado"""
+        return self._listener is not None
+
+    def start(self) -> None:
+        """Reemplaza los handlers del logger por la cola e inicia el listener"""
+        if self._listener is not None:
+            return
+
+        # Garantiza que los handlers de archivo y consola estén configurados
+        Logger()
+        logger = logging.getLogger(self._logger_name)
+        self._handlers = [
+            handler for handler in logger.handlers if handler is not self._queue_handler
+        ]
+
+        self._listener = QueueListener(
+            self._queue, *self._handlers, respect_handler_level=True
+        )
+        self._listener.start()
+
+        logger.addHandler(self._queue_handler)
+        for handler in self._handlers:
+            logger.removeHandler(handler)
+
+    def stop(self) -> None:
+        """Escribe los registros pendientes y restaura los handlers originales"""
+        if self._listener is None:
+            return
+
+        # Resumen de la última ventana de mensajes suprimidos
+        Logger().log_suppressed(force=True)
+
+        logger = logging.getLogger(self._logger_name)
+        for handler in self._handlers:
+            logger.addHandler(handler)
+        logger.removeHandler(self._queue_handler)
+
+        # QueueListener.stop procesa lo que queda en la cola antes de terminar
+        self._listener.stop()
+        self._listener = None
+        self._handlers = []
+
+
+# Instancia global iniciada y detenida con la aplicación
+log_listener = LogListener()
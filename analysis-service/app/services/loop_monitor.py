@@ -0,0 +1,164 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, UTC
+from typing import Any, Deque, Dict, Optional
+
+from app.services.logger import Logger
+from app.services.metrics import ServiceMetrics, metrics
+
+
+def _truthy(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class LoopLagMonitor:
+    """
+    Mide el retraso del event loop y detecta el código que lo bloquea
+
+    Una tarea duerme interval segundos en bucle y mide cuánto tarda el loop en
+    despertarla: ese retraso es el tiempo que alguna llamada síncrona tuvo el
+    loop ocupado. Se exporta en event_loop_lag_seconds y, si supera threshold,
+    se cuenta en event_loop_blocked_total y se registra una advertencia.
+
+    En modo debug un hilo vigila la tarea y, mientras el loop sigue bloqueado,
+    captura el stack del hilo del loop, que se adjunta a la advertencia y a
+    blocking_events. Además activa el modo debug de asyncio con el mismo
+    umbral para slow_callback_duration. Sin debug no hay hilo adicional.
+    """
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        threshold: Optional[float] = None,
+        debug: Optional[bool] = None,
+        service_metrics: Optional[ServiceMetrics] = None,
+        max_events: int = 50,
+    ):
+        self.logger = Logger()
+        self.interval = (
+            interval if interval is not None else float(os.getenv("LOOP_MONITOR_INTERVAL", "0.5"))
+        )
+        self.threshold = (
+            threshold
+            if threshold is not None
+            else float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100")) / 1000
+        )
+        self.debug = debug if debug is not None else _truthy(os.getenv("LOOP_MONITOR_DEBUG"))
+        self.metrics = service_metrics or metrics
+        self.max_lag = 0.0
+        self.blocking_events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_watchdog = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._previous_debug: Optional[tuple] = None
+        # Momento (perf_counter) en que la tarea debería despertar; None mientras mide
+        self._deadline: Optional[float] = None
+        self._stacks: Dict[float, str] = {}
+
+    @property
+    def running(self) -> bool:
+        """Indica si el monitor está midiendo"""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Inicia el monitor en el event loop actual"""
+        if self.running:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.max_lag = 0.0
+        self._task = asyncio.create_task(self._run())
+
+        if self.debug:
+            self._previous_debug = (loop.get_debug(), loop.slow_callback_duration)
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+            self._stop_watchdog.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+        self.logger.info(
+            f"Monitor del event loop iniciado (intervalo={self.interval}s, "
+            f"umbral={self.threshold * 1000:.0f}ms, debug={self.debug})"
+        )
+
+    async def stop(self) -> None:
+        """Detiene el monitor"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._deadline = None
+        self._stacks.clear()
+
+        if self._watchdog is not None:
+            self._stop_watchdog.set()
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        if self._previous_debug is not None:
+            loop = asyncio.get_running_loop()
+            loop.set_debug(self._previous_debug[0])
+            loop.slow_callback_duration = self._previous_debug[1]
+            self._previous_debug = None
+
+    async def _run(self) -> None:
+        while True:
+            deadline = time.perf_counter() + self.interval
+            self._deadline = deadline
+            await asyncio.sleep(self.interval)
+            self._deadline = None
+            self._record(max(time.perf_counter() - deadline, 0.0), deadline)
+
+    def _record(self, lag: float, deadline: float) -> None:
+        """Registra el retraso de una vuelta del monitor"""
+        self.metrics.loop_lag.observe(lag)
+        self.max_lag = max(self.max_lag, lag)
+        stack = self._stacks.pop(deadline, None)
+        if lag < self.threshold:
+            return
+
+        self.metrics.loop_blocked.inc()
+        event = {
+            "lag_ms": round(lag * 1000, 2),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "stack": stack,
+        }
+        self.blocking_events.append(event)
+        self.logger.warning(
+            f"Event loop bloqueado {event['lag_ms']} ms",
+            {"lag_ms": event["lag_ms"], "stack": stack} if stack else {"lag_ms": event["lag_ms"]},
+            key="Event loop bloqueado",
+        )
+
+    def _watch(self) -> None:
+        """Captura el stack del hilo del loop mientras está bloqueado (modo debug)"""
+        poll = max(self.threshold / 4, 0.001)
+        while not self._stop_watchdog.wait(poll):
+            deadline = self._deadline
+            if deadline is None or deadline in self._stacks:
+                continue
+            if time.perf_counter() - deadline < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            # Si el loop ya despertó la tarea, el stack sería de otro código
+            if frame is None or self._deadline != deadline:
+                continue
+            self._stacks[deadline] = "".join(traceback.format_stack(frame))
+
+
+# Instancia global iniciada con la aplicación
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,222 @@
+import os
+from timeit import default_timer
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.context_managers import InprogressTracker
+
+from app.services.server_timing import SERVER_TIMING_NAMES, record_server_timing
+
+METRICS_NAMESPACE = "analysis_service"
+
+# Buckets en segundos: desde operaciones en memoria (cifrado, respuesta) hasta
+# llamadas a Gemini de varios segundos
+STAGE_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Buckets en segundos del retraso del event loop: lo normal es menos de 1 ms
+LOOP_LAG_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class StageTimer:
+    """
+    Context manager que mide una etapa
+
+    Registra la duración en el histograma y, si la etapa tiene nombre en
+    Server-Timing, en el desglose de la petición en curso.
+    """
+
+    __slots__ = ("_histogram", "_timing_name", "_started")
+
+    def __init__(self, histogram: Histogram, timing_name: Optional[str]):
+        self._histogram = histogram
+        self._timing_name = timing_name
+        self._started = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self._started = default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        elapsed = max(default_timer() - self._started, 0.0)
+        self._histogram.observe(elapsed)
+        if self._timing_name is not None:
+            record_server_timing(self._timing_name, elapsed)
+
+
+class ServiceMetrics:
+    """
+    Métricas Prometheus del servicio
+
+    - stage_duration_seconds{component, stage}: duración de cada etapa de
+      AnalysisUseCase.execute (component="analysis") y de AuthMiddleware
+      (component="auth")
+    - cache_requests_total{cache, result}: aciertos y fallos de cachés
+    - fallbacks_total{reason}: respuestas de respaldo en lugar del resultado normal
+    - llm_parse_failures_total: respuestas de Gemini que no se pudieron parsear
+    - in_flight{operation}: operaciones en curso
+    - llm_tokens_total{type}: tokens de entrada y salida consumidos en Gemini
+    - event_loop_lag_seconds: retraso con que el event loop atiende un timer
+    - event_loop_blocked_total: veces que el retraso superó el umbral de bloqueo
+
+    Los hijos con etiquetas se crean una sola vez y se reutilizan, por lo que
+    medir una etapa cuesta un par de microsegundos.
+
+    Con varios workers de gunicorn, PROMETHEUS_MULTIPROC_DIR hace que cada
+    proceso escriba sus valores en ese directorio y que /metrics sume los de
+    todos los workers.
+    """
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None):
+        self.registry = registry or CollectorRegistry()
+
+        self.stage_duration = Histogram(
+            "stage_duration_seconds",
+            "Duración de cada etapa del procesamiento de una petición",
+            ["component", "stage"],
+            namespace=METRICS_NAMESPACE,
+            buckets=STAGE_BUCKETS,
+            registry=self.registry,
+        )
+        self.cache_requests = Counter(
+            "cache_requests",
+            "Consultas a cachés por resultado (hit o miss)",
+            ["cache", "result"],
+            namespace=METRICS_NAMESPACE,
+            registry=self.registry,
+        )
+        self.fallbacks = Counter(
+            "fallbacks",
+            "Respuestas de respaldo usadas en lugar del resultado normal",
+            ["reason"],
+            namespace=METRICS_NAMESPACE,
+            registry=self.registry,
+        )
+        self.llm_parse_failures = Counter(
+            "llm_parse_failures",
+            "Respuestas de Gemini que no contenían un JSON válido",
+            namespace=METRICS_NAMESPACE,
+            registry=self.registry,
+        )
+        self.in_flight = Gauge(
+            "in_flight",
+            "Operaciones en curso",
+            ["operation"],
+            namespace=METRICS_NAMESPACE,
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.llm_tokens = Counter(
+            "llm_tokens",
+            "Tokens consumidos en Gemini por tipo (prompt o completion)",
+            ["type"],
+            namespace=METRICS_NAMESPACE,
+            registry=self.registry,
+        )
+
+        self.loop_lag = Histogram(
+            "event_loop_lag_seconds",
+            "Retraso con que el event loop atiende un timer (tiempo bloqueado)",
+            namespace=METRICS_NAMESPACE,
+            buckets=LOOP_LAG_BUCKETS,
+            registry=self.registry,
+        )
+        self.loop_blocked = Counter(
+            "event_loop_blocked",
+            "Veces que el event loop estuvo bloqueado más que el umbral",
+            namespace=METRICS_NAMESPACE,
+            registry=self.registry,
+        )
+
+        self._stages: Dict[Tuple[str, str], Tuple[Histogram, Optional[str]]] = {}
+        self._in_flight: Dict[str, Gauge] = {}
+
+    def stage(self, component: str, stage: str) -> StageTimer:
+        """
+        Mide la duración de una etapa (usar como context manager)
+
+        Args:
+            component: Componente que ejecuta la etapa (analysis, auth)
+            stage: Nombre de la etapa
+
+        Returns:
+            StageTimer: Context manager que registra la duración al salir
+        """
+        entry = self._stages.get((component, stage))
+        if entry is None:
+            entry = (
+                self.stage_duration.labels(component, stage),
+                SERVER_TIMING_NAMES.get((component, stage)),
+            )
+            self._stages[(component, stage)] = entry
+        return StageTimer(*entry)
+
+    def track_in_flight(self, operation: str) -> InprogressTracker:
+        """
+        Cuenta una operación como en curso mientras dura (context manager)
+
+        Args:
+            operation: Nombre de la operación
+
+        Returns:
+            InprogressTracker: Context manager que incrementa y decrementa el gauge
+        """
+        child = self._in_flight.get(operation)
+        if child is None:
+            child = self.in_flight.labels(operation)
+            self._in_flight[operation] = child
+        return child.track_inprogress()
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Registra un acierto o un fallo de caché"""
+        self.cache_requests.labels(cache, "hit" if hit else "miss").inc()
+
+    def record_fallback(self, reason: str) -> None:
+        """Registra el uso de una respuesta de respaldo"""
+        self.fallbacks.labels(reason).inc()
+
+    def record_llm_usage(self, response) -> None:
+        """
+        Registra los tokens consumidos según usage_metadata de la respuesta de Gemini
+
+        Args:
+            response: Respuesta de generate_content (se ignora si no trae uso)
+        """
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        completion_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        if isinstance(prompt_tokens, int) and prompt_tokens > 0:
+            self.llm_tokens.labels("prompt").inc(prompt_tokens)
+        if isinstance(completion_tokens, int) and completion_tokens > 0:
+            self.llm_tokens.labels("completion").inc(completion_tokens)
+
+    def render(self) -> Tuple[bytes, str]:
+        """
+        Serializa las métricas en el formato de texto de Prometheus
+
+        Returns:
+            Tuple[bytes, str]: Cuerpo y content type de la respuesta
+        """
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry), CONTENT_TYPE_LATEST
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+# Instancia global expuesta en /metrics
+metrics = ServiceMetrics()
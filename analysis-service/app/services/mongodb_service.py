@@ -1,8 +1,33 @@
 import os
+from typing import Any, Dict
+
 from mongoengine import connect, disconnect
 from app.services.logger import Logger
 
 
+def pool_options() -> Dict[str, Any]:
+    """
+    Opciones del pool de conexiones y del protocolo, desde variables de entorno
+
+    - MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE: conexiones por proceso
+    - MONGO_WAIT_QUEUE_TIMEOUT_MS: espera máxima por una conexión libre del pool
+    - MONGO_SERVER_SELECTION_TIMEOUT_MS: espera máxima por un servidor disponible
+    - MONGO_COMPRESSORS: compresión del protocolo (zstd requiere zstandard)
+    """
+    options: Dict[str, Any] = {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "10")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(
+            os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")
+        ),
+    }
+    compressors = os.getenv("MONGO_COMPRESSORS", "zlib").strip()
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
 class MongoDBService:
     """
     Servicio para manejar la conexión a MongoDB
@@ -46,9 +71,12 @@ class MongoDBService:
                 f"URI de conexión: {mongo_uri.replace(mongo_password, '***') if mongo_password else mongo_uri}"
             )
 
+            options = pool_options()
+            self.logger.info(f"Opciones de conexión: {options}")
+
             # Establecer conexión
             self.connection = connect(
-                db=mongo_database, host=mongo_uri, alias="default"
+                db=mongo_database, host=mongo_uri, alias="default", **options
             )
 
             self.logger.success("Conexión a MongoDB establecida exitosamente")
@@ -0,0 +1,157 @@
+import json
+import os
+import zlib
+from typing import Any, Dict, Optional
+
+from bson import Binary
+
+from app.services.logger import Logger
+
+try:  # zstandard es opcional: solo se usa si se configura ANALYSIS_PAYLOAD_CODEC=zstd
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+# Marca que identifica un valor comprimido dentro de un documento
+CODEC_MARKER = "__codec__"
+
+CODEC_NONE = "none"
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+_FORMAT_TEXT = "text"
+_FORMAT_JSON = "json"
+
+_DEFAULT_LEVELS = {CODEC_ZLIB: 6, CODEC_ZSTD: 3}
+
+
+class PayloadCodec:
+    """
+    Compresión transparente de payloads grandes antes de guardarlos en MongoDB
+
+    Los valores que superan el umbral se guardan como un sobre
+    {"__codec__": "zlib", "format": "text" | "json", "data": Binary, "size": n};
+    el resto se guarda tal cual. decode acepta ambos, por lo que los registros
+    anteriores a la compresión se siguen leyendo sin migración.
+    """
+
+    def __init__(
+        self,
+        codec: Optional[str] = None,
+        level: Optional[int] = None,
+        threshold: Optional[int] = None,
+    ):
+        self.logger = Logger()
+        self.codec = (codec or os.getenv("ANALYSIS_PAYLOAD_CODEC", CODEC_ZLIB)).lower()
+        if self.codec == CODEC_ZSTD and zstandard is None:
+            self.logger.warning("zstandard no está instalado, se usará zlib para comprimir")
+            self.codec = CODEC_ZLIB
+        if self.codec not in (CODEC_NONE, CODEC_ZLIB, CODEC_ZSTD):
+            raise ValueError(f"Codec de compresión no soportado: {self.codec}")
+
+        env_level = os.getenv("ANALYSIS_PAYLOAD_COMPRESSION_LEVEL")
+        self.level = (
+            level
+            if level is not None
+            else int(env_level) if env_level else _DEFAULT_LEVELS.get(self.codec, 0)
+        )
+        self.threshold = (
+            threshold
+            if threshold is not None
+            else int(os.getenv("ANALYSIS_PAYLOAD_COMPRESSION_THRESHOLD", "1024"))
+        )
+
+    @staticmethod
+    def is_encoded(value: Any) -> bool:
+        """Indica si un valor es un sobre comprimido"""
+        return isinstance(value, dict) and CODEC_MARKER in value
+
+    def encode(self, value: Any) -> Any:
+        """
+        Comprime un valor si su tamaño serializado supera el umbral
+
+        Args:
+            value: Texto o estructura serializable a JSON
+
+        Returns:
+            Any: Sobre comprimido o el valor original
+        """
+        if self.codec == CODEC_NONE or value is None or self.is_encoded(value):
+            return value
+
+        if isinstance(value, str):
+            raw, value_format = value.encode("utf-8"), _FORMAT_TEXT
+        else:
+            raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            value_format = _FORMAT_JSON
+
+        if len(raw) < self.threshold:
+            return value
+
+        return {
+            CODEC_MARKER: self.codec,
+            "format": value_format,
+            "data": Binary(self._compress(raw)),
+            "size": len(raw),
+        }
+
+    def decode(self, value: Any) -> Any:
+        """
+        Descomprime un sobre; cualquier otro valor se retorna sin cambios
+
+        Raises:
+            RuntimeError: Si el sobre usa un codec no disponible
+        """
+        if not self.is_encoded(value):
+            return value
+
+        raw = self._decompress(value[CODEC_MARKER], bytes(value["data"]))
+        if value.get("format") == _FORMAT_TEXT:
+            return raw.decode("utf-8")
+        return json.loads(raw)
+
+    def encode_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Comprime la parte voluminosa de una respuesta de análisis con IA
+
+        Solo se comprime analysis_data.problems: security_level y safe quedan
+        en claro porque los usan los filtros y las proyecciones del historial.
+        """
+        analysis_data = response.get("analysis_data") if isinstance(response, dict) else None
+        if not isinstance(analysis_data, dict) or "problems" not in analysis_data:
+            return response
+
+        problems = self.encode(analysis_data["problems"])
+        if problems is analysis_data["problems"]:
+            return response
+
+        return {**response, "analysis_data": {**analysis_data, "problems": problems}}
+
+    def decode_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Revierte encode_response; se llama solo cuando se lee el payload completo"""
+        analysis_data = response.get("analysis_data") if isinstance(response, dict) else None
+        if not isinstance(analysis_data, dict) or not self.is_encoded(
+            analysis_data.get("problems")
+        ):
+            return response
+
+        problems = self.decode(analysis_data["problems"])
+        return {**response, "analysis_data": {**analysis_data, "problems": problems}}
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).compress(raw)
+        return zlib.compress(raw, self.level)
+
+    def _decompress(self, codec: str, data: bytes) -> bytes:
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(data)
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Payload comprimido con zstd pero zstandard no está instalado")
+            return zstandard.ZstdDecompressor().decompress(data)
+        raise RuntimeError(f"Codec de compresión desconocido: {codec}")
+
+
+# Instancia global configurada desde las variables de entorno
+payload_codec = PayloadCodec()
@@ -0,0 +1,373 @@
+import asyncio
+import html
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+PROFILE_FORMATS = {
+    "collapsed": "text/plain; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+}
+
+# Solo un perfil a la vez: cada uno agrega un hilo que muestrea todo el proceso
+_profiler_slot = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Ya hay un perfil en curso en el proceso"""
+
+
+def parse_profile_format(value: Optional[str]) -> str:
+    """
+    Valida el formato del perfil
+
+    Args:
+        value: collapsed (stacks colapsados para flamegraph) o html (None = collapsed)
+
+    Returns:
+        str: Formato normalizado
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    profile_format = (value or "collapsed").strip().lower()
+    if profile_format not in PROFILE_FORMATS:
+        raise ValueError(
+            f"Formato de perfil inválido: {value}. Valores permitidos: {', '.join(PROFILE_FORMATS)}"
+        )
+    return profile_format
+
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo de los stacks de todos los hilos del proceso
+
+    Un hilo propio toma sys._current_frames() cada interval segundos y cuenta
+    cada stack, sin instrumentar el código: fuera de start/stop no hay ningún
+    costo. Si se indica un frame ancla, solo se cuentan los stacks de los que
+    forma parte y se recortan a partir de él (así se perfila una sola
+    petición aunque el event loop atienda otras), además de los hilos del
+    pool que ejecutan trabajo de esa petición (track_thread).
+
+    Como todo profiler escrito en Python, muestrea cuando su hilo obtiene el
+    GIL: el código Python que no lo libera se interrumpe cada
+    sys.getswitchinterval() (5 ms por defecto), que es la resolución efectiva.
+    """
+
+    def __init__(self, interval: float = 0.005, anchor=None):
+        self.interval = interval
+        self.anchor = anchor
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._labels: Dict[object, str] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._tracked_threads: Set[int] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Inicia el muestreo en segundo plano"""
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el muestreo (puede llamarse más de una vez)"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+
+    def track_thread(self, func: Callable, *args, **kwargs) -> Any:
+        """Ejecuta func contando los stacks del hilo actual aunque no pasen por el ancla"""
+        ident = threading.get_ident()
+        self._tracked_threads.add(ident)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._tracked_threads.discard(ident)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(exclude=own)
+
+    def sample(self, exclude: Optional[int] = None) -> None:
+        """Toma una muestra de los stacks de todos los hilos"""
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            stack = self._stack(frame, tracked=ident in self._tracked_threads)
+            if stack:
+                self.stacks[";".join([self._thread_name(ident)] + stack)] += 1
+        self.sample_count += 1
+
+    def _stack(self, frame, tracked: bool = False) -> List[str]:
+        """Frames del stack desde la raíz (o el ancla) hasta el actual"""
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            if frame is self.anchor:
+                break
+            frame = frame.f_back
+        else:
+            if self.anchor is not None and not tracked:
+                return []
+        stack.reverse()
+        return stack
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            cwd = os.getcwd() + os.sep
+            if filename.startswith(cwd):
+                filename = filename[len(cwd):]
+            else:
+                filename = os.sep.join(filename.split(os.sep)[-2:])
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _thread_name(self, ident: int) -> str:
+        name = self._thread_names.get(ident)
+        if name is None:
+            self._thread_names = {
+                thread.ident: thread.name for thread in threading.enumerate()
+            }
+            name = self._thread_names.get(ident, f"thread-{ident}")
+        return name.replace(";", "_").replace(" ", "_")
+
+    def collapsed(self) -> str:
+        """Stacks colapsados (frame;frame;... cantidad), compatibles con flamegraph.pl y speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def function_totals(self) -> Tuple[Counter, Counter]:
+        """Muestras por función: propias (en la cima del stack) y acumuladas"""
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            own[frames[-1]] += count
+            for frame in set(frames):
+                cumulative[frame] += count
+        return own, cumulative
+
+    def html_report(self, limit: int = 50) -> str:
+        """Reporte HTML autocontenido con las funciones más costosas"""
+        own, cumulative = self.function_totals()
+        total = sum(self.stacks.values()) or 1
+
+        def rows(counter: Counter) -> str:
+            return "".join(
+                f"<tr><td>{count}</td><td>{count / total:.1%}</td><td>{html.escape(name)}</td></tr>"
+                for name, count in counter.most_common(limit)
+            )
+
+        header = "<tr><th>Muestras</th><th>%</th><th>Función</th></tr>"
+        return (
+            "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+            "<title>Perfil de analysis-service</title>"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+            "td,th{padding:2px 8px;text-align:left;border-bottom:1px solid #ddd}"
+            "pre{font-size:12px}</style></head><body>"
+            f"<h1>Perfil de analysis-service</h1>"
+            f"<p>{self.duration:.2f} s, {self.sample_count} muestras cada "
+            f"{self.interval * 1000:.1f} ms, {total} stacks</p>"
+            f"<h2>Tiempo propio</h2><table>{header}{rows(own)}</table>"
+            f"<h2>Tiempo acumulado</h2><table>{header}{rows(cumulative)}</table>"
+            f"<h2>Stacks colapsados</h2><pre>{html.escape(self.collapsed())}</pre>"
+            "</body></html>"
+        )
+
+    def render(self, profile_format: str) -> Tuple[str, str]:
+        """
+        Serializa el perfil
+
+        Args:
+            profile_format: collapsed o html
+
+        Returns:
+            Tuple[str, str]: Contenido y media type
+        """
+        content = self.html_report() if profile_format == "html" else self.collapsed()
+        return content, PROFILE_FORMATS[profile_format]
+
+
+def profiler_interval(env_name: str, default_ms: str) -> float:
+    """Intervalo de muestreo en segundos configurado en milisegundos"""
+    return max(float(os.getenv(env_name, default_ms)), 0.1) / 1000
+
+
+async def profile_process(seconds: float, interval: Optional[float] = None) -> SamplingProfiler:
+    """
+    Muestrea el proceso completo durante seconds segundos
+
+    El event loop queda libre mientras tanto, por lo que se perfila el
+    tráfico real que atiende el worker.
+
+    Args:
+        seconds: Duración del perfil
+        interval: Segundos entre muestras (por defecto PROFILER_INTERVAL_MS)
+
+    Returns:
+        SamplingProfiler: Perfil terminado
+
+    Raises:
+        ProfilerBusyError: Si ya hay un perfil en curso
+    """
+    if not _profiler_slot.acquire(blocking=False):
+        raise ProfilerBusyError("Ya hay un perfil en curso en este proceso")
+    try:
+        profiler = SamplingProfiler(
+            interval if interval is not None else profiler_interval("PROFILER_INTERVAL_MS", "5")
+        )
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(profiler.stop)
+        return profiler
+    finally:
+        _profiler_slot.release()
+
+
+class _RequestProfile:
+    """Perfil pedido con ?profile=1; el profiler se crea al autenticar a un administrador"""
+
+    def __init__(self, anchor):
+        self.anchor = anchor
+        self.profiler: Optional[SamplingProfiler] = None
+
+
+# Perfil pedido por la petición en curso (asyncio.to_thread copia el contexto al hilo)
+_request_profile: ContextVar[Optional[_RequestProfile]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def start_request_profile(user: Any, is_admin: Callable[[Any], bool]) -> bool:
+    """
+    Inicia el perfil de la petición en curso si lo pidió un administrador
+
+    La llama AuthMiddleware con el resultado de la validación del token, por
+    lo que el perfil no consulta al auth-service otra vez. El slot solo se
+    toma para administradores.
+
+    Args:
+        user: Usuario autenticado
+        is_admin: Comprueba si el usuario está en ADMIN_USERS (solo se llama
+            si la petición pidió el perfil)
+
+    Returns:
+        bool: True si se inició el perfil
+    """
+    profile = _request_profile.get()
+    if profile is None or profile.profiler is not None or not is_admin(user):
+        return False
+    if not _profiler_slot.acquire(blocking=False):
+        return False
+    profile.profiler = SamplingProfiler(
+        profiler_interval("PROFILER_REQUEST_INTERVAL_MS", "1"), anchor=profile.anchor
+    )
+    profile.profiler.start()
+    return True
+
+
+async def to_thread(func: Callable, *args, **kwargs) -> Any:
+    """
+    asyncio.to_thread que, si la petición se está perfilando, cuenta también
+    los stacks del hilo del pool mientras ejecuta func
+    """
+    profile = _request_profile.get()
+    if profile is None or profile.profiler is None:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return await asyncio.to_thread(profile.profiler.track_thread, func, *args, **kwargs)
+
+
+class RequestProfilerMiddleware:
+    """
+    Middleware ASGI que perfila una petición con ?profile=1
+
+    El middleware solo marca la petición: el perfil empieza cuando
+    AuthMiddleware valida el token y el usuario está en ADMIN_USERS
+    (start_request_profile), de modo que para cualquier otro usuario la
+    petición se atiende sin perfilar, sin ocupar el slot ni muestrear. Al
+    administrador se le responde el perfil en lugar de la respuesta normal.
+    Se muestrean los stacks que pasan por esta petición y los de los hilos
+    donde corre su trabajo (to_thread). Si ya hay un perfil en curso la
+    petición se atiende sin perfilar. Las peticiones sin el parámetro no
+    tienen costo adicional.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        profile_format = self._requested(scope) if scope["type"] == "http" else None
+        if profile_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = _RequestProfile(anchor=sys._getframe())
+        token = _request_profile.set(profile)
+        state = {"status": None}
+
+        async def hold(message):
+            if profile.profiler is None:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                # La respuesta normal se reemplaza por el perfil
+                state["status"] = message["status"]
+
+        try:
+            await self.app(scope, receive, hold)
+        finally:
+            _request_profile.reset(token)
+            if profile.profiler is not None:
+                try:
+                    await asyncio.to_thread(profile.profiler.stop)
+                finally:
+                    _profiler_slot.release()
+
+        if profile.profiler is None:
+            return
+
+        content, media_type = profile.profiler.render(profile_format)
+        body = content.encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", media_type.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profiled-status", str(state["status"]).encode()),
+                    (b"x-worker-pid", str(os.getpid()).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _requested(scope) -> Optional[str]:
+        """Formato pedido con ?profile=1 (None si no se pidió o no es válido)"""
+        query = scope.get("query_string") or b""
+        if b"profile=" not in query:
+            return None
+        params = parse_qs(query.decode("latin-1"))
+        if params.get("profile", [""])[-1].lower() not in ("1", "true"):
+            return None
+        try:
+            return parse_profile_format(params.get("profile_format", [None])[-1])
+        except ValueError:
+            return None
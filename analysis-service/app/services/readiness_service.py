@@ -0,0 +1,132 @@
+import asyncio
+import os
+import time
+from datetime import datetime, UTC
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from mongoengine.connection import get_connection
+
+from app.services.logger import Logger
+
+
+class ReadinessService:
+    """
+    Verifica que las dependencias del servicio respondan (readiness)
+
+    Consulta MongoDB, auth-service y config-service en paralelo, mide la
+    latencia de cada uno y guarda el resultado durante unos segundos para que
+    los sondeos frecuentes del orquestador no multipliquen la carga. Las
+    peticiones que llegan mientras hay una verificación en curso esperan a esa
+    misma verificación.
+    """
+
+    def __init__(
+        self,
+        auth_service_url: Optional[str] = None,
+        config_service_url: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        cache_seconds: Optional[float] = None,
+    ):
+        self.logger = Logger()
+        self.auth_service_url = auth_service_url or os.getenv(
+            "AUTH_SERVICE_URL", "http://localhost:8001"
+        )
+        self.config_service_url = config_service_url or os.getenv(
+            "CONFIG_SERVICE_URL", "http://localhost:8000"
+        )
+        self.timeout_seconds = (
+            timeout_seconds
+            if timeout_seconds is not None
+            else float(os.getenv("HEALTH_READY_TIMEOUT_SECONDS", "2"))
+        )
+        self.cache_seconds = (
+            cache_seconds
+            if cache_seconds is not None
+            else float(os.getenv("HEALTH_READY_CACHE_SECONDS", "2"))
+        )
+        self._result: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de las dependencias (desde caché si sigue vigente)
+
+        Returns:
+            Dict[str, Any]: status ("ready" o "not_ready"), checked_at, cached y
+            el estado y latencia de cada dependencia
+        """
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return dict(self._result, cached=True)
+
+        async with self._lock:
+            # Otra petición pudo completar la verificación mientras esperábamos
+            if self._result is not None and time.monotonic() < self._expires_at:
+                return dict(self._result, cached=True)
+
+            result = await self._run_checks()
+            self._result = result
+            self._expires_at = time.monotonic() + self.cache_seconds
+            return dict(result, cached=False)
+
+    def invalidate(self) -> None:
+        """Descarta el resultado guardado"""
+        self._result = None
+        self._expires_at = 0.0
+
+    async def _run_checks(self) -> Dict[str, Any]:
+        """Ejecuta todas las verificaciones en paralelo"""
+        names = ["mongodb", "auth_service", "config_service"]
+        results = await asyncio.gather(
+            self._measure(self._check_mongodb),
+            self._measure(lambda: self._check_http(self.auth_service_url)),
+            self._measure(lambda: self._check_http(self.config_service_url)),
+        )
+        dependencies = dict(zip(names, results))
+        ready = all(dependency["status"] == "up" for dependency in dependencies.values())
+
+        if not ready:
+            down = [name for name, dependency in dependencies.items() if dependency["status"] != "up"]
+            self.logger.error(f"Servicio no disponible, dependencias caídas: {down}")
+
+        return {
+            "status": "ready" if ready else "not_ready",
+            "service": "analysis-service",
+            "checked_at": datetime.now(UTC).isoformat(),
+            "dependencies": dependencies,
+        }
+
+    async def _measure(self, probe: Callable[[], Awaitable[None]]) -> Dict[str, Any]:
+        """Ejecuta una verificación con tiempo límite y mide su latencia"""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout_seconds)
+            status, error = "up", None
+        except asyncio.TimeoutError:
+            status, error = "down", f"Tiempo de espera agotado ({self.timeout_seconds}s)"
+        except Exception as e:
+            status, error = "down", str(e) or type(e).__name__
+
+        dependency: Dict[str, Any] = {
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        if error:
+            dependency["error"] = error
+        return dependency
+
+    @staticmethod
+    async def _check_mongodb() -> None:
+        """Envía un ping a MongoDB desde un hilo para no bloquear el event loop"""
+        await asyncio.to_thread(get_connection().admin.command, "ping")
+
+    async def _check_http(self, base_url: str) -> None:
+        """Consulta el endpoint /health de un servicio"""
+        async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
+            response = await client.get(f"{base_url}/health")
+            response.raise_for_status()
+
+
+# Instancia global usada por /health/ready
+readiness_service = ReadinessService()
@@ -0,0 +1,85 @@
+import re
+import uuid
+from contextvars import ContextVar, Token
+from typing import Any, Dict
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Solo se acepta el request id del cliente si es seguro escribirlo en los logs
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# Contexto de la petición en curso. Cada petición corre en su propia tarea de
+# asyncio, que tiene su propia copia de las variables de contexto, por lo que
+# los valores nunca se mezclan entre peticiones concurrentes. El diccionario no
+# se modifica: bind_request_context siempre crea uno nuevo.
+_request_context: ContextVar[Dict[str, Any]] = ContextVar("request_context", default={})
+
+
+def get_request_context() -> Dict[str, Any]:
+    """Obtiene el contexto de la petición en curso (no debe modificarse)"""
+    return _request_context.get()
+
+
+def bind_request_context(**fields: Any) -> Token:
+    """
+    Agrega campos al contexto de la petición en curso
+
+    Args:
+        **fields: Campos a agregar (los valores None se ignoran)
+
+    Returns:
+        Token: Token para restaurar el contexto anterior con reset_request_context
+    """
+    context = dict(_request_context.get())
+    context.update({key: value for key, value in fields.items() if value is not None})
+    return _request_context.set(context)
+
+
+def reset_request_context(token: Token) -> None:
+    """Restaura el contexto anterior a bind_request_context"""
+    _request_context.reset(token)
+
+
+def resolve_request_id(value: Any) -> str:
+    """Usa el request id recibido si es válido o genera uno nuevo"""
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    if isinstance(value, str) and _VALID_REQUEST_ID.match(value):
+        return value
+    return uuid.uuid4().hex
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI que vincula request_id, método y ruta a cada petición
+
+    El request id se toma del header X-Request-ID (o se genera) y se devuelve
+    en la respuesta. Los logs emitidos durante la petición lo incluyen sin que
+    cada capa tenga que pasarlo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = resolve_request_id(headers.get(REQUEST_ID_HEADER.encode()))
+        token = bind_request_context(
+            request_id=request_id, method=scope.get("method"), path=scope.get("path")
+        )
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            reset_request_context(token)
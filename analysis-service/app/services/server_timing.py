@@ -0,0 +1,101 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+SERVER_TIMING_HEADER = "server-timing"
+# Header con el que un cliente pide el desglose aunque no esté activo para todos
+SERVER_TIMING_REQUEST_HEADER = "x-server-timing"
+
+# Nombre en Server-Timing de cada etapa medida con metrics.stage(component, stage).
+# persist es el encolado en el buffer write-behind (la escritura en MongoDB ocurre
+# después de responder) o el guardado directo si el buffer no está activo;
+# build_response es la construcción del modelo, no la serialización JSON de FastAPI.
+SERVER_TIMING_NAMES: Dict[Tuple[str, str], str] = {
+    ("auth", "validate_token"): "auth",
+    ("analysis", "config_fetch"): "fetch",
+    ("analysis", "decrypt"): "decrypt",
+    ("analysis", "llm"): "llm",
+    ("analysis", "db_save"): "persist",
+    ("analysis", "response"): "build_response",
+}
+
+# Duraciones de la petición en curso. Solo existe (no es None) mientras
+# ServerTimingMiddleware atiende una petición que pidió el desglose; fuera de
+# ella registrar una duración no hace nada.
+_server_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "server_timings", default=None
+)
+
+
+def record_server_timing(name: str, seconds: float) -> None:
+    """
+    Suma una duración al desglose de la petición en curso
+
+    Args:
+        name: Nombre de la métrica en Server-Timing
+        seconds: Duración en segundos
+    """
+    timings = _server_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """Valor del header Server-Timing con las duraciones en milisegundos"""
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
+
+
+def _truthy(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que agrega el header Server-Timing con el desglose por etapa
+
+    Es opcional: se activa para todas las respuestas con
+    SERVER_TIMING_ENABLED=true o por petición con el header X-Server-Timing: 1.
+    Las etapas (auth, fetch, decrypt, llm, persist, build_response) las
+    registran los mismos timers de las métricas Prometheus; se agrega total
+    con el tiempo hasta el inicio de la respuesta.
+    """
+
+    def __init__(self, app, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = (
+            enabled if enabled is not None else _truthy(os.getenv("SERVER_TIMING_ENABLED"))
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _server_timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_server_timing(message):
+            if message["type"] == "http.response.start":
+                value = format_server_timing(
+                    dict(timings, total=time.perf_counter() - started)
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (SERVER_TIMING_HEADER.encode(), value.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            _server_timings.reset(token)
+
+    def _requested(self, scope) -> bool:
+        """Indica si la petición lleva el desglose"""
+        if self.enabled:
+            return True
+        for name, value in scope.get("headers") or []:
+            if name == SERVER_TIMING_REQUEST_HEADER.encode():
+                return _truthy(value.decode("latin-1"))
+        return False
@@ -0,0 +1,418 @@
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.services.request_context import (
+    bind_request_context,
+    get_request_context,
+    reset_request_context,
+)
+
+TRACEPARENT_HEADER = "traceparent"
+
+# version-trace_id-parent_id-flags (W3C Trace Context)
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# Marca de fin para el hilo que escribe el archivo
+_STOP = object()
+
+
+def parse_traceparent(value: Any) -> Optional[Tuple[str, str, bool]]:
+    """
+    Interpreta un header traceparent
+
+    Args:
+        value: Valor del header (str o bytes)
+
+    Returns:
+        Optional[Tuple[str, str, bool]]: trace_id, span_id del padre y si está
+        muestreado, o None si el header no es válido
+    """
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    if not isinstance(value, str):
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+class Span:
+    """Operación medida dentro de una traza"""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "sampled",
+        "attributes",
+        "status",
+        "start_time",
+        "duration",
+        "_started",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        sampled: bool,
+        attributes: Dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Agrega un atributo al span"""
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        """Registra la duración del span"""
+        self.duration = time.perf_counter() - self._started
+
+    @property
+    def traceparent(self) -> str:
+        """Header traceparent para propagar este span a otro servicio"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self, service: str) -> Dict[str, Any]:
+        """Span serializable como JSON"""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": service,
+            "start_time": datetime.fromtimestamp(self.start_time, timezone.utc).isoformat(),
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+# Span en curso de la tarea (o del hilo de asyncio.to_thread, que copia el contexto)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class SpanExporter:
+    """
+    Destino local de los spans terminados
+
+    Guarda los últimos buffer_size spans en memoria (consultables con
+    recent) y, si se indica path, los escribe además como JSON de una línea
+    en ese archivo. La escritura la hace un hilo propio por lotes de hasta
+    batch_size spans o cada flush_interval segundos, por lo que terminar un
+    span solo agrega una referencia; si el hilo se atrasa más de max_pending
+    spans, los siguientes no se escriben y se cuentan en dropped.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        buffer_size: int = 2000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        service: str = "analysis-service",
+    ):
+        self.path = path or None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.service = service
+        self.dropped = 0
+        self._recent: Deque[Span] = deque(maxlen=buffer_size)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Registra un span terminado"""
+        self._recent.append(span)
+        if self.path is None:
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def recent(
+        self,
+        trace_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        Spans guardados en memoria, del más reciente al más antiguo
+
+        Args:
+            trace_id: Solo los spans de esa traza
+            request_id: Solo las trazas de esa petición
+            limit: Máximo de spans
+
+        Returns:
+            List[Dict[str, Any]]: Spans serializados
+        """
+        spans = list(self._recent)
+        if request_id is not None:
+            trace_ids = {
+                span.trace_id
+                for span in spans
+                if span.attributes.get("request_id") == request_id
+            }
+            spans = [span for span in spans if span.trace_id in trace_ids]
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        return [span.to_dict(self.service) for span in reversed(spans[-limit:])]
+
+    def shutdown(self) -> None:
+        """Escribe los spans pendientes y detiene el hilo"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._thread = threading.Thread(
+                    target=self._run, name="span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            stopping = item is _STOP
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Span]) -> None:
+        lines = "".join(
+            json.dumps(span.to_dict(self.service), ensure_ascii=False, default=str) + "\n"
+            for span in batch
+        )
+        try:
+            with open(self.path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(lines)
+        except OSError:
+            self.dropped += len(batch)
+
+
+class SpanScope:
+    """Context manager que activa un span mientras dura el bloque"""
+
+    __slots__ = ("_tracer", "_name", "_attributes", "_parent", "span", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any], parent=None):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+        self._parent = parent
+        self.span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self.span = self._tracer._new_span(self._name, self._attributes, self._parent)
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.span.status = "error"
+            self.span.attributes.setdefault("error", exc_type.__name__)
+        self._tracer._finish(self.span)
+
+
+class Tracer:
+    """
+    Trazas por spans propagadas con W3C traceparent
+
+    La decisión de muestreo se toma al iniciar la traza (sample_ratio) o se
+    hereda del traceparent recibido, y la comparten todos sus spans. Los spans
+    no muestreados se crean igual, para propagar el traceparent a los otros
+    servicios, pero no se exportan.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        sample_ratio: float = 1.0,
+    ):
+        self.exporter = exporter or SpanExporter()
+        self.sample_ratio = sample_ratio
+
+    def span(self, name: str, **attributes: Any) -> SpanScope:
+        """
+        Mide un bloque como span hijo del span en curso (context manager)
+
+        Args:
+            name: Nombre de la operación
+            **attributes: Atributos del span
+
+        Returns:
+            SpanScope: Context manager que retorna el span al entrar
+        """
+        return SpanScope(self, name, attributes)
+
+    def start_trace(
+        self, name: str, traceparent: Any = None, **attributes: Any
+    ) -> SpanScope:
+        """
+        Inicia el span raíz de una petición entrante
+
+        Args:
+            name: Nombre de la operación
+            traceparent: Header traceparent recibido (continúa esa traza si es válido)
+            **attributes: Atributos del span
+
+        Returns:
+            SpanScope: Context manager que retorna el span al entrar
+        """
+        return SpanScope(self, name, attributes, parent=parse_traceparent(traceparent) or ())
+
+    def inject(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """
+        Agrega el traceparent del span en curso a los headers de una llamada saliente
+
+        Args:
+            headers: Headers de la petición (se modifican)
+
+        Returns:
+            Dict[str, str]: Los mismos headers
+        """
+        span = _current_span.get()
+        if span is not None:
+            headers[TRACEPARENT_HEADER] = span.traceparent
+        return headers
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        """Span en curso (None fuera de una traza)"""
+        return _current_span.get()
+
+    def _new_span(self, name: str, attributes: Dict[str, Any], parent) -> Span:
+        if parent is None:
+            current = _current_span.get()
+            if current is not None:
+                return Span(name, current.trace_id, current.span_id, current.sampled, attributes)
+        if parent:
+            trace_id, parent_id, sampled = parent
+            return Span(name, trace_id, parent_id, sampled, attributes)
+        sampled = self.sample_ratio >= 1.0 or random.random() < self.sample_ratio
+        return Span(name, _new_id(128), None, sampled, attributes)
+
+    def _finish(self, span: Span) -> None:
+        span.end()
+        if span.sampled:
+            self.exporter.export(span)
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que inicia la traza de cada petición
+
+    Continúa la traza del header traceparent recibido (o inicia una nueva),
+    mide la petición completa como span raíz y agrega trace_id al contexto
+    de la petición, por lo que los logs la incluyen.
+    """
+
+    def __init__(self, app, tracer: Optional["Tracer"] = None):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        active_tracer = self.tracer or tracer
+        traceparent = None
+        for name, value in scope.get("headers") or []:
+            if name == TRACEPARENT_HEADER.encode():
+                traceparent = value
+                break
+
+        method = scope.get("method")
+        path = scope.get("path")
+        attributes = {"http.method": method, "http.target": path}
+        request_id = get_request_context().get("request_id")
+        if request_id:
+            attributes["request_id"] = request_id
+
+        with active_tracer.start_trace(f"{method} {path}", traceparent, **attributes) as span:
+            token = bind_request_context(trace_id=span.trace_id)
+
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                reset_request_context(token)
+
+
+def build_tracer() -> Tracer:
+    """Crea el tracer según TRACE_SAMPLE_RATIO y TRACE_EXPORT_*"""
+    return Tracer(
+        SpanExporter(
+            path=os.getenv("TRACE_EXPORT_FILE", ""),
+            buffer_size=int(os.getenv("TRACE_BUFFER_SIZE", "2000")),
+            batch_size=int(os.getenv("TRACE_EXPORT_BATCH_SIZE", "200")),
+            flush_interval=float(os.getenv("TRACE_EXPORT_INTERVAL", "1.0")),
+        ),
+        sample_ratio=min(max(float(os.getenv("TRACE_SAMPLE_RATIO", "1.0")), 0.0), 1.0),
+    )
+
+
+# Instancia global usada por el middleware y los servicios
+tracer = build_tracer()
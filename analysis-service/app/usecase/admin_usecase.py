@@ -0,0 +1,45 @@
+from app.model.analysis_model import (
+    CollectionStorageStats,
+    StorageStatsData,
+    StorageStatsResponse,
+)
+from app.model.retention_repository import RetentionRepository
+from app.services.logger import Logger
+from app.services.profiler import to_thread
+
+
+class AdminUseCase:
+    """Caso de uso para las operaciones de administración"""
+
+    def __init__(self):
+        self.logger = Logger()
+        self.repository = RetentionRepository()
+
+    async def get_storage_stats(self) -> StorageStatsResponse:
+        """
+        Obtiene el tamaño de las colecciones e índices y la política de retención
+
+        Returns:
+            StorageStatsResponse: Estadísticas de almacenamiento
+        """
+        self.logger.set_context("AdminUseCase.get_storage_stats")
+
+        try:
+            stats = await to_thread(self.repository.collection_stats)
+            policy = self.repository.policy
+
+            return StorageStatsResponse(
+                success=True,
+                message="Estadísticas de almacenamiento obtenidas exitosamente",
+                data=StorageStatsData(
+                    collections=[CollectionStorageStats(**item) for item in stats],
+                    retention={
+                        "error_days": policy.error_days,
+                        "raw_days": policy.raw_days,
+                        "archive_after_days": policy.archive_after_days,
+                    },
+                ),
+            )
+        except Exception as e:
+            self.logger.error(f"Error al obtener estadísticas de almacenamiento: {str(e)}")
+            raise
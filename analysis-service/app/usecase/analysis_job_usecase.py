@@ -0,0 +1,92 @@
+from app.model.analysis_job_model import AnalysisJob
+from app.model.analysis_job_repository import AnalysisJobRepository
+from app.model.analysis_model import AnalysisJobData, AnalysisJobResponse
+from app.services.analysis_job_worker import analysis_job_worker_pool
+from app.services.logger import Logger
+from app.services.profiler import to_thread
+
+
+class AnalysisJobUseCase:
+    """Caso de uso para los trabajos de análisis asíncronos"""
+
+    def __init__(self):
+        self.logger = Logger()
+        self.repository = AnalysisJobRepository()
+        self.worker_pool = analysis_job_worker_pool
+
+    async def submit(
+        self, filename: str, enable_ia: bool, auth_result: dict
+    ) -> AnalysisJobResponse:
+        """
+        Registra un trabajo de análisis y retorna sin esperar su ejecución
+
+        Args:
+            filename: Nombre del archivo a analizar
+            enable_ia: Indica si se debe utilizar IA para el análisis
+            auth_result: Resultado de la autenticación
+
+        Returns:
+            AnalysisJobResponse: Trabajo creado en estado pendiente
+        """
+        self.logger.set_context("AnalysisJobUseCase.submit", {"filename": filename})
+
+        if not filename or not filename.strip():
+            raise ValueError("El nombre del archivo no puede estar vacío")
+
+        job = await to_thread(
+            self.repository.create_job,
+            filename,
+            enable_ia,
+            auth_result.get("user") or "unknown_user",
+            auth_result.get("token"),
+        )
+
+        # Despertar a los workers locales para no esperar al siguiente sondeo
+        self.worker_pool.notify()
+
+        return AnalysisJobResponse(
+            success=True,
+            message="Trabajo de análisis registrado",
+            data=self._to_job_data(job),
+        )
+
+    async def get_job(self, job_id: str, auth_result: dict) -> AnalysisJobResponse:
+        """
+        Obtiene el estado y, si terminó, el resultado de un trabajo
+
+        Args:
+            job_id: UUID del trabajo
+            auth_result: Resultado de la autenticación
+
+        Returns:
+            AnalysisJobResponse: Estado del trabajo
+
+        Raises:
+            ValueError: Si el trabajo no existe para el usuario autenticado
+        """
+        job = await to_thread(
+            self.repository.get_job, job_id, auth_result.get("user") or "unknown_user"
+        )
+        if job is None:
+            raise ValueError("El trabajo de análisis solicitado no existe")
+
+        return AnalysisJobResponse(
+            success=True,
+            message=f"Trabajo de análisis en estado {job.status}",
+            data=self._to_job_data(job),
+        )
+
+    def _to_job_data(self, job: AnalysisJob) -> AnalysisJobData:
+        """Convierte el documento de MongoDB en el modelo de respuesta"""
+        return AnalysisJobData(
+            job_id=job.uuid,
+            status=job.status,
+            filename=job.filename,
+            enable_ia=job.enable_ia,
+            attempts=job.attempts or 0,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            result=job.result or None,
+            error=job.error,
+        )
@@ -1,18 +1,42 @@
-from datetime import datetime
+from datetime import date, datetime
+from collections import Counter
+import hashlib
 import os
+import zlib
 import httpx
 from httpx import HTTPStatusError
-import google.generativeai as genai
 
 import json
-
-from app.model.analysis_model import AnalysisResponse
-from app.model.analysis_repository import AnalysisRepository
+from typing import Any, AsyncIterator, List, Optional
+
+from app.model.analysis_model import (
+    AnalysisResponse,
+    AnalysisDetail,
+    AnalysisDetailResponse,
+    AnalysisHistoryData,
+    AnalysisHistoryResponse,
+    AnalysisStatsCounters,
+    AnalysisStatsData,
+    AnalysisStatsDay,
+    AnalysisStatsResponse,
+    AnalysisSummary,
+)
+from app.model.analysis_repository import EXPORT_FIELDS, AsyncAnalysisRepository
+from app.model.analysis_rollup_repository import AnalysisRollupRepository, day_range
+from app.services.llm_provider import gemini_provider
 from app.services.logger import Logger
+from app.services.metrics import metrics
+from app.services.tracing import tracer
+from app.services.profiler import to_thread
+from app.services.inflight_coalescer import analysis_coalescer
+from app.services.analysis_record_writer import analysis_record_writer
 
 # Usar la nueva implementación compatible
 from app.services.encrypt import Encrypt
 
+# Rango máximo de días que acepta el endpoint de estadísticas
+MAX_STATS_DAYS = 366
+
 
 class AnalysisUseCase:
     """Caso de uso para el análisis de archivos"""
@@ -23,10 +47,16 @@ class AnalysisUseCase:
         self.config_service_url = os.getenv(
             "CONFIG_SERVICE_URL", "http://localhost:8000"
         )
-        self.repository = AnalysisRepository()
+        self.repository = AsyncAnalysisRepository()
+        self.rollup_repository = AnalysisRollupRepository()
+        self.record_writer = analysis_record_writer
 
     async def execute(
-        self, filename: str, auth_result: dict, enable_ia: bool
+        self,
+        filename: str,
+        auth_result: dict,
+        enable_ia: bool,
+        record_id: Optional[str] = None,
     ) -> AnalysisResponse:
         """
         Ejecuta el análisis del archivo especificado
@@ -35,6 +65,8 @@ class AnalysisUseCase:
             filename: Nombre del archivo a analizar
             auth_result: Resultado de la autenticación
             enable_ia: Indica si se debe utilizar IA para el análisis
+            record_id: UUID fijo del registro; los trabajos asíncronos usan el
+                del trabajo para que un reintento no duplique el registro
 
         Returns:
             AnalysisResponse: Resultado del análisis
@@ -43,27 +75,43 @@ class AnalysisUseCase:
         self.logger.info("Ejecutando caso de uso de análisis")
 
         try:
-            # Validar y procesar nombre del archivo
-            self._validate_filename(filename)
-            encrypted_filename, filename_base64 = self._encrypt_filename(filename)
-
-            # Obtener contenido del archivo y realizar análisis
-            file_content = await self._get_file_content_from_config_service(
-                filename_base64, auth_result.get("token")
-            )
+            with metrics.track_in_flight("analysis"), metrics.stage("analysis", "total"):
+                # Validar y procesar nombre del archivo (PBKDF2 fuera del event loop)
+                with metrics.stage("analysis", "encrypt_filename"):
+                    self._validate_filename(filename)
+                    encrypted_filename, filename_base64 = await to_thread(
+                        self._encrypt_filename, filename
+                    )
 
-            if enable_ia:
-                analysis_data = self._perform_analysis(file_content)
-            else:
-                analysis_data = file_content
+                # Obtener contenido del archivo (config_fetch y decrypt) y realizar análisis
+                file_content = await self._get_file_content_from_config_service(
+                    filename_base64, auth_result.get("token")
+                )
 
-            # Guardar registro en MongoDB
-            self._save_analysis_record(
-                filename, encrypted_filename, analysis_data, auth_result, enable_ia
-            )
+                if enable_ia:
+                    with metrics.stage("analysis", "llm"), tracer.span("llm.analyze"):
+                        analysis_data = await self._perform_coalesced_analysis(
+                            filename, file_content
+                        )
+                else:
+                    analysis_data = file_content
+
+                # Guardar registro en MongoDB
+                with metrics.stage("analysis", "db_save"):
+                    await self._save_analysis_record(
+                        filename,
+                        encrypted_filename,
+                        analysis_data,
+                        auth_result,
+                        enable_ia,
+                        record_id,
+                    )
 
-            # Crear y retornar respuesta
-            return self._create_success_response(analysis_data, filename, encrypted_filename)
+                # Crear y retornar respuesta
+                with metrics.stage("analysis", "response"):
+                    return self._create_success_response(
+                        analysis_data, filename, encrypted_filename
+                    )
 
         except Exception as e:
             self.logger.error(f"Error en caso de uso: {str(e)}")
@@ -84,8 +132,13 @@ class AnalysisUseCase:
         self.logger.info(
             "Nombre de archivo encriptado correctamente con método compatible"
         )
-        self.logger.info(f"Nombre de archivo encriptado: {encrypted_filename}")
-        self.logger.info(f"Nombre de archivo base64: {filename_base64}")
+        self.logger.info(
+            f"Nombre de archivo encriptado: {encrypted_filename}",
+            key="Nombre de archivo encriptado",
+        )
+        self.logger.info(
+            f"Nombre de archivo base64: {filename_base64}", key="Nombre de archivo base64"
+        )
 
         return encrypted_filename, filename_base64
 
@@ -109,7 +162,7 @@ class AnalysisUseCase:
             # Construir URL del servicio de configuración
             url = f"{self.config_service_url}/config/{encrypted_filename}"
 
-            self.logger.info(f"Realizando petición a: {url}")
+            self.logger.info(f"Realizando petición a: {url}", key="Realizando petición a")
 
             # Configurar headers con el token de autorización
             headers = {"accept": "application/json"}
@@ -119,10 +172,14 @@ class AnalysisUseCase:
 
             # Intentar obtener contenido del servicio de configuración
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.get(url, headers=headers)
-                    response.raise_for_status()
-                    mock_response = response.json()
+                with metrics.stage("analysis", "config_fetch"), tracer.span(
+                    "config_service.fetch", **{"http.url": url}
+                ) as span:
+                    async with httpx.AsyncClient(timeout=10.0) as client:
+                        response = await client.get(url, headers=tracer.inject(headers))
+                        span.set_attribute("http.status_code", response.status_code)
+                        response.raise_for_status()
+                        mock_response = response.json()
 
                 self.logger.info("Respuesta del servicio de configuración obtenida")
 
@@ -136,13 +193,16 @@ class AnalysisUseCase:
 
                 self.logger.info("Contenido encriptado extraído de la respuesta")
 
-                # Desofuscar el contenido (convertir de base64 a texto normal)
-                desofuscated_content = self.encrypt.desofuscar_base64(encrypted_content)
-                self.logger.info("Contenido desofuscado correctamente")
+                with metrics.stage("analysis", "decrypt"), tracer.span("decrypt"):
+                    # Desofuscar el contenido (convertir de base64 a texto normal)
+                    desofuscated_content = self.encrypt.desofuscar_base64(encrypted_content)
+                    self.logger.info("Contenido desofuscado correctamente")
 
-                # Desencriptar el contenido
-                decrypted_content = self.encrypt.decrypt(desofuscated_content)
-                self.logger.info("Contenido desencriptado correctamente")
+                    # Desencriptar el contenido (PBKDF2 fuera del event loop)
+                    decrypted_content = await to_thread(
+                        self.encrypt.decrypt, desofuscated_content
+                    )
+                    self.logger.info("Contenido desencriptado correctamente")
 
                 return decrypted_content
 
@@ -171,6 +231,36 @@ class AnalysisUseCase:
             self.logger.error(f"Error al obtener contenido del archivo: {str(e)}")
             raise
 
+    async def _perform_coalesced_analysis(self, filename: str, file_content: str) -> dict:
+        """
+        Realiza el análisis con IA compartiéndolo entre peticiones idénticas en curso
+
+        Las peticiones concurrentes para el mismo archivo y contenido esperan el
+        resultado de la primera, de modo que solo ella paga la llamada a Gemini.
+        Cada petición sigue guardando su propio registro en MongoDB.
+
+        Args:
+            filename: Nombre del archivo analizado
+            file_content: Contenido del archivo a analizar
+
+        Returns:
+            dict: Datos del análisis
+        """
+        content_hash = hashlib.sha256((file_content or "").encode("utf-8")).hexdigest()
+        analysis_data, is_leader = await analysis_coalescer.run(
+            (filename, content_hash, "ia"),
+            lambda: to_thread(self._perform_analysis, file_content),
+        )
+
+        metrics.record_cache("llm_coalescer", hit=not is_leader)
+        span = tracer.current_span()
+        if span is not None:
+            span.set_attribute("coalesced", not is_leader)
+        if not is_leader:
+            self.logger.info("Reutilizando análisis con IA en curso para el mismo contenido")
+
+        return analysis_data
+
     def _perform_analysis(self, file_content: str = None) -> dict:
         """
         Realiza el análisis del archivo usando la API de Google Gemini
@@ -188,10 +278,12 @@ class AnalysisUseCase:
             raise ValueError("No se proporcionó contenido del archivo")
 
         try:
-            # Configurar Gemini y obtener respuesta
-            model = self._configure_gemini()
-            prompt = self._create_analysis_prompt(file_content)
-            response = self._call_gemini_api(model, prompt)
+            with metrics.track_in_flight("llm"), tracer.span("gemini.generate_content"):
+                # Configurar Gemini y obtener respuesta
+                model = self._configure_gemini()
+                prompt = self._create_analysis_prompt(file_content)
+                response = self._call_gemini_api(model, prompt)
+                metrics.record_llm_usage(response)
 
             # Parsear respuesta y crear análisis
             parsed_analysis = self._parse_gemini_response(response)
@@ -202,6 +294,7 @@ class AnalysisUseCase:
 
         except Exception as e:
             self.logger.error(f"Error en análisis con Gemini: {str(e)}")
+            metrics.record_fallback("llm_error")
             return self._create_fallback_analysis(str(e))
 
     def _configure_gemini(self):
@@ -211,8 +304,8 @@ class AnalysisUseCase:
             self.logger.error("GEMINI_API_KEY no está configurada")
             raise ValueError("API key de Gemini no configurada")
 
-        genai.configure(api_key=api_key)
-        return genai.GenerativeModel("gemini-1.5-flash")
+        # El SDK se importa aquí la primera vez, no al cargar el servicio
+        return gemini_provider.create_model(api_key)
 
     def _create_analysis_prompt(self, file_content: str) -> str:
         """Crea el prompt para el análisis de seguridad"""
@@ -238,14 +331,13 @@ class AnalysisUseCase:
 
         response = model.generate_content(
             prompt,
-            generation_config=genai.types.GenerationConfig(
+            generation_config=gemini_provider.generation_config(
                 max_output_tokens=2048,
                 temperature=0.1,
             ),
         )
 
         self.logger.info("Respuesta recibida de Gemini API")
-        print(response)
         return response
 
     def _parse_gemini_response(self, response) -> dict:
@@ -258,6 +350,8 @@ class AnalysisUseCase:
             return self._extract_and_validate_json(analysis_result)
         except ValueError as e:
             self.logger.error(f"Error al parsear JSON de Gemini: {str(e)}")
+            metrics.llm_parse_failures.inc()
+            metrics.record_fallback("llm_parse")
             return self._create_default_analysis(
                 f"Error al parsear respuesta de Gemini: {str(e)}"
             )
@@ -283,6 +377,8 @@ class AnalysisUseCase:
             self.logger.warning(
                 "No se encontró JSON en la respuesta de Gemini, usando estructura por defecto"
             )
+            metrics.llm_parse_failures.inc()
+            metrics.record_fallback("llm_parse")
             return self._create_default_analysis(
                 "No se pudo parsear la respuesta de Gemini"
             )
@@ -391,13 +487,14 @@ class AnalysisUseCase:
             self.logger.warning(f"Error al determinar nivel de seguridad: {str(e)}")
             return "unknown"
 
-    def _save_analysis_record(
+    async def _save_analysis_record(
         self,
         filename: str,
         encrypted_filename: str,
         analysis_data: dict | str,
         auth_result: dict,
         enable_ia: bool,
+        record_id: Optional[str] = None,
     ) -> None:
         """Guarda el registro de análisis en MongoDB"""
         # En entorno de test, no intentar guardar en MongoDB
@@ -426,10 +523,13 @@ class AnalysisUseCase:
                     "timestamp": datetime.now().isoformat(),
                 }
 
-            self.repository.save_analysis_record(
-                success=True, response=mongo_response, user=auth_result.get("user")
+            await self._persist_record(
+                success=True,
+                response=mongo_response,
+                user=auth_result.get("user"),
+                record_id=record_id,
             )
-            self.logger.success("Registro guardado en MongoDB exitosamente")
+            self.logger.success("Registro enviado a MongoDB exitosamente")
 
         except Exception as mongo_error:
             self.logger.warning(
@@ -440,6 +540,25 @@ class AnalysisUseCase:
                 f"Error al guardar registro en base de datos: {str(mongo_error)}"
             )
 
+    async def _persist_record(
+        self, success: bool, response: dict, user: str, record_id: Optional[str] = None
+    ) -> None:
+        """
+        Persiste un registro de análisis
+
+        Si el buffer write-behind está activo, el registro solo se encola y la
+        respuesta HTTP no espera a MongoDB; si no, se guarda directamente.
+        """
+        with tracer.span("mongodb.save", write_behind=self.record_writer.running):
+            if self.record_writer.running:
+                await self.record_writer.enqueue(
+                    success=success, response=response, user=user, record_id=record_id
+                )
+            else:
+                await self.repository.save_analysis_record(
+                    success=success, response=response, user=user, record_id=record_id
+                )
+
     def _create_success_response(
         self,
         analysis_data: dict | str,
@@ -505,7 +624,7 @@ class AnalysisUseCase:
             data=analysis_data_model,
         )
 
-    def _save_error_record(
+    async def _save_error_record(
         self, filename: str, error_message: str, auth_result: dict
     ) -> None:
         """Guarda el registro de error en MongoDB"""
@@ -527,10 +646,10 @@ class AnalysisUseCase:
                 "timestamp": datetime.now().isoformat(),
             }
 
-            self.repository.save_analysis_record(
+            await self._persist_record(
                 success=False, response=error_response, user=user
             )
-            self.logger.info("Registro de error guardado en MongoDB")
+            self.logger.info("Registro de error enviado a MongoDB")
 
         except Exception as mongo_error:
             self.logger.warning(
@@ -541,84 +660,252 @@ class AnalysisUseCase:
                 f"Error al guardar registro de error en MongoDB: {str(mongo_error)}"
             )
 
-    def get_analysis_by_id(self, analysis_id: str, auth_result: dict) -> dict:
+    async def get_analysis_by_id(
+        self, analysis_id: str, auth_result: dict
+    ) -> AnalysisDetailResponse:
         """
         Obtiene un análisis específico por ID
-        
+
         Args:
             analysis_id: ID del análisis a obtener
             auth_result: Resultado de la autenticación
-            
+
         Returns:
-            dict: Datos del análisis
+            AnalysisDetailResponse: Registro completo del análisis
+
+        Raises:
+            ValueError: Si el análisis no existe para el usuario autenticado
         """
         try:
-            # En entorno de test, retornar datos mock
-            if "test" in os.environ.get("ENVIRONMENT", "").lower():
-                return {
-                    "analysis_id": analysis_id,
-                    "filename": "test.txt",
-                    "analysis_data": {"content": "test content"},
-                    "timestamp": datetime.now().isoformat(),
-                    "user": auth_result.get("user", "testuser")
-                }
-            
-            # Implementación real para obtener de MongoDB
-            # Por ahora retornamos datos mock
-            return {
-                "analysis_id": analysis_id,
-                "filename": "test.txt",
-                "analysis_data": {"content": "test content"},
-                "timestamp": datetime.now().isoformat(),
-                "user": auth_result.get("user", "unknown")
-            }
+            user = auth_result.get("user") or "unknown_user"
+            record = await self.repository.find_analysis(analysis_id, user)
+
+            if record is None:
+                raise ValueError("El análisis solicitado no existe")
+
+            return AnalysisDetailResponse(
+                success=True,
+                message="Análisis obtenido exitosamente",
+                data=AnalysisDetail(
+                    analysis_id=record["uuid"],
+                    user=record["user"],
+                    success=record["success"],
+                    response=record.get("response") or {},
+                    created_at=record["created_at"],
+                ),
+            )
         except Exception as e:
             self.logger.error(f"Error al obtener análisis por ID: {str(e)}")
             raise
 
-    def get_analyses_by_user(self, auth_result: dict) -> list:
+    async def get_analyses_by_user(
+        self,
+        auth_result: dict,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        success: Optional[bool] = None,
+        security_levels: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> AnalysisHistoryResponse:
         """
-        Obtiene todos los análisis de un usuario
-        
+        Obtiene una página del historial de análisis del usuario
+
         Args:
             auth_result: Resultado de la autenticación
-            
+            limit: Tamaño de página
+            cursor: Cursor de la página anterior
+            success: Filtrar por análisis exitosos o fallidos
+            security_levels: Filtrar por nivel de seguridad
+            date_from: Fecha mínima de creación
+            date_to: Fecha máxima de creación
+
         Returns:
-            list: Lista de análisis del usuario
+            AnalysisHistoryResponse: Página del historial y cursor siguiente
         """
         try:
-            user = auth_result.get("user", "unknown")
-            
-            # En entorno de test, retornar datos mock
-            if "test" in os.environ.get("ENVIRONMENT", "").lower():
-                return [
-                    {
-                        "analysis_id": "test_1",
-                        "filename": "test1.txt",
-                        "analysis_data": {"content": "test content 1"},
-                        "timestamp": datetime.now().isoformat(),
-                        "user": user
-                    },
-                    {
-                        "analysis_id": "test_2",
-                        "filename": "test2.txt",
-                        "analysis_data": {"content": "test content 2"},
-                        "timestamp": datetime.now().isoformat(),
-                        "user": user
-                    }
-                ]
-            
-            # Implementación real para obtener de MongoDB
-            # Por ahora retornamos datos mock
-            return [
-                {
-                    "analysis_id": "real_1",
-                    "filename": "real1.txt",
-                    "analysis_data": {"content": "real content 1"},
-                    "timestamp": datetime.now().isoformat(),
-                    "user": user
-                }
-            ]
+            user = auth_result.get("user") or "unknown_user"
+            records, next_cursor = await self.repository.find_analyses_by_user(
+                user,
+                limit=limit,
+                cursor=cursor,
+                success=success,
+                security_levels=security_levels,
+                date_from=date_from,
+                date_to=date_to,
+            )
+
+            return AnalysisHistoryResponse(
+                success=True,
+                message="Historial de análisis obtenido exitosamente",
+                data=AnalysisHistoryData(
+                    items=[self._to_summary(record) for record in records],
+                    next_cursor=next_cursor,
+                ),
+            )
         except Exception as e:
             self.logger.error(f"Error al obtener análisis por usuario: {str(e)}")
             raise
+
+    def export_analyses(
+        self,
+        auth_result: dict,
+        fields: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        compress: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """
+        Prepara la exportación NDJSON del historial del usuario
+
+        Los parámetros se validan aquí, antes de empezar a responder; los
+        registros se leen y serializan lote a lote al consumir el iterador.
+
+        Args:
+            auth_result: Resultado de la autenticación
+            fields: Campos a exportar (ver EXPORT_FIELDS)
+            date_from: Fecha mínima de creación
+            date_to: Fecha máxima de creación
+            compress: Comprimir la salida con gzip
+
+        Returns:
+            AsyncIterator[bytes]: Fragmentos del archivo NDJSON (o .ndjson.gz)
+
+        Raises:
+            ValueError: Si un campo no existe o el rango de fechas es inválido
+        """
+        invalid = [field for field in fields or [] if field not in EXPORT_FIELDS]
+        if invalid:
+            raise ValueError(f"Campos no válidos: {', '.join(invalid)}")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from no puede ser posterior a date_to")
+
+        user = auth_result.get("user") or "unknown_user"
+        return self._stream_export(user, fields, date_from, date_to, compress)
+
+    async def _stream_export(
+        self,
+        user: str,
+        fields: Optional[List[str]],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        compress: bool,
+    ) -> AsyncIterator[bytes]:
+        """Serializa cada lote como líneas JSON, comprimiendo de forma incremental"""
+        compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = formato gzip
+        exported = 0
+
+        try:
+            async for batch in self.repository.export_analyses(
+                user, fields=fields, date_from=date_from, date_to=date_to
+            ):
+                chunk = "".join(
+                    json.dumps(row, ensure_ascii=False, default=self._export_default) + "\n"
+                    for row in batch
+                ).encode("utf-8")
+                exported += len(batch)
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+
+            if compressor:
+                yield compressor.flush()
+            self.logger.info(f"Exportación completada: {exported} registros de {user}")
+        except Exception as e:
+            # La respuesta ya empezó: solo queda cortar la descarga
+            self.logger.error(f"Error al exportar análisis tras {exported} registros: {str(e)}")
+            raise
+
+    @staticmethod
+    def _export_default(value: Any) -> Any:
+        """Serializa los tipos de MongoDB que json no conoce"""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+    def _to_summary(self, record: dict) -> AnalysisSummary:
+        """Convierte un registro proyectado en su resumen"""
+        response = record.get("response") or {}
+        analysis_data = response.get("analysis_data")
+        if not isinstance(analysis_data, dict):
+            analysis_data = {}
+
+        return AnalysisSummary(
+            analysis_id=record["uuid"],
+            filename=response.get("filename"),
+            success=record["success"],
+            gemini_response=response.get("gemini_response"),
+            security_level=analysis_data.get("security_level"),
+            safe=analysis_data.get("safe"),
+            error=response.get("error"),
+            created_at=record["created_at"],
+        )
+
+    async def get_analysis_stats(
+        self,
+        auth_result: dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> AnalysisStatsResponse:
+        """
+        Obtiene los contadores diarios de análisis y severidades del usuario
+
+        Se leen los contadores precalculados (un documento por día), por lo que
+        el costo depende del rango pedido y no del tamaño del historial.
+
+        Args:
+            auth_result: Resultado de la autenticación
+            date_from: Primer día del rango (por defecto, hace 30 días)
+            date_to: Último día del rango (por defecto, hoy)
+
+        Returns:
+            AnalysisStatsResponse: Totales del rango y contadores por día
+
+        Raises:
+            ValueError: Si el rango es inválido o supera MAX_STATS_DAYS
+        """
+        try:
+            user = auth_result.get("user") or "unknown_user"
+            day_from, day_to = day_range(date_from, date_to, default_days=30)
+
+            span = (date.fromisoformat(day_to) - date.fromisoformat(day_from)).days + 1
+            if span <= 0:
+                raise ValueError("date_from no puede ser posterior a date_to")
+            if span > MAX_STATS_DAYS:
+                raise ValueError(f"El rango de fechas no puede superar {MAX_STATS_DAYS} días")
+
+            rollups = await to_thread(
+                self.rollup_repository.get_stats, user, day_from, day_to
+            )
+            days = [AnalysisStatsDay(**rollup) for rollup in rollups]
+
+            return AnalysisStatsResponse(
+                success=True,
+                message="Estadísticas de análisis obtenidas exitosamente",
+                data=AnalysisStatsData(
+                    date_from=day_from,
+                    date_to=day_to,
+                    totals=self._sum_stats(days),
+                    days=days,
+                ),
+            )
+        except Exception as e:
+            self.logger.error(f"Error al obtener estadísticas de análisis: {str(e)}")
+            raise
+
+    def _sum_stats(self, days: List[AnalysisStatsDay]) -> AnalysisStatsCounters:
+        """Suma los contadores diarios del rango"""
+        security_levels, severities = Counter(), Counter()
+        for day in days:
+            security_levels.update(day.security_levels)
+            severities.update(day.severities)
+
+        return AnalysisStatsCounters(
+            total=sum(day.total for day in days),
+            successful=sum(day.successful for day in days),
+            failed=sum(day.failed for day in days),
+            with_ia=sum(day.with_ia for day in days),
+            security_levels=dict(security_levels),
+            severities=dict(severities),
+        )
@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import List, Optional
+
+from app.model.analysis_finding_repository import AnalysisFindingRepository
+from app.model.analysis_model import FindingItem, FindingsData, FindingsResponse
+from app.services.logger import Logger
+from app.services.profiler import to_thread
+from app.utils.finding_categories import DEFAULT_CATEGORY, FINDING_CATEGORIES
+from app.utils.severity import SEVERITIES
+
+# Categorías aceptadas como filtro
+CATEGORIES = [category for category, _ in FINDING_CATEGORIES] + [DEFAULT_CATEGORY]
+
+
+class FindingUseCase:
+    """Caso de uso para la consulta de hallazgos de los análisis"""
+
+    def __init__(self):
+        self.logger = Logger()
+        self.repository = AnalysisFindingRepository()
+
+    async def get_findings(
+        self,
+        auth_result: dict,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        severities: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        filename: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> FindingsResponse:
+        """
+        Obtiene una página de hallazgos del usuario
+
+        Args:
+            auth_result: Resultado de la autenticación
+            limit: Tamaño de página
+            cursor: Cursor de la página anterior
+            severities: Filtrar por severidad
+            categories: Filtrar por categoría
+            filename: Filtrar por nombre de archivo
+            date_from: Fecha mínima del análisis
+            date_to: Fecha máxima del análisis
+
+        Returns:
+            FindingsResponse: Página de hallazgos y cursor siguiente
+
+        Raises:
+            ValueError: Si una severidad o categoría no es válida, o el cursor es inválido
+        """
+        self.logger.set_context("FindingUseCase.get_findings")
+
+        try:
+            invalid = [value for value in severities or [] if value not in SEVERITIES]
+            invalid += [value for value in categories or [] if value not in CATEGORIES]
+            if invalid:
+                raise ValueError(f"Filtros no válidos: {', '.join(invalid)}")
+
+            user = auth_result.get("user") or "unknown_user"
+            findings, next_cursor = await to_thread(
+                self.repository.find_findings,
+                user,
+                limit=limit,
+                cursor=cursor,
+                severities=severities,
+                categories=categories,
+                filename=filename,
+                date_from=date_from,
+                date_to=date_to,
+            )
+
+            return FindingsResponse(
+                success=True,
+                message="Hallazgos obtenidos exitosamente",
+                data=FindingsData(
+                    items=[
+                        FindingItem(
+                            analysis_id=finding["analysis_uuid"],
+                            filename=finding.get("filename"),
+                            severity=finding["severity"],
+                            category=finding["category"],
+                            problem=finding.get("problem"),
+                            recommendation=finding.get("recommendation"),
+                            created_at=finding["created_at"],
+                        )
+                        for finding in findings
+                    ],
+                    next_cursor=next_cursor,
+                ),
+            )
+        except Exception as e:
+            self.logger.error(f"Error al obtener hallazgos: {str(e)}")
+            raise
@@ -0,0 +1,49 @@
+import re
+from typing import Any, List, Pattern, Tuple
+
+# Categorías de hallazgo en orden de prioridad: gana la primera cuyas palabras
+# clave aparecen en el problema o la recomendación (Gemini no devuelve regla)
+FINDING_CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("telnet", ("telnet", "transport input all")),
+    ("ssh", ("ssh",)),
+    ("snmp", ("snmp",)),
+    ("http", ("http", "https")),
+    ("aaa", ("aaa", "tacacs", "tacacs+", "radius")),
+    (
+        "password",
+        (
+            "password",
+            "contraseña",
+            "contraseñas",
+            "credencial",
+            "credenciales",
+            "credential",
+            "credentials",
+            "enable secret",
+        ),
+    ),
+    ("acl", ("access-list", "access-class", "acl", "acls", "lista de acceso")),
+    ("logging", ("logging", "syslog")),
+    ("ntp", ("ntp",)),
+    ("cdp", ("cdp", "lldp")),
+    ("banner", ("banner",)),
+    ("spanning_tree", ("spanning-tree", "spanning tree", "bpdu", "portfast")),
+    ("vlan", ("vlan", "vlans", "trunk", "dtp", "switchport")),
+]
+
+# Categoría de los hallazgos que no coinciden con ninguna regla
+DEFAULT_CATEGORY = "other"
+
+_PATTERNS: List[Tuple[str, Pattern[str]]] = [
+    (category, re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, keywords)) + r")(?!\w)"))
+    for category, keywords in FINDING_CATEGORIES
+]
+
+
+def categorize_finding(*texts: Any) -> str:
+    """Asigna una de FINDING_CATEGORIES (u 'other') a partir del texto del hallazgo"""
+    text = " ".join(str(value or "") for value in texts).lower()
+    for category, pattern in _PATTERNS:
+        if pattern.search(text):
+            return category
+    return DEFAULT_CATEGORY
@@ -0,0 +1,47 @@
+from collections import Counter
+from typing import Any, Dict, List
+
+# Severidades normalizadas (Gemini responde en español o en inglés)
+SEVERITIES = ["critical", "high", "medium", "low", "unknown"]
+
+# Niveles de seguridad que calcula AnalysisUseCase
+SECURITY_LEVELS = ["critical", "high", "medium", "low", "safe", "unknown"]
+
+_SEVERITY_ALIASES = {
+    "crítica": "critical",
+    "critica": "critical",
+    "critical": "critical",
+    "alta": "high",
+    "high": "high",
+    "media": "medium",
+    "medium": "medium",
+    "baja": "low",
+    "low": "low",
+}
+
+
+def normalize_severity(value: Any) -> str:
+    """Normaliza la severidad de un problema a uno de SEVERITIES"""
+    return _SEVERITY_ALIASES.get(str(value or "").strip().lower(), "unknown")
+
+
+def normalize_security_level(value: Any) -> str:
+    """Normaliza el nivel de seguridad de un análisis a uno de SECURITY_LEVELS"""
+    level = str(value or "").strip().lower()
+    if level == "safe":
+        return level
+    return _SEVERITY_ALIASES.get(level, "unknown")
+
+
+def problem_entries(problems: Any) -> List[Dict[str, Any]]:
+    """Problemas de un análisis descartando las entradas que no son objetos"""
+    if not isinstance(problems, list):
+        return []
+    return [problem for problem in problems if isinstance(problem, dict)]
+
+
+def count_severities(problems: Any) -> Dict[str, int]:
+    """Cuenta los problemas válidos de un análisis por severidad normalizada"""
+    return dict(
+        Counter(normalize_severity(problem.get("severity")) for problem in problem_entries(problems))
+    )
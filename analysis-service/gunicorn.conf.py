@@ -0,0 +1,21 @@
+"""
+Configuración de gunicorn para producción
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Los valores se leen de variables de entorno en app/server.py.
+"""
+from app.server import child_exit, post_fork, pre_fork, prepare_metrics_dir, server_settings
+
+prepare_metrics_dir()
+_settings = server_settings()
+
+bind = _settings["bind"]
+workers = _settings["workers"]
+worker_class = _settings["worker_class"]
+preload_app = _settings["preload_app"]
+max_requests = _settings["max_requests"]
+max_requests_jitter = _settings["max_requests_jitter"]
+timeout = _settings["timeout"]
+graceful_timeout = _settings["graceful_timeout"]
+keepalive = _settings["keepalive"]
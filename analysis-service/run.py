@@ -9,8 +9,10 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.main import app
+from app.server import uvicorn_implementations
 import uvicorn
 
 if __name__ == "__main__":
+    # Un solo proceso (desarrollo); en producción: gunicorn -c gunicorn.conf.py app.main:app
     port = int(os.getenv("PORT", 8002))
-    uvicorn.run(app, host="0.0.0.0", port=port, reload=False) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=port, reload=False, **uvicorn_implementations())
@@ -0,0 +1,221 @@
+import os
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+from app.controller.admin_controller import (
+    get_storage_stats,
+    get_traces,
+    profile_worker,
+    stream_logs,
+)
+from app.model.analysis_model import StorageStatsData, StorageStatsResponse
+from app.services.profiler import ProfilerBusyError
+
+
+class TestAdminController:
+    """Test cases para el controlador de administración"""
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.AdminUseCase")
+    @patch("app.controller.admin_controller.logger")
+    async def test_get_storage_stats_success(self, mock_logger, mock_usecase_class):
+        """Test de obtención exitosa de estadísticas"""
+        response = StorageStatsResponse(
+            success=True,
+            message="ok",
+            data=StorageStatsData(collections=[], retention={"error_days": 30}),
+        )
+        mock_usecase = MagicMock()
+        mock_usecase.get_storage_stats = AsyncMock(return_value=response)
+        mock_usecase_class.return_value = mock_usecase
+
+        result = await get_storage_stats({"user": "root"})
+
+        assert result is response
+        mock_usecase.get_storage_stats.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.AdminUseCase")
+    @patch("app.controller.admin_controller.logger")
+    async def test_get_storage_stats_database_error(self, mock_logger, mock_usecase_class):
+        """Test de error de base de datos al obtener estadísticas"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_storage_stats = AsyncMock(side_effect=RuntimeError("Error de MongoDB"))
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_storage_stats({"user": "root"})
+
+        assert exc_info.value.status_code == 500
+
+
+class TestAdminLogStream:
+    """Test cases para el stream de logs en tiempo real"""
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.log_buffer")
+    @patch("app.controller.admin_controller.logger")
+    async def test_stream_logs_success(self, mock_logger, mock_buffer):
+        """Test de apertura del stream con filtros"""
+        mock_buffer.stream.return_value = iter(["data: {}\n\n"])
+
+        result = await stream_logs(
+            {"user": "root"}, level="warning", request_id="req-1", user="ana", backlog=5
+        )
+
+        assert isinstance(result, StreamingResponse)
+        assert result.media_type == "text/event-stream"
+        assert result.headers["cache-control"] == "no-cache"
+        assert result.headers["x-worker-pid"] == str(os.getpid())
+        mock_buffer.stream.assert_called_once_with(
+            level=30, request_id="req-1", user="ana", backlog=5
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.log_buffer")
+    @patch("app.controller.admin_controller.logger")
+    async def test_stream_logs_invalid_level(self, mock_logger, mock_buffer):
+        """Test de nivel inválido"""
+        with pytest.raises(HTTPException) as exc_info:
+            await stream_logs({"user": "root"}, level="VERBOSE", request_id=None, user=None, backlog=100)
+
+        assert exc_info.value.status_code == 400
+        mock_buffer.stream.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.log_buffer")
+    @patch("app.controller.admin_controller.logger")
+    async def test_stream_logs_unexpected_error(self, mock_logger, mock_buffer):
+        """Test de error inesperado al abrir el stream"""
+        mock_buffer.stream.side_effect = RuntimeError("fallo")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await stream_logs({"user": "root"}, level=None, request_id=None, user=None, backlog=100)
+
+        assert exc_info.value.status_code == 500
+
+
+class TestAdminProfile:
+    """Test cases para el perfil del worker"""
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.profile_process", new_callable=AsyncMock)
+    @patch("app.controller.admin_controller.logger")
+    async def test_profile_success(self, mock_logger, mock_profile):
+        """Test de perfil en formato HTML con intervalo explícito"""
+        mock_profile.return_value = MagicMock()
+        mock_profile.return_value.render.return_value = ("<html></html>", "text/html; charset=utf-8")
+
+        result = await profile_worker({"user": "root"}, seconds=2, format="html", interval_ms=10)
+
+        assert isinstance(result, Response)
+        assert result.body == b"<html></html>"
+        assert result.media_type == "text/html; charset=utf-8"
+        assert result.headers["x-worker-pid"] == str(os.getpid())
+        mock_profile.assert_awaited_once_with(2, 0.01)
+        mock_profile.return_value.render.assert_called_once_with("html")
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.profile_process", new_callable=AsyncMock)
+    @patch("app.controller.admin_controller.logger")
+    async def test_profile_default_interval(self, mock_logger, mock_profile):
+        """Test de perfil con el intervalo configurado por defecto"""
+        mock_profile.return_value = MagicMock()
+        mock_profile.return_value.render.return_value = ("MainThread;a 1\n", "text/plain; charset=utf-8")
+
+        result = await profile_worker({"user": "root"}, seconds=1, format=None, interval_ms=None)
+
+        assert result.body == b"MainThread;a 1\n"
+        mock_profile.assert_awaited_once_with(1, None)
+        mock_profile.return_value.render.assert_called_once_with("collapsed")
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.profile_process", new_callable=AsyncMock)
+    @patch("app.controller.admin_controller.logger")
+    async def test_profile_invalid_format(self, mock_logger, mock_profile):
+        """Test de formato inválido"""
+        with pytest.raises(HTTPException) as exc_info:
+            await profile_worker({"user": "root"}, seconds=1, format="pdf", interval_ms=None)
+
+        assert exc_info.value.status_code == 400
+        mock_profile.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.profile_process", new_callable=AsyncMock)
+    @patch("app.controller.admin_controller.logger")
+    async def test_profile_busy(self, mock_logger, mock_profile):
+        """Test de perfil simultáneo"""
+        mock_profile.side_effect = ProfilerBusyError("Ya hay un perfil en curso en este proceso")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await profile_worker({"user": "root"}, seconds=1, format=None, interval_ms=None)
+
+        assert exc_info.value.status_code == 409
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.profile_process", new_callable=AsyncMock)
+    @patch("app.controller.admin_controller.logger")
+    async def test_profile_unexpected_error(self, mock_logger, mock_profile):
+        """Test de error inesperado durante el perfil"""
+        mock_profile.side_effect = RuntimeError("fallo")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await profile_worker({"user": "root"}, seconds=1, format=None, interval_ms=None)
+
+        assert exc_info.value.status_code == 500
+
+
+class TestAdminTraces:
+    """Test cases para la consulta de trazas"""
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.tracer")
+    @patch("app.controller.admin_controller.logger")
+    async def test_get_traces_success(self, mock_logger, mock_tracer):
+        """Test de consulta de los spans de una traza"""
+        mock_tracer.exporter.dropped = 3
+        mock_tracer.exporter.recent.return_value = [
+            {
+                "trace_id": "4bf92f3577b34da6a3ce929d0e0e4736",
+                "span_id": "00f067aa0ba902b7",
+                "parent_id": None,
+                "name": "GET /api/v1/analyze",
+                "service": "analysis-service",
+                "start_time": "2024-01-15T10:30:00+00:00",
+                "duration_ms": 12.5,
+                "status": "ok",
+                "attributes": {"http.status_code": 200},
+            }
+        ]
+
+        response = Response()
+        result = await get_traces(
+            response,
+            {"user": "root"},
+            trace_id="4bf92f3577b34da6a3ce929d0e0e4736",
+            request_id=None,
+            limit=50,
+        )
+
+        assert result.success is True
+        assert result.data.dropped == 3
+        assert result.data.worker_pid == os.getpid()
+        assert response.headers["x-worker-pid"] == str(os.getpid())
+        assert result.data.spans[0].name == "GET /api/v1/analyze"
+        mock_tracer.exporter.recent.assert_called_once_with(
+            trace_id="4bf92f3577b34da6a3ce929d0e0e4736", request_id=None, limit=50
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.controller.admin_controller.tracer")
+    @patch("app.controller.admin_controller.logger")
+    async def test_get_traces_unexpected_error(self, mock_logger, mock_tracer):
+        """Test de error inesperado al consultar trazas"""
+        mock_tracer.exporter.recent.side_effect = RuntimeError("fallo")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_traces(Response(), {"user": "root"}, trace_id=None, request_id=None, limit=100)
+
+        assert exc_info.value.status_code == 500
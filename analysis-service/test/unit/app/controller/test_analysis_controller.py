@@ -3,8 +3,11 @@ from unittest.mock import Mock, MagicMock, AsyncMock, patch
 from fastapi import HTTPException, Request
 from datetime import datetime
 
-from app.controller.analysis_controller import analyze_file, router
+from app.controller.analysis_controller import (
+    analyze_file, list_analyses, get_analysis, get_analysis_stats, export_analyses, router
+)
 from app.model.analysis_model import AnalysisResponse, AnalysisData
+from app.services.request_context import get_request_context
 
 
 class TestAnalysisController:
@@ -211,15 +214,11 @@ class TestAnalysisController:
         # Ejecutar función
         result = await analyze_file(mock_request, {"token": "test_token"}, filename="document.pdf", enable_ia=False)
         
-        # Verificar contexto de logging
-        mock_logger.set_context.assert_called_once_with(
-            "AnalysisController.analyze_file",
-            {
-                "filename": "document.pdf",
-                "endpoint": "/analyze",
-                "authenticated": True
-            }
-        )
+        # El contexto va en el de la petición, no en el logger compartido del módulo
+        mock_logger.set_context.assert_not_called()
+        context = get_request_context()
+        assert context["handler"] == "AnalysisController.analyze_file"
+        assert context["filename"] == "document.pdf"
 
     def test_router_configuration(self):
         """Test que valida la configuración del router"""
@@ -237,4 +236,151 @@ class TestAnalysisController:
                 break
         
         assert analyze_route is not None
-        assert "GET" in analyze_route.methods 
\ No newline at end of file
+        assert "GET" in analyze_route.methods 
+
+class TestAnalysisHistoryController:
+    """Test cases para los endpoints de historial de análisis"""
+
+    @pytest.mark.asyncio
+    @patch('app.controller.analysis_controller.AnalysisUseCase')
+    @patch('app.controller.analysis_controller.logger')
+    async def test_list_analyses_success(self, mock_logger, mock_usecase_class):
+        """Test del listado de historial"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_analyses_by_user = AsyncMock(return_value="history")
+        mock_usecase_class.return_value = mock_usecase
+        auth_result = {"token": "test_token", "user": "testuser"}
+
+        result = await list_analyses(
+            auth_result, limit=10, cursor=None, success=True,
+            security_level=["critical"], date_from=None, date_to=None,
+        )
+
+        assert result == "history"
+        mock_usecase.get_analyses_by_user.assert_awaited_once_with(
+            auth_result, limit=10, cursor=None, success=True,
+            security_levels=["critical"], date_from=None, date_to=None,
+        )
+
+    @pytest.mark.asyncio
+    @patch('app.controller.analysis_controller.AnalysisUseCase')
+    @patch('app.controller.analysis_controller.logger')
+    async def test_list_analyses_invalid_cursor(self, mock_logger, mock_usecase_class):
+        """Test de cursor inválido"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_analyses_by_user = AsyncMock(
+            side_effect=ValueError("Cursor de paginación inválido")
+        )
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await list_analyses(
+                {"user": "testuser"}, limit=10, cursor="bad", success=None,
+                security_level=None, date_from=None, date_to=None,
+            )
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    @patch('app.controller.analysis_controller.AnalysisUseCase')
+    @patch('app.controller.analysis_controller.logger')
+    async def test_get_analysis_not_found(self, mock_logger, mock_usecase_class):
+        """Test de detalle de análisis inexistente"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_analysis_by_id = AsyncMock(
+            side_effect=ValueError("El análisis solicitado no existe")
+        )
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_analysis("missing", {"user": "testuser"})
+
+        assert exc_info.value.status_code == 404
+
+    @pytest.mark.asyncio
+    @patch('app.controller.analysis_controller.AnalysisUseCase')
+    @patch('app.controller.analysis_controller.logger')
+    async def test_get_analysis_stats_success(self, mock_logger, mock_usecase_class):
+        """Test de estadísticas de análisis"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_analysis_stats = AsyncMock(return_value="stats")
+        mock_usecase_class.return_value = mock_usecase
+        auth_result = {"user": "testuser"}
+
+        result = await get_analysis_stats(auth_result, date_from=None, date_to=None)
+
+        assert result == "stats"
+        mock_usecase.get_analysis_stats.assert_awaited_once_with(auth_result, None, None)
+
+    @pytest.mark.asyncio
+    @patch('app.controller.analysis_controller.AnalysisUseCase')
+    @patch('app.controller.analysis_controller.logger')
+    async def test_get_analysis_stats_invalid_range(self, mock_logger, mock_usecase_class):
+        """Test de rango de fechas inválido"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_analysis_stats = AsyncMock(side_effect=ValueError("rango"))
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_analysis_stats({"user": "testuser"}, date_from=None, date_to=None)
+
+        assert exc_info.value.status_code == 400
+
+    def test_stats_route_registered_before_detail(self):
+        """Test que valida que /analyses/stats no se resuelve como un analysis_id"""
+        paths = [route.path for route in router.routes]
+
+        assert paths.index("/analyses/stats") < paths.index("/analyses/{analysis_id}")
+
+    @pytest.mark.asyncio
+    @patch('app.controller.analysis_controller.AnalysisUseCase')
+    @patch('app.controller.analysis_controller.logger')
+    async def test_export_analyses_streams_ndjson(self, mock_logger, mock_usecase_class):
+        """Test de exportación en NDJSON con campos y gzip"""
+        async def stream():
+            yield b'{"analysis_id": "a1"}\n'
+
+        mock_usecase = MagicMock()
+        mock_usecase.export_analyses = MagicMock(return_value=stream())
+        mock_usecase_class.return_value = mock_usecase
+        auth_result = {"user": "testuser"}
+
+        plain = await export_analyses(
+            auth_result, fields="analysis_id, filename", date_from=None, date_to=None, gzip=False
+        )
+        compressed = await export_analyses(
+            auth_result, fields=None, date_from=None, date_to=None, gzip=True
+        )
+
+        assert plain.media_type == "application/x-ndjson"
+        assert plain.headers["content-disposition"].endswith('.ndjson"')
+        assert compressed.media_type == "application/gzip"
+        assert compressed.headers["content-disposition"].endswith('.ndjson.gz"')
+        assert mock_usecase.export_analyses.call_args_list[0].kwargs == {
+            "fields": ["analysis_id", "filename"],
+            "date_from": None,
+            "date_to": None,
+            "compress": False,
+        }
+
+    @pytest.mark.asyncio
+    @patch('app.controller.analysis_controller.AnalysisUseCase')
+    @patch('app.controller.analysis_controller.logger')
+    async def test_export_analyses_invalid_field(self, mock_logger, mock_usecase_class):
+        """Test de campo de exportación inválido"""
+        mock_usecase = MagicMock()
+        mock_usecase.export_analyses = MagicMock(side_effect=ValueError("Campos no válidos: x"))
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await export_analyses(
+                {"user": "testuser"}, fields="x", date_from=None, date_to=None, gzip=False
+            )
+
+        assert exc_info.value.status_code == 400
+
+    def test_export_route_registered_before_detail(self):
+        """Test que valida que /analyses/export no se resuelve como un analysis_id"""
+        paths = [route.path for route in router.routes]
+
+        assert paths.index("/analyses/export") < paths.index("/analyses/{analysis_id}")
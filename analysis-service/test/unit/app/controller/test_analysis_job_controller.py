@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi import HTTPException
+
+from app.controller.analysis_job_controller import (
+    create_analysis_job,
+    get_analysis_job,
+)
+from app.model.analysis_model import (
+    AnalysisJobRequest,
+    AnalysisJobResponse,
+    AnalysisJobData,
+)
+
+
+def _job_response(status="pending"):
+    """Construye una respuesta de trabajo de análisis"""
+    return AnalysisJobResponse(
+        success=True,
+        message=f"Trabajo de análisis en estado {status}",
+        data=AnalysisJobData(
+            job_id="job-1", status=status, filename="config.txt", enable_ia=True
+        ),
+    )
+
+
+class TestAnalysisJobController:
+    """Test cases para el controlador de trabajos de análisis"""
+
+    @pytest.mark.asyncio
+    @patch("app.controller.analysis_job_controller.AnalysisJobUseCase")
+    @patch("app.controller.analysis_job_controller.logger")
+    async def test_create_analysis_job_success(self, mock_logger, mock_usecase_class):
+        """Test de creación exitosa de un trabajo"""
+        mock_usecase = MagicMock()
+        mock_usecase.submit = AsyncMock(return_value=_job_response())
+        mock_usecase_class.return_value = mock_usecase
+        auth_result = {"token": "test_token", "user": "testuser"}
+
+        result = await create_analysis_job(
+            AnalysisJobRequest(filename="config.txt", enable_ia=True), auth_result
+        )
+
+        assert result.data.job_id == "job-1"
+        mock_usecase.submit.assert_awaited_once_with("config.txt", True, auth_result)
+
+    @pytest.mark.asyncio
+    @patch("app.controller.analysis_job_controller.AnalysisJobUseCase")
+    @patch("app.controller.analysis_job_controller.logger")
+    async def test_create_analysis_job_database_error(
+        self, mock_logger, mock_usecase_class
+    ):
+        """Test de error de base de datos al crear un trabajo"""
+        mock_usecase = MagicMock()
+        mock_usecase.submit = AsyncMock(side_effect=RuntimeError("Error de MongoDB"))
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await create_analysis_job(
+                AnalysisJobRequest(filename="config.txt"), {"user": "testuser"}
+            )
+
+        assert exc_info.value.status_code == 500
+
+    @pytest.mark.asyncio
+    @patch("app.controller.analysis_job_controller.AnalysisJobUseCase")
+    @patch("app.controller.analysis_job_controller.logger")
+    async def test_get_analysis_job_success(self, mock_logger, mock_usecase_class):
+        """Test de consulta exitosa de un trabajo"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_job = AsyncMock(return_value=_job_response("running"))
+        mock_usecase_class.return_value = mock_usecase
+
+        result = await get_analysis_job("job-1", {"user": "testuser"})
+
+        assert result.data.status == "running"
+
+    @pytest.mark.asyncio
+    @patch("app.controller.analysis_job_controller.AnalysisJobUseCase")
+    @patch("app.controller.analysis_job_controller.logger")
+    async def test_get_analysis_job_not_found(self, mock_logger, mock_usecase_class):
+        """Test de consulta de un trabajo inexistente"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_job = AsyncMock(
+            side_effect=ValueError("El trabajo de análisis solicitado no existe")
+        )
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_analysis_job("missing", {"user": "testuser"})
+
+        assert exc_info.value.status_code == 404
@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi import HTTPException
+
+from app.controller.finding_controller import list_findings
+
+
+class TestFindingController:
+    """Test cases para el controlador de hallazgos"""
+
+    @pytest.mark.asyncio
+    @patch("app.controller.finding_controller.FindingUseCase")
+    @patch("app.controller.finding_controller.logger")
+    async def test_list_findings_success(self, mock_logger, mock_usecase_class):
+        """Test del listado de hallazgos"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_findings = AsyncMock(return_value="findings")
+        mock_usecase_class.return_value = mock_usecase
+        auth_result = {"user": "testuser"}
+
+        result = await list_findings(
+            auth_result, limit=10, cursor=None, severity=["critical"], category=["telnet"],
+            filename="router.txt", date_from=None, date_to=None,
+        )
+
+        assert result == "findings"
+        mock_usecase.get_findings.assert_awaited_once_with(
+            auth_result, limit=10, cursor=None, severities=["critical"], categories=["telnet"],
+            filename="router.txt", date_from=None, date_to=None,
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.controller.finding_controller.FindingUseCase")
+    @patch("app.controller.finding_controller.logger")
+    async def test_list_findings_invalid_filter(self, mock_logger, mock_usecase_class):
+        """Test de filtro inválido"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_findings = AsyncMock(side_effect=ValueError("Filtros no válidos: ftp"))
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await list_findings(
+                {"user": "testuser"}, limit=10, cursor=None, severity=None, category=["ftp"],
+                filename=None, date_from=None, date_to=None,
+            )
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    @patch("app.controller.finding_controller.FindingUseCase")
+    @patch("app.controller.finding_controller.logger")
+    async def test_list_findings_database_error(self, mock_logger, mock_usecase_class):
+        """Test de error de base de datos"""
+        mock_usecase = MagicMock()
+        mock_usecase.get_findings = AsyncMock(side_effect=RuntimeError("Error de MongoDB"))
+        mock_usecase_class.return_value = mock_usecase
+
+        with pytest.raises(HTTPException) as exc_info:
+            await list_findings(
+                {"user": "testuser"}, limit=10, cursor=None, severity=None, category=None,
+                filename=None, date_from=None, date_to=None,
+            )
+
+        assert exc_info.value.status_code == 500
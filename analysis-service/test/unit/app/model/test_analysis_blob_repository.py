@@ -0,0 +1,225 @@
+import random
+from datetime import datetime, timedelta, UTC
+from unittest.mock import patch, MagicMock
+
+import bson
+import mongomock
+from mongoengine import connect, disconnect
+
+from app.model.analysis_blob_model import AnalysisBlob
+from app.model.analysis_blob_repository import (
+    AnalysisBlobRepository,
+    content_digest,
+    externalize_content,
+)
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_repository import AnalysisRepository
+
+
+def _config(index: int) -> str:
+    """Genera una configuración de switch de tamaño realista"""
+    interfaces = "".join(
+        f"interface GigabitEthernet0/{port}\n"
+        f" description Puerto {port} del switch {index}\n"
+        " switchport mode access\n"
+        f" switchport access vlan {10 + port % 4}\n"
+        " spanning-tree portfast\n!\n"
+        for port in range(1, 25)
+    )
+    return f"hostname Switch-{index}\n!\nenable password 7 01150F165E1C07032D\n!\n{interfaces}end\n"
+
+
+def _raw_response(filename: str, content: str) -> dict:
+    """Respuesta de un análisis sin IA tal como la arma el caso de uso"""
+    return {
+        "filename": filename,
+        "encrypted_filename": "encrypted",
+        "analysis_data": content,
+        "gemini_response": False,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+class TestExternalizeContent:
+    """Tests para la separación del contenido de las respuestas"""
+
+    def test_raw_content_is_replaced_by_reference(self):
+        """Test que valida que el contenido sin IA se reemplaza por su hash"""
+        response = _raw_response("a.txt", "hostname Switch")
+
+        stored, blob = externalize_content(response)
+
+        assert "analysis_data" not in stored
+        assert stored["content_ref"] == content_digest("hostname Switch")
+        assert stored["content_size"] == len("hostname Switch")
+        assert stored["filename"] == "a.txt"
+        assert blob == (content_digest("hostname Switch"), "hostname Switch")
+        assert response["analysis_data"] == "hostname Switch"
+
+    def test_ia_analysis_is_not_externalized(self):
+        """Test que valida que los análisis con IA se guardan completos"""
+        response = {"analysis_data": {"safe": True}, "gemini_response": True}
+
+        stored, blob = externalize_content(response)
+
+        assert stored is response
+        assert blob is None
+
+    def test_error_responses_are_not_externalized(self):
+        """Test que valida que las respuestas de error no generan blobs"""
+        stored, blob = externalize_content({"error": "boom", "filename": "a.txt"})
+
+        assert blob is None
+        assert externalize_content(None) == (None, None)
+
+
+class TestAnalysisBlobRepository:
+    """Tests para el repositorio de blobs de contenido"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+        with patch("app.model.analysis_blob_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.repository = AnalysisBlobRepository()
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisBlob.drop_collection()
+        AnalysisRecord.drop_collection()
+        disconnect()
+
+    def _age_blob(self, digest: str, seconds: int) -> None:
+        AnalysisBlob._get_collection().update_one(
+            {"_id": digest},
+            {"$set": {"last_referenced_at": datetime.now(UTC) - timedelta(seconds=seconds)}},
+        )
+
+    def test_store_blobs_writes_content_once(self):
+        """Test que valida que el mismo contenido se guarda una sola vez"""
+        digest = content_digest("config")
+
+        self.repository.store_blobs({digest: "config"})
+        first = AnalysisBlob._get_collection().find_one({"_id": digest})
+        self.repository.store_blobs({digest: "config"})
+
+        blobs = list(AnalysisBlob._get_collection().find())
+        assert len(blobs) == 1
+        assert blobs[0]["content"] == "config"
+        assert blobs[0]["size"] == 6
+        assert blobs[0]["created_at"] == first["created_at"]
+        assert blobs[0]["last_referenced_at"] >= first["last_referenced_at"]
+
+    def test_large_content_is_compressed(self):
+        """Test que valida que el contenido grande se guarda comprimido y se lee en claro"""
+        content = _config(1)
+        digest = content_digest(content)
+
+        self.repository.store_blobs({digest: content})
+
+        stored = AnalysisBlob._get_collection().find_one({"_id": digest})
+        assert stored["content"]["__codec__"] == "zlib"
+        assert stored["size"] == len(content.encode("utf-8"))
+        assert self.repository.get_content(digest) == content
+
+    def test_store_blobs_empty_is_noop(self):
+        """Test que valida que no se escribe nada sin blobs"""
+        with patch.object(AnalysisBlob, "_get_collection") as mock_collection:
+            self.repository.store_blobs({})
+
+        mock_collection.assert_not_called()
+
+    def test_resolve_content_single_lookup(self):
+        """Test que valida que resolver un registro cuesta una búsqueda por _id"""
+        stored, (digest, content) = externalize_content(_raw_response("a.txt", "config"))
+        self.repository.store_blobs({digest: content})
+
+        with patch.object(
+            self.repository, "get_content", wraps=self.repository.get_content
+        ) as mock_get_content:
+            resolved = self.repository.resolve_content(stored)
+
+        mock_get_content.assert_called_once_with(digest)
+        assert resolved["analysis_data"] == "config"
+
+    def test_resolve_content_without_reference(self):
+        """Test que valida que las respuestas sin referencia no consultan blobs"""
+        response = {"analysis_data": {"safe": True}}
+
+        with patch.object(self.repository, "get_content") as mock_get_content:
+            assert self.repository.resolve_content(response) is response
+
+        mock_get_content.assert_not_called()
+
+    def test_resolve_content_missing_blob(self):
+        """Test que valida el manejo de un blob inexistente"""
+        resolved = self.repository.resolve_content({"content_ref": "missing"})
+
+        assert resolved["analysis_data"] is None
+        self.repository.logger.warning.assert_called_once()
+
+    def test_collect_garbage_removes_only_unreferenced_blobs(self):
+        """Test que valida que solo se eliminan blobs sin referencias y fuera de gracia"""
+        referenced = content_digest("referenced")
+        orphan = content_digest("orphan")
+        recent_orphan = content_digest("recent")
+        self.repository.store_blobs(
+            {referenced: "referenced", orphan: "orphan", recent_orphan: "recent"}
+        )
+        self._age_blob(referenced, 7200)
+        self._age_blob(orphan, 7200)
+        AnalysisRecord(
+            success=True, response={"content_ref": referenced}, user="alice"
+        ).save()
+
+        deleted = self.repository.collect_garbage(grace_seconds=3600, batch_size=1)
+
+        remaining = {blob["_id"] for blob in AnalysisBlob._get_collection().find()}
+        assert deleted == 1
+        assert remaining == {referenced, recent_orphan}
+
+    def test_collect_garbage_error(self):
+        """Test que valida el error de MongoDB al recolectar"""
+        with patch.object(AnalysisBlob, "_get_collection", side_effect=Exception("caído")):
+            try:
+                self.repository.collect_garbage()
+                assert False, "Debería lanzar RuntimeError"
+            except RuntimeError as e:
+                assert "Error de MongoDB" in str(e)
+
+    def test_storage_savings_on_replayed_workload(self):
+        """Test que mide el ahorro de almacenamiento al reproducir una carga real"""
+        # 500 análisis sin IA sobre 20 configuraciones, con unas pocas muy repetidas
+        rng = random.Random(42)
+        configs = [_config(index) for index in range(20)]
+        weights = [1 / (rank + 1) for rank in range(len(configs))]
+        workload = rng.choices(range(len(configs)), weights=weights, k=500)
+
+        with patch("app.model.analysis_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            repository = AnalysisRepository(blob_repository=self.repository)
+
+        inline_bytes = 0
+        for index in workload:
+            response = _raw_response(f"switch-{index}.txt", configs[index])
+            inline_record = AnalysisRecord(success=True, response=response, user="alice")
+            inline_bytes += len(bson.encode(inline_record.to_mongo().to_dict()))
+            repository.save_analysis_record(True, response, "alice")
+
+        record_bytes = sum(
+            len(bson.encode(doc)) for doc in AnalysisRecord._get_collection().find()
+        )
+        blob_bytes = sum(len(bson.encode(doc)) for doc in AnalysisBlob._get_collection().find())
+        deduplicated_bytes = record_bytes + blob_bytes
+        savings = 1 - deduplicated_bytes / inline_bytes
+
+        print(
+            f"\nCarga reproducida: {len(workload)} análisis, {len(set(workload))} contenidos distintos"
+            f"\n  Inline:        {inline_bytes / 1024:.1f} KiB"
+            f"\n  Deduplicado:   {deduplicated_bytes / 1024:.1f} KiB"
+            f" (registros {record_bytes / 1024:.1f} KiB + blobs {blob_bytes / 1024:.1f} KiB)"
+            f"\n  Ahorro:        {savings:.1%}"
+        )
+
+        assert AnalysisBlob.objects.count() == len(set(workload))
+        assert savings > 0.8
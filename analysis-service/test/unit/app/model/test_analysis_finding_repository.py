@@ -0,0 +1,303 @@
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+import mongomock
+import pytest
+from mongoengine import connect, disconnect
+
+from app.model.analysis_finding_model import AnalysisFinding
+from app.model.analysis_finding_repository import AnalysisFindingRepository, build_findings
+from app.model.analysis_record_model import AnalysisRecord
+from app.services.payload_codec import payload_codec
+
+BASE_DATE = datetime(2024, 1, 1, 12, 0, 0)
+
+PROBLEMS = [
+    {
+        "problem": "Telnet habilitado en las líneas VTY",
+        "severity": "Crítica",
+        "recommendation": "Usar SSH",
+    },
+    {
+        "problem": "Contraseña enable en texto plano",
+        "severity": "alta",
+        "recommendation": "Usar enable secret",
+    },
+    {
+        "problem": "Comunidad SNMP 'public' por defecto",
+        "severity": "Alta",
+        "recommendation": "Usar SNMPv3",
+    },
+    {
+        "problem": "No hay servidor NTP configurado",
+        "severity": "baja",
+        "recommendation": "Configurar NTP",
+    },
+]
+
+
+def _ia_response(filename: str, problems: list) -> dict:
+    """Respuesta de un análisis con IA tal como la arma el caso de uso"""
+    return {
+        "filename": filename,
+        "gemini_response": True,
+        "analysis_data": {"security_level": "critical", "safe": False, "problems": problems},
+    }
+
+
+def _findings(user: str, minutes: int, filename: str = "router.txt") -> list:
+    created_at = BASE_DATE + timedelta(minutes=minutes)
+    return build_findings(
+        f"{user}-{minutes}", user, True, _ia_response(filename, PROBLEMS), created_at
+    )
+
+
+class TestBuildFindings:
+    """Tests para la construcción de hallazgos a partir de un análisis"""
+
+    def test_one_finding_per_problem(self):
+        """Test que valida la severidad normalizada y la categoría de cada problema"""
+        findings = build_findings("a1", "alice", True, _ia_response("r1.txt", PROBLEMS), BASE_DATE)
+
+        assert [(f["index"], f["severity"], f["category"]) for f in findings] == [
+            (0, "critical", "telnet"),
+            (1, "high", "password"),
+            (2, "high", "snmp"),
+            (3, "low", "ntp"),
+        ]
+        assert all(f["analysis_uuid"] == "a1" and f["filename"] == "r1.txt" for f in findings)
+        assert findings[0]["created_at"] == BASE_DATE
+
+    def test_compressed_problems_are_decoded(self):
+        """Test que valida que se generan hallazgos de problems comprimido"""
+        response = payload_codec.encode_response(_ia_response("r1.txt", PROBLEMS * 50))
+
+        assert len(build_findings("a1", "alice", True, response, BASE_DATE)) == 200
+
+    def test_no_findings_without_ia_analysis(self):
+        """Test que valida que errores y análisis sin IA no generan hallazgos"""
+        assert build_findings("a1", "alice", False, {"error": "boom"}, BASE_DATE) == []
+        assert build_findings("a1", "alice", True, {"analysis_data": "config"}, BASE_DATE) == []
+        assert build_findings("a1", "alice", True, None, BASE_DATE) == []
+
+
+class TestAnalysisFindingRepository:
+    """Tests para el repositorio de hallazgos"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+        with patch("app.model.analysis_finding_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.repository = AnalysisFindingRepository()
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisFinding.drop_collection()
+        AnalysisRecord.drop_collection()
+        disconnect()
+
+    def test_insert_findings_is_idempotent(self):
+        """Test que valida que reinsertar los hallazgos de un análisis no los duplica"""
+        AnalysisFinding.ensure_indexes()
+
+        assert self.repository.insert_findings(_findings("alice", 1)) == 4
+        assert self.repository.insert_findings(_findings("alice", 1)) == 0
+        assert self.repository.insert_findings([]) == 0
+        assert AnalysisFinding.objects.count() == 4
+
+    def test_find_findings_filters(self):
+        """Test que valida los filtros por severidad, categoría y archivo"""
+        self.repository.insert_findings(_findings("alice", 1, "r1.txt"))
+        self.repository.insert_findings(_findings("alice", 2, "r2.txt"))
+        self.repository.insert_findings(_findings("bob", 3, "r1.txt"))
+
+        critical_telnet, _ = self.repository.find_findings(
+            "alice", severities=["critical"], categories=["telnet"]
+        )
+        high, _ = self.repository.find_findings("alice", severities=["high"], filename="r1.txt")
+        recent, _ = self.repository.find_findings(
+            "alice", date_from=BASE_DATE + timedelta(minutes=2)
+        )
+
+        assert [f["analysis_uuid"] for f in critical_telnet] == ["alice-2", "alice-1"]
+        assert {f["category"] for f in high} == {"password", "snmp"}
+        assert all(f["filename"] == "r1.txt" and f["user"] == "alice" for f in high)
+        assert {f["analysis_uuid"] for f in recent} == {"alice-2"}
+
+    def test_keyset_pagination_with_shared_created_at(self):
+        """Test que valida que las páginas no repiten ni saltan hallazgos del mismo análisis"""
+        for minutes in range(5):
+            self.repository.insert_findings(_findings("alice", minutes))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.repository.find_findings("alice", limit=3, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        assert len(seen) == 20
+        assert len({f["_id"] for f in seen}) == 20
+        assert [f["created_at"] for f in seen] == sorted(
+            (f["created_at"] for f in seen), reverse=True
+        )
+
+    def test_invalid_cursor(self):
+        """Test que valida el error de cursor inválido"""
+        with pytest.raises(ValueError):
+            self.repository.find_findings("alice", cursor="no-es-un-cursor")
+
+    def test_find_findings_error(self):
+        """Test que valida el error de MongoDB al consultar hallazgos"""
+        with patch.object(AnalysisFinding, "_get_collection", side_effect=Exception("caído")):
+            with pytest.raises(RuntimeError, match="Error de MongoDB"):
+                self.repository.find_findings("alice")
+
+    def test_backfill_from_existing_records(self):
+        """Test que valida la generación de hallazgos de registros previos, repetible"""
+        AnalysisFinding.ensure_indexes()
+        for index in range(3):
+            AnalysisRecord(
+                success=True,
+                response=payload_codec.encode_response(_ia_response(f"r{index}.txt", PROBLEMS)),
+                user="alice",
+            ).save()
+        AnalysisRecord(success=False, response={"error": "boom"}, user="alice").save()
+        AnalysisRecord(success=True, response={"analysis_data": "config"}, user="alice").save()
+
+        assert self.repository.backfill(batch_size=2) == 12
+        assert self.repository.backfill(batch_size=2) == 0
+        assert AnalysisFinding.objects(severity="critical", category="telnet").count() == 3
+
+    def test_backfill_error(self):
+        """Test que valida el error de MongoDB al generar hallazgos"""
+        with patch.object(AnalysisRecord, "_get_collection", side_effect=Exception("caído")):
+            with pytest.raises(RuntimeError, match="Error de MongoDB"):
+                self.repository.backfill()
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+@pytest.mark.skipif(
+    not os.getenv("MONGODB_TEST_URL"),
+    reason="Requiere un mongod local en MONGODB_TEST_URL para medir consultas reales",
+)
+class TestFindingsQueryBenchmark:
+    """
+    Compara la consulta indexada de hallazgos contra el pipeline equivalente
+    que desenrolla response.analysis_data.problems en analysis_records
+
+    El tamaño se ajusta con FINDINGS_BENCHMARK_SIZE (por defecto 1M hallazgos,
+    10 por análisis, repartidos entre 100 usuarios).
+    """
+
+    PROBLEMS_PER_ANALYSIS = 10
+    USERS = 100
+
+    def setup_method(self):
+        connect(host=os.environ["MONGODB_TEST_URL"], alias="default")
+        AnalysisRecord.drop_collection()
+        AnalysisFinding.drop_collection()
+        AnalysisFinding.ensure_indexes()
+        AnalysisRecord.ensure_indexes()
+
+        total = int(os.getenv("FINDINGS_BENCHMARK_SIZE", "1000000"))
+        rng = random.Random(7)
+        catalog = PROBLEMS + [
+            {"problem": f"Interfaz sin descripción {n}", "severity": "media"} for n in range(6)
+        ]
+        records, findings = [], []
+        for number in range(total // self.PROBLEMS_PER_ANALYSIS):
+            user = f"user-{number % self.USERS}"
+            created_at = BASE_DATE + timedelta(seconds=number)
+            # Los registros de referencia guardan problems en claro, como antes de la compresión
+            response = _ia_response(
+                f"device-{number % 5000}.txt", rng.choices(catalog, k=self.PROBLEMS_PER_ANALYSIS)
+            )
+            records.append(
+                {
+                    "uuid": str(number),
+                    "success": True,
+                    "user": user,
+                    "created_at": created_at,
+                    "response": response,
+                }
+            )
+            findings.extend(build_findings(str(number), user, True, response, created_at))
+            if len(records) == 1000:
+                AnalysisRecord._get_collection().insert_many(records)
+                AnalysisFinding._get_collection().insert_many(findings)
+                records, findings = [], []
+        if records:
+            AnalysisRecord._get_collection().insert_many(records)
+            AnalysisFinding._get_collection().insert_many(findings)
+
+    def teardown_method(self):
+        AnalysisRecord.drop_collection()
+        AnalysisFinding.drop_collection()
+        disconnect()
+
+    def _best_of(self, run, repeat=5):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    def test_indexed_findings_beat_unwind_pipeline(self):
+        repository = AnalysisFindingRepository()
+        pipeline = [
+            {"$match": {"user": "user-42", "success": True, "response.gemini_response": True}},
+            {"$sort": {"created_at": -1}},
+            {"$unwind": "$response.analysis_data.problems"},
+            {
+                "$match": {
+                    "response.analysis_data.problems.severity": {
+                        "$in": ["Crítica", "crítica", "critica", "critical"]
+                    },
+                    "response.analysis_data.problems.problem": {
+                        "$regex": "telnet",
+                        "$options": "i",
+                    },
+                }
+            },
+            {"$limit": 20},
+        ]
+
+        indexed_seconds, (page, _) = self._best_of(
+            lambda: repository.find_findings(
+                "user-42", limit=20, severities=["critical"], categories=["telnet"]
+            )
+        )
+        pipeline_seconds, unwound = self._best_of(
+            lambda: list(AnalysisRecord._get_collection().aggregate(pipeline))
+        )
+        explain = (
+            AnalysisFinding._get_collection()
+            .find(
+                {
+                    "user": "user-42",
+                    "severity": {"$in": ["critical"]},
+                    "category": {"$in": ["telnet"]},
+                }
+            )
+            .sort("created_at", -1)
+            .limit(21)
+            .explain()
+        )
+
+        print(
+            f"\nHallazgos: {AnalysisFinding.objects.count()}"
+            f"\n  Colección indexada: {indexed_seconds * 1000:.2f} ms"
+            f"\n  Pipeline $unwind:   {pipeline_seconds * 1000:.2f} ms"
+        )
+
+        assert len(page) == len(unwound) == 20
+        assert explain["queryPlanner"]["winningPlan"]["stage"] != "SORT"
+        assert "COLLSCAN" not in str(explain["queryPlanner"]["winningPlan"])
+        assert indexed_seconds < pipeline_seconds
@@ -0,0 +1,196 @@
+import pytest
+from datetime import datetime, timedelta, UTC
+from unittest.mock import patch, MagicMock
+from mongoengine import connect, disconnect
+import mongomock
+
+from app.model.analysis_job_model import (
+    AnalysisJob,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED,
+)
+from app.model.analysis_job_repository import AnalysisJobRepository
+
+
+class TestAnalysisJobRepository:
+    """Tests para el repositorio AnalysisJobRepository"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+        with patch("app.model.analysis_job_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.repository = AnalysisJobRepository()
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisJob.drop_collection()
+        disconnect()
+
+    def test_create_job_is_pending(self):
+        """Test que valida que un trabajo nuevo queda pendiente"""
+        job = self.repository.create_job("config.txt", True, "test_user", "token")
+
+        stored = AnalysisJob.objects(uuid=job.uuid).first()
+        assert stored.status == JOB_STATUS_PENDING
+        assert stored.filename == "config.txt"
+        assert stored.enable_ia is True
+        assert stored.attempts == 0
+
+    def test_create_job_encrypts_token(self):
+        """Test que valida que el token se guarda cifrado y el worker lo recupera"""
+        job = self.repository.create_job("config.txt", True, "test_user", "token-secreto")
+
+        stored = AnalysisJob.objects(uuid=job.uuid).first()
+        assert stored.token != "token-secreto"
+        assert self.repository.job_token(stored) == "token-secreto"
+        assert self.repository.job_token(
+            self.repository.create_job("config.txt", True, "test_user", None)
+        ) is None
+
+    def test_get_job_restricted_to_owner(self):
+        """Test que valida que un usuario no puede consultar trabajos ajenos"""
+        job = self.repository.create_job("config.txt", False, "owner", "token")
+
+        assert self.repository.get_job(job.uuid, "owner") is not None
+        assert self.repository.get_job(job.uuid, "other_user") is None
+
+    def test_claim_next_job_oldest_first(self):
+        """Test que valida que se reclama el trabajo pendiente más antiguo"""
+        first = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.create_job("b.txt", False, "user", "token")
+
+        claimed = self.repository.claim_next_job("worker-1", 60, 3)
+
+        assert claimed.uuid == first.uuid
+        assert claimed.status == JOB_STATUS_RUNNING
+        assert claimed.worker_id == "worker-1"
+        assert claimed.attempts == 1
+
+    def test_claim_never_returns_same_job_twice(self):
+        """Test que valida que dos workers no reciben el mismo trabajo"""
+        self.repository.create_job("a.txt", False, "user", "token")
+
+        assert self.repository.claim_next_job("worker-1", 60, 3) is not None
+        assert self.repository.claim_next_job("worker-2", 60, 3) is None
+
+    def test_claim_expired_lease(self):
+        """Test que valida que un trabajo con lease vencido se puede retomar"""
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 3)
+        AnalysisJob.objects(uuid=job.uuid).update_one(
+            set__lease_expires_at=datetime.now(UTC) - timedelta(seconds=1)
+        )
+
+        reclaimed = self.repository.claim_next_job("worker-2", 60, 3)
+
+        assert reclaimed.uuid == job.uuid
+        assert reclaimed.worker_id == "worker-2"
+        assert reclaimed.attempts == 2
+
+    def test_claim_respects_max_attempts(self):
+        """Test que valida que no se reclaman trabajos sin intentos restantes"""
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 1)
+        AnalysisJob.objects(uuid=job.uuid).update_one(
+            set__lease_expires_at=datetime.now(UTC) - timedelta(seconds=1)
+        )
+
+        assert self.repository.claim_next_job("worker-2", 60, 1) is None
+        assert self.repository.fail_exhausted_jobs(1) == 1
+        assert AnalysisJob.objects(uuid=job.uuid).first().status == JOB_STATUS_FAILED
+
+    def test_complete_job_clears_token(self):
+        """Test que valida que completar un trabajo guarda el resultado y borra el token"""
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 3)
+
+        assert self.repository.complete_job(job.uuid, "worker-1", {"success": True})
+
+        stored = AnalysisJob.objects(uuid=job.uuid).first()
+        assert stored.status == JOB_STATUS_COMPLETED
+        assert stored.result == {"success": True}
+        assert stored.token is None
+        assert stored.finished_at is not None
+
+    def test_finished_job_expires_after_retention(self):
+        """Test que valida que un trabajo terminado recibe la fecha de expiración del TTL"""
+        self.repository.retention_days = 7
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 3)
+
+        assert AnalysisJob.objects(uuid=job.uuid).first().expires_at is None
+        assert self.repository.fail_job(job.uuid, "worker-1", "error")
+
+        stored = AnalysisJob.objects(uuid=job.uuid).first()
+        assert stored.expires_at - stored.finished_at == timedelta(days=7)
+
+    def test_exhausted_job_expires_after_retention(self):
+        """Test que valida que los trabajos con intentos agotados también expiran"""
+        self.repository.retention_days = 7
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 1)
+        AnalysisJob.objects(uuid=job.uuid).update_one(
+            set__lease_expires_at=datetime.now(UTC) - timedelta(seconds=1)
+        )
+
+        assert self.repository.fail_exhausted_jobs(1) == 1
+
+        stored = AnalysisJob.objects(uuid=job.uuid).first()
+        assert stored.expires_at - stored.finished_at == timedelta(days=7)
+
+    def test_finished_job_without_retention_never_expires(self):
+        """Test que valida que ANALYSIS_JOB_RETENTION_DAYS=0 desactiva la expiración"""
+        self.repository.retention_days = 0
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 3)
+
+        assert self.repository.complete_job(job.uuid, "worker-1", {"success": True})
+        assert AnalysisJob.objects(uuid=job.uuid).first().expires_at is None
+
+    def test_retention_days_from_environment(self):
+        """Test que valida la lectura de ANALYSIS_JOB_RETENTION_DAYS"""
+        with patch.dict("os.environ", {"ANALYSIS_JOB_RETENTION_DAYS": "3"}), \
+             patch("app.model.analysis_job_repository.Logger"):
+            assert AnalysisJobRepository().retention_days == 3
+
+    def test_finish_job_rejects_other_worker(self):
+        """Test que valida que un worker no puede cerrar un trabajo que ya no posee"""
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 3)
+
+        assert self.repository.fail_job(job.uuid, "worker-2", "error") is False
+        assert AnalysisJob.objects(uuid=job.uuid).first().status == JOB_STATUS_RUNNING
+
+    def test_renew_lease_only_for_owner(self):
+        """Test que valida que solo el worker dueño extiende el lease del trabajo"""
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 1, 3)
+        before = AnalysisJob.objects(uuid=job.uuid).first().lease_expires_at
+
+        assert self.repository.renew_lease(job.uuid, "worker-1", 60) is True
+        assert AnalysisJob.objects(uuid=job.uuid).first().lease_expires_at > before
+        assert self.repository.renew_lease(job.uuid, "worker-2", 60) is False
+
+    def test_stale_worker_cannot_finish_reclaimed_job(self):
+        """Test que valida que un worker cuyo lease venció no cierra el trabajo retomado"""
+        job = self.repository.create_job("a.txt", False, "user", "token")
+        self.repository.claim_next_job("worker-1", 60, 3)
+        AnalysisJob.objects(uuid=job.uuid).update_one(
+            set__lease_expires_at=datetime.now(UTC) - timedelta(seconds=1)
+        )
+        self.repository.claim_next_job("worker-2", 60, 3)
+
+        assert self.repository.complete_job(job.uuid, "worker-1", {"success": True}) is False
+        assert self.repository.renew_lease(job.uuid, "worker-1", 60) is False
+        assert AnalysisJob.objects(uuid=job.uuid).first().worker_id == "worker-2"
+
+    def test_create_job_mongodb_error(self):
+        """Test que valida el manejo de errores al crear un trabajo"""
+        with patch("app.model.analysis_job_repository.AnalysisJob") as mock_job_class:
+            mock_job_class.return_value.save.side_effect = Exception("Connection failed")
+
+            with pytest.raises(RuntimeError, match="Error de MongoDB: Connection failed"):
+                self.repository.create_job("a.txt", False, "user", "token")
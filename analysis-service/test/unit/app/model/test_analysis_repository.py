@@ -1,7 +1,23 @@
+import os
 import pytest
+import asyncio
+import time
+from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
-from app.model.analysis_repository import AnalysisRepository
+from mongoengine import connect, disconnect
+import mongomock
+from app.model.analysis_repository import (
+    DEFAULT_EXPORT_FIELDS,
+    AnalysisRepository,
+    AsyncAnalysisRepository,
+)
+from app.model.pagination import decode_cursor, encode_cursor
 from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_blob_model import AnalysisBlob
+from app.model.analysis_rollup_model import AnalysisRollup
+from app.model.analysis_finding_model import AnalysisFinding
+from app.model.analysis_archive_model import AnalysisArchive
+from app.model.retention_repository import RetentionRepository
 
 
 class TestAnalysisRepository:
@@ -607,3 +623,565 @@ class TestAnalysisRepository:
 
             # Verificar el resultado
             assert result == mock_record
+
+
+class _SlowMongoRepository(AnalysisRepository):
+    """Sustituto en memoria que simula el round trip bloqueante de pymongo"""
+
+    ROUND_TRIP_SECONDS = 0.1
+
+    def save_analysis_record(self, success, response, user, record_id=None):
+        time.sleep(self.ROUND_TRIP_SECONDS)
+        return super().save_analysis_record(success, response, user, record_id)
+
+
+async def _max_loop_lag(save_coroutine_factory, writes: int = 5) -> float:
+    """Ejecuta escrituras concurrentes y mide el mayor retraso del event loop"""
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await asyncio.gather(*[save_coroutine_factory() for _ in range(writes)])
+    stop.set()
+    await ticker_task
+    return max(lags)
+
+
+class TestAsyncAnalysisRepository:
+    """Tests para el repositorio asíncrono AsyncAnalysisRepository"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisRecord.drop_collection()
+        disconnect()
+
+    @pytest.mark.asyncio
+    async def test_save_analysis_record_persists_same_document(self):
+        """Test que valida que se guarda el mismo documento que la versión síncrona"""
+        repository = AsyncAnalysisRepository()
+
+        record = await repository.save_analysis_record(
+            True, {"filename": "config.txt"}, "test_user"
+        )
+
+        stored = AnalysisRecord.objects(uuid=record.uuid).first()
+        assert stored.user == "test_user"
+        assert stored.success is True
+        assert stored.response == {"filename": "config.txt"}
+
+    @pytest.mark.asyncio
+    async def test_save_analysis_record_propagates_errors(self):
+        """Test que valida que los errores de MongoDB se propagan igual que antes"""
+        repository = AsyncAnalysisRepository()
+
+        with patch("app.model.analysis_repository.AnalysisRecord") as mock_record_class:
+            mock_record_class.return_value.save.side_effect = Exception("Connection failed")
+
+            with pytest.raises(RuntimeError, match="Error de MongoDB: Connection failed"):
+                await repository.save_analysis_record(True, {}, "test_user")
+
+    @pytest.mark.asyncio
+    async def test_event_loop_blocking_before_and_after(self):
+        """Test que compara el bloqueo del event loop entre la versión síncrona y la asíncrona"""
+        slow_repository = _SlowMongoRepository()
+        async_repository = AsyncAnalysisRepository(slow_repository)
+
+        async def blocking_save():
+            slow_repository.save_analysis_record(True, {"data": "x"}, "test_user")
+
+        async def non_blocking_save():
+            await async_repository.save_analysis_record(True, {"data": "x"}, "test_user")
+
+        blocking_lag = await _max_loop_lag(blocking_save)
+        non_blocking_lag = await _max_loop_lag(non_blocking_save)
+
+        # Antes: el loop queda detenido durante todo el round trip de cada escritura
+        assert blocking_lag >= _SlowMongoRepository.ROUND_TRIP_SECONDS * 0.9
+        # Después: el loop sigue atendiendo mientras las escrituras están en curso
+        assert non_blocking_lag < _SlowMongoRepository.ROUND_TRIP_SECONDS / 2
+        assert AnalysisRecord.objects.count() == 10
+
+
+BASE_DATE = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _insert(user, minutes, success=True, security_level="high", ia=True):
+    """Inserta un registro con created_at controlado"""
+    analysis_data = (
+        {"security_level": security_level, "safe": False, "problems": [{"problem": "x" * 100}]}
+        if ia
+        else "interface eth0\n" * 100
+    )
+    record = AnalysisRecord(
+        success=success,
+        user=user,
+        response={"filename": f"file_{minutes}.txt", "analysis_data": analysis_data, "gemini_response": ia},
+        created_at=BASE_DATE + timedelta(minutes=minutes),
+    )
+    record.save()
+    return record
+
+
+def _archive(record):
+    """Mueve un registro a analysis_archive como lo hace RetentionRepository"""
+    collection = AnalysisRecord._get_collection()
+    document = collection.find_one({"uuid": record.uuid})
+    AnalysisArchive._get_collection().insert_one(RetentionRepository._to_archive(document))
+    collection.delete_one({"_id": document["_id"]})
+
+
+class TestAnalysisHistoryQueries:
+    """Tests para las consultas de historial de AnalysisRepository"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+        with patch("app.model.analysis_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.repository = AnalysisRepository()
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisRecord.drop_collection()
+        AnalysisBlob.drop_collection()
+        AnalysisRollup.drop_collection()
+        AnalysisFinding.drop_collection()
+        AnalysisArchive.drop_collection()
+        disconnect()
+
+    def _all_pages(self, **filters):
+        items, cursor, pages = [], None, 0
+        while True:
+            page, cursor = self.repository.find_analyses_by_user("alice", cursor=cursor, **filters)
+            items.extend(page)
+            pages += 1
+            if cursor is None:
+                return items, pages
+
+    def test_find_analysis_restricted_to_user(self):
+        """Test que valida que solo el dueño puede leer un registro"""
+        record = _insert("alice", 1)
+
+        assert self.repository.find_analysis(record.uuid, "alice")["uuid"] == record.uuid
+        assert self.repository.find_analysis(record.uuid, "bob") is None
+
+    def test_pagination_newest_first_without_gaps(self):
+        """Test que valida que la paginación recorre todo el historial en orden"""
+        for minutes in range(7):
+            _insert("alice", minutes)
+        _insert("bob", 3)
+
+        items, pages = self._all_pages(limit=3)
+
+        assert pages == 3
+        assert [item["response"]["filename"] for item in items] == [
+            f"file_{minutes}.txt" for minutes in reversed(range(7))
+        ]
+
+    def test_pagination_with_identical_created_at(self):
+        """Test que valida que los empates de created_at no pierden ni repiten registros"""
+        uuids = {_insert("alice", 5).uuid for _ in range(5)}
+        _insert("alice", 1)
+
+        items, _ = self._all_pages(limit=2)
+
+        assert len(items) == 6
+        assert {item["uuid"] for item in items[:5]} == uuids
+
+    def test_projection_excludes_payload(self):
+        """Test que valida que los listados no cargan el payload completo"""
+        _insert("alice", 1, ia=True)
+        _insert("alice", 2, ia=False)
+
+        items, _ = self.repository.find_analyses_by_user("alice")
+
+        assert "problems" not in items[1]["response"]["analysis_data"]
+        assert items[1]["response"]["analysis_data"]["security_level"] == "high"
+        assert "analysis_data" not in items[0]["response"]
+
+    def test_filters(self):
+        """Test que valida los filtros de éxito, severidad y rango de fechas"""
+        _insert("alice", 1, security_level="critical")
+        _insert("alice", 2, security_level="low")
+        _insert("alice", 3, success=False)
+        _insert("alice", 10, security_level="critical")
+
+        failed, _ = self.repository.find_analyses_by_user("alice", success=False)
+        critical, _ = self.repository.find_analyses_by_user(
+            "alice", security_levels=["critical"]
+        )
+        in_range, _ = self.repository.find_analyses_by_user(
+            "alice",
+            date_from=BASE_DATE + timedelta(minutes=2),
+            date_to=BASE_DATE + timedelta(minutes=5),
+        )
+
+        assert len(failed) == 1
+        assert len(critical) == 2
+        assert [item["response"]["filename"] for item in in_range] == [
+            "file_3.txt",
+            "file_2.txt",
+        ]
+
+    def test_history_includes_archived_analyses(self):
+        """Test que valida que el historial mezcla por fecha los análisis archivados"""
+        records = [_insert("alice", minutes) for minutes in range(6)]
+        for record in records[:3]:
+            _archive(record)
+        # Archivado interrumpido: el resumen ya existe pero el registro no se borró
+        AnalysisArchive._get_collection().insert_one(
+            RetentionRepository._to_archive(
+                AnalysisRecord._get_collection().find_one({"uuid": records[3].uuid})
+            )
+        )
+
+        items, pages = self._all_pages(limit=2)
+
+        assert [item["uuid"] for item in items] == [record.uuid for record in reversed(records)]
+        assert pages == 3
+        assert items[-1]["response"]["analysis_data"]["security_level"] == "high"
+
+    def test_history_filters_apply_to_archived_analyses(self):
+        """Test que valida que los filtros del historial también aplican al archivo"""
+        _archive(_insert("alice", 1, security_level="critical"))
+        _archive(_insert("alice", 2, security_level="low"))
+        _insert("alice", 3, security_level="critical")
+
+        critical, _ = self.repository.find_analyses_by_user(
+            "alice", security_levels=["critical"]
+        )
+        failed, _ = self.repository.find_analyses_by_user("alice", success=False)
+
+        assert [item["response"]["filename"] for item in critical] == [
+            "file_3.txt",
+            "file_1.txt",
+        ]
+        assert failed == []
+
+    def test_cursor_roundtrip_and_invalid(self):
+        """Test que valida la codificación de cursores y el rechazo de cursores inválidos"""
+        record = _insert("alice", 1)
+        stored = AnalysisRecord._get_collection().find_one({"uuid": record.uuid})
+
+        created_at, seen_ids = decode_cursor(encode_cursor(stored["created_at"], [stored["_id"]]))
+
+        assert created_at == stored["created_at"]
+        assert seen_ids == [stored["_id"]]
+        with pytest.raises(ValueError, match="Cursor de paginación inválido"):
+            self.repository.find_analyses_by_user("alice", cursor="no-es-un-cursor")
+
+    def test_save_raw_content_references_blob(self):
+        """Test que valida que el contenido sin IA se guarda aparte y se resuelve al leer"""
+        response = {
+            "filename": "switch.txt",
+            "analysis_data": "hostname Switch\n" * 50,
+            "gemini_response": False,
+        }
+
+        first = self.repository.save_analysis_record(True, response, "alice")
+        self.repository.save_analysis_record(True, dict(response), "alice")
+
+        stored = AnalysisRecord._get_collection().find_one({"uuid": first.uuid})
+        assert "analysis_data" not in stored["response"]
+        assert AnalysisBlob.objects.count() == 1
+        assert AnalysisBlob.objects.first().sha256 == stored["response"]["content_ref"]
+
+        detail = self.repository.find_analysis(first.uuid, "alice")
+        assert detail["response"]["analysis_data"] == response["analysis_data"]
+
+    def test_large_ia_response_is_compressed_at_rest(self):
+        """Test que valida que los problemas grandes se comprimen y solo se leen al pedir el detalle"""
+        problems = [{"problem": "Telnet habilitado en line vty", "severity": "alta"}] * 100
+        response = {
+            "filename": "switch.txt",
+            "analysis_data": {"security_level": "high", "safe": False, "problems": problems},
+            "gemini_response": True,
+        }
+
+        record = self.repository.save_analysis_record(True, response, "alice")
+
+        stored = AnalysisRecord._get_collection().find_one({"uuid": record.uuid})
+        assert stored["response"]["analysis_data"]["problems"]["__codec__"] == "zlib"
+        items, _ = self.repository.find_analyses_by_user("alice", security_levels=["high"])
+        assert items[0]["response"]["analysis_data"] == {"security_level": "high", "safe": False}
+        detail = self.repository.find_analysis(record.uuid, "alice")
+        assert detail["response"]["analysis_data"]["problems"] == problems
+
+    def test_save_sets_expiration_by_record_type(self):
+        """Test que valida que errores y contenido sin IA expiran y los análisis con IA no"""
+        error = self.repository.save_analysis_record(False, {"error": "boom"}, "alice")
+        raw = self.repository.save_analysis_record(
+            True, {"analysis_data": "hostname Switch", "gemini_response": False}, "alice"
+        )
+        ia = self.repository.save_analysis_record(
+            True, {"analysis_data": {"safe": True, "problems": []}, "gemini_response": True}, "alice"
+        )
+
+        collection = AnalysisRecord._get_collection()
+        assert collection.find_one({"uuid": error.uuid})["expires_at"] is not None
+        assert collection.find_one({"uuid": raw.uuid})["expires_at"] is not None
+        assert "expires_at" not in collection.find_one({"uuid": ia.uuid})
+
+    def test_save_updates_daily_rollup(self):
+        """Test que valida que cada registro guardado incrementa el contador del día"""
+        self.repository.save_analysis_record(
+            True,
+            {
+                "gemini_response": True,
+                "analysis_data": {"security_level": "Alta", "problems": [{"severity": "alta"}]},
+            },
+            "alice",
+        )
+        self.repository.save_analysis_record(False, {"error": "boom"}, "alice")
+
+        rollup = AnalysisRollup._get_collection().find_one({"user": "alice"})
+        assert (rollup["total"], rollup["successful"], rollup["failed"]) == (2, 1, 1)
+        assert rollup["security_levels"] == {"high": 1}
+        assert rollup["severities"] == {"high": 1}
+
+    def test_save_writes_findings(self):
+        """Test que valida que cada problema del análisis se guarda como hallazgo"""
+        record = self.repository.save_analysis_record(
+            True,
+            {
+                "filename": "router.txt",
+                "gemini_response": True,
+                "analysis_data": {
+                    "security_level": "critical",
+                    "problems": [
+                        {"problem": "Telnet habilitado", "severity": "Crítica"},
+                        {"problem": "Sin servidor NTP", "severity": "baja"},
+                    ],
+                },
+            },
+            "alice",
+        )
+
+        findings = list(AnalysisFinding._get_collection().find().sort("index", 1))
+        assert [(f["severity"], f["category"]) for f in findings] == [
+            ("critical", "telnet"),
+            ("low", "ntp"),
+        ]
+        assert all(f["analysis_uuid"] == record.uuid for f in findings)
+
+    def test_save_with_existing_record_id_is_idempotent(self):
+        """Test que valida que repetir un registro con el mismo UUID no lo duplica"""
+        response = {
+            "gemini_response": True,
+            "analysis_data": {"problems": [{"problem": "Telnet habilitado", "severity": "alta"}]},
+        }
+
+        first = self.repository.save_analysis_record(True, response, "alice", "job-1")
+        second = self.repository.save_analysis_record(True, response, "alice", "job-1")
+
+        assert first.uuid == second.uuid == "job-1"
+        assert AnalysisRecord.objects(uuid="job-1").count() == 1
+        assert AnalysisRollup._get_collection().find_one({"user": "alice"})["total"] == 1
+        assert AnalysisFinding._get_collection().count_documents({}) == 1
+
+    def test_rollup_error_does_not_fail_save(self):
+        """Test que valida que un error en los contadores no impide guardar el registro"""
+        self.repository.rollup_repository = MagicMock()
+        self.repository.rollup_repository.apply.side_effect = Exception("caído")
+
+        record = self.repository.save_analysis_record(False, {"error": "boom"}, "alice")
+
+        assert AnalysisRecord.objects(uuid=record.uuid).count() == 1
+
+    def test_find_analysis_inline_content_is_compatible(self):
+        """Test que valida que los registros antiguos con contenido inline se siguen leyendo"""
+        record = _insert("alice", 1, ia=False)
+
+        detail = self.repository.find_analysis(record.uuid, "alice")
+
+        assert detail["response"]["analysis_data"] == "interface eth0\n" * 100
+
+
+class TestAnalysisExport:
+    """Tests para la exportación por lotes de AnalysisRepository"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+        with patch("app.model.analysis_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.repository = AnalysisRepository(
+                rollup_repository=MagicMock(), finding_repository=MagicMock()
+            )
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisRecord.drop_collection()
+        AnalysisBlob.drop_collection()
+        AnalysisArchive.drop_collection()
+        disconnect()
+
+    def test_export_includes_archived_analyses(self):
+        """Test que valida que la exportación incluye los archivados, en orden y sin problemas"""
+        records = [_insert("alice", minutes) for minutes in range(4)]
+        _archive(records[0])
+        _archive(records[2])
+
+        rows = [
+            row
+            for batch in self.repository.export_analyses(
+                "alice", fields=["analysis_id", "security_level", "problems"], batch_size=3
+            )
+            for row in batch
+        ]
+
+        assert [row["analysis_id"] for row in rows] == [record.uuid for record in records]
+        assert rows[0]["security_level"] == "high"
+        assert rows[0]["problems"] is None
+        assert rows[1]["problems"] == [{"problem": "x" * 100}]
+
+    def test_export_in_fixed_batches_oldest_first(self):
+        """Test que valida los lotes de tamaño fijo, el orden y los campos por defecto"""
+        for minutes in range(7):
+            _insert("alice", minutes)
+        _insert("bob", 3)
+
+        batches = list(self.repository.export_analyses("alice", batch_size=3))
+
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        rows = [row for batch in batches for row in batch]
+        assert [row["filename"] for row in rows] == [f"file_{minutes}.txt" for minutes in range(7)]
+        assert set(rows[0]) == {
+            "analysis_id",
+            "success",
+            "created_at",
+            "filename",
+            "gemini_response",
+            "error",
+            "security_level",
+            "safe",
+        }
+        assert rows[0]["security_level"] == "high"
+
+    def test_export_projection_dates_and_compressed_problems(self):
+        """Test que valida la proyección, el filtro de fechas y los problemas descomprimidos"""
+        problems = [{"problem": "Telnet habilitado " * 20, "severity": "alta"}] * 10
+        record = self.repository.save_analysis_record(
+            True, {"gemini_response": True, "analysis_data": {"problems": problems}}, "alice"
+        )
+        _insert("alice", 1)
+
+        rows = [
+            row
+            for batch in self.repository.export_analyses(
+                "alice", fields=["analysis_id", "problems"], date_from=BASE_DATE + timedelta(days=1)
+            )
+            for row in batch
+        ]
+
+        assert rows == [{"analysis_id": record.uuid, "problems": problems}]
+
+    def test_export_closes_cursor_when_abandoned(self):
+        """Test que valida que el cursor se cierra si la descarga se interrumpe"""
+        cursor = MagicMock()
+        cursor.__iter__.return_value = iter(
+            [
+                {"_id": index, "uuid": str(index), "created_at": BASE_DATE}
+                for index in range(10)
+            ]
+        )
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value.batch_size.return_value = cursor
+
+        with patch.object(AnalysisRecord, "_get_collection", return_value=collection):
+            batches = self.repository.export_analyses("alice", batch_size=2)
+            first = next(batches)
+            batches.close()
+
+        assert first == [
+            {**dict.fromkeys(DEFAULT_EXPORT_FIELDS), "analysis_id": "0", "created_at": BASE_DATE},
+            {**dict.fromkeys(DEFAULT_EXPORT_FIELDS), "analysis_id": "1", "created_at": BASE_DATE},
+        ]
+        collection.find.return_value.sort.return_value.batch_size.assert_called_once_with(2)
+        cursor.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_async_export_yields_batches(self):
+        """Test que valida que la versión asíncrona entrega los mismos lotes"""
+        for minutes in range(5):
+            _insert("alice", minutes)
+        repository = AsyncAnalysisRepository(self.repository)
+
+        batches = [
+            batch async for batch in repository.export_analyses("alice", batch_size=2)
+        ]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not os.getenv("MONGODB_TEST_URL"),
+    reason="Requiere un mongod local en MONGODB_TEST_URL para ejecutar explain()",
+)
+class TestAnalysisHistoryQueryPlans:
+    """Verifica con explain() que las consultas de historial usan índices"""
+
+    def setup_method(self):
+        connect(host=os.environ["MONGODB_TEST_URL"], alias="default")
+        AnalysisRecord.drop_collection()
+        AnalysisRecord.ensure_indexes()
+        for minutes in range(50):
+            _insert("alice" if minutes % 2 else "bob", minutes, success=minutes % 5 != 0)
+
+    def teardown_method(self):
+        AnalysisRecord.drop_collection()
+        disconnect()
+
+    def _stages(self, plan):
+        stages = [plan.get("stage")]
+        for key in ("inputStage", "queryPlan"):
+            if key in plan:
+                stages.extend(self._stages(plan[key]))
+        for child in plan.get("inputStages", []):
+            stages.extend(self._stages(child))
+        return stages
+
+    def _winning_stages(self, query, sort=("created_at", -1)):
+        explain = (
+            AnalysisRecord._get_collection()
+            .find(query)
+            .sort(*sort)
+            .limit(21)
+            .explain()
+        )
+        return self._stages(explain["queryPlanner"]["winningPlan"])
+
+    def test_history_queries_use_user_created_at_index(self):
+        repository = AnalysisRepository()
+        _, cursor = repository.find_analyses_by_user("alice", limit=5)
+        queries = [
+            repository._build_history_query("alice", None, None, None, None, None),
+            repository._build_history_query("alice", cursor, None, None, None, None),
+            repository._build_history_query("alice", None, False, ["high"], BASE_DATE, None),
+        ]
+
+        for query in queries:
+            stages = self._winning_stages(query)
+            assert "COLLSCAN" not in stages
+            assert "IXSCAN" in stages
+            # El índice (user, created_at) entrega el orden: no hay SORT en memoria
+            assert "SORT" not in stages
+
+    def test_find_analysis_uses_uuid_index(self):
+        explain = AnalysisRecord._get_collection().find({"uuid": "x", "user": "alice"}).explain()
+        stages = self._stages(explain["queryPlanner"]["winningPlan"])
+
+        assert "COLLSCAN" not in stages
+        assert "IXSCAN" in stages
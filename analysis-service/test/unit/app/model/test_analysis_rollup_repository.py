@@ -0,0 +1,258 @@
+import pytest
+from datetime import date, datetime, timedelta, UTC
+from unittest.mock import patch, MagicMock
+
+import mongomock
+from mongoengine import connect, disconnect
+
+from app.model.analysis_archive_model import AnalysisArchive
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_rollup_model import AnalysisRollup
+from app.model.retention_policy import RetentionPolicy
+from app.model.analysis_rollup_repository import (
+    AnalysisRollupRepository,
+    day_range,
+    rollup_day,
+    rollup_increments,
+)
+from app.services.payload_codec import payload_codec
+
+
+def _ia_response(security_level: str, severities: list) -> dict:
+    """Respuesta de un análisis con IA tal como la arma el caso de uso"""
+    return {
+        "filename": "router.txt",
+        "gemini_response": True,
+        "analysis_data": {
+            "security_level": security_level,
+            "safe": security_level == "safe",
+            "problems": [{"severity": severity} for severity in severities],
+        },
+    }
+
+
+class TestRollupIncrements:
+    """Tests para el cálculo de incrementos de un registro"""
+
+    def test_ia_analysis_counts_levels_and_severities(self):
+        """Test que valida la normalización de nivel y severidades"""
+        increments = rollup_increments(True, _ia_response("Alta", ["Crítica", "alta", "alta", "?"]))
+
+        assert increments == {
+            "total": 1,
+            "successful": 1,
+            "with_ia": 1,
+            "security_levels.high": 1,
+            "severities.critical": 1,
+            "severities.high": 2,
+            "severities.unknown": 1,
+        }
+
+    def test_compressed_problems_are_decoded(self):
+        """Test que valida que se cuentan los problemas almacenados comprimidos"""
+        response = payload_codec.encode_response(_ia_response("low", ["baja"] * 200))
+
+        assert rollup_increments(True, response)["severities.low"] == 200
+
+    def test_archived_summary_uses_severity_counts(self):
+        """Test que valida que los resúmenes archivados usan severity_counts"""
+        response = {
+            "gemini_response": True,
+            "analysis_data": {"security_level": "safe", "severity_counts": {"low": 3}},
+        }
+
+        assert rollup_increments(True, response)["severities.low"] == 3
+
+    @pytest.mark.parametrize(
+        "problems",
+        [
+            ["texto suelto", None, {"severity": "alta"}, 3],
+            "no es una lista",
+            None,
+        ],
+    )
+    def test_malformed_problems_are_skipped(self, problems):
+        """Test que valida que las entradas de problems que no son objetos se ignoran"""
+        response = {
+            "gemini_response": True,
+            "analysis_data": {"security_level": "alta", "problems": problems},
+        }
+
+        increments = rollup_increments(True, response)
+
+        assert increments["with_ia"] == 1
+        expected = 1 if isinstance(problems, list) else 0
+        assert increments.get("severities.high", 0) == expected
+        assert "severities.unknown" not in increments
+
+    def test_failed_and_raw_analyses(self):
+        """Test que valida los análisis con error y sin IA"""
+        assert rollup_increments(False, {"error": "boom"}) == {"total": 1, "failed": 1}
+        assert rollup_increments(True, {"analysis_data": "config"}) == {
+            "total": 1,
+            "successful": 1,
+        }
+
+    def test_rollup_day_is_utc(self):
+        """Test que valida que el día se calcula en UTC"""
+        created_at = datetime(2024, 1, 1, 23, 30, tzinfo=UTC) + timedelta(hours=1)
+
+        assert rollup_day(created_at) == "2024-01-02"
+        assert rollup_day(datetime(2024, 1, 1, 23, 30)) == "2024-01-01"
+
+    def test_day_range_defaults(self):
+        """Test que valida el rango por defecto"""
+        assert day_range(None, date(2024, 1, 10), default_days=10) == ("2024-01-01", "2024-01-10")
+        assert day_range(date(2024, 1, 5), date(2024, 1, 6), default_days=10) == (
+            "2024-01-05",
+            "2024-01-06",
+        )
+
+
+class TestAnalysisRollupRepository:
+    """Tests para el repositorio de contadores diarios"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+        with patch("app.model.analysis_rollup_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.repository = AnalysisRollupRepository()
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisRollup.drop_collection()
+        AnalysisRecord.drop_collection()
+        AnalysisArchive.drop_collection()
+        disconnect()
+
+    def test_apply_merges_and_increments(self):
+        """Test que valida que los incrementos del mismo día se acumulan con $inc"""
+        first = rollup_increments(True, _ia_response("high", ["alta"]))
+        second = rollup_increments(False, {"error": "boom"})
+
+        self.repository.apply([("alice", "2024-01-01", first), ("alice", "2024-01-01", second)])
+        self.repository.apply([("alice", "2024-01-01", first), ("bob", "2024-01-01", second)])
+
+        rollup = AnalysisRollup._get_collection().find_one({"user": "alice"})
+        assert AnalysisRollup._get_collection().count_documents({}) == 2
+        assert rollup["total"] == 3
+        assert rollup["failed"] == 1
+        assert rollup["security_levels"] == {"high": 2}
+        assert rollup["severities"] == {"high": 2}
+
+    def test_apply_empty_is_noop(self):
+        """Test que valida que no se escribe nada sin incrementos"""
+        with patch.object(AnalysisRollup, "_get_collection") as mock_collection:
+            self.repository.apply([])
+
+        mock_collection.assert_not_called()
+
+    def test_get_stats_filters_user_and_range(self):
+        """Test que valida el filtro por usuario y rango de días"""
+        increments = {"total": 1, "successful": 1}
+        self.repository.apply(
+            [
+                ("alice", "2024-01-03", increments),
+                ("alice", "2024-01-01", increments),
+                ("alice", "2024-02-01", increments),
+                ("bob", "2024-01-02", increments),
+            ]
+        )
+
+        stats = self.repository.get_stats("alice", "2024-01-01", "2024-01-31")
+
+        assert [rollup["day"] for rollup in stats] == ["2024-01-01", "2024-01-03"]
+        assert "_id" not in stats[0]
+
+    def test_get_stats_error(self):
+        """Test que valida el error de MongoDB al leer contadores"""
+        with patch.object(AnalysisRollup, "_get_collection", side_effect=Exception("caído")):
+            try:
+                self.repository.get_stats("alice", "2024-01-01", "2024-01-31")
+                assert False, "Debería lanzar RuntimeError"
+            except RuntimeError as e:
+                assert "Error de MongoDB" in str(e)
+
+    def test_rebuild_from_records_and_archive(self):
+        """Test que valida la reconstrucción por lotes sin tocar el día actual"""
+        yesterday = datetime.now(UTC) - timedelta(days=1)
+        AnalysisRecord(
+            success=True,
+            response=_ia_response("high", ["alta", "media"]),
+            user="alice",
+            created_at=yesterday,
+        ).save()
+        AnalysisRecord(success=False, response={"error": "boom"}, user="alice", created_at=yesterday).save()
+        AnalysisRecord(success=True, response={"analysis_data": "x"}, user="alice").save()
+        AnalysisArchive(
+            uuid="archived",
+            success=True,
+            user="bob",
+            created_at=datetime(2023, 6, 1),
+            response={
+                "gemini_response": True,
+                "analysis_data": {"security_level": "low", "severity_counts": {"low": 2}},
+            },
+        ).save()
+        # Un contador desfasado del día anterior se reemplaza, no se suma
+        self.repository.apply([("alice", rollup_day(yesterday), {"total": 50})])
+
+        written = self.repository.rebuild(batch_size=1, days=0)
+
+        rollups = {
+            (rollup["user"], rollup["day"]): rollup
+            for rollup in AnalysisRollup._get_collection().find()
+        }
+        assert written == 2
+        assert set(rollups) == {("alice", rollup_day(yesterday)), ("bob", "2023-06-01")}
+        alice = rollups[("alice", rollup_day(yesterday))]
+        assert (alice["total"], alice["successful"], alice["failed"], alice["with_ia"]) == (2, 1, 1, 1)
+        assert alice["severities"] == {"high": 1, "medium": 1}
+        assert rollups[("bob", "2023-06-01")]["severities"] == {"low": 2}
+
+    def test_rebuild_keeps_rollups_of_expired_days(self):
+        """Test que valida que los días cuyos registros ya expiraron conservan sus contadores"""
+        self.repository.policy = RetentionPolicy(error_days=30, raw_days=90)
+        old_day = datetime.now(UTC) - timedelta(days=45)
+        recent_day = datetime.now(UTC) - timedelta(days=29)
+        # Los registros de error del día antiguo expiraron; solo queda el archivado
+        AnalysisArchive(
+            uuid="archived",
+            success=True,
+            user="alice",
+            created_at=old_day,
+            response={"gemini_response": True, "analysis_data": {"security_level": "low"}},
+        ).save()
+        AnalysisRecord(success=False, response={"error": "boom"}, user="alice", created_at=recent_day).save()
+        self.repository.apply(
+            [
+                ("alice", rollup_day(old_day), {"total": 5, "failed": 4, "successful": 1}),
+                ("alice", rollup_day(recent_day), {"total": 7}),
+            ]
+        )
+
+        assert self.repository.rebuild() == 1
+
+        rollups = {
+            rollup["day"]: rollup for rollup in AnalysisRollup._get_collection().find()
+        }
+        old = rollups[rollup_day(old_day)]
+        assert (old["total"], old["failed"], old["successful"]) == (5, 4, 1)
+        assert rollups[rollup_day(recent_day)]["total"] == 1
+
+    def test_complete_days_uses_shortest_retention(self):
+        """Test que valida la ventana de reconstrucción según la política de retención"""
+        self.repository.policy = RetentionPolicy(error_days=30, raw_days=90)
+        assert self.repository.complete_days() == 30
+        self.repository.policy = RetentionPolicy(error_days=0, raw_days=90)
+        assert self.repository.complete_days() == 90
+        self.repository.policy = RetentionPolicy(error_days=0, raw_days=0)
+        assert self.repository.complete_days() == 0
+
+    def test_rebuild_include_today(self):
+        """Test que valida la reconstrucción incluyendo el día actual"""
+        AnalysisRecord(success=True, response={"analysis_data": "x"}, user="alice").save()
+
+        assert self.repository.rebuild(include_today=True) == 1
+        assert AnalysisRollup._get_collection().find_one()["day"] == rollup_day(datetime.now(UTC))
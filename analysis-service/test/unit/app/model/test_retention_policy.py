@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, UTC
+from unittest.mock import patch
+
+from app.model.retention_policy import RetentionPolicy
+
+
+class TestRetentionPolicy:
+    """Tests para la política de retención"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        self.policy = RetentionPolicy(error_days=30, raw_days=90, archive_after_days=180)
+        self.created_at = datetime(2024, 1, 1, tzinfo=UTC)
+
+    def test_error_records_expire(self):
+        """Test que valida la expiración de los registros de error"""
+        expires_at = self.policy.expires_at(False, {"error": "boom"}, self.created_at)
+
+        assert expires_at == self.created_at + timedelta(days=30)
+
+    def test_raw_content_records_expire(self):
+        """Test que valida la expiración de los registros sin IA"""
+        expires_at = self.policy.expires_at(
+            True, {"content_ref": "abc", "gemini_response": False}, self.created_at
+        )
+
+        assert expires_at == self.created_at + timedelta(days=90)
+
+    def test_ia_records_do_not_expire(self):
+        """Test que valida que los análisis con IA no expiran (se archivan)"""
+        assert self.policy.expires_at(True, {"gemini_response": True}) is None
+
+    def test_zero_days_disables_rule(self):
+        """Test que valida que 0 días desactiva la expiración y el archivado"""
+        policy = RetentionPolicy(error_days=0, raw_days=0, archive_after_days=0)
+
+        assert policy.expires_at(False, {}) is None
+        assert policy.expires_at(True, {"gemini_response": False}) is None
+        assert policy.archive_cutoff() is None
+
+    def test_archive_cutoff(self):
+        """Test que valida la fecha límite de archivado"""
+        now = datetime(2024, 7, 1, tzinfo=UTC)
+
+        assert self.policy.archive_cutoff(now) == now - timedelta(days=180)
+
+    def test_defaults_from_environment(self):
+        """Test que valida la configuración desde variables de entorno"""
+        with patch.dict(
+            "os.environ",
+            {
+                "ANALYSIS_RETENTION_ERROR_DAYS": "7",
+                "ANALYSIS_RETENTION_RAW_DAYS": "14",
+                "ANALYSIS_ARCHIVE_AFTER_DAYS": "60",
+            },
+        ):
+            policy = RetentionPolicy()
+
+        assert (policy.error_days, policy.raw_days, policy.archive_after_days) == (7, 14, 60)
@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta, UTC
+from unittest.mock import patch, MagicMock
+
+import pytest
+import mongomock
+from mongoengine import connect, disconnect
+from pymongo.errors import OperationFailure
+
+from app.model.analysis_archive_model import AnalysisArchive
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_repository import AnalysisRepository
+from app.model.retention_policy import RetentionPolicy
+from app.model.retention_repository import RetentionRepository
+from app.services.payload_codec import payload_codec
+
+NOW = datetime.now(UTC).replace(microsecond=0)
+
+
+def _insert(user, days_ago, success=True, ia=True, problems=2):
+    """Inserta un registro con antigüedad controlada"""
+    if ia:
+        response = {
+            "filename": f"file_{days_ago}.txt",
+            "gemini_response": True,
+            "analysis_data": {
+                "security_level": "high",
+                "safe": False,
+                "problems": [{"problem": "Telnet habilitado", "severity": "alta"}] * problems,
+            },
+        }
+    else:
+        response = {"filename": "raw.txt", "content_ref": "abc", "gemini_response": False}
+    if not success:
+        response = {"filename": "err.txt", "error": "boom"}
+
+    record = AnalysisRecord(
+        success=success,
+        user=user,
+        response=payload_codec.encode_response(response),
+        created_at=NOW - timedelta(days=days_ago),
+    )
+    record.save()
+    return record
+
+
+class TestRetentionRepository:
+    """Tests para el repositorio de retención y archivado"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        connect("test_db", mongo_client_class=mongomock.MongoClient)
+        with patch("app.model.retention_repository.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.repository = RetentionRepository(
+                RetentionPolicy(error_days=30, raw_days=90, archive_after_days=180)
+            )
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        AnalysisRecord.drop_collection()
+        AnalysisArchive.drop_collection()
+        disconnect()
+
+    def test_archive_moves_only_old_ia_analyses(self):
+        """Test que valida que solo se archivan análisis con IA antiguos y exitosos"""
+        old = [_insert("alice", 200 + i, problems=50) for i in range(5)]
+        recent = _insert("alice", 10)
+        old_raw = _insert("alice", 400, ia=False)
+        old_error = _insert("alice", 400, success=False)
+
+        archived = self.repository.archive_analyses(batch_size=2)
+
+        remaining = {doc["uuid"] for doc in AnalysisRecord._get_collection().find()}
+        assert archived == 5
+        assert remaining == {recent.uuid, old_raw.uuid, old_error.uuid}
+        assert AnalysisArchive.objects.count() == 5
+
+        summary = AnalysisArchive._get_collection().find_one({"uuid": old[0].uuid})
+        assert summary["response"]["analysis_data"] == {
+            "analysis_date": None,
+            "security_level": "high",
+            "safe": False,
+            "problem_count": 50,
+            "severity_counts": {"high": 50},
+        }
+        assert summary["created_at"] == old[0].created_at.replace(tzinfo=None)
+
+    def test_archive_skips_malformed_problems(self):
+        """Test que valida que un problems con texto o null no interrumpe el lote archivado"""
+        malformed = AnalysisRecord(
+            success=True,
+            user="alice",
+            response={
+                "filename": "raro.txt",
+                "gemini_response": True,
+                "analysis_data": {
+                    "security_level": "high",
+                    "problems": ["Telnet habilitado", None, {"severity": "Crítica"}],
+                },
+            },
+            created_at=NOW - timedelta(days=300),
+        )
+        malformed.save()
+        regular = _insert("alice", 250)
+
+        assert self.repository.archive_analyses() == 2
+
+        summary = AnalysisArchive._get_collection().find_one({"uuid": malformed.uuid})
+        assert summary["response"]["analysis_data"]["problem_count"] == 1
+        assert summary["response"]["analysis_data"]["severity_counts"] == {"critical": 1}
+        assert AnalysisArchive._get_collection().find_one({"uuid": regular.uuid}) is not None
+
+    def test_archive_respects_max_batches(self):
+        """Test que valida el límite de lotes por ejecución"""
+        for i in range(5):
+            _insert("alice", 200 + i)
+
+        assert self.repository.archive_analyses(batch_size=2, max_batches=1) == 2
+
+    def test_archive_is_idempotent_after_interruption(self):
+        """Test que valida que repetir un lote interrumpido no duplica resúmenes"""
+        record = _insert("alice", 200)
+        document = AnalysisRecord._get_collection().find_one({"uuid": record.uuid})
+        # Simular un lote que se archivó pero no alcanzó a borrarse
+        AnalysisArchive._get_collection().insert_one(self.repository._to_archive(document))
+
+        archived = self.repository.archive_analyses()
+
+        assert archived == 1
+        assert AnalysisArchive.objects.count() == 1
+        assert AnalysisRecord.objects.count() == 0
+
+    def test_archive_disabled(self):
+        """Test que valida que el archivado se puede desactivar"""
+        _insert("alice", 400)
+        self.repository.policy = RetentionPolicy(archive_after_days=0)
+
+        assert self.repository.archive_analyses() == 0
+        assert AnalysisRecord.objects.count() == 1
+
+    def test_archived_analysis_still_readable_by_id(self):
+        """Test que valida que el detalle de un análisis archivado retorna su resumen"""
+        record = _insert("alice", 200)
+        self.repository.archive_analyses()
+
+        with patch("app.model.analysis_repository.Logger"):
+            detail = AnalysisRepository().find_analysis(record.uuid, "alice")
+
+        assert detail["uuid"] == record.uuid
+        assert detail["response"]["analysis_data"]["problem_count"] == 2
+
+    def test_apply_retention_backfills_expiring_records(self):
+        """Test que valida la asignación de expires_at a los registros existentes"""
+        error = _insert("alice", 5, success=False)
+        raw = _insert("alice", 5, ia=False)
+        ia = _insert("alice", 5)
+
+        updated = self.repository.apply_retention(batch_size=1)
+
+        collection = AnalysisRecord._get_collection()
+        assert updated == 2
+        assert collection.find_one({"uuid": error.uuid})["expires_at"] == (
+            error.created_at + timedelta(days=30)
+        ).replace(tzinfo=None)
+        assert collection.find_one({"uuid": raw.uuid})["expires_at"] == (
+            raw.created_at + timedelta(days=90)
+        ).replace(tzinfo=None)
+        assert "expires_at" not in collection.find_one({"uuid": ia.uuid})
+        assert self.repository.apply_retention() == 0
+
+    def test_apply_retention_disabled(self):
+        """Test que valida que sin reglas de expiración no se actualiza nada"""
+        _insert("alice", 5, success=False)
+        self.repository.policy = RetentionPolicy(error_days=0, raw_days=0)
+
+        assert self.repository.apply_retention() == 0
+
+    def test_collection_stats(self):
+        """Test que valida el reporte de tamaños de colecciones e índices"""
+        db = MagicMock()
+        db.command.side_effect = lambda command, name: (
+            {
+                "count": 10,
+                "size": 2048,
+                "storageSize": 1024,
+                "totalIndexSize": 512,
+                "indexSizes": {"_id_": 256, "user_1_created_at_1": 256},
+            }
+            if name == "analysis_records"
+            else (_ for _ in ()).throw(OperationFailure("ns not found"))
+        )
+
+        with patch.object(AnalysisRecord, "_get_db", return_value=db):
+            stats = self.repository.collection_stats()
+
+        records = stats[0]
+        assert [item["collection"] for item in stats] == [
+            "analysis_records",
+            "analysis_archive",
+            "analysis_blobs",
+            "analysis_rollups",
+            "analysis_findings",
+            "analysis_jobs",
+        ]
+        assert records["total_index_size_bytes"] == 512
+        assert records["index_sizes"]["user_1_created_at_1"] == 256
+        assert stats[1]["count"] == 0
+
+    def test_errors_raise_runtime_error(self):
+        """Test que valida la conversión de errores de MongoDB"""
+        with patch.object(AnalysisRecord, "_get_collection", side_effect=Exception("caído")):
+            with pytest.raises(RuntimeError, match="Error de MongoDB"):
+                self.repository.archive_analyses()
+            with pytest.raises(RuntimeError, match="Error de MongoDB"):
+                self.repository.apply_retention()
+        with patch.object(AnalysisRecord, "_get_db", side_effect=Exception("caído")):
+            with pytest.raises(RuntimeError, match="Error de MongoDB"):
+                self.repository.collection_stats()
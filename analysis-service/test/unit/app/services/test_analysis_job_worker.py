@@ -0,0 +1,213 @@
+import pytest
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from app.model.analysis_model import AnalysisResponse, AnalysisData
+from app.services.analysis_job_worker import AnalysisJobWorkerPool
+from app.services.request_context import get_request_context
+
+
+def _build_response():
+    """Construye una respuesta de análisis mínima"""
+    return AnalysisResponse(
+        success=True,
+        message="Análisis completado exitosamente",
+        data=AnalysisData(
+            filename="config.txt",
+            file_size=10,
+            encrypted_filename="encrypted",
+            checksum="checksum",
+            file_type="text/plain",
+            content="content",
+        ),
+    )
+
+
+class TestAnalysisJobWorkerPool:
+    """Tests para el pool de workers de trabajos de análisis"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        self.repository = MagicMock()
+        self.repository.job_token.return_value = "token"
+        self.repository.complete_job.return_value = True
+        self.repository.fail_job.return_value = True
+        self.repository.renew_lease.return_value = True
+        self.use_case = MagicMock()
+        self.use_case.execute = AsyncMock(return_value=_build_response())
+
+        with patch("app.services.analysis_job_worker.Logger") as mock_logger_class:
+            mock_logger_class.return_value = MagicMock()
+            self.pool = AnalysisJobWorkerPool(
+                repository=self.repository,
+                use_case_factory=lambda: self.use_case,
+                workers=2,
+                poll_interval=0.01,
+                lease_seconds=60,
+                max_attempts=3,
+            )
+
+    def _job(self):
+        job = MagicMock()
+        job.uuid = "job-1"
+        job.filename = "config.txt"
+        job.enable_ia = True
+        job.user = "test_user"
+        job.token = "token-cifrado"
+        return job
+
+    def test_configuration_from_environment(self):
+        """Test que valida la configuración desde variables de entorno"""
+        with patch.dict(
+            "os.environ",
+            {"ANALYSIS_JOB_WORKERS": "5", "ANALYSIS_JOB_LEASE_SECONDS": "120"},
+        ), patch("app.services.analysis_job_worker.Logger"):
+            pool = AnalysisJobWorkerPool(repository=self.repository)
+
+        assert pool.workers == 5
+        assert pool.lease_seconds == 120
+
+    @pytest.mark.asyncio
+    async def test_run_once_without_jobs(self):
+        """Test que valida que no se ejecuta nada si no hay trabajos"""
+        self.repository.claim_next_job.return_value = None
+
+        assert await self.pool.run_once("worker-1") is False
+        self.use_case.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_run_once_completes_job(self):
+        """Test que valida la ejecución exitosa de un trabajo"""
+        self.repository.claim_next_job.return_value = self._job()
+
+        assert await self.pool.run_once("worker-1") is True
+
+        self.repository.claim_next_job.assert_called_once_with("worker-1", 60, 3)
+        self.repository.job_token.assert_called_once_with(self.repository.claim_next_job.return_value)
+        self.use_case.execute.assert_awaited_once_with(
+            "config.txt",
+            {"authenticated": True, "token": "token", "user": "test_user"},
+            True,
+            record_id="job-1",
+        )
+        job_id, worker_id, result = self.repository.complete_job.call_args.args
+        assert (job_id, worker_id) == ("job-1", "worker-1")
+        assert result["success"] is True
+        self.repository.fail_job.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_run_once_fails_job(self):
+        """Test que valida que un error en el análisis marca el trabajo como fallido"""
+        self.repository.claim_next_job.return_value = self._job()
+        self.use_case.execute.side_effect = ValueError("El archivo solicitado no existe")
+
+        assert await self.pool.run_once("worker-1") is True
+
+        self.repository.fail_job.assert_called_once_with(
+            "job-1", "worker-1", "El archivo solicitado no existe"
+        )
+        self.repository.complete_job.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_run_once_renews_lease_while_running(self):
+        """Test que valida que el lease se renueva durante el análisis y se detiene al terminar"""
+        self.repository.claim_next_job.return_value = self._job()
+        self.pool.heartbeat_interval = 0.01
+
+        async def execute(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _build_response()
+
+        self.use_case.execute.side_effect = execute
+
+        await self.pool.run_once("worker-1")
+        renewals = self.repository.renew_lease.call_count
+        await asyncio.sleep(0.03)
+
+        assert renewals >= 2
+        assert self.repository.renew_lease.call_count == renewals
+        self.repository.renew_lease.assert_called_with("job-1", "worker-1", 60)
+
+    @pytest.mark.asyncio
+    async def test_run_once_stops_heartbeat_when_lease_lost(self):
+        """Test que valida que el heartbeat termina si otro worker retomó el trabajo"""
+        self.repository.claim_next_job.return_value = self._job()
+        self.repository.renew_lease.return_value = False
+        self.pool.heartbeat_interval = 0.01
+
+        async def execute(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _build_response()
+
+        self.use_case.execute.side_effect = execute
+
+        await self.pool.run_once("worker-1")
+
+        assert self.repository.renew_lease.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_run_once_reports_lost_lease(self):
+        """Test que valida que un worker que perdió el lease no da el trabajo por completado"""
+        self.repository.claim_next_job.return_value = self._job()
+        self.repository.complete_job.return_value = False
+
+        assert await self.pool.run_once("worker-1") is True
+
+        self.pool.logger.success.assert_not_called()
+        assert "perdió el lease" in self.pool.logger.warning.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_run_once_binds_job_context(self):
+        """Test que valida el contexto de logging del trabajo y su restauración"""
+        self.repository.claim_next_job.return_value = self._job()
+        seen = {}
+
+        async def execute(*args, **kwargs):
+            seen.update(get_request_context())
+            return _build_response()
+
+        self.use_case.execute.side_effect = execute
+
+        await self.pool.run_once("worker-1")
+
+        assert seen == {"job_id": "job-1", "user": "test_user", "filename": "config.txt"}
+        assert get_request_context() == {}
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self):
+        """Test que valida el ciclo de vida del pool"""
+        self.repository.claim_next_job.return_value = None
+        self.repository.fail_exhausted_jobs.return_value = 0
+
+        await self.pool.start()
+        assert self.pool.running is True
+        await asyncio.sleep(0.05)
+        await self.pool.stop()
+
+        assert self.pool.running is False
+        assert self.repository.claim_next_job.call_count >= 2
+
+    @pytest.mark.asyncio
+    async def test_start_disabled_with_zero_workers(self):
+        """Test que valida que el pool no inicia sin workers configurados"""
+        self.pool.workers = 0
+
+        await self.pool.start()
+
+        assert self.pool.running is False
+
+    @pytest.mark.asyncio
+    async def test_notify_wakes_idle_worker(self):
+        """Test que valida que notify despierta a un worker antes del sondeo"""
+        self.pool.poll_interval = 10
+        self.repository.claim_next_job.side_effect = [None, self._job(), None, None]
+        self.repository.fail_exhausted_jobs.return_value = 0
+        self.pool.workers = 1
+
+        await self.pool.start()
+        await asyncio.sleep(0.01)
+        self.pool.notify()
+        await asyncio.sleep(0.05)
+        await self.pool.stop()
+
+        self.use_case.execute.assert_awaited_once()
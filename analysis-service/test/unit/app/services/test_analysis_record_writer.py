@@ -0,0 +1,413 @@
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from pymongo.errors import BulkWriteError
+
+from app.services.analysis_record_writer import AnalysisRecordWriter
+
+
+class _FakeCollection:
+    """Colección en memoria que simula la latencia de cada round trip a MongoDB"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.batches = []
+        self.documents = []
+
+    def insert_many(self, documents, ordered=True):
+        time.sleep(self.latency)
+        self.batches.append(len(documents))
+        self.documents.extend(documents)
+
+    def insert_one(self, document):
+        time.sleep(self.latency)
+        self.documents.append(document)
+
+
+def _writer(collection, **kwargs):
+    """Crea un buffer con logger simulado"""
+    options = {
+        "batch_size": 10,
+        "flush_interval": 0.01,
+        "max_pending": 100,
+        "blob_repository": MagicMock(),
+        "rollup_repository": MagicMock(),
+        "finding_repository": MagicMock(),
+    }
+    options.update(kwargs)
+    with patch("app.services.analysis_record_writer.Logger") as mock_logger_class:
+        mock_logger_class.return_value = MagicMock()
+        return AnalysisRecordWriter(collection_provider=lambda: collection, **options)
+
+
+class TestAnalysisRecordWriter:
+    """Tests para el buffer write-behind de registros de análisis"""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_returns_before_write(self):
+        """Test que valida que encolar no espera a la base de datos"""
+        collection = _FakeCollection(latency=0.2)
+        writer = _writer(collection)
+        await writer.start()
+
+        start = time.perf_counter()
+        record = await writer.enqueue(True, {"filename": "a.txt"}, "test_user")
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.05
+        assert record.uuid is not None
+        await writer.stop()
+        assert collection.documents[0]["uuid"] == record.uuid
+        assert collection.documents[0]["user"] == "test_user"
+        # Sin gemini_response se trata como contenido sin IA: expira por retención
+        assert collection.documents[0]["expires_at"] > record.created_at
+
+    @pytest.mark.asyncio
+    async def test_flush_by_batch_size(self):
+        """Test que valida el flush al alcanzar el tamaño de lote"""
+        collection = _FakeCollection()
+        writer = _writer(collection, batch_size=5, flush_interval=10)
+        await writer.start()
+
+        for index in range(5):
+            await writer.enqueue(True, {"index": index}, "test_user")
+        await asyncio.sleep(0.05)
+
+        assert collection.batches == [5]
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_flush_by_interval(self):
+        """Test que valida el flush al vencer el intervalo aunque el lote no esté lleno"""
+        collection = _FakeCollection()
+        writer = _writer(collection, batch_size=100, flush_interval=0.02)
+        await writer.start()
+
+        await writer.enqueue(True, {}, "test_user")
+        await asyncio.sleep(0.1)
+
+        assert collection.batches == [1]
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_records(self):
+        """Test que valida que al detenerse se escriben todos los pendientes"""
+        collection = _FakeCollection(latency=0.01)
+        writer = _writer(collection, batch_size=4, flush_interval=10)
+        await writer.start()
+
+        for index in range(10):
+            await writer.enqueue(True, {"index": index}, "test_user")
+        await writer.stop()
+
+        assert len(collection.documents) == 10
+        assert writer.written_records == 10
+        assert writer.running is False
+
+    @pytest.mark.asyncio
+    async def test_records_prepared_off_event_loop(self):
+        """Test que valida que la codificación y los hallazgos se calculan en la tarea de flush, en un hilo"""
+        collection = _FakeCollection()
+        writer = _writer(collection, batch_size=2, flush_interval=10)
+        threads = []
+
+        def encode_response(response):
+            threads.append(threading.current_thread())
+            return response
+
+        await writer.start()
+        with patch(
+            "app.services.analysis_record_writer.payload_codec.encode_response",
+            side_effect=encode_response,
+        ), patch(
+            "app.services.analysis_record_writer.build_findings", return_value=[]
+        ) as mock_findings:
+            await writer.enqueue(True, {"gemini_response": True}, "test_user")
+            assert threads == []
+            mock_findings.assert_not_called()
+
+            await writer.enqueue(True, {"gemini_response": True}, "test_user")
+            await writer.stop()
+
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+        assert len(collection.documents) == 2
+
+    @pytest.mark.asyncio
+    async def test_record_that_cannot_be_prepared_is_reported(self):
+        """Test que valida que un registro que no se puede codificar no impide escribir el resto del lote"""
+        collection = _FakeCollection()
+        failures = []
+        writer = _writer(collection, batch_size=2, flush_interval=10)
+        writer.failure_handlers.append(lambda document, error: failures.append(document["uuid"]))
+        await writer.start()
+
+        with patch(
+            "app.services.analysis_record_writer.payload_codec.encode_response",
+            side_effect=[ValueError("payload inválido"), {"index": 1}],
+        ):
+            broken = await writer.enqueue(True, {"index": 0}, "test_user")
+            written = await writer.enqueue(True, {"index": 1}, "test_user")
+            await writer.stop()
+
+        assert failures == [broken.uuid]
+        assert [document["uuid"] for document in collection.documents] == [written.uuid]
+        assert writer.failed_records == 1
+
+    @pytest.mark.asyncio
+    async def test_enqueue_after_stop_writes_directly(self):
+        """Test que valida que un registro encolado con el buffer detenido no se pierde"""
+        collection = _FakeCollection()
+        writer = _writer(collection, batch_size=4, flush_interval=10)
+        await writer.start()
+        await writer.stop()
+
+        record = await writer.enqueue(True, {"filename": "a.txt"}, "test_user")
+
+        assert [document["uuid"] for document in collection.documents] == [record.uuid]
+        assert writer.pending == 0
+        writer.rollup_repository.apply.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failing_failure_handler_keeps_writer_running(self):
+        """Test que valida que un manejador de fallos con error no detiene la tarea de flush"""
+        collection = MagicMock()
+        collection.insert_many.side_effect = [
+            BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "invalido"}]}),
+            None,
+        ]
+        writer = _writer(collection, batch_size=1, flush_interval=10, max_retries=0)
+
+        def broken_handler(document, error):
+            raise ValueError("handler roto")
+
+        writer.failure_handlers.append(broken_handler)
+        await writer.start()
+
+        await writer.enqueue(True, {}, "test_user")
+        await writer.enqueue(True, {}, "test_user")
+        # Cada lote pasa por dos hilos (preparación y escritura): se espera a ambos
+        for _ in range(200):
+            if writer.failed_records + writer.written_records == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        assert writer.running is True
+        assert writer.failed_records == 1
+        assert writer.written_records == 1
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_flush_error_keeps_writer_running(self):
+        """Test que valida que un error inesperado al escribir un lote no detiene el buffer"""
+        collection = _FakeCollection()
+        writer = _writer(collection, batch_size=1, flush_interval=10)
+        await writer.start()
+
+        with patch.object(writer, "_write_with_retries", side_effect=[Exception("boom"), set()]):
+            await writer.enqueue(True, {}, "test_user")
+            await asyncio.sleep(0.02)
+            assert writer.running is True
+            await writer.enqueue(True, {}, "test_user")
+            await writer.stop()
+
+        assert "boom" in writer.logger.error.call_args_list[0].args[0]
+        assert writer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_backpressure_when_buffer_full(self):
+        """Test que valida que el buffer acotado aplica backpressure y luego falla"""
+        collection = _FakeCollection(latency=0.5)
+        writer = _writer(collection, batch_size=1, max_pending=1, enqueue_timeout=0.05)
+        await writer.start()
+
+        await writer.enqueue(True, {}, "test_user")  # lo toma la tarea de flush
+        await asyncio.sleep(0.01)
+        await writer.enqueue(True, {}, "test_user")  # ocupa la cola
+
+        with pytest.raises(RuntimeError, match="buffer de registros lleno"):
+            await writer.enqueue(True, {}, "test_user")
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_reports_per_record_failures(self):
+        """Test que valida el reporte individual de los registros que fallaron"""
+        collection = MagicMock()
+        collection.insert_many.side_effect = BulkWriteError(
+            {"writeErrors": [{"index": 1, "code": 121, "errmsg": "Document failed validation"}]}
+        )
+        failures = []
+        writer = _writer(collection, batch_size=3, flush_interval=10)
+        writer.failure_handlers.append(lambda document, error: failures.append((document, error)))
+        await writer.start()
+
+        records = [await writer.enqueue(True, {"index": i}, "test_user") for i in range(3)]
+        await writer.stop()
+
+        assert writer.written_records == 2
+        assert writer.failed_records == 1
+        assert failures[0][0]["uuid"] == records[1].uuid
+        assert failures[0][1] == "Document failed validation"
+
+    @pytest.mark.asyncio
+    async def test_existing_record_id_is_skipped(self):
+        """Test que valida que un registro con UUID ya existente no cuenta como fallo ni duplica contadores"""
+        collection = MagicMock()
+        collection.insert_many.side_effect = BulkWriteError(
+            {"writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate key"}]}
+        )
+        failures = []
+        writer = _writer(collection, batch_size=2, flush_interval=10)
+        writer.failure_handlers.append(lambda document, error: failures.append(document))
+        await writer.start()
+
+        retried = await writer.enqueue(True, {"index": 0}, "test_user", record_id="job-1")
+        await writer.enqueue(True, {"index": 1}, "test_user")
+        await writer.stop()
+
+        assert retried.uuid == "job-1"
+        assert collection.insert_many.call_args.args[0][0]["uuid"] == "job-1"
+        assert failures == []
+        assert writer.failed_records == 0
+        assert writer.written_records == 1
+        assert len(writer.rollup_repository.apply.call_args.args[0]) == 1
+
+    @pytest.mark.asyncio
+    async def test_rollups_applied_only_for_written_records(self):
+        """Test que valida que los contadores solo cuentan los registros guardados"""
+        collection = MagicMock()
+        collection.insert_many.side_effect = BulkWriteError(
+            {"writeErrors": [{"index": 1, "code": 121, "errmsg": "Document failed validation"}]}
+        )
+        writer = _writer(collection, batch_size=3, flush_interval=10)
+        await writer.start()
+
+        for index in range(3):
+            await writer.enqueue(index != 2, {"index": index}, "test_user")
+        await writer.stop()
+
+        writer.rollup_repository.apply.assert_called_once()
+        entries = writer.rollup_repository.apply.call_args.args[0]
+        assert len(entries) == 2
+        assert [increments for _, _, increments in entries] == [
+            {"total": 1, "successful": 1},
+            {"total": 1, "failed": 1},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_findings_written_only_for_written_records(self):
+        """Test que valida que los hallazgos solo se guardan para registros escritos"""
+        collection = MagicMock()
+        collection.insert_many.side_effect = BulkWriteError(
+            {"writeErrors": [{"index": 0, "code": 121, "errmsg": "Document failed validation"}]}
+        )
+        writer = _writer(collection, batch_size=2, flush_interval=10)
+        await writer.start()
+
+        problems = [{"problem": "Telnet habilitado", "severity": "Crítica"}]
+        response = {"gemini_response": True, "analysis_data": {"problems": problems}}
+        await writer.enqueue(True, response, "test_user")
+        written = await writer.enqueue(True, response, "test_user")
+        await writer.stop()
+
+        writer.finding_repository.insert_findings.assert_called_once()
+        findings = writer.finding_repository.insert_findings.call_args.args[0]
+        assert [finding["analysis_uuid"] for finding in findings] == [written.uuid]
+        assert findings[0]["severity"] == "critical"
+        assert findings[0]["category"] == "telnet"
+
+    @pytest.mark.asyncio
+    async def test_rollup_error_does_not_fail_records(self):
+        """Test que valida que un error en los contadores no afecta a los registros"""
+        collection = _FakeCollection()
+        writer = _writer(collection, batch_size=2, flush_interval=10)
+        writer.rollup_repository.apply.side_effect = Exception("caído")
+        await writer.start()
+
+        for _ in range(2):
+            await writer.enqueue(True, {"filename": "a.txt"}, "test_user")
+        await writer.stop()
+
+        assert writer.written_records == 2
+        assert writer.failed_records == 0
+        writer.logger.warning.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        """Test que valida el reintento de errores transitorios de conexión"""
+        collection = _FakeCollection()
+        original_insert = collection.insert_many
+        calls = {"count": 0}
+
+        def flaky_insert(documents, ordered=True):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise ConnectionError("MongoDB no disponible")
+            original_insert(documents, ordered)
+
+        collection.insert_many = flaky_insert
+        writer = _writer(collection, max_retries=2)
+        await writer.start()
+
+        await writer.enqueue(True, {}, "test_user")
+        await writer.stop()
+
+        assert calls["count"] == 2
+        assert writer.written_records == 1
+        assert writer.failed_records == 0
+
+    @pytest.mark.asyncio
+    async def test_throughput_order_of_magnitude(self):
+        """Test que compara el throughput de inserciones individuales contra el buffer"""
+        total = 200
+        latency = 0.015
+
+        single_collection = _FakeCollection(latency=latency)
+        start = time.perf_counter()
+        for index in range(total):
+            await asyncio.to_thread(single_collection.insert_one, {"index": index})
+        single_elapsed = time.perf_counter() - start
+
+        batched_collection = _FakeCollection(latency=latency)
+        writer = _writer(batched_collection, batch_size=100, flush_interval=0.05, max_pending=1000)
+        await writer.start()
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[writer.enqueue(True, {"index": index}, "test_user") for index in range(total)]
+        )
+        await writer.stop()
+        batched_elapsed = time.perf_counter() - start
+
+        assert len(batched_collection.documents) == total
+        assert single_elapsed / batched_elapsed >= 10, (single_elapsed, batched_elapsed)
+
+    @pytest.mark.asyncio
+    async def test_raw_content_blobs_written_once_per_batch(self):
+        """Test que valida que cada lote escribe sus blobs distintos antes que los registros"""
+        collection = _FakeCollection()
+        writer = _writer(collection, batch_size=3, flush_interval=10)
+        calls = []
+        writer.blob_repository.store_blobs.side_effect = lambda blobs: calls.append(
+            ("blobs", dict(blobs), len(collection.documents))
+        )
+        await writer.start()
+
+        for _ in range(3):
+            await writer.enqueue(
+                True,
+                {"filename": "a.txt", "analysis_data": "hostname Switch", "gemini_response": False},
+                "test_user",
+            )
+        await writer.stop()
+
+        assert len(calls) == 1
+        _, blobs, records_before = calls[0]
+        assert list(blobs.values()) == ["hostname Switch"]
+        assert records_before == 0
+        assert all(
+            document["response"]["content_ref"] == list(blobs)[0]
+            and "analysis_data" not in document["response"]
+            for document in collection.documents
+        )
@@ -3,6 +3,7 @@ import os
 import aiohttp
 from unittest.mock import patch, MagicMock, AsyncMock
 from app.services.auth_client import AuthClient
+from app.services.tracing import SpanExporter, Tracer
 
 
 class MockResponse:
@@ -30,6 +31,7 @@ class MockSession:
     def __init__(self, response):
         self.response = response
         self.post_calls = []
+        self.post_headers = []
 
     async def __aenter__(self):
         return self
@@ -37,8 +39,9 @@ class MockSession:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         pass
 
-    def post(self, url, json=None):
+    def post(self, url, json=None, headers=None):
         self.post_calls.append((url, json))
+        self.post_headers.append(headers)
         return MockResponseContext(self.response)
 
 
@@ -98,8 +101,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -113,9 +114,9 @@ class TestAuthClient:
             assert is_valid is True
             assert data == mock_response_data
 
-            # Verificar que se configuró el contexto
-            mock_set_context.assert_called_once_with(
-                "AuthClient.validate_token",
+            # Verificar los datos del registro inicial
+            mock_info.assert_any_call(
+                "Validando token con servicio de autenticación",
                 {
                     "token_length": len(token),
                     "auth_service_url": self.client.auth_service_url,
@@ -123,7 +124,7 @@ class TestAuthClient:
             )
 
             # Verificar logs
-            mock_info.assert_any_call("Validando token con servicio de autenticación")
+            assert mock_info.call_args_list[0].args[0] == "Validando token con servicio de autenticación"
             mock_info.assert_any_call("Respuesta del servicio de autenticación: 200")
             mock_success.assert_called_once_with(
                 "Token validado exitosamente",
@@ -145,8 +146,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -161,7 +160,7 @@ class TestAuthClient:
             assert data is None
 
             # Verificar logs
-            mock_info.assert_any_call("Validando token con servicio de autenticación")
+            assert mock_info.call_args_list[0].args[0] == "Validando token con servicio de autenticación"
             mock_info.assert_any_call("Respuesta del servicio de autenticación: 401")
             mock_error.assert_called_once_with(
                 "Token inválido según el servicio de autenticación"
@@ -176,8 +175,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -192,7 +189,7 @@ class TestAuthClient:
             assert data is None
 
             # Verificar logs
-            mock_info.assert_any_call("Validando token con servicio de autenticación")
+            assert mock_info.call_args_list[0].args[0] == "Validando token con servicio de autenticación"
             mock_info.assert_any_call("Respuesta del servicio de autenticación: 400")
             mock_error.assert_called_once_with(
                 "Error en formato de token: {'error': 'Invalid token format'}"
@@ -207,8 +204,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -223,7 +218,7 @@ class TestAuthClient:
             assert data is None
 
             # Verificar logs
-            mock_info.assert_any_call("Validando token con servicio de autenticación")
+            assert mock_info.call_args_list[0].args[0] == "Validando token con servicio de autenticación"
             mock_info.assert_any_call("Respuesta del servicio de autenticación: 500")
             mock_error.assert_called_once_with(
                 "Error en validación de token: 500 - Internal Server Error"
@@ -235,8 +230,6 @@ class TestAuthClient:
         token = "valid.jwt.token"
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -267,8 +260,6 @@ class TestAuthClient:
         token = "valid.jwt.token"
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -297,8 +288,6 @@ class TestAuthClient:
         token = "test.token"
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -319,7 +308,8 @@ class TestAuthClient:
 
             # Verificar logs
             mock_info.assert_called_once_with(
-                "Validando token con servicio de autenticación"
+                "Validando token con servicio de autenticación",
+                {"token_length": len(token), "auth_service_url": self.client.auth_service_url},
             )
             mock_error.assert_called_once()
             error_call = mock_error.call_args[0][0]
@@ -334,8 +324,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch(
             "aiohttp.ClientSession", return_value=mock_session
@@ -347,9 +335,9 @@ class TestAuthClient:
             assert is_valid is True
             assert data == {"valid": True}
 
-            # Verificar que se configuró el contexto con longitud 0
-            mock_set_context.assert_called_once_with(
-                "AuthClient.validate_token",
+            # Verificar los datos del registro inicial con longitud 0
+            mock_info.assert_any_call(
+                "Validando token con servicio de autenticación",
                 {"token_length": 0, "auth_service_url": self.client.auth_service_url},
             )
 
@@ -362,8 +350,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch(
             "aiohttp.ClientSession", return_value=mock_session
@@ -375,9 +361,9 @@ class TestAuthClient:
             assert is_valid is True
             assert data == {"valid": True}
 
-            # Verificar que se configuró el contexto con longitud 0
-            mock_set_context.assert_called_once_with(
-                "AuthClient.validate_token",
+            # Verificar los datos del registro inicial con longitud 0
+            mock_info.assert_any_call(
+                "Validando token con servicio de autenticación",
                 {"token_length": 0, "auth_service_url": self.client.auth_service_url},
             )
 
@@ -390,8 +376,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -405,9 +389,9 @@ class TestAuthClient:
             assert is_valid is True
             assert data == {"valid": True, "user": {"id": 1}}
 
-            # Verificar que se configuró el contexto con la longitud correcta
-            mock_set_context.assert_called_once_with(
-                "AuthClient.validate_token",
+            # Verificar los datos del registro inicial con la longitud correcta
+            mock_info.assert_any_call(
+                "Validando token con servicio de autenticación",
                 {
                     "token_length": 10000,
                     "auth_service_url": self.client.auth_service_url,
@@ -423,8 +407,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -438,9 +420,9 @@ class TestAuthClient:
             assert is_valid is True
             assert data == {"valid": True, "user": {"name": "John Doe"}}
 
-            # Verificar que se configuró el contexto con la longitud correcta
-            mock_set_context.assert_called_once_with(
-                "AuthClient.validate_token",
+            # Verificar los datos del registro inicial con la longitud correcta
+            mock_info.assert_any_call(
+                "Validando token con servicio de autenticación",
                 {
                     "token_length": len(token),
                     "auth_service_url": self.client.auth_service_url,
@@ -456,8 +438,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -471,9 +451,9 @@ class TestAuthClient:
             assert is_valid is True
             assert data == {"valid": True, "user": {"name": "José"}}
 
-            # Verificar que se configuró el contexto con la longitud correcta
-            mock_set_context.assert_called_once_with(
-                "AuthClient.validate_token",
+            # Verificar los datos del registro inicial con la longitud correcta
+            mock_info.assert_any_call(
+                "Validando token con servicio de autenticación",
                 {
                     "token_length": len(token),
                     "auth_service_url": self.client.auth_service_url,
@@ -490,8 +470,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -521,8 +499,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -551,8 +527,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -580,8 +554,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "success"
@@ -610,8 +582,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -626,7 +596,7 @@ class TestAuthClient:
             assert data is None
 
             # Verificar logs
-            mock_info.assert_any_call("Validando token con servicio de autenticación")
+            assert mock_info.call_args_list[0].args[0] == "Validando token con servicio de autenticación"
             mock_info.assert_any_call("Respuesta del servicio de autenticación: 403")
             mock_error.assert_called_once_with(
                 "Error en validación de token: 403 - Forbidden"
@@ -641,8 +611,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -669,8 +637,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -697,8 +663,6 @@ class TestAuthClient:
         mock_session = MockSession(mock_response)
 
         with patch.object(
-            self.client.logger, "set_context"
-        ) as mock_set_context, patch.object(
             self.client.logger, "info"
         ) as mock_info, patch.object(
             self.client.logger, "error"
@@ -715,3 +679,23 @@ class TestAuthClient:
             # Verificar que se loggeó el error
             error_call = mock_error.call_args[0][0]
             assert "Error inesperado en validación de token" in error_call
+
+    @pytest.mark.asyncio
+    async def test_validate_token_propagates_traceparent(self):
+        """Test que valida el span de la llamada y la propagación de traceparent"""
+        tracer = Tracer(SpanExporter())
+        mock_session = MockSession(MockResponse(200, json_data={"valid": True}))
+
+        with patch("app.services.auth_client.tracer", tracer), patch(
+            "aiohttp.ClientSession", return_value=mock_session
+        ):
+            with tracer.start_trace("POST /api/v1/analyze") as root:
+                await self.client.validate_token("valid.jwt.token")
+
+        span = tracer.exporter.recent(trace_id=root.trace_id)[1]
+        assert span["name"] == "auth_service.validate"
+        assert span["parent_id"] == root.span_id
+        assert span["attributes"]["http.status_code"] == 200
+        assert mock_session.post_headers[0] == {
+            "traceparent": f"00-{root.trace_id}-{span['span_id']}-01"
+        }
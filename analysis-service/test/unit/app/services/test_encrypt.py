@@ -40,6 +40,16 @@ class TestEncrypt:
         key2 = self.encrypt._derive_key(salt)
         assert key == key2
 
+    def test_derive_key_compatible_with_cryptography(self):
+        """Test que valida que la clave es la misma que PBKDF2HMAC de cryptography"""
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+        salt = os.urandom(16)
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
+
+        assert self.encrypt._derive_key(salt) == kdf.derive(self.encrypt.password)
+
     def test_derive_key_with_different_salt(self):
         """Test que valida que diferentes salts producen diferentes claves"""
         salt1 = os.urandom(16)
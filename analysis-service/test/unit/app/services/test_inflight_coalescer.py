@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+
+from app.services.inflight_coalescer import InFlightCoalescer
+
+
+class TestInFlightCoalescer:
+    """Tests para el agrupador de operaciones en curso"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        self.coalescer = InFlightCoalescer()
+        self.calls = 0
+
+    async def _slow_operation(self):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        return {"problems": [{"severity": "alta"}]}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test que valida que las llamadas concurrentes ejecutan la operación una vez"""
+        results = await asyncio.gather(
+            *[self.coalescer.run("key", self._slow_operation) for _ in range(5)]
+        )
+
+        assert self.calls == 1
+        assert [is_leader for _, is_leader in results].count(True) == 1
+        assert all(result == {"problems": [{"severity": "alta"}]} for result, _ in results)
+        assert len(self.coalescer) == 0
+
+    @pytest.mark.asyncio
+    async def test_followers_receive_independent_copies(self):
+        """Test que valida que las seguidoras no comparten el objeto del líder"""
+        (leader, _), (follower, _) = await asyncio.gather(
+            self.coalescer.run("key", self._slow_operation),
+            self.coalescer.run("key", self._slow_operation),
+        )
+
+        follower["problems"].append({"severity": "baja"})
+
+        assert len(leader["problems"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_independently(self):
+        """Test que valida que claves distintas no se agrupan"""
+        await asyncio.gather(
+            self.coalescer.run(("a.txt", "hash", "ia"), self._slow_operation),
+            self.coalescer.run(("b.txt", "hash", "ia"), self._slow_operation),
+        )
+
+        assert self.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_cached(self):
+        """Test que valida que una operación terminada no se reutiliza"""
+        await self.coalescer.run("key", self._slow_operation)
+        await asyncio.sleep(0)
+        await self.coalescer.run("key", self._slow_operation)
+
+        assert self.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_callers(self):
+        """Test que valida que un error llega a todas las llamadas agrupadas"""
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("Gemini no disponible")
+
+        results = await asyncio.gather(
+            self.coalescer.run("key", failing),
+            self.coalescer.run("key", failing),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(self.coalescer) == 0
+
+    @pytest.mark.asyncio
+    async def test_leader_cancellation_does_not_affect_followers(self):
+        """Test que valida que cancelar al líder no cancela la operación compartida"""
+        leader = asyncio.create_task(self.coalescer.run("key", self._slow_operation))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(self.coalescer.run("key", self._slow_operation))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        result, is_leader = await follower
+
+        assert is_leader is False
+        assert result["problems"][0]["severity"] == "alta"
+        assert self.calls == 1
@@ -0,0 +1,52 @@
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.llm_provider import GEMINI_MODEL, GeminiProvider, gemini_provider
+
+
+class TestGeminiProvider:
+    """Tests para GeminiProvider"""
+
+    def test_sdk_is_imported_on_first_use(self):
+        """Test que valida que el SDK se importa una sola vez y al usarse"""
+        sdk = MagicMock()
+        with patch("app.services.llm_provider.importlib.import_module", return_value=sdk) as mock_import:
+            provider = GeminiProvider()
+            assert provider.loaded is False
+            mock_import.assert_not_called()
+
+            assert provider.sdk is sdk
+            assert provider.sdk is sdk
+
+        mock_import.assert_called_once_with("google.generativeai")
+        assert provider.loaded is True
+
+    def test_create_model(self):
+        """Test que valida la configuración de la API key y el modelo por defecto"""
+        sdk = MagicMock()
+        with patch("app.services.llm_provider.importlib.import_module", return_value=sdk):
+            model = GeminiProvider().create_model("clave")
+
+        sdk.configure.assert_called_once_with(api_key="clave")
+        sdk.GenerativeModel.assert_called_once_with(GEMINI_MODEL)
+        assert model is sdk.GenerativeModel.return_value
+
+    def test_generation_config(self):
+        """Test que valida la creación de GenerationConfig"""
+        sdk = SimpleNamespace(types=MagicMock())
+        with patch("app.services.llm_provider.importlib.import_module", return_value=sdk):
+            config = GeminiProvider().generation_config(max_output_tokens=10, temperature=0.1)
+
+        sdk.types.GenerationConfig.assert_called_once_with(max_output_tokens=10, temperature=0.1)
+        assert config is sdk.types.GenerationConfig.return_value
+
+    def test_real_sdk(self):
+        """Test que valida la importación del SDK instalado"""
+        provider = GeminiProvider()
+
+        assert provider.sdk is sys.modules["google.generativeai"]
+
+    def test_global_instance(self):
+        """Test que valida la instancia global"""
+        assert isinstance(gemini_provider, GeminiProvider)
@@ -0,0 +1,203 @@
+import gzip
+import logging
+import os
+import threading
+import time
+from unittest.mock import patch
+
+from app.services.log_rotation import RotatingLogFileHandler, build_file_handler
+
+
+def emit(handler: logging.Handler, message: str) -> None:
+    """Escribe un registro a través del handler"""
+    handler.handle(logging.makeLogRecord({"msg": message, "levelno": logging.INFO}))
+
+
+def rotated_files(directory):
+    """Archivos rotados del log, ordenados por nombre"""
+    return sorted(name for name in os.listdir(directory) if name.startswith("app.log."))
+
+
+class TestRotatingLogFileHandler:
+    """Tests para RotatingLogFileHandler"""
+
+    def setup_method(self):
+        self.handlers = []
+
+    def teardown_method(self):
+        for handler in self.handlers:
+            handler.close()
+
+    def _handler(self, directory, **kwargs) -> RotatingLogFileHandler:
+        kwargs.setdefault("when", "none")
+        handler = RotatingLogFileHandler(str(directory / "app.log"), **kwargs)
+        self.handlers.append(handler)
+        return handler
+
+    def test_rotates_by_size_and_compresses(self, tmp_path):
+        """Test que valida la rotación por tamaño y la compresión con gzip"""
+        handler = self._handler(tmp_path, max_bytes=100, backup_count=5)
+
+        emit(handler, "a" * 150)
+        emit(handler, "b" * 10)
+        handler.wait_for_compression()
+
+        rotated = rotated_files(tmp_path)
+        assert len(rotated) == 1
+        assert rotated[0].endswith(".gz")
+        with gzip.open(tmp_path / rotated[0], "rt") as compressed:
+            assert compressed.read() == "a" * 150 + "\n"
+        assert (tmp_path / "app.log").read_text() == "b" * 10 + "\n"
+
+    def test_no_size_rotation_below_limit(self, tmp_path):
+        """Test que valida que no rota mientras no se supera el tamaño"""
+        handler = self._handler(tmp_path, max_bytes=1000)
+
+        for _ in range(5):
+            emit(handler, "mensaje")
+
+        assert rotated_files(tmp_path) == []
+
+    def test_rotates_by_time(self, tmp_path):
+        """Test que valida la rotación al vencer el intervalo de tiempo"""
+        handler = self._handler(tmp_path, when="S", interval=1, compress=False)
+        emit(handler, "antes")
+
+        with patch("app.services.log_rotation.time.time", return_value=handler.rolloverAt + 1):
+            emit(handler, "después")
+
+        rotated = rotated_files(tmp_path)
+        assert len(rotated) == 1
+        assert (tmp_path / rotated[0]).read_text() == "antes\n"
+        assert handler.rolloverAt > time.time()
+
+    def test_time_rotation_disabled(self, tmp_path):
+        """Test que valida que when=none desactiva la rotación por tiempo"""
+        handler = self._handler(tmp_path, when="none")
+        handler.rolloverAt = 0
+
+        emit(handler, "mensaje")
+
+        assert rotated_files(tmp_path) == []
+
+    def test_backup_count(self, tmp_path):
+        """Test que valida que solo se conservan backup_count copias"""
+        handler = self._handler(tmp_path, max_bytes=10, backup_count=2)
+
+        for index in range(5):
+            emit(handler, f"mensaje número {index}")
+            handler.wait_for_compression()
+
+        rotated = rotated_files(tmp_path)
+        assert len(rotated) == 2
+        contents = [gzip.open(tmp_path / name, "rt").read() for name in rotated]
+        assert contents == ["mensaje número 2\n", "mensaje número 3\n"]
+
+    def test_backup_count_without_compression(self, tmp_path):
+        """Test que valida la depuración de copias sin compresión"""
+        handler = self._handler(tmp_path, max_bytes=10, backup_count=1, compress=False)
+
+        for index in range(3):
+            emit(handler, f"mensaje número {index}")
+
+        rotated = rotated_files(tmp_path)
+        assert len(rotated) == 1
+        assert not rotated[0].endswith(".gz")
+
+    def test_compression_does_not_block_writer(self, tmp_path):
+        """Test que valida que quien escribe no espera la compresión"""
+        handler = self._handler(tmp_path, max_bytes=10)
+        release = threading.Event()
+        original = handler._compress_and_cleanup
+
+        def slow_compress(rotated):
+            release.wait(5)
+            original(rotated)
+
+        with patch.object(handler, "_compress_and_cleanup", side_effect=slow_compress):
+            emit(handler, "mensaje largo para rotar")
+            started = time.perf_counter()
+            emit(handler, "siguiente mensaje")
+            elapsed = time.perf_counter() - started
+
+            assert elapsed < 0.5
+            assert not any(name.endswith(".gz") for name in rotated_files(tmp_path))
+
+            release.set()
+            handler.wait_for_compression()
+
+        assert any(name.endswith(".gz") for name in rotated_files(tmp_path))
+
+    def test_compression_error_keeps_file(self, tmp_path):
+        """Test que valida que si falla la compresión se conserva el archivo rotado"""
+        handler = self._handler(tmp_path, max_bytes=10)
+
+        with patch("app.services.log_rotation.gzip.open", side_effect=OSError("disco lleno")):
+            emit(handler, "mensaje largo para rotar")
+            emit(handler, "siguiente")
+            handler.wait_for_compression()
+
+        rotated = rotated_files(tmp_path)
+        assert len(rotated) == 1
+        assert not rotated[0].endswith(".gz")
+
+    def test_close_waits_for_compression(self, tmp_path):
+        """Test que valida que close termina las compresiones pendientes"""
+        handler = self._handler(tmp_path, max_bytes=10)
+        emit(handler, "mensaje largo para rotar")
+        emit(handler, "siguiente")
+
+        handler.close()
+
+        assert rotated_files(tmp_path)[0].endswith(".gz")
+
+
+class TestBuildFileHandler:
+    """Tests para build_file_handler"""
+
+    def test_defaults(self, tmp_path):
+        """Test que valida la configuración por defecto"""
+        with patch.dict(os.environ, {}, clear=True):
+            handler = build_file_handler(str(tmp_path))
+        handler.close()
+
+        assert handler.baseFilename == str(tmp_path / "analysis-service.log")
+        assert handler.max_bytes == 50 * 1024 * 1024
+        assert handler.time_rotation is True
+        assert handler.when == "MIDNIGHT"
+        assert handler.backupCount == 14
+        assert handler.compress is True
+
+    def test_configuration_from_environment(self, tmp_path):
+        """Test que valida la configuración desde variables de entorno"""
+        with patch.dict(os.environ, {
+            "LOG_FILE_MAX_BYTES": "1024",
+            "LOG_ROTATE_WHEN": "H",
+            "LOG_ROTATE_INTERVAL": "6",
+            "LOG_BACKUP_COUNT": "3",
+            "LOG_COMPRESS_BACKUPS": "false",
+        }, clear=True):
+            handler = build_file_handler(str(tmp_path))
+        handler.close()
+
+        assert handler.max_bytes == 1024
+        assert handler.when == "H"
+        assert handler.interval == 6 * 3600
+        assert handler.backupCount == 3
+        assert handler.compress is False
+
+    def test_worker_file(self, tmp_path):
+        """Test que valida el archivo propio de un worker"""
+        with patch.dict(os.environ, {}, clear=True):
+            handler = build_file_handler(str(tmp_path), worker=2)
+        handler.close()
+
+        assert handler.baseFilename == str(tmp_path / "analysis-service.worker-2.log")
+
+    def test_time_rotation_can_be_disabled(self, tmp_path):
+        """Test que valida LOG_ROTATE_WHEN=none"""
+        with patch.dict(os.environ, {"LOG_ROTATE_WHEN": "none"}, clear=True):
+            handler = build_file_handler(str(tmp_path))
+        handler.close()
+
+        assert handler.time_rotation is False
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from app.services.log_stream import (
+    LogBuffer,
+    LogSubscription,
+    log_buffer,
+    parse_stream_level,
+)
+from app.services.logger import JsonFormatter
+
+
+def make_record(message, level=logging.INFO, request=None):
+    """Crea un registro como los que emite el Logger"""
+    return logging.makeLogRecord(
+        {
+            "msg": message,
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "request": request or {},
+            "context": {},
+        }
+    )
+
+
+def build_buffer(capacity=10):
+    """Crea un buffer con el formatter JSON del servicio"""
+    buffer = LogBuffer(capacity)
+    buffer.setFormatter(JsonFormatter("json"))
+    return buffer
+
+
+def messages(events):
+    """Mensajes de los eventos de datos SSE"""
+    return [
+        json.loads(event[len("data: "):])["message"]
+        for event in events
+        if event.startswith("data: ")
+    ]
+
+
+async def next_event(stream, timeout=1):
+    """Siguiente evento del stream"""
+    return await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+
+
+async def start_stream(buffer, stream):
+    """Pide el primer evento en segundo plano y espera a que el stream se suscriba"""
+    first = asyncio.ensure_future(next_event(stream))
+    while not buffer.subscriber_count:
+        await asyncio.sleep(0)
+    return first
+
+
+class TestParseStreamLevel:
+    """Tests para parse_stream_level"""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            (None, logging.NOTSET),
+            ("", logging.NOTSET),
+            ("debug", logging.DEBUG),
+            ("SUCCESS", logging.INFO),
+            (" warning ", logging.WARNING),
+            ("ERROR", logging.ERROR),
+        ],
+    )
+    def test_valid_levels(self, value, expected):
+        """Test que valida los niveles aceptados"""
+        assert parse_stream_level(value) == expected
+
+    def test_invalid_level(self):
+        """Test que valida el error con un nivel desconocido"""
+        with pytest.raises(ValueError, match="Nivel de log inválido"):
+            parse_stream_level("VERBOSE")
+
+
+class TestLogSubscription:
+    """Tests para LogSubscription"""
+
+    @pytest.mark.asyncio
+    async def test_matches_filters(self):
+        """Test que valida los filtros por nivel, request id y usuario"""
+        subscription = LogSubscription(
+            asyncio.get_running_loop(), level=logging.WARNING, request_id="r1", user="ana"
+        )
+
+        assert subscription.matches(
+            make_record("ok", logging.ERROR, {"request_id": "r1", "user": "ana"})
+        )
+        assert not subscription.matches(
+            make_record("nivel", logging.INFO, {"request_id": "r1", "user": "ana"})
+        )
+        assert not subscription.matches(
+            make_record("petición", logging.ERROR, {"request_id": "r2", "user": "ana"})
+        )
+        assert not subscription.matches(
+            make_record("usuario", logging.ERROR, {"request_id": "r1", "user": "luis"})
+        )
+        assert not subscription.matches(make_record("sin contexto", logging.ERROR))
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_records(self):
+        """Test que valida que con la cola llena se descarta y se cuenta"""
+        subscription = LogSubscription(asyncio.get_running_loop(), max_pending=2)
+
+        for index in range(5):
+            subscription.offer(make_record(f"m{index}"))
+        await asyncio.sleep(0)
+
+        assert subscription.queue.qsize() == 2
+        assert subscription.dropped == 3
+
+    def test_offer_after_loop_closed(self):
+        """Test que valida que entregar a un loop cerrado no falla"""
+        loop = asyncio.new_event_loop()
+        subscription = LogSubscription(loop)
+        loop.close()
+
+        subscription.offer(make_record("tarde"))
+
+        assert subscription.dropped == 0
+
+
+class TestLogBuffer:
+    """Tests para LogBuffer"""
+
+    def test_keeps_last_records(self):
+        """Test que valida que el buffer conserva solo los últimos registros"""
+        buffer = build_buffer(capacity=3)
+
+        for index in range(5):
+            buffer.handle(make_record(f"m{index}"))
+
+        assert [record.getMessage() for record in buffer.snapshot()] == ["m2", "m3", "m4"]
+
+    def test_zero_capacity_keeps_nothing(self):
+        """Test que valida que con capacidad 0 no se guardan registros"""
+        buffer = build_buffer(capacity=0)
+
+        buffer.handle(make_record("m"))
+
+        assert buffer.snapshot() == ()
+
+    def test_handler_filters_apply(self):
+        """Test que valida que se respetan los filtros del handler"""
+        buffer = build_buffer()
+        buffer.addFilter(lambda record: record.levelno >= logging.WARNING)
+
+        assert buffer.handle(make_record("info")) is False
+        assert buffer.handle(make_record("warning", logging.WARNING)) is True
+        assert [record.getMessage() for record in buffer.snapshot()] == ["warning"]
+
+    @pytest.mark.asyncio
+    async def test_subscribe_and_unsubscribe(self):
+        """Test que valida el alta y baja de suscriptores"""
+        buffer = build_buffer()
+        subscription = LogSubscription(asyncio.get_running_loop())
+
+        buffer.subscribe(subscription)
+        buffer.handle(make_record("m"))
+        await asyncio.sleep(0)
+        buffer.unsubscribe(subscription)
+        buffer.handle(make_record("después"))
+        await asyncio.sleep(0)
+
+        assert buffer.subscriber_count == 0
+        assert subscription.queue.qsize() == 1
+
+    def test_global_instance(self):
+        """Test que valida la instancia global"""
+        assert isinstance(log_buffer, LogBuffer)
+
+
+class TestLogBufferStream:
+    """Tests para LogBuffer.stream"""
+
+    @pytest.mark.asyncio
+    async def test_backlog_then_live_records(self):
+        """Test que valida que se envía el historial y luego los registros nuevos"""
+        buffer = build_buffer()
+        for index in range(3):
+            buffer.handle(make_record(f"antes {index}"))
+
+        stream = buffer.stream(backlog=2, heartbeat_seconds=5)
+        events = [await next_event(stream), await next_event(stream)]
+        buffer.handle(make_record("nuevo"))
+        events.append(await next_event(stream))
+        await stream.aclose()
+
+        assert messages(events) == ["antes 1", "antes 2", "nuevo"]
+        assert all(event.endswith("\n\n") for event in events)
+        assert buffer.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_filters_are_applied_server_side(self):
+        """Test que valida los filtros en el historial y en los registros nuevos"""
+        buffer = build_buffer()
+        buffer.handle(make_record("otro usuario", request={"user": "luis"}))
+        buffer.handle(make_record("historial", request={"user": "ana"}))
+
+        buffer.handle(make_record("historial de ana", logging.ERROR, {"user": "ana"}))
+
+        stream = buffer.stream(level=logging.WARNING, user="ana", heartbeat_seconds=5)
+        first = await start_stream(buffer, stream)
+        buffer.handle(make_record("info de ana", request={"user": "ana"}))
+        buffer.handle(make_record("warning de luis", logging.WARNING, {"user": "luis"}))
+        buffer.handle(make_record("warning de ana", logging.WARNING, {"user": "ana"}))
+        events = [await first, await next_event(stream)]
+        await stream.aclose()
+
+        assert messages(events) == ["historial de ana", "warning de ana"]
+
+    @pytest.mark.asyncio
+    async def test_record_in_backlog_and_queue_is_sent_once(self):
+        """Test que valida que un registro emitido al conectar no se duplica"""
+        buffer = build_buffer()
+        original_snapshot = buffer.snapshot
+
+        def snapshot_after_emit():
+            buffer.handle(make_record("al conectar"))
+            return original_snapshot()
+
+        buffer.snapshot = snapshot_after_emit
+        stream = buffer.stream(heartbeat_seconds=5)
+        events = [await next_event(stream)]
+        buffer.handle(make_record("después"))
+        events.append(await next_event(stream))
+        await stream.aclose()
+
+        assert messages(events) == ["al conectar", "después"]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat(self):
+        """Test que valida el keepalive cuando no hay registros"""
+        buffer = build_buffer()
+        stream = buffer.stream(heartbeat_seconds=0.01)
+
+        event = await next_event(stream)
+        await stream.aclose()
+
+        assert event == ": keepalive\n\n"
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_drops_records(self):
+        """Test que valida que un cliente lento pierde registros sin frenar al productor"""
+        buffer = build_buffer()
+        stream = buffer.stream(backlog=0, heartbeat_seconds=5, max_pending=3)
+        first = await start_stream(buffer, stream)
+
+        started = time.perf_counter()
+        for index in range(100):
+            buffer.handle(make_record(f"m{index}"))
+        elapsed = time.perf_counter() - started
+
+        events = [await first]
+        events.append(await next_event(stream))
+        events.append(await next_event(stream))
+        await stream.aclose()
+
+        assert elapsed < 0.5
+        assert events[0] == 'event: dropped\ndata: {"dropped": 97}\n\n'
+        assert messages(events) == ["m0", "m1"]
+
+    @pytest.mark.asyncio
+    async def test_records_from_other_threads(self):
+        """Test que valida la entrega de registros emitidos en otro hilo"""
+        buffer = build_buffer()
+        stream = buffer.stream(heartbeat_seconds=5)
+        first = await start_stream(buffer, stream)
+
+        thread = threading.Thread(target=buffer.handle, args=(make_record("desde hilo"),))
+        thread.start()
+        thread.join()
+        event = await first
+        await stream.aclose()
+
+        assert messages([event]) == ["desde hilo"]
+
+
+@pytest.mark.slow
+class TestLogBufferOverhead:
+    """Benchmark del costo del buffer sin suscriptores"""
+
+    RECORDS = 100000
+
+    def test_emit_cost_without_subscribers(self):
+        """Test que valida que sin suscriptores el buffer no serializa y cuesta poco"""
+        buffer = LogBuffer(1000)
+        formatted = []
+        buffer.format = lambda record: formatted.append(record) or ""
+        records = [make_record(f"m{index}") for index in range(self.RECORDS)]
+
+        started = time.perf_counter()
+        for record in records:
+            buffer.handle(record)
+        per_record = (time.perf_counter() - started) / self.RECORDS
+
+        print(f"\nLogBuffer sin suscriptores: {per_record * 1e9:.0f} ns por registro")
+        assert formatted == []
+        assert per_record < 5e-6
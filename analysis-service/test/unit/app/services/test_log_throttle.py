@@ -0,0 +1,268 @@
+import io
+import logging
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services.log_throttle import LogThrottle, log_throttle
+from app.services.logger import JsonFormatter, Logger
+
+
+class FakeClock:
+    """Reloj controlable para los tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_logger(throttle: LogThrottle):
+    """Crea un Logger con un logger interno que escribe JSON en memoria"""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter("json"))
+    internal = logging.getLogger(f"test-log-throttle-{id(stream)}")
+    internal.propagate = False
+    internal.setLevel(logging.INFO)
+    internal.handlers = [handler]
+
+    logger = Logger.__new__(Logger)
+    logger._logger = internal
+    logger.console_print = False
+    logger.throttle = throttle
+    return logger, stream
+
+
+class TestLogThrottleConfiguration:
+    """Tests para la configuración de LogThrottle"""
+
+    def test_disabled_by_default(self):
+        """Test que valida que sin configuración no se suprime nada"""
+        with patch.dict(os.environ, {}, clear=True):
+            throttle = LogThrottle()
+
+        assert throttle.enabled is False
+        assert all(throttle.allow(logging.INFO, "clave") for _ in range(100))
+        assert throttle.take_summary(force=True) is None
+
+    def test_configuration_from_environment(self):
+        """Test que valida la configuración por nivel desde variables de entorno"""
+        with patch.dict(os.environ, {
+            "LOG_SAMPLE_RATE_INFO": "0.1",
+            "LOG_SAMPLE_RATE_DEBUG": "0",
+            "LOG_RATE_LIMIT_WARNING": "5",
+            "LOG_SUPPRESSION_SUMMARY_SECONDS": "30",
+        }, clear=True):
+            throttle = LogThrottle()
+
+        assert throttle.enabled is True
+        assert throttle.sample_every == {logging.DEBUG: 0, logging.INFO: 10, logging.WARNING: 1}
+        assert throttle.rate_limits == {logging.WARNING: 5.0}
+        assert throttle.summary_seconds == 30.0
+
+    def test_global_instance(self):
+        """Test que valida la instancia global"""
+        assert isinstance(log_throttle, LogThrottle)
+        assert Logger.throttle is log_throttle
+
+
+class TestLogThrottleAllow:
+    """Tests para LogThrottle.allow"""
+
+    def test_sampling_keeps_first_and_every_nth(self):
+        """Test que valida que se escribe el primero y luego uno de cada N por clave"""
+        throttle = LogThrottle(sample_rates={logging.INFO: 0.25}, rate_limits={})
+
+        allowed = [throttle.allow(logging.INFO, "a") for _ in range(8)]
+
+        assert allowed == [True, False, False, False, True, False, False, False]
+        assert throttle.allow(logging.INFO, "b") is True
+
+    def test_sample_rate_zero_suppresses_level(self):
+        """Test que valida que una tasa 0 suprime todos los mensajes del nivel"""
+        throttle = LogThrottle(sample_rates={logging.DEBUG: 0}, rate_limits={})
+
+        assert throttle.allow(logging.DEBUG, "a") is False
+        assert throttle.allow(logging.INFO, "a") is True
+
+    def test_errors_are_never_throttled(self):
+        """Test que valida que los errores nunca se muestrean ni se limitan"""
+        throttle = LogThrottle(
+            sample_rates={logging.ERROR: 0, logging.INFO: 0},
+            rate_limits={logging.ERROR: 1},
+        )
+
+        assert all(throttle.allow(logging.ERROR, "a") for _ in range(100))
+        assert all(throttle.allow(logging.CRITICAL, "a") for _ in range(100))
+
+    def test_token_bucket(self):
+        """Test que valida el límite por segundo y la recarga de tokens"""
+        clock = FakeClock()
+        throttle = LogThrottle(sample_rates={}, rate_limits={logging.INFO: 2}, clock=clock)
+
+        assert [throttle.allow(logging.INFO, "a") for _ in range(3)] == [True, True, False]
+        assert throttle.allow(logging.INFO, "b") is True
+
+        clock.now = 0.5
+        assert [throttle.allow(logging.INFO, "a") for _ in range(2)] == [True, False]
+
+        clock.now = 10
+        assert [throttle.allow(logging.INFO, "a") for _ in range(3)] == [True, True, False]
+
+    def test_fractional_rate_limit(self):
+        """Test que valida límites de menos de un mensaje por segundo"""
+        clock = FakeClock()
+        throttle = LogThrottle(sample_rates={}, rate_limits={logging.INFO: 0.5}, clock=clock)
+
+        assert [throttle.allow(logging.INFO, "a") for _ in range(2)] == [True, False]
+        clock.now = 1
+        assert throttle.allow(logging.INFO, "a") is False
+        clock.now = 2
+        assert throttle.allow(logging.INFO, "a") is True
+
+    def test_max_keys(self):
+        """Test que valida que las claves que exceden el máximo no se limitan"""
+        throttle = LogThrottle(sample_rates={logging.INFO: 0}, rate_limits={}, max_keys=2)
+
+        assert throttle.allow(logging.INFO, "a") is False
+        assert throttle.allow(logging.INFO, "b") is False
+        assert throttle.allow(logging.INFO, "c") is True
+
+
+class TestLogThrottleSummary:
+    """Tests para LogThrottle.take_summary"""
+
+    def test_summary_after_window(self):
+        """Test que valida el resumen por nivel y clave al terminar la ventana"""
+        clock = FakeClock()
+        throttle = LogThrottle(
+            sample_rates={logging.INFO: 0.5, logging.WARNING: 0},
+            rate_limits={},
+            summary_seconds=60,
+            clock=clock,
+        )
+        for _ in range(4):
+            throttle.allow(logging.INFO, "a")
+        throttle.allow(logging.WARNING, "b")
+
+        assert throttle.take_summary() is None
+
+        clock.now = 60
+        assert throttle.take_summary() == {"INFO": {"a": 2}, "WARNING": {"b": 1}}
+
+        # El estado se reinicia con la nueva ventana
+        assert throttle.allow(logging.INFO, "a") is True
+        clock.now = 120
+        assert throttle.take_summary() is None
+
+    def test_forced_summary(self):
+        """Test que valida el resumen forzado antes de terminar la ventana"""
+        throttle = LogThrottle(sample_rates={logging.INFO: 0}, rate_limits={}, clock=FakeClock())
+        throttle.allow(logging.INFO, "a")
+
+        assert throttle.take_summary(force=True) == {"INFO": {"a": 1}}
+        assert throttle.take_summary(force=True) is None
+
+
+class TestLoggerThrottling:
+    """Tests para la integración de LogThrottle con Logger"""
+
+    def test_suppressed_messages_are_not_written(self):
+        """Test que valida que los mensajes suprimidos no se escriben"""
+        logger, stream = build_logger(
+            LogThrottle(sample_rates={logging.INFO: 0.5}, rate_limits={}, clock=FakeClock())
+        )
+
+        for index in range(4):
+            logger.info(f"Petición a {index}", key="Petición a")
+            logger.error("Error repetido")
+
+        lines = stream.getvalue().splitlines()
+        assert sum('"Petición a' in line for line in lines) == 2
+        assert sum('"Error repetido"' in line for line in lines) == 4
+
+    def test_summary_is_logged(self):
+        """Test que valida que el resumen se registra al terminar la ventana"""
+        clock = FakeClock()
+        logger, stream = build_logger(
+            LogThrottle(sample_rates={logging.INFO: 0}, rate_limits={}, summary_seconds=10, clock=clock)
+        )
+
+        logger.info("Contenido desofuscado correctamente")
+        logger.success("Contenido desofuscado correctamente")
+        clock.now = 10
+        logger.info("Otro mensaje")
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 1
+        assert '"level":"WARNING"' in lines[0]
+        assert '"Mensajes de log suprimidos"' in lines[0]
+        assert '"data":{"INFO":{"Contenido desofuscado correctamente":2}}' in lines[0]
+
+    def test_log_suppressed_forced(self):
+        """Test que valida el resumen forzado (por ejemplo al apagar)"""
+        logger, stream = build_logger(
+            LogThrottle(sample_rates={logging.INFO: 0}, rate_limits={}, clock=FakeClock())
+        )
+        logger.info("mensaje")
+
+        logger.log_suppressed(force=True)
+
+        assert '"data":{"INFO":{"mensaje":1}}' in stream.getvalue()
+
+
+@pytest.mark.slow
+class TestLogThrottleReplay:
+    """Benchmark de volumen y CPU de logging en una repetición de 10k peticiones"""
+
+    REQUESTS = 10000
+
+    def _replay(self, throttle: LogThrottle):
+        """Emite las líneas de log de un análisis sin IA por cada petición"""
+        logger, stream = build_logger(throttle)
+        logger.set_context("AnalysisUseCase.execute", {"filename": "router.cfg"})
+
+        started = time.process_time()
+        for index in range(self.REQUESTS):
+            encrypted = f"{index:032x}"
+            logger.info("Ejecutando caso de uso de análisis")
+            logger.info("Nombre de archivo validado")
+            logger.info("Nombre de archivo encriptado correctamente con método compatible")
+            logger.info(f"Nombre de archivo encriptado: {encrypted}", key="Nombre de archivo encriptado")
+            logger.info(f"Nombre de archivo base64: {encrypted}==", key="Nombre de archivo base64")
+            logger.info("Obteniendo contenido del archivo desde el servicio de configuración")
+            logger.info(f"Realizando petición a: http://config/config/{encrypted}", key="Realizando petición a")
+            logger.info("Respuesta del servicio de configuración obtenida")
+            logger.info("Contenido encriptado extraído de la respuesta")
+            logger.info("Contenido desofuscado correctamente")
+            logger.info("Contenido desencriptado correctamente")
+            logger.success("Registro enviado a MongoDB exitosamente")
+            if index % 1000 == 0:
+                logger.error("Error al obtener archivo del servicio de configuración")
+        logger.log_suppressed(force=True)
+        elapsed = time.process_time() - started
+
+        return len(stream.getvalue().encode()), elapsed, stream.getvalue()
+
+    def test_replay_volume_and_cpu(self):
+        """Test que compara volumen y CPU sin límites y con muestreo del 1% en INFO"""
+        full_bytes, full_cpu, _ = self._replay(LogThrottle(sample_rates={}, rate_limits={}))
+        sampled_bytes, sampled_cpu, output = self._replay(
+            LogThrottle(sample_rates={logging.INFO: 0.01}, rate_limits={}, summary_seconds=3600)
+        )
+
+        print(
+            f"\n{self.REQUESTS} peticiones: sin muestreo {full_bytes / 1024:.0f} KiB en "
+            f"{full_cpu * 1000:.0f} ms de CPU; INFO al 1% {sampled_bytes / 1024:.0f} KiB en "
+            f"{sampled_cpu * 1000:.0f} ms de CPU"
+        )
+
+        # Los errores se escriben todos y el resumen reporta lo suprimido
+        assert output.count("Error al obtener archivo") == self.REQUESTS // 1000
+        assert '"Contenido desofuscado correctamente":9900' in output
+        assert sampled_bytes * 20 < full_bytes
+        assert sampled_cpu * 2 < full_cpu
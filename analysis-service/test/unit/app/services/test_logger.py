@@ -1,10 +1,46 @@
 import pytest
 import os
 import logging
+import asyncio
+import gc
+import io
 import json
+import sys
+import time
+import weakref
+from logging.handlers import QueueHandler
 from datetime import datetime
 from unittest.mock import patch, MagicMock, mock_open, call
-from app.services.logger import Logger
+from app.services import logger as logger_module
+from app.services.logger import (
+    LOGGER_NAME,
+    JsonFormatter,
+    LogListener,
+    Logger,
+    RequestContextFilter,
+    log_level_from_env,
+    log_listener,
+    use_worker_log_file,
+)
+from app.services.log_rotation import RotatingLogFileHandler
+from app.services.log_stream import log_buffer
+from app.services.request_context import bind_request_context, reset_request_context
+
+
+@pytest.fixture(autouse=True)
+def clean_function_context():
+    """Cada test empieza sin contexto de función (los tests síncronos comparten el del hilo)"""
+    token = logger_module._function_context.set({})
+    yield
+    logger_module._function_context.reset(token)
+
+
+def render(logger, message, data=None, formatter=None):
+    """Formatea un registro como lo haría un handler del servicio"""
+    record = logging.makeLogRecord(
+        {"msg": message, "levelname": "INFO", "levelno": logging.INFO, "context": logger.context, "data": data}
+    )
+    return (formatter or JsonFormatter()).format(record)
 
 
 class TestLogger:
@@ -18,6 +54,7 @@ class TestLogger:
             mock_logger.handlers = []
             mock_get_logger.return_value = mock_logger
             self.logger = Logger()
+            self.logger.console_print = True
             self.mock_logger = mock_logger
 
     def test_logger_initialization(self):
@@ -41,7 +78,7 @@ class TestLogger:
         with patch('logging.getLogger') as mock_get_logger, \
              patch('os.path.exists', return_value=False) as mock_exists, \
              patch('os.makedirs') as mock_makedirs, \
-             patch('logging.FileHandler'), \
+             patch('app.services.logger.build_file_handler'), \
              patch('logging.StreamHandler'):
             
             mock_internal_logger = MagicMock()
@@ -58,7 +95,7 @@ class TestLogger:
         with patch('logging.getLogger') as mock_get_logger, \
              patch('os.path.exists', return_value=True) as mock_exists, \
              patch('os.makedirs') as mock_makedirs, \
-             patch('logging.FileHandler'), \
+             patch('app.services.logger.build_file_handler'), \
              patch('logging.StreamHandler'):
             
             mock_internal_logger = MagicMock()
@@ -74,7 +111,7 @@ class TestLogger:
         """Test que valida la configuración de handlers"""
         with patch('logging.getLogger') as mock_get_logger, \
              patch('os.path.exists', return_value=True), \
-             patch('logging.FileHandler') as mock_file_handler, \
+             patch('app.services.logger.build_file_handler') as mock_file_handler, \
              patch('logging.StreamHandler') as mock_stream_handler:
             
             mock_internal_logger = MagicMock()
@@ -89,17 +126,18 @@ class TestLogger:
             Logger()
             
             # Verificar que se configuraron los handlers
-            mock_file_handler.assert_called_once_with("logs/analysis-service.log")
+            mock_file_handler.assert_called_once_with("logs")
             mock_stream_handler.assert_called_once()
             
-            # Verificar que se agregaron al logger
-            assert mock_internal_logger.addHandler.call_count == 2
+            # Verificar que se agregaron al logger (archivo, consola y buffer del stream)
+            assert mock_internal_logger.addHandler.call_count == 3
+            mock_internal_logger.addHandler.assert_any_call(log_buffer)
 
     def test_setup_logger_avoids_duplicate_handlers(self):
         """Test que valida que no duplica handlers"""
         with patch('logging.getLogger') as mock_get_logger, \
              patch('os.path.exists', return_value=True), \
-             patch('logging.FileHandler'), \
+             patch('app.services.logger.build_file_handler'), \
              patch('logging.StreamHandler'):
             
             mock_internal_logger = MagicMock()
@@ -112,6 +150,22 @@ class TestLogger:
             # No debería agregar handlers si ya los tiene
             mock_internal_logger.addHandler.assert_not_called()
 
+    def test_setup_logger_configures_level_and_directory_once(self):
+        """Test que valida que el nivel y el directorio no se reconfiguran en cada Logger"""
+        with patch('logging.getLogger') as mock_get_logger, \
+             patch('os.path.exists') as mock_exists, \
+             patch('os.makedirs') as mock_makedirs:
+            
+            mock_internal_logger = MagicMock()
+            mock_internal_logger.handlers = [MagicMock()]
+            mock_get_logger.return_value = mock_internal_logger
+            
+            Logger()
+            
+            mock_exists.assert_not_called()
+            mock_makedirs.assert_not_called()
+            mock_internal_logger.setLevel.assert_not_called()
+
     def test_set_context_basic(self):
         """Test que valida el establecimiento de contexto básico"""
         function_name = "test_function"
@@ -167,7 +221,7 @@ class TestLogger:
         self.logger.context = {"functionName": "test", "timestamp": "2023-01-01T12:00:00"}
         message = "Test message"
         
-        formatted = self.logger._format_message(message)
+        formatted = render(self.logger, message)
         
         # Parsear el JSON para verificar estructura
         parsed = json.loads(formatted)
@@ -181,7 +235,7 @@ class TestLogger:
         message = "Test message"
         data = {"key": "value", "number": 42}
         
-        formatted = self.logger._format_message(message, data)
+        formatted = render(self.logger, message, data)
         
         # Parsear el JSON para verificar estructura
         parsed = json.loads(formatted)
@@ -194,7 +248,7 @@ class TestLogger:
         self.logger.context = {"functionName": "test", "timestamp": "2023-01-01T12:00:00"}
         message = "Test message"
         
-        formatted = self.logger._format_message(message, None)
+        formatted = render(self.logger, message, None)
         
         # Parsear el JSON para verificar estructura
         parsed = json.loads(formatted)
@@ -213,7 +267,7 @@ class TestLogger:
             "nested": {"deep": {"value": "test"}}
         }
         
-        formatted = self.logger._format_message(message, data)
+        formatted = render(self.logger, message, data)
         
         # Verificar que es JSON válido y preserva caracteres Unicode
         parsed = json.loads(formatted)
@@ -225,26 +279,26 @@ class TestLogger:
         message = "Info message"
         data = {"key": "value"}
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.info(message, data)
             
-            mock_format.assert_called_once_with(message, data)
-            self.mock_logger.info.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.INFO, message, extra={"context": self.logger.context, "data": data}
+            )
             mock_print.assert_called_once_with(f"\033[94m[INFO]\033[0m {message}")
 
     def test_info_method_without_data(self):
         """Test que valida el método info sin datos"""
         message = "Info message"
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.info(message)
             
-            mock_format.assert_called_once_with(message, None)
-            self.mock_logger.info.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.INFO, message, extra={"context": self.logger.context, "data": None}
+            )
             mock_print.assert_called_once_with(f"\033[94m[INFO]\033[0m {message}")
 
     def test_error_method(self):
@@ -252,26 +306,26 @@ class TestLogger:
         message = "Error message"
         error = {"error_code": 500, "details": "Something went wrong"}
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.error(message, error)
             
-            mock_format.assert_called_once_with(message, error)
-            self.mock_logger.error.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.ERROR, message, extra={"context": self.logger.context, "data": error}
+            )
             mock_print.assert_called_once_with(f"\033[91m[ERROR]\033[0m {message}")
 
     def test_error_method_without_error_data(self):
         """Test que valida el método error sin datos de error"""
         message = "Error message"
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.error(message)
             
-            mock_format.assert_called_once_with(message, None)
-            self.mock_logger.error.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.ERROR, message, extra={"context": self.logger.context, "data": None}
+            )
             mock_print.assert_called_once_with(f"\033[91m[ERROR]\033[0m {message}")
 
     def test_success_method(self):
@@ -279,26 +333,26 @@ class TestLogger:
         message = "Success message"
         data = {"result": "completed", "count": 42}
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.success(message, data)
             
-            mock_format.assert_called_once_with(message, data)
-            self.mock_logger.info.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.INFO, message, extra={"context": self.logger.context, "data": data, "log_level": "SUCCESS"}
+            )
             mock_print.assert_called_once_with(f"\033[92m[SUCCESS]\033[0m {message}")
 
     def test_success_method_without_data(self):
         """Test que valida el método success sin datos"""
         message = "Success message"
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.success(message)
             
-            mock_format.assert_called_once_with(message, None)
-            self.mock_logger.info.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.INFO, message, extra={"context": self.logger.context, "data": None, "log_level": "SUCCESS"}
+            )
             mock_print.assert_called_once_with(f"\033[92m[SUCCESS]\033[0m {message}")
 
     def test_warning_method(self):
@@ -306,26 +360,26 @@ class TestLogger:
         message = "Warning message"
         data = {"reason": "deprecated", "alternative": "new_method"}
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.warning(message, data)
             
-            mock_format.assert_called_once_with(message, data)
-            self.mock_logger.warning.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.WARNING, message, extra={"context": self.logger.context, "data": data}
+            )
             mock_print.assert_called_once_with(f"\033[93m[WARNING]\033[0m {message}")
 
     def test_warning_method_without_data(self):
         """Test que valida el método warning sin datos"""
         message = "Warning message"
         
-        with patch.object(self.logger, '_format_message', return_value='formatted_message') as mock_format, \
-             patch('builtins.print') as mock_print:
+        with patch('builtins.print') as mock_print:
             
             self.logger.warning(message)
             
-            mock_format.assert_called_once_with(message, None)
-            self.mock_logger.warning.assert_called_once_with('formatted_message')
+            self.mock_logger.log.assert_called_once_with(
+                logging.WARNING, message, extra={"context": self.logger.context, "data": None}
+            )
             mock_print.assert_called_once_with(f"\033[93m[WARNING]\033[0m {message}")
 
     def test_get_timestamp(self):
@@ -344,7 +398,7 @@ class TestLogger:
         data = {"usuario": "José", "país": "España", "emoji": "🌍"}
         
         self.logger.set_context("test_unicode")
-        formatted = self.logger._format_message(message, data)
+        formatted = render(self.logger, message, data)
         
         # Verificar que el JSON mantiene los caracteres Unicode
         parsed = json.loads(formatted)
@@ -363,7 +417,7 @@ class TestLogger:
         }
         
         self.logger.set_context("test_large_data")
-        formatted = self.logger._format_message(message, large_data)
+        formatted = render(self.logger, message, large_data)
         
         # Verificar que puede manejar datos grandes
         parsed = json.loads(formatted)
@@ -375,26 +429,27 @@ class TestLogger:
         """Test que valida que el contexto persiste entre llamadas"""
         self.logger.set_context("persistent_function", {"session_id": "123"})
         
-        with patch.object(self.logger, '_format_message', return_value='formatted') as mock_format, \
-             patch('builtins.print'):
+        with patch('builtins.print'):
             
             self.logger.info("First message")
             self.logger.error("Second message")
             self.logger.success("Third message")
             
             # Verificar que todas las llamadas usan el mismo contexto
-            for call_args in mock_format.call_args_list:
-                # El contexto debería estar disponible en self.logger.context
-                pass  # El contexto se mantiene en self.logger.context
-            
-            assert mock_format.call_count == 3
+            assert self.mock_logger.log.call_count == 3
+            for call_args in self.mock_logger.log.call_args_list:
+                assert call_args.kwargs["extra"]["context"] == {
+                    "functionName": "persistent_function",
+                    "timestamp": self.logger.context["timestamp"],
+                    "session_id": "123",
+                }
 
     def test_empty_context_logging(self):
         """Test que valida el logging con contexto vacío"""
         # No establecer contexto intencionalmente
         message = "Message without context"
         
-        formatted = self.logger._format_message(message)
+        formatted = render(self.logger, message)
         parsed = json.loads(formatted)
         
         assert parsed["message"] == message
@@ -434,9 +489,11 @@ class TestLogger:
         message = "Test message"
         non_serializable_data = {"object": NonSerializable()}
         
-        # json.dumps debería fallar con este tipo de datos
-        with pytest.raises(TypeError):
-            self.logger._format_message(message, non_serializable_data)
+        # Los valores no serializables se escriben con str() en lugar de fallar
+        for backend in ["json", "orjson"]:
+            formatted = render(self.logger, message, non_serializable_data, JsonFormatter(backend))
+            parsed = json.loads(formatted)
+            assert "NonSerializable object" in parsed["data"]["object"]
 
     def test_multiple_logger_instances(self):
         """Test que valida múltiples instancias de logger"""
@@ -457,8 +514,8 @@ class TestLogger:
             assert logger1._logger == mock_logger1
             assert logger2._logger == mock_logger2
 
-    def test_context_isolation_between_instances(self):
-        """Test que valida que el contexto está aislado entre instancias"""
+    def test_context_is_shared_within_task(self):
+        """Test que valida que el contexto es el de la tarea: el último set_context lo reemplaza"""
         with patch('logging.getLogger') as mock_get_logger:
             mock_logger1 = MagicMock()
             mock_logger1.handlers = []
@@ -473,8 +530,470 @@ class TestLogger:
             logger1.set_context("function1", {"data": "value1"})
             logger2.set_context("function2", {"data": "value2"})
             
-            # Verificar que los contextos están separados
-            assert logger1.context["functionName"] == "function1"
-            assert logger2.context["functionName"] == "function2"
-            assert logger1.context["data"] == "value1"
-            assert logger2.context["data"] == "value2"
+            assert logger1.context is logger2.context
+            assert logger1.context["functionName"] == "function2"
+            assert logger1.context["data"] == "value2"
+
+
+class TestLoggerTaskContext:
+    """Tests para el contexto de función por tarea"""
+
+    def _logger(self):
+        with patch('logging.getLogger'):
+            return Logger()
+
+    @pytest.mark.asyncio
+    async def test_context_is_isolated_between_tasks(self):
+        """Test que valida que una instancia compartida no mezcla contextos entre tareas"""
+        shared = self._logger()
+        seen = {}
+
+        async def request(name):
+            shared.set_context(name)
+            await asyncio.sleep(0.01)
+            seen[name] = shared.context["functionName"]
+
+        await asyncio.gather(request("primera"), request("segunda"))
+
+        assert seen == {"primera": "primera", "segunda": "segunda"}
+        assert shared.context == {}
+
+    def test_context_does_not_retain_loggers(self):
+        """Test que valida que el contexto no retiene los Logger descartados"""
+        logger = self._logger()
+        logger.set_context("temporal")
+        reference = weakref.ref(logger)
+
+        del logger
+        gc.collect()
+
+        assert reference() is None
+
+
+class TestRequestContextFilter:
+    """Tests para RequestContextFilter"""
+
+    def test_adds_request_context(self):
+        """Test que valida que el registro recibe el contexto de la petición"""
+        record = logging.makeLogRecord({"msg": "mensaje"})
+        token = bind_request_context(request_id="abc", user="ana")
+        try:
+            assert RequestContextFilter().filter(record) is True
+        finally:
+            reset_request_context(token)
+
+        assert record.request == {"request_id": "abc", "user": "ana"}
+
+    def test_keeps_explicit_request(self):
+        """Test que valida que no sobrescribe un contexto explícito"""
+        record = logging.makeLogRecord({"msg": "mensaje", "request": {"request_id": "x"}})
+
+        RequestContextFilter().filter(record)
+
+        assert record.request == {"request_id": "x"}
+
+    def test_formatter_includes_request(self):
+        """Test que valida que el JSON incluye el contexto de la petición"""
+        record = logging.makeLogRecord({"msg": "mensaje", "request": {"request_id": "abc"}})
+
+        assert json.loads(JsonFormatter("json").format(record))["request"] == {"request_id": "abc"}
+
+    def test_formatter_omits_empty_request(self):
+        """Test que valida que fuera de una petición no se agrega la clave request"""
+        record = logging.makeLogRecord({"msg": "mensaje", "request": {}})
+
+        assert "request" not in json.loads(JsonFormatter("json").format(record))
+
+    def test_setup_logger_adds_filter_once(self):
+        """Test que valida que el filtro se agrega una sola vez al logger del servicio"""
+        internal = logging.getLogger("test-request-context-filter-once")
+        with patch('logging.getLogger', return_value=internal), \
+             patch('app.services.logger.build_file_handler'), \
+             patch('logging.StreamHandler'):
+            Logger()
+            Logger()
+
+        assert sum(isinstance(f, RequestContextFilter) for f in internal.filters) == 1
+        internal.handlers.clear()
+
+
+class TestLoggerConsolePrint:
+    """Tests para la salida opcional por print"""
+
+    def test_console_print_disabled_by_default(self):
+        """Test que valida que por defecto no se duplica la salida con print"""
+        with patch.dict(os.environ, {}, clear=True), \
+             patch('logging.getLogger'), \
+             patch('builtins.print') as mock_print:
+            logger = Logger()
+            logger.info("mensaje")
+            logger.error("mensaje")
+            logger.success("mensaje")
+            logger.warning("mensaje")
+
+        assert logger.console_print is False
+        mock_print.assert_not_called()
+
+    def test_console_print_enabled_from_environment(self):
+        """Test que valida que LOG_CONSOLE_PRINT habilita la salida con print"""
+        with patch.dict(os.environ, {"LOG_CONSOLE_PRINT": "true"}), \
+             patch('logging.getLogger'), \
+             patch('builtins.print') as mock_print:
+            Logger().info("mensaje")
+
+        mock_print.assert_called_once_with("\033[94m[INFO]\033[0m mensaje")
+
+
+class TestLogLevel:
+    """Tests para el nivel de logging configurable"""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("DEBUG", logging.DEBUG),
+            ("warning", logging.WARNING),
+            (" error ", logging.ERROR),
+            ("WARN", logging.WARNING),
+            ("invalido", logging.INFO),
+        ],
+    )
+    def test_log_level_from_env(self, value, expected):
+        """Test que valida la lectura de LOG_LEVEL"""
+        with patch.dict(os.environ, {"LOG_LEVEL": value}):
+            assert log_level_from_env() == expected
+
+    def test_log_level_default(self):
+        """Test que valida el nivel por defecto"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert log_level_from_env() == logging.INFO
+
+    def test_setup_logger_uses_log_level(self):
+        """Test que valida que el logger del servicio usa LOG_LEVEL"""
+        with patch.dict(os.environ, {"LOG_LEVEL": "WARNING"}), \
+             patch('logging.getLogger') as mock_get_logger, \
+             patch('os.path.exists', return_value=True), \
+             patch('app.services.logger.build_file_handler'), \
+             patch('logging.StreamHandler'):
+            mock_internal_logger = MagicMock()
+            mock_internal_logger.handlers = []
+            mock_get_logger.return_value = mock_internal_logger
+
+            Logger()
+
+        mock_internal_logger.setLevel.assert_called_once_with(logging.WARNING)
+
+    def test_disabled_level_short_circuits(self):
+        """Test que valida que un nivel deshabilitado no emite ni imprime"""
+        with patch('logging.getLogger') as mock_get_logger, \
+             patch('builtins.print') as mock_print:
+            mock_internal_logger = MagicMock()
+            mock_internal_logger.isEnabledFor.return_value = False
+            mock_get_logger.return_value = mock_internal_logger
+            logger = Logger()
+            logger.console_print = True
+
+            logger.debug("depuración", {"x": 1})
+            logger.info("información", {"x": 1})
+
+        mock_internal_logger.log.assert_not_called()
+        mock_print.assert_not_called()
+
+    def test_debug_method(self):
+        """Test que valida el método debug"""
+        with patch('logging.getLogger') as mock_get_logger:
+            mock_internal_logger = MagicMock()
+            mock_get_logger.return_value = mock_internal_logger
+            logger = Logger()
+
+            logger.debug("depuración", {"x": 1})
+
+        mock_internal_logger.log.assert_called_once_with(
+            logging.DEBUG, "depuración", extra={"context": {}, "data": {"x": 1}}
+        )
+
+    def test_filtered_records_are_not_serialized(self):
+        """Test que valida que los mensajes filtrados nunca se formatean"""
+        logger = logging.getLogger("test-log-level-filtered")
+        logger.propagate = False
+        logger.setLevel(logging.WARNING)
+        handler = logging.StreamHandler(io.StringIO())
+        formatter = JsonFormatter()
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+        try:
+            with patch.object(formatter, "format", wraps=formatter.format) as mock_format:
+                service_logger = Logger.__new__(Logger)
+                service_logger._logger = logger
+                service_logger.context = {}
+                service_logger.console_print = False
+
+                service_logger.info("filtrado", {"grande": list(range(1000))})
+                service_logger.warning("escrito")
+        finally:
+            logger.removeHandler(handler)
+
+        mock_format.assert_called_once()
+        assert json.loads(handler.stream.getvalue())["message"] == "escrito"
+
+
+class TestUseWorkerLogFile:
+    """Tests para use_worker_log_file"""
+
+    def test_replaces_inherited_file_handler(self, tmp_path):
+        """Test que valida que el worker escribe en su propio archivo con el mismo formato"""
+        logger = logging.getLogger(f"test-worker-log-{id(self)}")
+        inherited = RotatingLogFileHandler(str(tmp_path / "analysis-service.log"))
+        inherited.setFormatter(JsonFormatter())
+        console = logging.StreamHandler(io.StringIO())
+        logger.addHandler(inherited)
+        logger.addHandler(console)
+
+        try:
+            use_worker_log_file(3, logger_name=logger.name)
+
+            handlers = [h for h in logger.handlers if isinstance(h, RotatingLogFileHandler)]
+            assert len(handlers) == 1
+            assert handlers[0] is not inherited
+            assert handlers[0].baseFilename == str(tmp_path / "analysis-service.worker-3.log")
+            assert isinstance(handlers[0].formatter, JsonFormatter)
+            assert console in logger.handlers
+            assert inherited.stream is None
+        finally:
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+
+
+class TestJsonFormatter:
+    """Tests para JsonFormatter"""
+
+    def _record(self, **attributes):
+        record = logging.makeLogRecord(
+            {"msg": "mensaje", "levelname": "INFO", "levelno": logging.INFO, "created": 0, **attributes}
+        )
+        return record
+
+    @pytest.mark.parametrize("backend", ["json", "orjson"])
+    def test_single_line_output(self, backend):
+        """Test que valida que cada registro ocupa una sola línea"""
+        formatted = JsonFormatter(backend).format(
+            self._record(context={"functionName": "f"}, data={"texto": "línea 1\nlínea 2"})
+        )
+
+        assert "\n" not in formatted
+        assert json.loads(formatted) == {
+            "timestamp": "1970-01-01T00:00:00+00:00",
+            "level": "INFO",
+            "service": LOGGER_NAME,
+            "message": "mensaje",
+            "context": {"functionName": "f"},
+            "data": {"texto": "línea 1\nlínea 2"},
+        }
+
+    def test_custom_level_name(self):
+        """Test que valida el nivel SUCCESS de los mensajes de éxito"""
+        formatted = JsonFormatter("json").format(self._record(log_level="SUCCESS"))
+
+        assert json.loads(formatted)["level"] == "SUCCESS"
+
+    def test_message_args(self):
+        """Test que valida la interpolación de argumentos del mensaje"""
+        formatted = JsonFormatter("json").format(self._record(msg="total %s", args=(3,)))
+
+        assert json.loads(formatted)["message"] == "total 3"
+
+    def test_exception(self):
+        """Test que valida que se incluye la traza de la excepción"""
+        try:
+            raise ValueError("fallo")
+        except ValueError:
+            record = self._record(exc_info=sys.exc_info())
+
+        parsed = json.loads(JsonFormatter("json").format(record))
+        assert "ValueError: fallo" in parsed["exception"]
+
+    def test_backend_from_environment(self):
+        """Test que valida la selección del backend con LOG_JSON_BACKEND"""
+        with patch.dict(os.environ, {"LOG_JSON_BACKEND": "json"}):
+            assert JsonFormatter().backend == "json"
+        with patch.dict(os.environ, {"LOG_JSON_BACKEND": "orjson"}):
+            assert JsonFormatter().backend == "orjson"
+
+    def test_backend_falls_back_without_orjson(self):
+        """Test que valida que sin orjson se usa json de la biblioteca estándar"""
+        with patch('app.services.logger.orjson', None):
+            formatter = JsonFormatter("orjson")
+
+        assert formatter.backend == "json"
+        assert json.loads(formatter.format(self._record()))["message"] == "mensaje"
+
+    def test_orjson_unsupported_value_falls_back(self):
+        """Test que valida el respaldo a json con valores que orjson no admite"""
+        formatted = JsonFormatter("orjson").format(self._record(data={"grande": 2 ** 70}))
+
+        assert json.loads(formatted)["data"]["grande"] == 2 ** 70
+
+    def test_non_string_keys(self):
+        """Test que valida datos con claves no textuales"""
+        for backend in ["json", "orjson"]:
+            formatted = JsonFormatter(backend).format(self._record(data={1: "uno"}))
+            assert json.loads(formatted)["data"] == {"1": "uno"}
+
+
+class SlowHandler(logging.Handler):
+    """Handler que simula un disco lento"""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__()
+        self.delay = delay
+        self.messages = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.messages.append(record.getMessage())
+
+
+class TestLogListener:
+    """Tests para LogListener"""
+
+    def setup_method(self):
+        """Crea un logger aislado con un handler de prueba"""
+        self.name = f"test-log-listener-{id(self)}"
+        self.logger = logging.getLogger(self.name)
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = SlowHandler()
+        self.logger.addHandler(self.handler)
+        self.listener = LogListener(self.name)
+
+    def teardown_method(self):
+        """Detiene el listener y limpia el logger"""
+        self.listener.stop()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+
+    def test_start_replaces_handlers_with_queue(self):
+        """Test que valida que al iniciar solo queda el QueueHandler"""
+        with patch('app.services.logger.Logger'):
+            self.listener.start()
+
+        assert self.listener.running is True
+        assert len(self.logger.handlers) == 1
+        assert isinstance(self.logger.handlers[0], QueueHandler)
+
+    def test_records_are_written_by_listener(self):
+        """Test que valida que los registros encolados llegan al handler"""
+        with patch('app.services.logger.Logger'):
+            self.listener.start()
+
+        self.logger.info("primero")
+        self.logger.info("segundo")
+        self.listener.stop()
+
+        assert self.handler.messages == ["primero", "segundo"]
+
+    def test_stop_restores_handlers(self):
+        """Test que valida que al detener se restauran los handlers originales"""
+        with patch('app.services.logger.Logger'):
+            self.listener.start()
+        self.listener.stop()
+
+        assert self.listener.running is False
+        assert self.logger.handlers == [self.handler]
+
+        self.logger.info("síncrono")
+        assert self.handler.messages == ["síncrono"]
+
+    def test_stop_logs_suppressed_summary(self):
+        """Test que valida que al detener se registra el resumen de mensajes suprimidos"""
+        with patch('app.services.logger.Logger') as mock_logger_class:
+            self.listener.start()
+            self.listener.stop()
+
+        mock_logger_class.return_value.log_suppressed.assert_called_once_with(force=True)
+
+    def test_start_is_idempotent(self):
+        """Test que valida que iniciar dos veces no duplica el QueueHandler"""
+        with patch('app.services.logger.Logger'):
+            self.listener.start()
+            self.listener.start()
+
+        assert len(self.logger.handlers) == 1
+
+    def test_stop_without_start(self):
+        """Test que valida que detener sin iniciar no falla"""
+        self.listener.stop()
+
+        assert self.logger.handlers == [self.handler]
+
+    def test_respects_handler_level(self):
+        """Test que valida que se respeta el nivel de cada handler"""
+        self.handler.setLevel(logging.ERROR)
+        with patch('app.services.logger.Logger'):
+            self.listener.start()
+
+        self.logger.info("ignorado")
+        self.logger.error("escrito")
+        self.listener.stop()
+
+        assert self.handler.messages == ["escrito"]
+
+    def test_start_configures_service_logger(self):
+        """Test que valida que start configura los handlers del servicio"""
+        with patch('app.services.logger.Logger') as mock_logger_class:
+            self.listener.start()
+
+        mock_logger_class.assert_called_once()
+
+    def test_global_instance(self):
+        """Test que valida la instancia global"""
+        assert isinstance(log_listener, LogListener)
+        assert log_listener._logger_name == LOGGER_NAME
+
+
+@pytest.mark.slow
+class TestLogListenerBenchmark:
+    """Benchmark del costo del logging en el camino de la petición"""
+
+    LINES_PER_REQUEST = 20
+    REQUESTS = 20
+    DISK_DELAY = 0.001
+
+    def _request_latency(self, logger: logging.Logger) -> float:
+        """Latencia media de una petición que emite LINES_PER_REQUEST líneas"""
+        started = time.perf_counter()
+        for request in range(self.REQUESTS):
+            for line in range(self.LINES_PER_REQUEST):
+                logger.info("petición %s línea %s", request, line)
+        return (time.perf_counter() - started) / self.REQUESTS
+
+    def test_queue_removes_disk_latency_from_requests(self):
+        """Test que compara la latencia con disco lento, síncrono y con cola"""
+        logger = logging.getLogger("test-log-listener-benchmark")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = SlowHandler(self.DISK_DELAY)
+        logger.addHandler(handler)
+        listener = LogListener(logger.name)
+
+        try:
+            sync_latency = self._request_latency(logger)
+
+            with patch('app.services.logger.Logger'):
+                listener.start()
+            queued_latency = self._request_latency(logger)
+            listener.stop()
+        finally:
+            listener.stop()
+            logger.removeHandler(handler)
+
+        print(
+            f"\nLatencia por petición ({self.LINES_PER_REQUEST} líneas, "
+            f"disco {self.DISK_DELAY * 1000:.1f} ms/línea): "
+            f"síncrono {sync_latency * 1000:.2f} ms, cola {queued_latency * 1000:.2f} ms"
+        )
+
+        # Ningún registro se pierde al detener el listener
+        assert len(handler.messages) == 2 * self.REQUESTS * self.LINES_PER_REQUEST
+        assert queued_latency * 5 < sync_latency
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from app.services.loop_monitor import LoopLagMonitor
+from app.services.metrics import ServiceMetrics
+
+
+def blocking_call(seconds: float) -> None:
+    """Llamada síncrona que bloquea el event loop"""
+    time.sleep(seconds)
+
+
+def sample_value(service_metrics: ServiceMetrics, name: str) -> float:
+    return service_metrics.registry.get_sample_value(name) or 0.0
+
+
+class TestLoopLagMonitor:
+    """Tests para LoopLagMonitor"""
+
+    def setup_method(self):
+        self.metrics = ServiceMetrics(CollectorRegistry())
+
+    def monitor(self, **kwargs) -> LoopLagMonitor:
+        with patch("app.services.loop_monitor.Logger"):
+            return LoopLagMonitor(service_metrics=self.metrics, **kwargs)
+
+    def test_configuration_from_environment(self):
+        """Test que valida la configuración por variables de entorno"""
+        with patch.dict(
+            "os.environ",
+            {
+                "LOOP_MONITOR_INTERVAL": "0.2",
+                "LOOP_BLOCK_THRESHOLD_MS": "40",
+                "LOOP_MONITOR_DEBUG": "true",
+            },
+        ):
+            monitor = self.monitor()
+
+        assert monitor.interval == 0.2
+        assert monitor.threshold == 0.04
+        assert monitor.debug is True
+
+    @pytest.mark.asyncio
+    async def test_measures_lag_without_blocking(self):
+        """Test que valida la medición del retraso cuando nada bloquea"""
+        monitor = self.monitor(interval=0.005, threshold=0.05)
+
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert sample_value(self.metrics, "analysis_service_event_loop_lag_seconds_count") > 3
+        assert sample_value(self.metrics, "analysis_service_event_loop_blocked_total") == 0
+        assert monitor.max_lag < 0.05
+        assert list(monitor.blocking_events) == []
+        assert monitor.running is False
+
+    @pytest.mark.asyncio
+    async def test_detects_blocking_call(self):
+        """Test que valida que un bloqueo se cuenta y se registra sin stack fuera de debug"""
+        monitor = self.monitor(interval=0.005, threshold=0.03)
+
+        await monitor.start()
+        await asyncio.sleep(0.01)
+        blocking_call(0.08)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        assert monitor.max_lag >= 0.03
+        assert sample_value(self.metrics, "analysis_service_event_loop_blocked_total") == 1
+        event = monitor.blocking_events[0]
+        assert event["lag_ms"] >= 30
+        assert event["stack"] is None
+        monitor.logger.warning.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_debug_captures_stack(self):
+        """Test que valida que en modo debug se captura el stack del código que bloquea"""
+        monitor = self.monitor(interval=0.005, threshold=0.02, debug=True)
+        loop = asyncio.get_running_loop()
+        previous_debug = loop.get_debug()
+
+        await monitor.start()
+        assert loop.get_debug() is True
+        assert loop.slow_callback_duration == 0.02
+        await asyncio.sleep(0.01)
+        blocking_call(0.1)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        assert loop.get_debug() is previous_debug
+        stack = monitor.blocking_events[0]["stack"]
+        assert "blocking_call" in stack
+        assert "time.sleep(seconds)" in stack
+        message, data = monitor.logger.warning.call_args[0]
+        assert message.startswith("Event loop bloqueado")
+        assert data["stack"] == stack
+
+    @pytest.mark.asyncio
+    async def test_start_twice_and_stop_without_start(self):
+        """Test que valida que iniciar dos veces o detener sin iniciar no falla"""
+        monitor = self.monitor(interval=0.01, threshold=0.05)
+        await monitor.stop()
+
+        await monitor.start()
+        task = monitor._task
+        await monitor.start()
+
+        assert monitor._task is task
+        await monitor.stop()
@@ -0,0 +1,200 @@
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from app.services.encrypt import Encrypt
+from app.services.metrics import METRICS_NAMESPACE, ServiceMetrics, metrics
+from app.usecase.analysis_usecase import AnalysisUseCase
+
+
+def sample(service_metrics: ServiceMetrics, name: str, **labels) -> float:
+    """Valor de una muestra del registro (0 si no existe)"""
+    value = service_metrics.registry.get_sample_value(f"{METRICS_NAMESPACE}_{name}", labels)
+    return value or 0.0
+
+
+class TestServiceMetrics:
+    """Tests para ServiceMetrics"""
+
+    def setup_method(self):
+        self.metrics = ServiceMetrics(CollectorRegistry())
+
+    def test_stage_records_duration(self):
+        """Test que valida que stage registra una observación por uso"""
+        with self.metrics.stage("analysis", "decrypt"):
+            time.sleep(0.002)
+        with self.metrics.stage("analysis", "decrypt"):
+            pass
+
+        labels = {"component": "analysis", "stage": "decrypt"}
+        assert sample(self.metrics, "stage_duration_seconds_count", **labels) == 2
+        assert sample(self.metrics, "stage_duration_seconds_sum", **labels) >= 0.002
+
+    def test_stage_records_duration_on_error(self):
+        """Test que valida que la etapa se mide aunque falle"""
+        with pytest.raises(RuntimeError):
+            with self.metrics.stage("auth", "validate_token"):
+                raise RuntimeError("fallo")
+
+        assert sample(
+            self.metrics, "stage_duration_seconds_count", component="auth", stage="validate_token"
+        ) == 1
+
+    def test_stage_reuses_labelled_child(self):
+        """Test que valida que los hijos con etiquetas se crean una sola vez"""
+        with patch.object(
+            self.metrics.stage_duration, "labels", wraps=self.metrics.stage_duration.labels
+        ) as mock_labels:
+            for _ in range(3):
+                with self.metrics.stage("analysis", "llm"):
+                    pass
+
+        mock_labels.assert_called_once_with("analysis", "llm")
+
+    def test_track_in_flight(self):
+        """Test que valida el gauge de operaciones en curso"""
+        with self.metrics.track_in_flight("analysis"):
+            with self.metrics.track_in_flight("analysis"):
+                assert sample(self.metrics, "in_flight", operation="analysis") == 2
+            assert sample(self.metrics, "in_flight", operation="analysis") == 1
+
+        assert sample(self.metrics, "in_flight", operation="analysis") == 0
+
+    def test_counters(self):
+        """Test que valida los contadores de caché, respaldo y parseo"""
+        self.metrics.record_cache("llm_coalescer", hit=True)
+        self.metrics.record_cache("llm_coalescer", hit=False)
+        self.metrics.record_cache("llm_coalescer", hit=True)
+        self.metrics.record_fallback("llm_error")
+        self.metrics.llm_parse_failures.inc()
+
+        assert sample(self.metrics, "cache_requests_total", cache="llm_coalescer", result="hit") == 2
+        assert sample(self.metrics, "cache_requests_total", cache="llm_coalescer", result="miss") == 1
+        assert sample(self.metrics, "fallbacks_total", reason="llm_error") == 1
+        assert sample(self.metrics, "llm_parse_failures_total") == 1
+
+    def test_record_llm_usage(self):
+        """Test que valida los tokens tomados de usage_metadata"""
+        response = SimpleNamespace(
+            usage_metadata=SimpleNamespace(prompt_token_count=120, candidates_token_count=45)
+        )
+
+        self.metrics.record_llm_usage(response)
+        self.metrics.record_llm_usage(response)
+
+        assert sample(self.metrics, "llm_tokens_total", type="prompt") == 240
+        assert sample(self.metrics, "llm_tokens_total", type="completion") == 90
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            SimpleNamespace(),
+            SimpleNamespace(usage_metadata=None),
+            SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=None)),
+            MagicMock(),
+        ],
+    )
+    def test_record_llm_usage_without_usage(self, response):
+        """Test que valida que las respuestas sin uso de tokens se ignoran"""
+        self.metrics.record_llm_usage(response)
+
+        assert sample(self.metrics, "llm_tokens_total", type="prompt") == 0
+        assert sample(self.metrics, "llm_tokens_total", type="completion") == 0
+
+    def test_render(self):
+        """Test que valida el formato de texto de Prometheus"""
+        with self.metrics.stage("analysis", "total"):
+            pass
+
+        body, content_type = self.metrics.render()
+
+        assert content_type.startswith("text/plain")
+        text = body.decode()
+        assert "# TYPE analysis_service_stage_duration_seconds histogram" in text
+        assert 'analysis_service_stage_duration_seconds_count{component="analysis",stage="total"} 1.0' in text
+        assert "# TYPE analysis_service_llm_tokens_total counter" in text
+
+    def test_render_multiprocess(self, tmp_path):
+        """Test que valida que con PROMETHEUS_MULTIPROC_DIR se exportan los valores de todos los workers"""
+        with self.metrics.stage("analysis", "total"):
+            pass
+
+        with patch.dict("os.environ", {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}), patch(
+            "app.services.metrics.multiprocess.MultiProcessCollector"
+        ) as mock_collector:
+            body, content_type = self.metrics.render()
+
+        registry = mock_collector.call_args[0][0]
+        assert isinstance(registry, CollectorRegistry)
+        assert registry is not self.metrics.registry
+        assert content_type.startswith("text/plain")
+        assert b"stage_duration_seconds" not in body
+
+    def test_global_instance(self):
+        """Test que valida la instancia global"""
+        assert isinstance(metrics, ServiceMetrics)
+
+
+@pytest.mark.slow
+class TestMetricsOverhead:
+    """Benchmark del costo de la instrumentación frente al tiempo de una petición"""
+
+    ITERATIONS = 20000
+    REQUESTS = 20
+
+    def _instrument_request(self, service_metrics: ServiceMetrics) -> None:
+        """Las mismas mediciones que hacen AuthMiddleware y execute en una petición"""
+        with service_metrics.track_in_flight("auth"), service_metrics.stage("auth", "validate_token"):
+            pass
+        with service_metrics.track_in_flight("analysis"), service_metrics.stage("analysis", "total"):
+            for stage in ("encrypt_filename", "config_fetch", "decrypt", "db_save", "response"):
+                with service_metrics.stage("analysis", stage):
+                    pass
+
+    async def _request_seconds(self) -> float:
+        """Duración de execute sin IA con cifrado real y E/S simulada sin latencia"""
+        encrypt = Encrypt("clave")
+        content = encrypt.ofuscar_base64(encrypt.encrypt("interface eth0\n" * 200))
+
+        response = MagicMock()
+        response.json.return_value = {"data": {"content": content}}
+        client = AsyncMock()
+        client.get.return_value = response
+        client.__aenter__.return_value = client
+
+        with patch("app.usecase.analysis_usecase.Logger"), patch(
+            "app.usecase.analysis_usecase.AsyncAnalysisRepository"
+        ), patch("app.usecase.analysis_usecase.httpx.AsyncClient", return_value=client):
+            usecase = AnalysisUseCase()
+            usecase.encrypt = encrypt
+            usecase._save_analysis_record = AsyncMock()
+
+            durations = []
+            for _ in range(self.REQUESTS):
+                started = time.perf_counter()
+                await usecase.execute("router.cfg", {"token": "t", "user": "ana"}, False)
+                durations.append(time.perf_counter() - started)
+
+        return statistics.median(durations)
+
+    def test_overhead_under_one_percent(self):
+        """Test que valida que la instrumentación cuesta menos del 1% de una petición"""
+        service_metrics = ServiceMetrics(CollectorRegistry())
+        started = time.perf_counter()
+        for _ in range(self.ITERATIONS):
+            self._instrument_request(service_metrics)
+        per_request = (time.perf_counter() - started) / self.ITERATIONS
+
+        request_seconds = asyncio.run(self._request_seconds())
+
+        print(
+            f"\nInstrumentación: {per_request * 1e6:.1f} µs por petición; "
+            f"execute sin IA ni red: {request_seconds * 1000:.1f} ms "
+            f"({per_request / request_seconds:.3%})"
+        )
+        assert per_request < request_seconds * 0.01
@@ -1,7 +1,16 @@
 import pytest
 import os
 from unittest.mock import patch, MagicMock
-from app.services.mongodb_service import MongoDBService, mongodb_service
+from app.services.mongodb_service import MongoDBService, mongodb_service, pool_options
+
+# Opciones del pool sin variables de entorno
+DEFAULT_POOL_OPTIONS = {
+    "maxPoolSize": 100,
+    "minPoolSize": 10,
+    "waitQueueTimeoutMS": 5000,
+    "serverSelectionTimeoutMS": 5000,
+    "compressors": "zlib",
+}
 
 
 class TestMongoDBService:
@@ -56,7 +65,8 @@ class TestMongoDBService:
             mock_connect.assert_called_once_with(
                 db="test_db",
                 host="mongodb://test_host:27018/test_db",
-                alias="default"
+                alias="default",
+                **DEFAULT_POOL_OPTIONS
             )
             
             # Verificar logging de éxito
@@ -103,7 +113,8 @@ class TestMongoDBService:
             mock_connect.assert_called_once_with(
                 db="auth_db",
                 host=expected_uri,
-                alias="default"
+                alias="default",
+                **DEFAULT_POOL_OPTIONS
             )
             
             assert self.service.connection == mock_connection
@@ -129,7 +140,8 @@ class TestMongoDBService:
             mock_connect.assert_called_once_with(
                 db="analysis_service",
                 host="mongodb://localhost:27017/analysis_service",
-                alias="default"
+                alias="default",
+                **DEFAULT_POOL_OPTIONS
             )
 
     def test_connect_with_partial_authentication(self):
@@ -154,7 +166,8 @@ class TestMongoDBService:
             mock_connect.assert_called_once_with(
                 db="analysis_service",
                 host="mongodb://localhost:27017/analysis_service",
-                alias="default"
+                alias="default",
+                **DEFAULT_POOL_OPTIONS
             )
 
     def test_connect_with_custom_port_as_string(self):
@@ -267,7 +280,8 @@ class TestMongoDBService:
             mock_connect.assert_called_once_with(
                 db="testdb",
                 host=expected_uri,
-                alias="default"
+                alias="default",
+                **DEFAULT_POOL_OPTIONS
             )
 
     def test_multiple_connect_calls(self):
@@ -360,6 +374,47 @@ class TestMongoDBService:
             assert self.service.connection == mock_connection
 
 
+class TestPoolOptions:
+    """Tests para la configuración del pool de conexiones"""
+
+    def test_pool_options_defaults(self):
+        """Test que valida los valores por defecto del pool"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert pool_options() == DEFAULT_POOL_OPTIONS
+
+    def test_pool_options_from_environment(self):
+        """Test que valida que las variables de entorno sobrescriben el pool"""
+        with patch.dict(os.environ, {
+            "MONGO_MAX_POOL_SIZE": "50",
+            "MONGO_MIN_POOL_SIZE": "0",
+            "MONGO_WAIT_QUEUE_TIMEOUT_MS": "1000",
+            "MONGO_SERVER_SELECTION_TIMEOUT_MS": "2000",
+            "MONGO_COMPRESSORS": "zstd,zlib",
+        }, clear=True):
+            assert pool_options() == {
+                "maxPoolSize": 50,
+                "minPoolSize": 0,
+                "waitQueueTimeoutMS": 1000,
+                "serverSelectionTimeoutMS": 2000,
+                "compressors": "zstd,zlib",
+            }
+
+    def test_pool_options_without_compression(self):
+        """Test que valida que un valor vacío desactiva la compresión"""
+        with patch.dict(os.environ, {"MONGO_COMPRESSORS": ""}, clear=True):
+            assert "compressors" not in pool_options()
+
+    def test_connect_passes_pool_options(self):
+        """Test que valida que connect recibe las opciones del pool"""
+        with patch.dict(os.environ, {"MONGO_MAX_POOL_SIZE": "20"}, clear=True), \
+             patch('app.services.mongodb_service.Logger'), \
+             patch('app.services.mongodb_service.connect') as mock_connect:
+            MongoDBService().connect()
+
+            assert mock_connect.call_args.kwargs["maxPoolSize"] == 20
+            assert mock_connect.call_args.kwargs["minPoolSize"] == 10
+
+
 class TestMongoDBServiceGlobalInstance:
     """Tests para la instancia global mongodb_service"""
 
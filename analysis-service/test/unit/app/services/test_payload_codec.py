@@ -0,0 +1,226 @@
+import time
+import zlib
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import bson
+import pytest
+
+from app.services import payload_codec as payload_codec_module
+from app.services.payload_codec import CODEC_MARKER, PayloadCodec
+
+# Configuración real de ejemplo del repositorio (si está disponible)
+_SHOW_RUNNING = Path(__file__).resolve().parents[5] / "show_running.txt"
+
+
+def _codec(**kwargs):
+    """Crea un codec con logger simulado"""
+    with patch("app.services.payload_codec.Logger") as mock_logger_class:
+        mock_logger_class.return_value = MagicMock()
+        return PayloadCodec(**kwargs)
+
+
+def _cisco_config(switch: int, ports: int = 48) -> str:
+    """Genera un running-config de Cisco IOS con interfaces, VLANs y ACLs"""
+    lines = [
+        "version 15.2",
+        "service timestamps debug datetime msec",
+        "no service password-encryption",
+        f"hostname SW-ACCESS-{switch:03d}",
+        "!",
+        "enable secret 5 $1$mERr$hx5rVt7rPNoS4wqbXKX7m0",
+        "username admin privilege 15 secret 5 $1$mERr$hx5rVt7rPNoS4wqbXKX7m0",
+        "aaa new-model",
+        "ip domain-name corp.example.com",
+        "!",
+    ]
+    for vlan in (10, 20, 30, 40, 99):
+        lines += [f"vlan {vlan}", f" name VLAN_{vlan}_USUARIOS", "!"]
+    for port in range(1, ports + 1):
+        lines += [
+            f"interface GigabitEthernet1/0/{port}",
+            f" description Puesto {switch}-{port} planta {port % 4}",
+            " switchport mode access",
+            f" switchport access vlan {(10, 20, 30, 40)[port % 4]}",
+            " switchport port-security maximum 2",
+            " switchport port-security violation restrict",
+            " spanning-tree portfast",
+            " spanning-tree bpduguard enable",
+            "!",
+        ]
+    for rule in range(40):
+        lines.append(
+            f"access-list 110 permit tcp 10.{switch % 250}.{rule}.0 0.0.0.255 any eq {8000 + rule}"
+        )
+    lines += [
+        "!",
+        "snmp-server community public RO",
+        "ntp server 10.0.0.1",
+        "line vty 0 4",
+        " transport input telnet ssh",
+        "end",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _workload():
+    """Configuraciones realistas sobre las que se mide el codec"""
+    configs = [_cisco_config(switch) for switch in range(20)]
+    if _SHOW_RUNNING.exists():
+        configs.append(_SHOW_RUNNING.read_text())
+    return configs
+
+
+class TestPayloadCodec:
+    """Tests para la compresión de payloads"""
+
+    def test_small_values_are_stored_as_is(self):
+        """Test que valida que los valores bajo el umbral no se comprimen"""
+        codec = _codec(codec="zlib", threshold=1024)
+
+        assert codec.encode("hostname Switch") == "hostname Switch"
+        assert codec.encode({"safe": True}) == {"safe": True}
+        assert codec.encode(None) is None
+
+    def test_text_roundtrip(self):
+        """Test que valida la compresión y descompresión de texto"""
+        codec = _codec(codec="zlib", threshold=100)
+        config = _cisco_config(1)
+
+        encoded = codec.encode(config)
+
+        assert encoded[CODEC_MARKER] == "zlib"
+        assert encoded["format"] == "text"
+        assert encoded["size"] == len(config.encode("utf-8"))
+        assert len(encoded["data"]) < len(config) / 4
+        assert codec.decode(encoded) == config
+
+    def test_json_roundtrip(self):
+        """Test que valida la compresión de estructuras JSON"""
+        codec = _codec(codec="zlib", threshold=10)
+        problems = [{"problem": "Telnet habilitado", "severity": "alta"}] * 20
+
+        encoded = codec.encode(problems)
+
+        assert encoded["format"] == "json"
+        assert codec.decode(encoded) == problems
+
+    def test_encode_is_idempotent(self):
+        """Test que valida que un sobre no se vuelve a comprimir"""
+        codec = _codec(codec="zlib", threshold=10)
+        encoded = codec.encode("x" * 100)
+
+        assert codec.encode(encoded) is encoded
+
+    def test_level_is_configurable(self):
+        """Test que valida el nivel de compresión configurado"""
+        with patch.dict("os.environ", {"ANALYSIS_PAYLOAD_COMPRESSION_LEVEL": "9"}):
+            codec = _codec(codec="zlib")
+
+        assert codec.level == 9
+        assert _codec(codec="zlib").level == 6
+        assert zlib.decompress(bytes(_codec(codec="zlib", level=1, threshold=1).encode("abc")["data"])) == b"abc"
+
+    def test_codec_none_disables_compression(self):
+        """Test que valida que el codec none no comprime"""
+        codec = _codec(codec="none", threshold=1)
+
+        assert codec.encode("x" * 5000) == "x" * 5000
+
+    def test_unknown_codec(self):
+        """Test que valida el rechazo de codecs no soportados"""
+        with pytest.raises(ValueError, match="no soportado"):
+            _codec(codec="lz4")
+
+    def test_zstd_falls_back_to_zlib_when_not_installed(self):
+        """Test que valida el uso de zlib si zstandard no está instalado"""
+        with patch.object(payload_codec_module, "zstandard", None):
+            codec = _codec(codec="zstd")
+
+        assert codec.codec == "zlib"
+        codec.logger.warning.assert_called_once()
+
+    def test_zlib_is_default_even_with_zstandard_installed(self):
+        """Test que valida que zstd solo se usa si se configura de forma explícita"""
+        with patch.object(payload_codec_module, "zstandard", MagicMock()), patch.dict(
+            "os.environ", {}, clear=True
+        ):
+            codec = _codec()
+
+        assert codec.codec == "zlib"
+        assert codec.level == 6
+
+    def test_decode_zstd_without_library(self):
+        """Test que valida el error al leer un payload zstd sin zstandard"""
+        codec = _codec(codec="zlib")
+        envelope = {CODEC_MARKER: "zstd", "format": "text", "data": b"", "size": 0}
+
+        with patch.object(payload_codec_module, "zstandard", None):
+            with pytest.raises(RuntimeError, match="zstandard"):
+                codec.decode(envelope)
+
+    def test_response_keeps_queryable_fields_in_clear(self):
+        """Test que valida que solo se comprimen los problemas del análisis con IA"""
+        codec = _codec(codec="zlib", threshold=10)
+        response = {
+            "filename": "a.txt",
+            "gemini_response": True,
+            "analysis_data": {
+                "security_level": "high",
+                "safe": False,
+                "problems": [{"problem": "SNMP con comunidad public", "severity": "alta"}] * 10,
+            },
+        }
+
+        encoded = codec.encode_response(response)
+
+        assert encoded["analysis_data"]["security_level"] == "high"
+        assert encoded["analysis_data"]["safe"] is False
+        assert codec.is_encoded(encoded["analysis_data"]["problems"])
+        assert codec.decode_response(encoded) == response
+        assert not codec.is_encoded(response["analysis_data"]["problems"])
+
+    def test_response_without_analysis_is_unchanged(self):
+        """Test que valida que las respuestas sin análisis no se modifican"""
+        codec = _codec(codec="zlib", threshold=1)
+        response = {"error": "boom"}
+
+        assert codec.encode_response(response) is response
+        assert codec.decode_response(response) is response
+        assert codec.decode_response(None) is None
+
+    @pytest.mark.slow
+    def test_benchmark_latency_vs_storage(self):
+        """Benchmark de latencia de escritura/lectura contra ahorro en disco"""
+        configs = _workload()
+        variants = [("none", 0), ("zlib", 1), ("zlib", 6), ("zlib", 9)]
+        if payload_codec_module.zstandard is not None:
+            variants += [("zstd", 3), ("zstd", 19)]
+
+        raw_bytes = sum(len(bson.encode({"content": config})) for config in configs)
+        rows = []
+        for codec_name, level in variants:
+            codec = _codec(codec=codec_name, level=level, threshold=1024)
+
+            start = time.perf_counter()
+            documents = [bson.encode({"content": codec.encode(config)}) for config in configs]
+            write_ms = (time.perf_counter() - start) * 1000 / len(configs)
+
+            start = time.perf_counter()
+            decoded = [codec.decode(bson.decode(document)["content"]) for document in documents]
+            read_ms = (time.perf_counter() - start) * 1000 / len(configs)
+
+            assert decoded == configs
+            stored_bytes = sum(len(document) for document in documents)
+            rows.append((f"{codec_name}-{level}", write_ms, read_ms, stored_bytes))
+
+        print(f"\n{len(configs)} configs, {raw_bytes / len(configs) / 1024:.1f} KiB de media")
+        print(f"{'codec':<10}{'escritura ms':>14}{'lectura ms':>12}{'KiB':>10}{'ratio':>8}")
+        for name, write_ms, read_ms, stored_bytes in rows:
+            print(
+                f"{name:<10}{write_ms:>14.3f}{read_ms:>12.3f}"
+                f"{stored_bytes / 1024:>10.1f}{raw_bytes / stored_bytes:>8.1f}"
+            )
+
+        ratios = {name: raw_bytes / stored_bytes for name, _, _, stored_bytes in rows}
+        assert ratios["zlib-6"] > 5
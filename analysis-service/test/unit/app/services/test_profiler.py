@@ -0,0 +1,335 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services import profiler as profiler_module
+from app.services.auth_middleware import is_admin_user
+from app.services.profiler import (
+    ProfilerBusyError,
+    RequestProfilerMiddleware,
+    SamplingProfiler,
+    parse_profile_format,
+    profile_process,
+    start_request_profile,
+    to_thread,
+)
+
+
+def busy_wait(stop: threading.Event) -> None:
+    """Función que ocupa CPU hasta que se le indique"""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+async def call_middleware(app, query=b""):
+    """Ejecuta el middleware con una petición mínima y retorna los mensajes enviados"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/analyze",
+        "query_string": query,
+        "headers": [],
+    }
+    await RequestProfilerMiddleware(app)(scope, receive, send)
+    return sent
+
+
+def spin(seconds: float) -> None:
+    """Ocupa CPU durante seconds segundos"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def user_app(user, threaded: bool = False):
+    """
+    Aplicación ASGI que autentica al usuario como AuthMiddleware y trabaja unos
+    milisegundos en el event loop (o en un hilo con to_thread)
+    """
+
+    async def app(scope, receive, send):
+        if user is not None:
+            start_request_profile(user, is_admin_user)
+        await asyncio.sleep(0)
+        if threaded:
+            await to_thread(spin, 0.05)
+        else:
+            spin(0.05)
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"respuesta"})
+
+    return app
+
+
+class TestParseProfileFormat:
+    """Tests para parse_profile_format"""
+
+    @pytest.mark.parametrize(
+        "value,expected", [(None, "collapsed"), ("HTML", "html"), (" collapsed ", "collapsed")]
+    )
+    def test_valid(self, value, expected):
+        """Test que valida los formatos aceptados"""
+        assert parse_profile_format(value) == expected
+
+    def test_invalid(self):
+        """Test que valida el error con un formato desconocido"""
+        with pytest.raises(ValueError, match="Formato de perfil inválido"):
+            parse_profile_format("pdf")
+
+
+class TestSamplingProfiler:
+    """Tests para SamplingProfiler"""
+
+    def test_samples_busy_thread(self):
+        """Test que valida que el perfil encuentra la función que ocupa CPU"""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_wait, args=(stop,), name="worker ocupado")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.001)
+        try:
+            profiler.start()
+            time.sleep(0.1)
+            profiler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        lines = profiler.collapsed().splitlines()
+        assert profiler.sample_count > 10
+        assert profiler.duration >= 0.1
+        assert any(
+            line.startswith("worker_ocupado;") and "busy_wait (" in line for line in lines
+        )
+        assert not any("sampling-profiler" in line for line in lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+            assert "\n" not in stack
+
+    def test_anchor_limits_and_trims_stacks(self):
+        """Test que valida que con ancla solo se cuentan los stacks que pasan por ella"""
+
+        def inner(profiler):
+            profiler.sample()
+
+        def anchored():
+            profiler = SamplingProfiler(anchor=sys._getframe())
+            inner(profiler)
+            return profiler
+
+        profiler = anchored()
+
+        assert len(profiler.stacks) == 1
+        stack = next(iter(profiler.stacks)).split(";")
+        assert stack[0] == "MainThread"
+        assert stack[1].startswith("anchored (")
+        assert stack[2].startswith("inner (")
+        assert stack[-1].startswith("sample (")
+
+    def test_labels_are_relative_to_project(self):
+        """Test que valida el nombre de los frames"""
+        profiler = SamplingProfiler()
+
+        label = profiler._label(busy_wait.__code__)
+
+        assert label == (
+            f"busy_wait ({os.path.join('test', 'unit', 'app', 'services', 'test_profiler.py')}:"
+            f"{busy_wait.__code__.co_firstlineno})"
+        )
+
+    def test_function_totals_and_html(self):
+        """Test que valida el tiempo propio, el acumulado y el reporte HTML"""
+        profiler = SamplingProfiler()
+        profiler.stacks.update({"Main;a;b": 3, "Main;a;c<x>": 1, "Main;a": 1})
+
+        own, cumulative = profiler.function_totals()
+        report = profiler.html_report()
+
+        assert own == {"b": 3, "c<x>": 1, "a": 1}
+        assert cumulative == {"a": 5, "b": 3, "c<x>": 1}
+        assert "<td>5</td><td>100.0%</td><td>a</td>" in report
+        assert "c&lt;x&gt;" in report
+        assert profiler.render("html") == (report, "text/html; charset=utf-8")
+        assert profiler.render("collapsed") == (
+            "Main;a;b 3\nMain;a;c<x> 1\nMain;a 1\n",
+            "text/plain; charset=utf-8",
+        )
+
+    def test_stop_without_start(self):
+        """Test que valida que detener un perfil no iniciado no falla"""
+        SamplingProfiler().stop()
+
+
+class TestProfileProcess:
+    """Tests para profile_process"""
+
+    @pytest.mark.asyncio
+    async def test_profiles_event_loop(self):
+        """Test que valida el perfil del proceso sin bloquear el event loop"""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        profiler = await profile_process(0.1, interval=0.002)
+        task.cancel()
+
+        assert ticks > 5
+        assert profiler.sample_count > 10
+        assert any(line.startswith("MainThread;") for line in profiler.collapsed().splitlines())
+
+    @pytest.mark.asyncio
+    async def test_only_one_profile_at_a_time(self):
+        """Test que valida que no se permiten perfiles simultáneos"""
+        first = asyncio.create_task(profile_process(0.1, interval=0.01))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ProfilerBusyError):
+            await profile_process(0.1)
+
+        await first
+        await profile_process(0.01, interval=0.005)
+
+
+class TestRequestProfilerMiddleware:
+    """Tests para RequestProfilerMiddleware"""
+
+    @pytest.mark.asyncio
+    async def test_without_parameter_does_not_profile(self):
+        """Test que valida que sin ?profile=1 no se crea ningún profiler"""
+        with patch.object(profiler_module, "SamplingProfiler") as mock_profiler:
+            sent = await call_middleware(user_app("root"), query=b"filename=a.txt")
+
+        mock_profiler.assert_not_called()
+        assert sent[0]["status"] == 201
+
+    @pytest.mark.asyncio
+    async def test_admin_receives_profile(self):
+        """Test que valida que un administrador recibe el perfil de su petición"""
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}):
+            sent = await call_middleware(
+                user_app("root"), query=b"filename=a.txt&profile=1"
+            )
+
+        headers = dict(sent[0]["headers"])
+        body = sent[1]["body"].decode()
+        assert sent[0]["status"] == 200
+        assert headers[b"content-type"].startswith(b"text/plain")
+        assert headers[b"x-profiled-status"] == b"201"
+        assert headers[b"x-worker-pid"] == str(os.getpid()).encode()
+        assert len(sent) == 2
+        lines = body.splitlines()
+        assert lines
+        # Solo los stacks que pasan por la petición, recortados desde el middleware
+        assert all(line.split(";")[1].startswith("__call__ (") for line in lines)
+        assert any(";app (" in line for line in lines)
+
+    @pytest.mark.asyncio
+    async def test_admin_profile_includes_worker_threads(self):
+        """Test que valida que el perfil incluye el trabajo de la petición en to_thread"""
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}):
+            sent = await call_middleware(user_app("root", threaded=True), query=b"profile=1")
+
+        lines = sent[1]["body"].decode().splitlines()
+        assert any(";spin (" in line and ";track_thread (" in line for line in lines)
+
+    @pytest.mark.asyncio
+    async def test_other_threads_are_not_profiled(self):
+        """Test que valida que los hilos de otras peticiones no entran en el perfil"""
+        stop = threading.Event()
+        other = threading.Thread(target=busy_wait, args=(stop,))
+        other.start()
+        try:
+            with patch.dict(os.environ, {"ADMIN_USERS": "root"}):
+                sent = await call_middleware(user_app("root"), query=b"profile=1")
+        finally:
+            stop.set()
+            other.join()
+
+        assert "busy_wait" not in sent[1]["body"].decode()
+
+    @pytest.mark.asyncio
+    async def test_admin_html_report(self):
+        """Test que valida el reporte HTML por petición"""
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}):
+            sent = await call_middleware(
+                user_app("root"), query=b"profile=1&profile_format=html"
+            )
+
+        assert dict(sent[0]["headers"])[b"content-type"].startswith(b"text/html")
+        assert sent[1]["body"].startswith(b"<!DOCTYPE html>")
+
+    @pytest.mark.asyncio
+    async def test_non_admin_gets_normal_response(self):
+        """Test que valida que un usuario no administrador recibe la respuesta normal"""
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}):
+            sent = await call_middleware(user_app("ana"), query=b"profile=1")
+
+        assert sent[0]["status"] == 201
+        assert sent[1]["body"] == b"respuesta"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("user", ["ana", None])
+    async def test_non_admin_does_not_profile_or_hold_slot(self, user):
+        """Test que valida que sin un administrador autenticado no se crea profiler ni se ocupa el slot"""
+        slot_held = []
+
+        async def app(scope, receive, send):
+            if user is not None:
+                assert start_request_profile(user, is_admin_user) is False
+            slot_held.append(profiler_module._profiler_slot.locked())
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}), patch.object(
+            profiler_module, "SamplingProfiler"
+        ) as mock_profiler:
+            sent = await call_middleware(app, query=b"profile=1")
+
+        mock_profiler.assert_not_called()
+        assert slot_held == [False]
+        assert sent[0]["status"] == 200
+
+    def test_start_without_profile_request(self):
+        """Test que valida que autenticar sin ?profile=1 no inicia ningún perfil"""
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}), patch.object(
+            profiler_module, "SamplingProfiler"
+        ) as mock_profiler:
+            assert start_request_profile("root", is_admin_user) is False
+
+        mock_profiler.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_busy_profiler_serves_request(self):
+        """Test que valida que con otro perfil en curso la petición se atiende sin perfilar"""
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}):
+            profiling = asyncio.create_task(profile_process(0.2, interval=0.01))
+            await asyncio.sleep(0.01)
+            sent = await call_middleware(user_app("root"), query=b"profile=1")
+            await profiling
+
+        assert sent[0]["status"] == 201
+
+    @pytest.mark.parametrize(
+        "query", [b"profile=0", b"profile=1&profile_format=pdf", b"profiler=1"]
+    )
+    def test_requested(self, query):
+        """Test que valida que solo profile=1 con un formato válido activa el perfil"""
+        assert RequestProfilerMiddleware._requested({"query_string": query}) is None
@@ -0,0 +1,222 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.services.readiness_service import ReadinessService, readiness_service
+
+
+def build_service(**kwargs) -> ReadinessService:
+    """Crea un servicio con URLs de prueba y sin logger real"""
+    with patch("app.services.readiness_service.Logger"):
+        return ReadinessService(
+            auth_service_url="http://auth",
+            config_service_url="http://config",
+            **kwargs,
+        )
+
+
+class TestReadinessServiceInit:
+    """Tests para la configuración de ReadinessService"""
+
+    def test_defaults_from_environment(self, monkeypatch):
+        """Test que valida que la configuración se lee de las variables de entorno"""
+        monkeypatch.setenv("AUTH_SERVICE_URL", "http://auth:8001")
+        monkeypatch.setenv("CONFIG_SERVICE_URL", "http://config:8000")
+        monkeypatch.setenv("HEALTH_READY_TIMEOUT_SECONDS", "0.5")
+        monkeypatch.setenv("HEALTH_READY_CACHE_SECONDS", "5")
+
+        with patch("app.services.readiness_service.Logger"):
+            service = ReadinessService()
+
+        assert service.auth_service_url == "http://auth:8001"
+        assert service.config_service_url == "http://config:8000"
+        assert service.timeout_seconds == 0.5
+        assert service.cache_seconds == 5.0
+
+    def test_global_instance(self):
+        """Test que valida la instancia global"""
+        assert isinstance(readiness_service, ReadinessService)
+
+
+class TestReadinessServiceCheck:
+    """Tests para ReadinessService.check"""
+
+    @pytest.mark.asyncio
+    async def test_all_dependencies_up(self):
+        """Test que valida el estado ready cuando todas las dependencias responden"""
+        service = build_service(cache_seconds=10)
+
+        with patch.object(service, "_check_mongodb", AsyncMock()), \
+             patch.object(service, "_check_http", AsyncMock()) as mock_http:
+            result = await service.check()
+
+        assert result["status"] == "ready"
+        assert result["cached"] is False
+        assert set(result["dependencies"]) == {"mongodb", "auth_service", "config_service"}
+        for dependency in result["dependencies"].values():
+            assert dependency["status"] == "up"
+            assert dependency["latency_ms"] >= 0
+            assert "error" not in dependency
+        mock_http.assert_any_await("http://auth")
+        mock_http.assert_any_await("http://config")
+
+    @pytest.mark.asyncio
+    async def test_dependency_down(self):
+        """Test que valida el estado not_ready y el error de la dependencia caída"""
+        service = build_service(cache_seconds=10)
+
+        with patch.object(
+            service, "_check_mongodb", AsyncMock(side_effect=Exception("sin servidor"))
+        ), patch.object(service, "_check_http", AsyncMock()):
+            result = await service.check()
+
+        assert result["status"] == "not_ready"
+        assert result["dependencies"]["mongodb"] == {
+            "status": "down",
+            "latency_ms": result["dependencies"]["mongodb"]["latency_ms"],
+            "error": "sin servidor",
+        }
+        assert result["dependencies"]["auth_service"]["status"] == "up"
+        service.logger.error.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_dependency_timeout(self):
+        """Test que valida que una dependencia lenta se reporta como caída"""
+        service = build_service(timeout_seconds=0.01, cache_seconds=10)
+
+        async def slow(_url):
+            await asyncio.sleep(1)
+
+        with patch.object(service, "_check_mongodb", AsyncMock()), \
+             patch.object(service, "_check_http", side_effect=slow):
+            result = await service.check()
+
+        assert result["status"] == "not_ready"
+        assert "Tiempo de espera agotado" in result["dependencies"]["auth_service"]["error"]
+        assert result["dependencies"]["auth_service"]["latency_ms"] < 1000
+
+    @pytest.mark.asyncio
+    async def test_checks_run_concurrently(self):
+        """Test que valida que las verificaciones se ejecutan en paralelo"""
+        service = build_service(cache_seconds=10)
+
+        async def slow_mongo():
+            await asyncio.sleep(0.1)
+
+        async def slow_http(_url):
+            await asyncio.sleep(0.1)
+
+        with patch.object(service, "_check_mongodb", side_effect=slow_mongo), \
+             patch.object(service, "_check_http", side_effect=slow_http):
+            started = asyncio.get_running_loop().time()
+            await service.check()
+            elapsed = asyncio.get_running_loop().time() - started
+
+        assert elapsed < 0.25
+
+    @pytest.mark.asyncio
+    async def test_result_is_cached(self):
+        """Test que valida que el resultado se reutiliza mientras está vigente"""
+        service = build_service(cache_seconds=10)
+
+        with patch.object(service, "_check_mongodb", AsyncMock()) as mock_mongo, \
+             patch.object(service, "_check_http", AsyncMock()):
+            first = await service.check()
+            second = await service.check()
+
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["checked_at"] == first["checked_at"]
+        assert mock_mongo.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_expires(self):
+        """Test que valida que se vuelve a verificar cuando la caché expira"""
+        service = build_service(cache_seconds=0)
+
+        with patch.object(service, "_check_mongodb", AsyncMock()) as mock_mongo, \
+             patch.object(service, "_check_http", AsyncMock()):
+            await service.check()
+            result = await service.check()
+
+        assert result["cached"] is False
+        assert mock_mongo.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self):
+        """Test que valida que invalidate descarta el resultado guardado"""
+        service = build_service(cache_seconds=10)
+
+        with patch.object(service, "_check_mongodb", AsyncMock()) as mock_mongo, \
+             patch.object(service, "_check_http", AsyncMock()):
+            await service.check()
+            service.invalidate()
+            await service.check()
+
+        assert mock_mongo.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_probes_share_check(self):
+        """Test que valida que los sondeos simultáneos comparten una verificación"""
+        service = build_service(cache_seconds=10)
+
+        async def slow_mongo():
+            await asyncio.sleep(0.05)
+
+        with patch.object(service, "_check_mongodb", AsyncMock(side_effect=slow_mongo)) as mock_mongo, \
+             patch.object(service, "_check_http", AsyncMock()):
+            results = await asyncio.gather(*(service.check() for _ in range(5)))
+
+        assert mock_mongo.await_count == 1
+        assert sum(1 for result in results if not result["cached"]) == 1
+
+
+class TestReadinessServiceProbes:
+    """Tests para las verificaciones individuales"""
+
+    @pytest.mark.asyncio
+    async def test_check_mongodb_pings(self):
+        """Test que valida que se envía ping a MongoDB"""
+        connection = MagicMock()
+
+        with patch("app.services.readiness_service.get_connection", return_value=connection):
+            await ReadinessService._check_mongodb()
+
+        connection.admin.command.assert_called_once_with("ping")
+
+    @pytest.mark.asyncio
+    async def test_check_http_requests_health(self):
+        """Test que valida la consulta al endpoint /health"""
+        service = build_service()
+        requests = []
+
+        def handler(request):
+            requests.append(str(request.url))
+            return httpx.Response(200, json={"status": "ok"})
+
+        transport = httpx.MockTransport(handler)
+        real_client = httpx.AsyncClient
+
+        with patch(
+            "app.services.readiness_service.httpx.AsyncClient",
+            side_effect=lambda **kwargs: real_client(transport=transport, **kwargs),
+        ):
+            await service._check_http("http://auth")
+
+        assert requests == ["http://auth/health"]
+
+    @pytest.mark.asyncio
+    async def test_check_http_error_status(self):
+        """Test que valida que un estado de error se reporta como excepción"""
+        service = build_service()
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        real_client = httpx.AsyncClient
+
+        with patch(
+            "app.services.readiness_service.httpx.AsyncClient",
+            side_effect=lambda **kwargs: real_client(transport=transport, **kwargs),
+        ):
+            with pytest.raises(httpx.HTTPStatusError):
+                await service._check_http("http://config")
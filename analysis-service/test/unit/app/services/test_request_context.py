@@ -0,0 +1,208 @@
+import asyncio
+import io
+import json
+import logging
+import random
+
+import pytest
+
+from app.services.logger import JsonFormatter, Logger, RequestContextFilter
+from app.services.request_context import (
+    RequestContextMiddleware,
+    bind_request_context,
+    get_request_context,
+    reset_request_context,
+    resolve_request_id,
+)
+
+
+async def call_middleware(app, headers=None, scope_type="http"):
+    """Ejecuta el middleware con una petición mínima y retorna los mensajes enviados"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": scope_type,
+        "method": "GET",
+        "path": "/api/v1/analyze",
+        "headers": headers or [],
+    }
+    await RequestContextMiddleware(app)(scope, receive, send)
+    return sent
+
+
+async def ok_app(scope, receive, send):
+    """Aplicación ASGI que responde 200 sin cuerpo"""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class TestRequestContext:
+    """Tests para las funciones del contexto de petición"""
+
+    def test_default_is_empty(self):
+        """Test que valida que fuera de una petición el contexto está vacío"""
+        assert get_request_context() == {}
+
+    def test_bind_and_reset(self):
+        """Test que valida que bind agrega campos y reset los restaura"""
+        first = bind_request_context(request_id="abc")
+        second = bind_request_context(user="ana", filename=None)
+
+        assert get_request_context() == {"request_id": "abc", "user": "ana"}
+
+        reset_request_context(second)
+        assert get_request_context() == {"request_id": "abc"}
+        reset_request_context(first)
+        assert get_request_context() == {}
+
+    def test_bind_does_not_mutate_previous_context(self):
+        """Test que valida que bind crea un diccionario nuevo"""
+        token = bind_request_context(request_id="abc")
+        previous = get_request_context()
+        inner = bind_request_context(user="ana")
+
+        assert previous == {"request_id": "abc"}
+
+        reset_request_context(inner)
+        reset_request_context(token)
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("req-1.A_b", "req-1.A_b"),
+            (b"req-2", "req-2"),
+        ],
+    )
+    def test_resolve_request_id_valid(self, value, expected):
+        """Test que valida que se conserva un request id válido"""
+        assert resolve_request_id(value) == expected
+
+    @pytest.mark.parametrize("value", [None, "", "con espacios", "a" * 129, 'x"}\ninyectado'])
+    def test_resolve_request_id_generates(self, value):
+        """Test que valida que se genera un request id si falta o no es seguro"""
+        request_id = resolve_request_id(value)
+
+        assert request_id != value
+        assert len(request_id) == 32
+
+
+class TestRequestContextMiddleware:
+    """Tests para RequestContextMiddleware"""
+
+    @pytest.mark.asyncio
+    async def test_binds_context_and_returns_header(self):
+        """Test que valida el contexto dentro de la petición y el header de respuesta"""
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen.update(get_request_context())
+            await ok_app(scope, receive, send)
+
+        sent = await call_middleware(app)
+
+        assert seen["method"] == "GET"
+        assert seen["path"] == "/api/v1/analyze"
+        assert len(seen["request_id"]) == 32
+        assert (b"x-request-id", seen["request_id"].encode()) in sent[0]["headers"]
+        assert get_request_context() == {}
+
+    @pytest.mark.asyncio
+    async def test_uses_incoming_request_id(self):
+        """Test que valida que se propaga el X-Request-ID recibido"""
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen.update(get_request_context())
+            await ok_app(scope, receive, send)
+
+        sent = await call_middleware(app, headers=[(b"x-request-id", b"upstream-123")])
+
+        assert seen["request_id"] == "upstream-123"
+        assert sent[0]["headers"] == [(b"x-request-id", b"upstream-123")]
+
+    @pytest.mark.asyncio
+    async def test_resets_context_on_error(self):
+        """Test que valida que el contexto se restaura aunque la aplicación falle"""
+
+        async def app(scope, receive, send):
+            raise RuntimeError("fallo")
+
+        with pytest.raises(RuntimeError):
+            await call_middleware(app)
+
+        assert get_request_context() == {}
+
+    @pytest.mark.asyncio
+    async def test_ignores_non_http_scopes(self):
+        """Test que valida que los scopes que no son HTTP pasan sin cambios"""
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen.update(get_request_context())
+
+        await call_middleware(app, scope_type="lifespan")
+
+        assert seen == {}
+
+
+class TestRequestContextConcurrency:
+    """Tests de aislamiento del contexto entre peticiones concurrentes"""
+
+    REQUESTS = 1000
+
+    @pytest.mark.asyncio
+    async def test_no_context_bleed_between_interleaved_requests(self):
+        """Test que valida que 1000 peticiones intercaladas no mezclan su contexto"""
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter("json"))
+        base_logger = logging.getLogger("test-request-context-concurrency")
+        base_logger.propagate = False
+        base_logger.setLevel(logging.INFO)
+        base_logger.addFilter(RequestContextFilter())
+        base_logger.addHandler(handler)
+
+        # Un único Logger compartido, como el de un controller
+        shared = Logger.__new__(Logger)
+        shared._logger = base_logger
+        shared.console_print = False
+
+        async def app(scope, receive, send):
+            index = dict(scope["headers"])[b"x-request-id"].decode().split("-")[1]
+            shared.set_context("Controller.handle", {"index": index})
+            bind_request_context(user=f"user-{index}", filename=f"file-{index}.txt")
+            for step in range(3):
+                await asyncio.sleep(random.random() / 1000)
+                shared.info(f"paso {step}")
+            await ok_app(scope, receive, send)
+
+        try:
+            await asyncio.gather(
+                *(
+                    call_middleware(app, headers=[(b"x-request-id", f"req-{i}".encode())])
+                    for i in range(self.REQUESTS)
+                )
+            )
+        finally:
+            base_logger.removeHandler(handler)
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert len(records) == self.REQUESTS * 3
+        for record in records:
+            index = record["context"]["index"]
+            assert record["request"] == {
+                "request_id": f"req-{index}",
+                "method": "GET",
+                "path": "/api/v1/analyze",
+                "user": f"user-{index}",
+                "filename": f"file-{index}.txt",
+            }
+        assert {record["context"]["index"] for record in records} == {
+            str(i) for i in range(self.REQUESTS)
+        }
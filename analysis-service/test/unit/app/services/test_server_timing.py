@@ -0,0 +1,166 @@
+import os
+import re
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from app.services.metrics import ServiceMetrics
+from app.services.server_timing import (
+    ServerTimingMiddleware,
+    format_server_timing,
+    record_server_timing,
+)
+
+
+async def call_middleware(app, headers=None, enabled=False):
+    """Ejecuta el middleware con una petición mínima y retorna los mensajes enviados"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/analyze", "headers": headers or []}
+    await ServerTimingMiddleware(app, enabled=enabled)(scope, receive, send)
+    return sent
+
+
+def server_timing(sent):
+    """Métricas del header Server-Timing como {nombre: milisegundos}"""
+    headers = dict(sent[0]["headers"])
+    if b"server-timing" not in headers:
+        return None
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", headers[b"server-timing"].decode())
+    }
+
+
+def staged_app(service_metrics):
+    """Aplicación ASGI que mide las etapas de un análisis"""
+
+    async def app(scope, receive, send):
+        for component, stage in [
+            ("auth", "validate_token"),
+            ("analysis", "config_fetch"),
+            ("analysis", "decrypt"),
+            ("analysis", "llm"),
+            ("analysis", "db_save"),
+            ("analysis", "response"),
+            ("analysis", "total"),
+        ]:
+            with service_metrics.stage(component, stage):
+                pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+class TestServerTimingHelpers:
+    """Tests para las funciones de Server-Timing"""
+
+    def test_format(self):
+        """Test que valida el formato del header en milisegundos"""
+        assert (
+            format_server_timing({"auth": 0.0012, "llm": 1.5})
+            == "auth;dur=1.20, llm;dur=1500.00"
+        )
+
+    def test_record_outside_request_is_noop(self):
+        """Test que valida que fuera de una petición no se registra nada"""
+        record_server_timing("auth", 1.0)
+
+
+class TestServerTimingMiddleware:
+    """Tests para ServerTimingMiddleware"""
+
+    def setup_method(self):
+        self.metrics = ServiceMetrics(CollectorRegistry())
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        """Test que valida que sin activarlo no se agrega el header"""
+        sent = await call_middleware(staged_app(self.metrics))
+
+        assert server_timing(sent) is None
+
+    @pytest.mark.asyncio
+    async def test_enabled_by_request_header(self):
+        """Test que valida el desglose pedido con X-Server-Timing"""
+        sent = await call_middleware(
+            staged_app(self.metrics), headers=[(b"x-server-timing", b"1")]
+        )
+
+        timings = server_timing(sent)
+        assert list(timings) == [
+            "auth",
+            "fetch",
+            "decrypt",
+            "llm",
+            "persist",
+            "build_response",
+            "total",
+        ]
+        assert all(duration >= 0 for duration in timings.values())
+
+    @pytest.mark.asyncio
+    async def test_request_header_false(self):
+        """Test que valida que X-Server-Timing: 0 no activa el desglose"""
+        sent = await call_middleware(
+            staged_app(self.metrics), headers=[(b"x-server-timing", b"0")]
+        )
+
+        assert server_timing(sent) is None
+
+    @pytest.mark.asyncio
+    async def test_enabled_by_configuration(self):
+        """Test que valida SERVER_TIMING_ENABLED para todas las respuestas"""
+        with patch.dict(os.environ, {"SERVER_TIMING_ENABLED": "true"}):
+            middleware = ServerTimingMiddleware(staged_app(self.metrics))
+
+        assert middleware.enabled is True
+        sent = await call_middleware(staged_app(self.metrics), enabled=True)
+        assert "build_response" in server_timing(sent)
+
+    @pytest.mark.asyncio
+    async def test_repeated_stage_is_summed(self):
+        """Test que valida que una etapa medida varias veces se suma"""
+
+        async def app(scope, receive, send):
+            for _ in range(2):
+                with self.metrics.stage("analysis", "config_fetch"):
+                    record_server_timing("fetch", 0.005)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        sent = await call_middleware(app, enabled=True)
+
+        assert server_timing(sent)["fetch"] >= 10.0
+
+    @pytest.mark.asyncio
+    async def test_timings_are_not_shared_between_requests(self):
+        """Test que valida que cada petición tiene su propio desglose"""
+        first = await call_middleware(staged_app(self.metrics), enabled=True)
+
+        async def empty_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+
+        second = await call_middleware(empty_app, enabled=True)
+
+        assert "auth" in server_timing(first)
+        assert list(server_timing(second)) == ["total"]
+
+    @pytest.mark.asyncio
+    async def test_non_http_scope(self):
+        """Test que valida que los scopes que no son HTTP pasan sin cambios"""
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["type"])
+
+        await ServerTimingMiddleware(app, enabled=True)({"type": "lifespan"}, None, None)
+
+        assert calls == ["lifespan"]
@@ -0,0 +1,276 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.request_context import (
+    bind_request_context,
+    get_request_context,
+    reset_request_context,
+)
+from app.services.tracing import (
+    SpanExporter,
+    Tracer,
+    TracingMiddleware,
+    parse_traceparent,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+async def call_middleware(tracer, app, headers=None):
+    """Ejecuta el middleware con una petición mínima y retorna los mensajes enviados"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/analyze", "headers": headers or []}
+    await TracingMiddleware(app, tracer=tracer)(scope, receive, send)
+    return sent
+
+
+def traced_app(tracer, status=200):
+    """Aplicación ASGI que registra un span hijo y el trace_id del contexto"""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["trace_id"] = get_request_context().get("trace_id")
+        with tracer.span("config_service.fetch"):
+            seen["headers"] = tracer.inject({"accept": "application/json"})
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app, seen
+
+
+class TestParseTraceparent:
+    """Tests para parse_traceparent"""
+
+    def test_valid(self):
+        """Test que valida un traceparent muestreado y otro sin muestrear"""
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00".encode()) == (
+            TRACE_ID,
+            PARENT_ID,
+            False,
+        )
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            None,
+            "",
+            "basura",
+            f"ff-{TRACE_ID}-{PARENT_ID}-01",
+            f"00-{'0' * 32}-{PARENT_ID}-01",
+            f"00-{TRACE_ID}-{'0' * 16}-01",
+            f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01",
+        ],
+    )
+    def test_invalid(self, value):
+        """Test que valida que los headers inválidos se ignoran"""
+        assert parse_traceparent(value) is None
+
+
+class TestTracer:
+    """Tests para Tracer"""
+
+    def setup_method(self):
+        self.tracer = Tracer(SpanExporter())
+
+    def test_nested_spans(self):
+        """Test que valida la relación padre-hijo y la exportación"""
+        with self.tracer.span("root", component="test") as root:
+            with self.tracer.span("child") as child:
+                pass
+
+        spans = self.tracer.exporter.recent()
+        assert [span["name"] for span in spans] == ["root", "child"]
+        assert child.trace_id == root.trace_id
+        assert spans[1]["parent_id"] == root.span_id
+        assert spans[0]["parent_id"] is None
+        assert spans[0]["attributes"] == {"component": "test"}
+        assert spans[0]["duration_ms"] >= spans[1]["duration_ms"]
+        assert self.tracer.current_span() is None
+
+    def test_error_status(self):
+        """Test que valida que una excepción marca el span con error"""
+        with pytest.raises(ValueError):
+            with self.tracer.span("falla"):
+                raise ValueError("boom")
+
+        span = self.tracer.exporter.recent()[0]
+        assert span["status"] == "error"
+        assert span["attributes"]["error"] == "ValueError"
+
+    def test_continues_incoming_trace(self):
+        """Test que valida que la traza recibida se continúa con el muestreo del padre"""
+        tracer = Tracer(SpanExporter(), sample_ratio=0.0)
+
+        with tracer.start_trace("GET /", f"00-{TRACE_ID}-{PARENT_ID}-01") as root:
+            headers = tracer.inject({})
+
+        assert root.trace_id == TRACE_ID
+        assert root.parent_id == PARENT_ID
+        assert headers == {"traceparent": f"00-{TRACE_ID}-{root.span_id}-01"}
+        assert len(tracer.exporter.recent()) == 1
+
+    def test_unsampled_trace_propagates_but_is_not_exported(self):
+        """Test que valida que una traza no muestreada se propaga sin exportarse"""
+        tracer = Tracer(SpanExporter(), sample_ratio=0.0)
+
+        with tracer.start_trace("GET /") as root:
+            with tracer.span("child"):
+                headers = tracer.inject({})
+
+        assert headers["traceparent"].startswith(f"00-{root.trace_id}-")
+        assert headers["traceparent"].endswith("-00")
+        assert tracer.exporter.recent() == []
+
+    def test_start_trace_ignores_current_span(self):
+        """Test que valida que start_trace siempre inicia una traza nueva"""
+        with self.tracer.span("otra"):
+            with self.tracer.start_trace("GET /") as root:
+                pass
+
+        assert root.parent_id is None
+
+    def test_inject_without_span(self):
+        """Test que valida que fuera de una traza no se agrega traceparent"""
+        assert self.tracer.inject({"accept": "application/json"}) == {"accept": "application/json"}
+
+    @pytest.mark.asyncio
+    async def test_span_in_worker_thread(self):
+        """Test que valida que asyncio.to_thread conserva el span padre"""
+
+        def work():
+            with self.tracer.span("gemini.generate_content") as span:
+                return span
+
+        with self.tracer.span("llm.analyze") as parent:
+            child = await asyncio.to_thread(work)
+
+        assert child.parent_id == parent.span_id
+
+
+class TestSpanExporter:
+    """Tests para SpanExporter"""
+
+    def test_recent_filters_and_limit(self):
+        """Test que valida los filtros por traza y por petición"""
+        tracer = Tracer(SpanExporter(buffer_size=10))
+        with tracer.start_trace("GET /a", request_id="req-1") as first:
+            with tracer.span("child"):
+                pass
+        with tracer.start_trace("GET /b", request_id="req-2"):
+            pass
+
+        assert {span["trace_id"] for span in tracer.exporter.recent(request_id="req-1")} == {
+            first.trace_id
+        }
+        assert len(tracer.exporter.recent(trace_id=first.trace_id)) == 2
+        assert [span["name"] for span in tracer.exporter.recent(limit=1)] == ["GET /b"]
+
+    def test_buffer_is_bounded(self):
+        """Test que valida que el buffer en memoria conserva solo los últimos spans"""
+        tracer = Tracer(SpanExporter(buffer_size=3))
+        for index in range(5):
+            with tracer.span(f"span-{index}"):
+                pass
+
+        assert [span["name"] for span in tracer.exporter.recent()] == [
+            "span-4",
+            "span-3",
+            "span-2",
+        ]
+
+    def test_file_export_in_batches(self, tmp_path):
+        """Test que valida la escritura por lotes en el archivo"""
+        path = tmp_path / "trazas" / "spans.jsonl"
+        exporter = SpanExporter(path=str(path), batch_size=2, flush_interval=0.01)
+        tracer = Tracer(exporter)
+
+        for index in range(5):
+            with tracer.span(f"span-{index}", index=index):
+                pass
+        exporter.shutdown()
+
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert [line["name"] for line in lines] == [f"span-{index}" for index in range(5)]
+        assert lines[0]["service"] == "analysis-service"
+        assert lines[0]["attributes"] == {"index": 0}
+        assert exporter.dropped == 0
+
+    def test_full_queue_drops(self, tmp_path):
+        """Test que valida que con la cola llena los spans se descartan sin bloquear"""
+        exporter = SpanExporter(path=str(tmp_path / "spans.jsonl"), max_pending=1)
+        exporter._thread = object()  # Hilo ocupado: nadie consume la cola
+        tracer = Tracer(exporter)
+
+        for _ in range(3):
+            with tracer.span("span"):
+                pass
+
+        assert exporter.dropped == 2
+        assert len(exporter.recent()) == 3
+
+    def test_shutdown_without_thread(self):
+        """Test que valida que cerrar sin haber escrito no falla"""
+        SpanExporter().shutdown()
+
+
+class TestTracingMiddleware:
+    """Tests para TracingMiddleware"""
+
+    def setup_method(self):
+        self.tracer = Tracer(SpanExporter())
+
+    @pytest.mark.asyncio
+    async def test_root_span_and_propagation(self):
+        """Test que valida el span raíz, el contexto de logs y la propagación"""
+        app, seen = traced_app(self.tracer)
+        token = bind_request_context(request_id="req-1")
+        try:
+            await call_middleware(
+                self.tracer, app, headers=[(b"traceparent", f"00-{TRACE_ID}-{PARENT_ID}-01".encode())]
+            )
+        finally:
+            reset_request_context(token)
+
+        root, child = self.tracer.exporter.recent()
+        assert root["name"] == "GET /api/v1/analyze"
+        assert root["trace_id"] == TRACE_ID
+        assert root["parent_id"] == PARENT_ID
+        assert root["attributes"]["http.status_code"] == 200
+        assert root["attributes"]["request_id"] == "req-1"
+        assert child["parent_id"] == root["span_id"]
+        assert seen["trace_id"] == TRACE_ID
+        assert seen["headers"]["traceparent"] == f"00-{TRACE_ID}-{child['span_id']}-01"
+        assert "trace_id" not in get_request_context()
+
+    @pytest.mark.asyncio
+    async def test_server_error_status(self):
+        """Test que valida que una respuesta 5xx marca la traza con error"""
+        app, _ = traced_app(self.tracer, status=503)
+
+        await call_middleware(self.tracer, app)
+
+        assert self.tracer.exporter.recent()[0]["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_non_http_scope(self):
+        """Test que valida que los scopes que no son HTTP pasan sin cambios"""
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["type"])
+
+        await TracingMiddleware(app, tracer=self.tracer)({"type": "lifespan"}, None, None)
+
+        assert calls == ["lifespan"]
+        assert self.tracer.exporter.recent() == []
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.cli import build_parser, main
+
+
+class TestCli:
+    """Tests para la CLI de mantenimiento"""
+
+    def test_gc_blobs_default_grace(self):
+        """Test que valida el periodo de gracia por defecto"""
+        args = build_parser().parse_args(["gc-blobs"])
+
+        assert args.grace_seconds == 3600
+
+    def test_requires_command(self):
+        """Test que valida que se exige un comando"""
+        with pytest.raises(SystemExit):
+            build_parser().parse_args([])
+
+    def test_gc_blobs_runs_collection(self, capsys):
+        """Test que valida la ejecución de la recolección de blobs"""
+        with patch("app.cli.mongodb_service") as mock_mongodb, patch(
+            "app.cli.AnalysisBlobRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value.collect_garbage.return_value = 3
+
+            exit_code = main(["gc-blobs", "--grace-seconds", "60"])
+
+        assert exit_code == 0
+        mock_repo_class.return_value.collect_garbage.assert_called_once_with(grace_seconds=60)
+        mock_mongodb.connect.assert_called_once()
+        mock_mongodb.disconnect.assert_called_once()
+        assert "Blobs eliminados: 3" in capsys.readouterr().out
+
+    def test_archive_analyses_runs_archiving(self, capsys):
+        """Test que valida la ejecución del archivado por lotes"""
+        with patch("app.cli.mongodb_service"), patch(
+            "app.cli.RetentionRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value.archive_analyses.return_value = 7
+
+            exit_code = main(["archive-analyses", "--batch-size", "100", "--max-batches", "2"])
+
+        assert exit_code == 0
+        mock_repo_class.return_value.archive_analyses.assert_called_once_with(
+            batch_size=100, max_batches=2
+        )
+        assert "Análisis archivados: 7" in capsys.readouterr().out
+
+    def test_apply_retention_runs_backfill(self, capsys):
+        """Test que valida la asignación de expiración a registros existentes"""
+        with patch("app.cli.mongodb_service"), patch(
+            "app.cli.RetentionRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value.apply_retention.return_value = 4
+
+            exit_code = main(["apply-retention"])
+
+        assert exit_code == 0
+        mock_repo_class.return_value.apply_retention.assert_called_once_with(batch_size=500)
+        assert "Registros actualizados: 4" in capsys.readouterr().out
+
+    def test_rebuild_rollups_excludes_today_by_default(self, capsys):
+        """Test que valida la reconstrucción de contadores sin el día actual"""
+        with patch("app.cli.mongodb_service"), patch(
+            "app.cli.AnalysisRollupRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value.rebuild.return_value = 12
+
+            exit_code = main(["rebuild-rollups", "--batch-size", "50"])
+
+        assert exit_code == 0
+        mock_repo_class.return_value.rebuild.assert_called_once_with(
+            batch_size=50, include_today=False, days=None
+        )
+        assert "Contadores reconstruidos: 12" in capsys.readouterr().out
+
+    def test_backfill_findings_runs_backfill(self, capsys):
+        """Test que valida la generación de hallazgos de registros existentes"""
+        with patch("app.cli.mongodb_service"), patch(
+            "app.cli.AnalysisFindingRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value.backfill.return_value = 40
+
+            exit_code = main(["backfill-findings", "--batch-size", "100"])
+
+        assert exit_code == 0
+        mock_repo_class.return_value.backfill.assert_called_once_with(batch_size=100)
+        assert "Hallazgos generados: 40" in capsys.readouterr().out
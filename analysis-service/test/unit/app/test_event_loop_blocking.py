@@ -0,0 +1,195 @@
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from prometheus_client import CollectorRegistry
+
+from app.main import app
+from app.services.analysis_record_writer import AnalysisRecordWriter
+from app.services.auth_middleware import auth_middleware
+from app.services.encrypt import Encrypt
+from app.services.loop_monitor import LoopLagMonitor
+from app.services.metrics import ServiceMetrics
+from app.usecase.analysis_usecase import AnalysisUseCase
+
+# Máximo que una petición puede bloquear el event loop (configurable en CI). Con
+# cobertura (sys.gettrace) cada línea de Python tarda varias veces más y el
+# margen se duplica; un bloqueo real (p. ej. PBKDF2 en el loop) lo sigue superando.
+LOOP_BLOCK_BUDGET_MS = float(os.getenv("LOOP_BLOCK_BUDGET_MS", "50")) * (
+    2 if sys.gettrace() is not None else 1
+)
+
+CONFIG_CONTENT = "interface eth0\n ip address 10.0.0.1 255.255.255.0\nenable password cisco"
+
+
+async def validate_token_stand_in(token):
+    """Auth-service local: responde como una llamada de red"""
+    await asyncio.sleep(0.005)
+    return True, {"user": "ana"}
+
+
+class ConfigServiceStandIn:
+    """
+    Config-service local: reemplaza a httpx.AsyncClient y responde sin red
+
+    Es una clase simple y no un mock para que el propio stand-in no ocupe el
+    event loop durante la medición.
+    """
+
+    def __init__(self, status_code=200):
+        encrypt = Encrypt(os.getenv("ENCRYPTION_KEY", "mi_contraseña_secreta"))
+        self.status_code = status_code
+        self.content = encrypt.ofuscar_base64(encrypt.encrypt(CONFIG_CONTENT))
+
+    def __call__(self, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return False
+
+    async def get(self, url, headers=None):
+        await asyncio.sleep(0.005)
+        return httpx.Response(
+            self.status_code,
+            json={"data": {"content": self.content}},
+            request=httpx.Request("GET", url),
+        )
+
+
+def gemini_stand_in():
+    """Proveedor de Gemini local: generate_content es síncrono y tarda como la API real"""
+
+    def generate_content(prompt, generation_config=None):
+        time.sleep(0.05)
+        response = MagicMock()
+        response.text = json.dumps({"safe": False, "problems": []})
+        response.usage_metadata = None
+        return response
+
+    provider = MagicMock()
+    provider.create_model.return_value.generate_content.side_effect = generate_content
+    return provider
+
+
+def repository_stand_in():
+    """MongoDB local: el guardado síncrono de mongoengine tarda unos milisegundos"""
+
+    def save_analysis_record(success, response, user, record_id=None):
+        time.sleep(0.02)
+
+    repository = MagicMock()
+    repository.save_analysis_record.side_effect = save_analysis_record
+    return repository
+
+
+def record_writer_stand_in():
+    """Buffer write-behind con una colección local que tarda en insertar"""
+    collection = MagicMock()
+    collection.insert_many.side_effect = lambda documents, ordered: time.sleep(0.02)
+    return AnalysisRecordWriter(
+        collection_provider=lambda: collection,
+        flush_interval=0.01,
+        blob_repository=MagicMock(),
+        rollup_repository=MagicMock(),
+        finding_repository=MagicMock(),
+    )
+
+
+class TestAnalyzeDoesNotBlockEventLoop:
+    """
+    Falla si alguna ruta de /api/v1/analyze bloquea el event loop más de
+    LOOP_BLOCK_BUDGET_MS con los servicios reemplazados por stand-ins locales
+    """
+
+    async def run_requests(self, query, config_status=200, write_behind=False, count=4):
+        monitor = LoopLagMonitor(
+            interval=0.002,
+            threshold=LOOP_BLOCK_BUDGET_MS / 1000,
+            debug=True,
+            service_metrics=ServiceMetrics(CollectorRegistry()),
+        )
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://analysis"
+        )
+        use_case = AnalysisUseCase()
+        use_case.repository.repository = repository_stand_in()
+        use_case.record_writer = record_writer_stand_in()
+
+        with patch.dict(os.environ, {"ENVIRONMENT": "ci", "GEMINI_API_KEY": "clave"}), patch.object(
+            auth_middleware.auth_client, "validate_token", validate_token_stand_in
+        ), patch(
+            "app.usecase.analysis_usecase.httpx.AsyncClient", ConfigServiceStandIn(config_status)
+        ), patch(
+            "app.usecase.analysis_usecase.gemini_provider", gemini_stand_in()
+        ), patch(
+            "app.controller.analysis_controller.AnalysisUseCase", return_value=use_case
+        ):
+            if write_behind:
+                await use_case.record_writer.start()
+            # Una recolección completa pendiente de otros tests no es un bloqueo de la petición
+            gc.collect()
+            await monitor.start()
+            try:
+                responses = await asyncio.gather(
+                    *[
+                        client.get(
+                            f"/api/v1/analyze?filename=r{index}.cfg&{query}",
+                            headers={"Authorization": "Bearer token"},
+                        )
+                        for index in range(count)
+                    ]
+                )
+            finally:
+                await monitor.stop()
+                if write_behind:
+                    await use_case.record_writer.stop()
+                await client.aclose()
+
+        stacks = "\n".join(event["stack"] or "" for event in monitor.blocking_events)
+        assert monitor.max_lag * 1000 < LOOP_BLOCK_BUDGET_MS, (
+            f"El event loop se bloqueó {monitor.max_lag * 1000:.1f} ms "
+            f"(máximo {LOOP_BLOCK_BUDGET_MS} ms):\n{stacks}"
+        )
+        return responses, use_case
+
+    @pytest.mark.asyncio
+    async def test_analyze_without_ia(self):
+        """Test de la ruta sin IA: cifrado, config-service, descifrado y guardado"""
+        responses, use_case = await self.run_requests("enable_ia=false")
+
+        assert [response.status_code for response in responses] == [200] * 4
+        assert responses[0].json()["data"]["content"] == CONFIG_CONTENT
+        assert use_case.repository.repository.save_analysis_record.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_analyze_with_ia(self):
+        """Test de la ruta con IA: Gemini síncrono y guardado"""
+        responses, use_case = await self.run_requests("enable_ia=true")
+
+        assert [response.status_code for response in responses] == [200] * 4
+        assert responses[0].json()["data"]["safe"] is False
+        assert use_case.repository.repository.save_analysis_record.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_analyze_with_write_behind(self):
+        """Test de la ruta con el buffer write-behind de registros"""
+        responses, use_case = await self.run_requests("enable_ia=false", write_behind=True)
+
+        assert [response.status_code for response in responses] == [200] * 4
+        assert use_case.record_writer.written_records == 4
+
+    @pytest.mark.asyncio
+    async def test_analyze_file_not_found(self):
+        """Test de la ruta de error del config-service"""
+        responses, _ = await self.run_requests("enable_ia=false", config_status=404)
+
+        assert {response.status_code for response in responses} == {404}
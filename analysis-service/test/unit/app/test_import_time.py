@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+# Límites del arranque de app.main (configurables en CI). Con google.generativeai
+# importado al cargar, eran ~1.6 s y ~1950 módulos; sin él, ~0.9 s y ~970.
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+IMPORT_MODULE_BUDGET = int(os.getenv("IMPORT_MODULE_BUDGET", "1300"))
+
+# SDKs que solo se usan en algunas peticiones y no deben importarse al arrancar
+LAZY_MODULES = ("google.generativeai", "grpc", "google.protobuf", "uvicorn")
+
+SERVICE_ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+
+
+def import_profile(module: str = "app.main") -> dict:
+    """
+    Importa module en un intérprete nuevo con -X importtime
+
+    Returns:
+        dict: Tiempo acumulado de module en microsegundos por cada módulo importado
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_ROOT,
+        # Sin la cobertura de pytest-cov, que se propaga a los subprocesos y triplica el tiempo
+        env={key: value for key, value in os.environ.items() if not key.startswith("COV_CORE_")},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+class TestImportTime:
+    """
+    Falla si importar app.main vuelve a cargar SDKs pesados o supera los límites
+    de IMPORT_TIME_BUDGET_MS y IMPORT_MODULE_BUDGET
+    """
+
+    def test_app_main_startup(self):
+        """Test que valida el tiempo, la cantidad de módulos y los imports diferidos"""
+        # El primer intérprete compila los .pyc; se toma la mejor de dos mediciones
+        profiles = [import_profile(), import_profile()]
+        elapsed_ms = min(profile["app.main"] for profile in profiles) / 1000
+        profile = profiles[-1]
+
+        lazy = sorted(
+            name
+            for name in profile
+            if any(name == prefix or name.startswith(prefix + ".") for prefix in LAZY_MODULES)
+        )
+        assert lazy == [], f"Módulos que deberían importarse al usarse: {lazy[:10]}"
+        assert len(profile) <= IMPORT_MODULE_BUDGET, (
+            f"app.main importa {len(profile)} módulos (máximo {IMPORT_MODULE_BUDGET})"
+        )
+        assert elapsed_ms <= IMPORT_TIME_BUDGET_MS, (
+            f"Importar app.main tarda {elapsed_ms:.0f} ms (máximo {IMPORT_TIME_BUDGET_MS:.0f} ms)"
+        )
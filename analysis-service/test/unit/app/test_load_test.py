@@ -0,0 +1,70 @@
+import argparse
+
+import httpx
+import pytest
+
+from app.load_test import build_parser, main, parse_header, percentile, run_load_test
+
+
+class TestLoadTest:
+    """Tests para la prueba de carga local"""
+
+    def test_percentile(self):
+        """Test que valida el percentil por vecino más cercano"""
+        values = [float(value) for value in range(1, 101)]
+
+        assert percentile(values, 0.5) == 50.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([], 0.5) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_run_load_test(self):
+        """Test que valida el conteo de respuestas, errores y los headers enviados"""
+        seen_headers = []
+        calls = {"count": 0}
+
+        def handler(request):
+            calls["count"] += 1
+            seen_headers.append(request.headers.get("authorization"))
+            if calls["count"] % 5 == 0:
+                raise httpx.ConnectError("rechazada", request=request)
+            return httpx.Response(200 if calls["count"] % 2 else 503)
+
+        result = await run_load_test(
+            "http://analysis/health",
+            concurrency=4,
+            duration=0.05,
+            headers={"Authorization": "Bearer token"},
+            transport=httpx.MockTransport(handler),
+        )
+
+        assert result["requests"] > 0
+        assert result["requests"] + result["errors"]["ConnectError"] == calls["count"]
+        assert set(result["statuses"]) == {200, 503}
+        assert result["requests_per_second"] > 0
+        assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
+        assert set(seen_headers) == {"Bearer token"}
+
+    def test_parse_header(self):
+        """Test que valida el formato 'Nombre: valor'"""
+        assert parse_header("Authorization: Bearer a:b") == ("Authorization", "Bearer a:b")
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_header("sin-separador")
+
+    def test_parser_defaults(self):
+        """Test que valida los valores por defecto"""
+        args = build_parser().parse_args([])
+
+        assert args.url == "http://localhost:8002/health"
+        assert args.concurrency == 50
+        assert args.duration == 30.0
+        assert args.header == []
+
+    def test_main_reports_errors(self, capsys):
+        """Test que valida el reporte y el código de salida con errores de conexión"""
+        exit_code = main(["--url", "http://127.0.0.1:1/health", "--concurrency", "1", "--duration", "0.05"])
+
+        output = capsys.readouterr().out
+        assert exit_code == 1
+        assert "Throughput:" in output
+        assert "Errores: {'ConnectError':" in output
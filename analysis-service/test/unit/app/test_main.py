@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
 import json
+import os
 
 from app.main import (
     app,
@@ -48,10 +49,170 @@ class TestMain:
         assert result["version"] == "1.0.0"
         assert "timestamp" in result
 
+    def test_request_id_header(self):
+        """Test que valida que cada respuesta incluye el request id"""
+        client = TestClient(app)
+
+        generated = client.get("/health")
+        propagated = client.get("/health", headers={"X-Request-ID": "req-123"})
+
+        assert len(generated.headers["X-Request-ID"]) == 32
+        assert propagated.headers["X-Request-ID"] == "req-123"
+
+    def test_readiness_endpoint_ready(self):
+        """Test del endpoint de readiness con todas las dependencias disponibles"""
+        result = {"status": "ready", "cached": False, "dependencies": {}}
+        with patch("app.main.readiness_service.check", AsyncMock(return_value=result)):
+            response = TestClient(app).get("/health/ready")
+
+        assert response.status_code == 200
+        assert response.json() == result
+
+    def test_readiness_endpoint_not_ready(self):
+        """Test del endpoint de readiness con una dependencia caída"""
+        result = {
+            "status": "not_ready",
+            "cached": False,
+            "dependencies": {"mongodb": {"status": "down", "latency_ms": 2.0, "error": "sin servidor"}},
+        }
+        with patch("app.main.readiness_service.check", AsyncMock(return_value=result)):
+            response = TestClient(app).get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["dependencies"]["mongodb"]["error"] == "sin servidor"
+
+    def test_metrics_endpoint(self):
+        """Test del endpoint de métricas Prometheus sin autenticación"""
+        response = TestClient(app).get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "analysis_service_stage_duration_seconds" in response.text
+        assert "analysis_service_llm_parse_failures_total" in response.text
+
+    def test_server_timing_header(self):
+        """Test del header Server-Timing en /api/v1/analyze cuando se pide"""
+        from app.services.auth_middleware import auth_middleware
+        from app.services.encrypt import Encrypt
+        from app.usecase.analysis_usecase import AnalysisUseCase
+
+        encrypt = Encrypt(os.getenv("ENCRYPTION_KEY", "mi_contraseña_secreta"))
+        config_response = MagicMock()
+        config_response.json.return_value = {
+            "data": {"content": encrypt.ofuscar_base64(encrypt.encrypt("interface eth0"))}
+        }
+        http_client = AsyncMock()
+        http_client.get.return_value = config_response
+        http_client.__aenter__.return_value = http_client
+
+        with patch.object(
+            auth_middleware.auth_client,
+            "validate_token",
+            AsyncMock(return_value=(True, {"user": "ana"})),
+        ), patch(
+            "app.usecase.analysis_usecase.httpx.AsyncClient", return_value=http_client
+        ), patch.object(AnalysisUseCase, "_save_analysis_record", AsyncMock()):
+            client = TestClient(app)
+            headers = {"Authorization": "Bearer token"}
+            plain = client.get("/api/v1/analyze?filename=r1.cfg", headers=headers)
+            timed = client.get(
+                "/api/v1/analyze?filename=r1.cfg",
+                headers={**headers, "X-Server-Timing": "1"},
+            )
+
+        assert plain.status_code == 200
+        assert "server-timing" not in plain.headers
+        assert timed.status_code == 200
+        names = [entry.split(";")[0] for entry in timed.headers["server-timing"].split(", ")]
+        assert names == ["auth", "fetch", "decrypt", "persist", "build_response", "total"]
+
+    def test_request_profile_reuses_authentication(self):
+        """Test de ?profile=1: un solo round trip al auth-service y el trabajo en hilos incluido"""
+        from app.services.auth_middleware import auth_middleware
+        from app.services.encrypt import Encrypt
+        from app.usecase.analysis_usecase import AnalysisUseCase
+
+        encrypt = Encrypt(os.getenv("ENCRYPTION_KEY", "mi_contraseña_secreta"))
+        config_response = MagicMock()
+        config_response.json.return_value = {
+            "data": {"content": encrypt.ofuscar_base64(encrypt.encrypt("interface eth0"))}
+        }
+        http_client = AsyncMock()
+        http_client.get.return_value = config_response
+        http_client.__aenter__.return_value = http_client
+        validate_token = AsyncMock(return_value=(True, {"user": "root"}))
+
+        with patch.dict(os.environ, {"ADMIN_USERS": "root"}), patch.object(
+            auth_middleware.auth_client, "validate_token", validate_token
+        ), patch(
+            "app.usecase.analysis_usecase.httpx.AsyncClient", return_value=http_client
+        ), patch.object(AnalysisUseCase, "_save_analysis_record", AsyncMock()):
+            response = TestClient(app).get(
+                "/api/v1/analyze?filename=r1.cfg&profile=1",
+                headers={"Authorization": "Bearer token"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["x-profiled-status"] == "200"
+        validate_token.assert_awaited_once()
+        # El descifrado (PBKDF2) corre en un hilo del pool y aparece en el perfil
+        assert "_derive_key (" in response.text
+
+    def test_tracing_propagates_traceparent(self):
+        """Test de la traza de /api/v1/analyze y su propagación al config-service"""
+        from app.services.auth_middleware import auth_middleware
+        from app.services.encrypt import Encrypt
+        from app.services.tracing import tracer
+        from app.usecase.analysis_usecase import AnalysisUseCase
+
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        encrypt = Encrypt(os.getenv("ENCRYPTION_KEY", "mi_contraseña_secreta"))
+        config_response = MagicMock()
+        config_response.status_code = 200
+        config_response.json.return_value = {
+            "data": {"content": encrypt.ofuscar_base64(encrypt.encrypt("interface eth0"))}
+        }
+        http_client = AsyncMock()
+        http_client.get.return_value = config_response
+        http_client.__aenter__.return_value = http_client
+
+        with patch.object(
+            auth_middleware.auth_client,
+            "validate_token",
+            AsyncMock(return_value=(True, {"user": "ana"})),
+        ), patch(
+            "app.usecase.analysis_usecase.httpx.AsyncClient", return_value=http_client
+        ), patch.object(AnalysisUseCase, "_save_analysis_record", AsyncMock()):
+            response = TestClient(app).get(
+                "/api/v1/analyze?filename=r1.cfg",
+                headers={
+                    "Authorization": "Bearer token",
+                    "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01",
+                    "X-Request-ID": "req-traza",
+                },
+            )
+
+        assert response.status_code == 200
+        spans = {span["name"]: span for span in tracer.exporter.recent(request_id="req-traza")}
+        assert set(spans) == {
+            "GET /api/v1/analyze",
+            "auth_middleware.validate_token",
+            "config_service.fetch",
+            "decrypt",
+        }
+        assert all(span["trace_id"] == trace_id for span in spans.values())
+        fetch = spans["config_service.fetch"]
+        assert fetch["attributes"]["http.status_code"] == 200
+        assert http_client.get.call_args.kwargs["headers"]["traceparent"] == (
+            f"00-{trace_id}-{fetch['span_id']}-01"
+        )
+
     def test_is_public_path(self):
         """Test de la función _is_public_path"""
         # Rutas públicas
         assert _is_public_path("/health") is True
+        assert _is_public_path("/health/ready") is True
+        assert _is_public_path("/metrics") is True
         assert _is_public_path("/docs") is True
         assert _is_public_path("/redoc") is True
         assert _is_public_path("/openapi.json") is True
@@ -165,9 +326,12 @@ class TestMain:
         result2 = custom_openapi()
         assert result2 is result
 
+    @patch('app.main.loop_monitor', new_callable=AsyncMock)
+    @patch('app.main.analysis_record_writer', new_callable=AsyncMock)
     @patch('app.main.mongodb_service.connect')
     @patch('builtins.print')
-    def test_startup_event_success(self, mock_print, mock_connect):
+    @patch('app.main.log_listener')
+    def test_startup_event_success(self, mock_log_listener, mock_print, mock_connect, mock_writer, mock_monitor):
         """Test del evento startup exitoso"""
         import asyncio
         from app.main import startup_event
@@ -178,11 +342,17 @@ class TestMain:
         asyncio.run(startup_event())
         
         mock_connect.assert_called_once()
+        mock_writer.start.assert_awaited_once()
+        mock_monitor.start.assert_awaited_once()
+        mock_log_listener.start.assert_called_once()
         mock_print.assert_called_with("✅ Conexión a MongoDB establecida exitosamente")
 
+    @patch('app.main.loop_monitor', new_callable=AsyncMock)
+    @patch('app.main.analysis_record_writer', new_callable=AsyncMock)
     @patch('app.main.mongodb_service.connect')
     @patch('builtins.print')
-    def test_startup_event_failure(self, mock_print, mock_connect):
+    @patch('app.main.log_listener')
+    def test_startup_event_failure(self, mock_log_listener, mock_print, mock_connect, mock_writer, mock_monitor):
         """Test del evento startup con error"""
         import asyncio
         from app.main import startup_event
@@ -195,9 +365,12 @@ class TestMain:
         mock_connect.assert_called_once()
         mock_print.assert_called_with("❌ Error al conectar a MongoDB: Connection failed")
 
+    @patch('app.main.loop_monitor', new_callable=AsyncMock)
+    @patch('app.main.analysis_record_writer', new_callable=AsyncMock)
     @patch('app.main.mongodb_service.disconnect')
     @patch('builtins.print')
-    def test_shutdown_event_success(self, mock_print, mock_disconnect):
+    @patch('app.main.log_listener')
+    def test_shutdown_event_success(self, mock_log_listener, mock_print, mock_disconnect, mock_writer, mock_monitor):
         """Test del evento shutdown exitoso"""
         import asyncio
         from app.main import shutdown_event
@@ -208,11 +381,17 @@ class TestMain:
         asyncio.run(shutdown_event())
         
         mock_disconnect.assert_called_once()
+        mock_writer.stop.assert_awaited_once()
+        mock_monitor.stop.assert_awaited_once()
+        mock_log_listener.stop.assert_called_once()
         mock_print.assert_called_with("✅ Conexión a MongoDB cerrada exitosamente")
 
+    @patch('app.main.loop_monitor', new_callable=AsyncMock)
+    @patch('app.main.analysis_record_writer', new_callable=AsyncMock)
     @patch('app.main.mongodb_service.disconnect')
     @patch('builtins.print')
-    def test_shutdown_event_failure(self, mock_print, mock_disconnect):
+    @patch('app.main.log_listener')
+    def test_shutdown_event_failure(self, mock_log_listener, mock_print, mock_disconnect, mock_writer, mock_monitor):
         """Test del evento shutdown con error"""
         import asyncio
         from app.main import shutdown_event
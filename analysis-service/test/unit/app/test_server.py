@@ -0,0 +1,216 @@
+import os
+import runpy
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.server import (
+    WORKER_CLASS,
+    child_exit,
+    default_workers,
+    next_worker_slot,
+    post_fork,
+    pre_fork,
+    prepare_metrics_dir,
+    server_settings,
+    uvicorn_implementations,
+)
+
+GUNICORN_CONF = os.path.join(os.path.dirname(__file__), "..", "..", "..", "gunicorn.conf.py")
+
+
+def gunicorn_server(workers=2, running=()):
+    """Arbiter mínimo con los atributos que usan los hooks"""
+    return SimpleNamespace(
+        cfg=SimpleNamespace(workers=workers),
+        WORKERS={index: worker for index, worker in enumerate(running)},
+    )
+
+
+class TestServerSettings:
+    """Tests para la configuración de gunicorn"""
+
+    def test_defaults(self):
+        """Test que valida los valores por defecto"""
+        with patch.dict(os.environ, {}, clear=True):
+            settings = server_settings()
+
+        assert settings == {
+            "bind": "0.0.0.0:8002",
+            "workers": default_workers(),
+            "worker_class": WORKER_CLASS,
+            "preload_app": True,
+            "max_requests": 2000,
+            "max_requests_jitter": 200,
+            "timeout": 60,
+            "graceful_timeout": 30,
+            "keepalive": 5,
+        }
+
+    def test_configuration_from_environment(self):
+        """Test que valida la configuración desde variables de entorno"""
+        with patch.dict(
+            os.environ,
+            {
+                "PORT": "9000",
+                "WEB_CONCURRENCY": "3",
+                "PRELOAD_APP": "false",
+                "WORKER_MAX_REQUESTS": "0",
+                "WORKER_MAX_REQUESTS_JITTER": "10",
+                "WORKER_TIMEOUT": "120",
+                "GRACEFUL_TIMEOUT": "5",
+                "KEEPALIVE": "2",
+            },
+            clear=True,
+        ):
+            settings = server_settings()
+
+        assert settings["bind"] == "0.0.0.0:9000"
+        assert settings["workers"] == 3
+        assert settings["preload_app"] is False
+        assert settings["max_requests"] == 0
+        assert settings["max_requests_jitter"] == 10
+        assert settings["timeout"] == 120
+        assert settings["graceful_timeout"] == 5
+        assert settings["keepalive"] == 2
+
+    def test_empty_concurrency_uses_cpu_count(self):
+        """Test que valida que WEB_CONCURRENCY vacío usa un worker por CPU"""
+        with patch.dict(os.environ, {"WEB_CONCURRENCY": ""}, clear=True), patch(
+            "app.server.default_workers", return_value=6
+        ):
+            assert server_settings()["workers"] == 6
+
+    def test_default_workers_uses_affinity(self):
+        """Test que valida que se cuentan las CPUs asignadas al proceso"""
+        with patch("app.server.os.sched_getaffinity", return_value={0, 1, 2}, create=True):
+            assert default_workers() == 3
+
+    def test_uvicorn_implementations(self):
+        """Test que valida uvloop y httptools por defecto y su configuración"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert uvicorn_implementations() == {"loop": "uvloop", "http": "httptools"}
+        with patch.dict(os.environ, {"UVICORN_LOOP": "asyncio", "UVICORN_HTTP": "h11"}):
+            assert uvicorn_implementations() == {"loop": "asyncio", "http": "h11"}
+
+    def test_gunicorn_conf(self, tmp_path):
+        """Test que valida que gunicorn.conf.py expone los valores y los hooks"""
+        (tmp_path / "gauge_1.db").write_bytes(b"")
+        with patch.dict(
+            os.environ,
+            {"WEB_CONCURRENCY": "4", "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)},
+            clear=True,
+        ):
+            conf = runpy.run_path(GUNICORN_CONF)
+
+        assert conf["workers"] == 4
+        assert conf["worker_class"] == WORKER_CLASS
+        assert conf["preload_app"] is True
+        assert conf["graceful_timeout"] == 30
+        assert conf["pre_fork"] is pre_fork
+        assert conf["post_fork"] is post_fork
+        assert conf["child_exit"] is child_exit
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestServerHooks:
+    """Tests para los hooks de gunicorn"""
+
+    def test_next_worker_slot(self):
+        """Test que valida que se reutiliza el menor slot libre"""
+        workers = [SimpleNamespace(slot=1), SimpleNamespace(slot=3), SimpleNamespace()]
+
+        assert next_worker_slot([]) == 1
+        assert next_worker_slot(workers) == 2
+
+    def test_pre_fork_assigns_slot(self):
+        """Test que valida que el worker nuevo recibe el slot del que reemplaza"""
+        server = gunicorn_server(running=[SimpleNamespace(slot=2)])
+        worker = SimpleNamespace()
+
+        pre_fork(server, worker)
+
+        assert worker.slot == 1
+
+    def test_post_fork_uses_worker_log_file(self):
+        """Test que valida el archivo de log por worker con varios workers"""
+        with patch("app.services.logger.use_worker_log_file") as mock_use:
+            post_fork(gunicorn_server(workers=2), SimpleNamespace(slot=2))
+
+        mock_use.assert_called_once_with(2)
+
+    def test_post_fork_single_worker_keeps_log_file(self):
+        """Test que valida que con un solo worker se conserva analysis-service.log"""
+        with patch("app.services.logger.use_worker_log_file") as mock_use:
+            post_fork(gunicorn_server(workers=1), SimpleNamespace(slot=1))
+
+        mock_use.assert_not_called()
+
+    def test_prepare_metrics_dir(self, tmp_path):
+        """Test que valida que se crea el directorio y se eliminan los valores anteriores"""
+        directory = tmp_path / "metricas"
+        with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": str(directory)}):
+            prepare_metrics_dir()
+            (directory / "counter_1.db").write_bytes(b"")
+            prepare_metrics_dir()
+
+        assert list(directory.iterdir()) == []
+
+    def test_prepare_metrics_dir_disabled(self):
+        """Test que valida que sin PROMETHEUS_MULTIPROC_DIR no se toca el disco"""
+        with patch.dict(os.environ, {}, clear=True), patch("app.server.os.makedirs") as mock_makedirs:
+            prepare_metrics_dir()
+
+        mock_makedirs.assert_not_called()
+
+    def test_child_exit_marks_process_dead(self, tmp_path):
+        """Test que valida que se descartan los gauges del worker que terminó"""
+        with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}), patch(
+            "prometheus_client.multiprocess.mark_process_dead"
+        ) as mock_mark:
+            child_exit(gunicorn_server(), SimpleNamespace(pid=1234))
+
+        mock_mark.assert_called_once_with(1234)
+
+    def test_child_exit_without_multiprocess(self):
+        """Test que valida que sin métricas multiproceso no se hace nada"""
+        with patch.dict(os.environ, {}, clear=True), patch(
+            "prometheus_client.multiprocess.mark_process_dead"
+        ) as mock_mark:
+            child_exit(gunicorn_server(), SimpleNamespace(pid=1234))
+
+        mock_mark.assert_not_called()
+
+
+class TestAnalysisUvicornWorker:
+    """Tests para el worker de uvicorn"""
+
+    def test_worker_configuration(self):
+        """Test que valida el event loop, el parser, el reciclado y la espera al detener"""
+        pytest.importorskip("gunicorn")
+        from gunicorn.config import Config
+
+        from app.server_worker import AnalysisUvicornWorker
+
+        cfg = Config()
+        cfg.set("graceful_timeout", 12)
+        cfg.set("max_requests", 100)
+
+        # Sin reemplazar los handlers de los loggers de uvicorn del proceso de tests
+        with patch("uvicorn.workers.logging"):
+            worker = AnalysisUvicornWorker(1, os.getpid(), [], MagicMock(), 30, cfg, MagicMock())
+
+        assert worker.config.loop == "uvloop"
+        assert worker.config.http == "httptools"
+        assert worker.config.limit_max_requests == 100
+        assert worker.config.timeout_graceful_shutdown == 12
+
+    def test_worker_class_path(self):
+        """Test que valida que WORKER_CLASS apunta a la clase del worker"""
+        pytest.importorskip("gunicorn")
+        from app import server_worker
+
+        module_name, class_name = WORKER_CLASS.rsplit(".", 1)
+        assert module_name == server_worker.__name__
+        assert getattr(server_worker, class_name).CONFIG_KWARGS == uvicorn_implementations()
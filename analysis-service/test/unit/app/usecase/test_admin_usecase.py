@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.model.retention_policy import RetentionPolicy
+from app.usecase.admin_usecase import AdminUseCase
+
+
+class TestAdminUseCase:
+    """Tests para el caso de uso de administración"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        with patch("app.usecase.admin_usecase.Logger"), patch(
+            "app.usecase.admin_usecase.RetentionRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value = MagicMock()
+            self.usecase = AdminUseCase()
+        self.usecase.repository.policy = RetentionPolicy(
+            error_days=30, raw_days=90, archive_after_days=180
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_storage_stats(self):
+        """Test que valida el armado de la respuesta de estadísticas"""
+        self.usecase.repository.collection_stats.return_value = [
+            {
+                "collection": "analysis_records",
+                "count": 10,
+                "size_bytes": 2048,
+                "storage_size_bytes": 1024,
+                "total_index_size_bytes": 512,
+                "index_sizes": {"_id_": 512},
+            }
+        ]
+
+        response = await self.usecase.get_storage_stats()
+
+        assert response.success is True
+        assert response.data.collections[0].total_index_size_bytes == 512
+        assert response.data.retention == {
+            "error_days": 30,
+            "raw_days": 90,
+            "archive_after_days": 180,
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_storage_stats_error(self):
+        """Test que valida la propagación de errores de MongoDB"""
+        self.usecase.repository.collection_stats.side_effect = RuntimeError("Error de MongoDB")
+
+        with pytest.raises(RuntimeError):
+            await self.usecase.get_storage_stats()
@@ -0,0 +1,89 @@
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import patch, MagicMock
+
+from app.usecase.analysis_job_usecase import AnalysisJobUseCase
+
+
+def _job(status="pending", result=None):
+    """Construye un documento de trabajo simulado"""
+    job = MagicMock()
+    job.uuid = "job-1"
+    job.status = status
+    job.filename = "config.txt"
+    job.enable_ia = True
+    job.attempts = 0
+    job.created_at = datetime(2024, 1, 1, tzinfo=UTC)
+    job.started_at = None
+    job.finished_at = None
+    job.result = result
+    job.error = None
+    return job
+
+
+class TestAnalysisJobUseCase:
+    """Tests para el caso de uso de trabajos de análisis"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        with patch("app.usecase.analysis_job_usecase.Logger"), patch(
+            "app.usecase.analysis_job_usecase.AnalysisJobRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value = MagicMock()
+            self.usecase = AnalysisJobUseCase()
+        self.usecase.worker_pool = MagicMock()
+
+    @pytest.mark.asyncio
+    async def test_submit_creates_job_and_notifies(self):
+        """Test que valida el registro de un trabajo y el aviso a los workers"""
+        self.usecase.repository.create_job.return_value = _job()
+
+        result = await self.usecase.submit(
+            "config.txt", True, {"token": "token", "user": "testuser"}
+        )
+
+        self.usecase.repository.create_job.assert_called_once_with(
+            "config.txt", True, "testuser", "token"
+        )
+        self.usecase.worker_pool.notify.assert_called_once()
+        assert result.data.job_id == "job-1"
+        assert result.data.status == "pending"
+
+    @pytest.mark.asyncio
+    async def test_submit_empty_filename(self):
+        """Test que valida el rechazo de nombres de archivo vacíos"""
+        with pytest.raises(ValueError):
+            await self.usecase.submit("  ", False, {"user": "testuser"})
+
+        self.usecase.repository.create_job.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_job_completed_includes_result(self):
+        """Test que valida que un trabajo completado incluye el resultado"""
+        result = {
+            "success": True,
+            "message": "Análisis completado exitosamente",
+            "data": {
+                "filename": "config.txt",
+                "file_size": 10,
+                "encrypted_filename": "encrypted",
+                "checksum": "checksum",
+                "file_type": "text/plain",
+                "content": "content",
+            },
+        }
+        self.usecase.repository.get_job.return_value = _job("completed", result)
+
+        response = await self.usecase.get_job("job-1", {"user": "testuser"})
+
+        self.usecase.repository.get_job.assert_called_once_with("job-1", "testuser")
+        assert response.data.status == "completed"
+        assert response.data.result.data.filename == "config.txt"
+
+    @pytest.mark.asyncio
+    async def test_get_job_not_found(self):
+        """Test que valida el error cuando el trabajo no existe"""
+        self.usecase.repository.get_job.return_value = None
+
+        with pytest.raises(ValueError, match="no existe"):
+            await self.usecase.get_job("missing", {"user": "testuser"})
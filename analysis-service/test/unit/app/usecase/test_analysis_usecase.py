@@ -1,11 +1,22 @@
 import pytest
+import asyncio
+import gzip
 import os
+import time
 import json
-from datetime import datetime
+import zlib
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 
+from prometheus_client import CollectorRegistry
+
+from app.services.metrics import ServiceMetrics
 from app.usecase.analysis_usecase import AnalysisUseCase
+from app.model.analysis_archive_model import AnalysisArchive
 from app.model.analysis_model import AnalysisResponse
+from app.model.analysis_record_model import AnalysisRecord
+from app.model.analysis_repository import AnalysisRepository, AsyncAnalysisRepository
 
 
 class TestAnalysisUseCase:
@@ -16,12 +27,13 @@ class TestAnalysisUseCase:
         with patch("app.usecase.analysis_usecase.Logger") as mock_logger_class, patch(
             "app.usecase.analysis_usecase.Encrypt"
         ) as mock_encrypt_class, patch(
-            "app.usecase.analysis_usecase.AnalysisRepository"
+            "app.usecase.analysis_usecase.AsyncAnalysisRepository"
         ) as mock_repo_class:
 
             mock_logger = MagicMock()
             mock_encrypt = MagicMock()
             mock_repo = MagicMock()
+            mock_repo.save_analysis_record = AsyncMock()
 
             mock_logger_class.return_value = mock_logger
             mock_encrypt_class.return_value = mock_encrypt
@@ -37,7 +49,7 @@ class TestAnalysisUseCase:
         with patch("app.usecase.analysis_usecase.Logger") as mock_logger_class, patch(
             "app.usecase.analysis_usecase.Encrypt"
         ) as mock_encrypt_class, patch(
-            "app.usecase.analysis_usecase.AnalysisRepository"
+            "app.usecase.analysis_usecase.AsyncAnalysisRepository"
         ) as mock_repo_class:
 
             usecase = AnalysisUseCase()
@@ -260,6 +272,23 @@ class TestAnalysisUseCase:
         mock_model_class.assert_called_once_with("gemini-1.5-flash")
         assert result == mock_model
 
+    @patch.dict(os.environ, {"GEMINI_API_KEY": "test_key"})
+    def test_call_gemini_api_generation_config(self, capsys):
+        """Test que valida la configuración de generación enviada a Gemini"""
+        mock_model = MagicMock()
+        with patch("app.usecase.analysis_usecase.gemini_provider") as mock_provider:
+            result = self.usecase._call_gemini_api(mock_model, "prompt")
+
+        mock_provider.generation_config.assert_called_once_with(
+            max_output_tokens=2048, temperature=0.1
+        )
+        mock_model.generate_content.assert_called_once_with(
+            "prompt", generation_config=mock_provider.generation_config.return_value
+        )
+        assert result == mock_model.generate_content.return_value
+        # La respuesta (con el análisis de la configuración) no se escribe en stdout
+        assert capsys.readouterr().out == ""
+
     def test_configure_gemini_no_api_key(self):
         """Test de configuración de Gemini sin API key"""
         with patch.dict(os.environ, {}, clear=True):
@@ -267,8 +296,8 @@ class TestAnalysisUseCase:
                 self.usecase._configure_gemini()
 
     @pytest.mark.asyncio
-    @patch("app.usecase.analysis_usecase.genai")
-    async def test_perform_analysis_success(self, mock_genai):
+    @patch("app.usecase.analysis_usecase.gemini_provider")
+    async def test_perform_analysis_success(self, mock_provider):
         """Test exitoso de análisis con Gemini"""
         # Configurar mocks
         mock_model = MagicMock()
@@ -294,27 +323,145 @@ class TestAnalysisUseCase:
         with pytest.raises(ValueError, match="No se proporcionó contenido del archivo"):
             self.usecase._perform_analysis(None)
 
-    def test_get_analysis_by_id(self):
+    @pytest.mark.asyncio
+    async def test_get_analysis_by_id(self):
         """Test de obtención de análisis por ID"""
-        auth_result = {"user": "test_user"}
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        self.usecase.repository.find_analysis = AsyncMock(
+            return_value={
+                "uuid": "test_id",
+                "user": "test_user",
+                "success": True,
+                "response": {"filename": "test.txt", "analysis_data": "content"},
+                "created_at": created_at,
+            }
+        )
 
-        result = self.usecase.get_analysis_by_id("test_id", auth_result)
+        result = await self.usecase.get_analysis_by_id("test_id", {"user": "test_user"})
 
-        assert result["analysis_id"] == "test_id"
-        assert result["user"] == "test_user"
-        assert "filename" in result
+        self.usecase.repository.find_analysis.assert_awaited_once_with("test_id", "test_user")
+        assert result.data.analysis_id == "test_id"
+        assert result.data.user == "test_user"
+        assert result.data.response["filename"] == "test.txt"
 
-    def test_get_analyses_by_user(self):
+    @pytest.mark.asyncio
+    async def test_get_analysis_by_id_not_found(self):
+        """Test de análisis inexistente o de otro usuario"""
+        self.usecase.repository.find_analysis = AsyncMock(return_value=None)
+
+        with pytest.raises(ValueError, match="no existe"):
+            await self.usecase.get_analysis_by_id("missing", {"user": "test_user"})
+
+    @pytest.mark.asyncio
+    async def test_get_analyses_by_user(self):
         """Test de obtención de análisis por usuario"""
-        auth_result = {"user": "test_user"}
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        self.usecase.repository.find_analyses_by_user = AsyncMock(
+            return_value=(
+                [
+                    {
+                        "uuid": "a1",
+                        "success": True,
+                        "created_at": created_at,
+                        "response": {
+                            "filename": "test1.txt",
+                            "gemini_response": True,
+                            "analysis_data": {"security_level": "high", "safe": False},
+                        },
+                    },
+                    {
+                        "uuid": "a2",
+                        "success": False,
+                        "created_at": created_at,
+                        "response": {"filename": "test2.txt", "error": "Timeout"},
+                    },
+                ],
+                "next-cursor",
+            )
+        )
+
+        result = await self.usecase.get_analyses_by_user(
+            {"user": "test_user"}, limit=2, security_levels=["high"]
+        )
 
-        result = self.usecase.get_analyses_by_user(auth_result)
+        call = self.usecase.repository.find_analyses_by_user.await_args
+        assert call.args == ("test_user",)
+        assert call.kwargs["limit"] == 2
+        assert call.kwargs["security_levels"] == ["high"]
+        assert result.data.next_cursor == "next-cursor"
+        assert result.data.items[0].security_level == "high"
+        assert result.data.items[1].error == "Timeout"
 
-        assert isinstance(result, list)
-        assert len(result) > 0
-        assert result[0]["user"] == "test_user"
+    @pytest.mark.asyncio
+    async def test_get_analysis_stats(self):
+        """Test de estadísticas diarias con totales del rango"""
+        self.usecase.rollup_repository = MagicMock()
+        self.usecase.rollup_repository.get_stats.return_value = [
+            {
+                "user": "test_user",
+                "day": "2024-01-01",
+                "total": 3,
+                "successful": 2,
+                "failed": 1,
+                "with_ia": 2,
+                "security_levels": {"high": 1, "safe": 1},
+                "severities": {"high": 2, "low": 1},
+            },
+            {
+                "user": "test_user",
+                "day": "2024-01-03",
+                "total": 1,
+                "successful": 1,
+                "with_ia": 1,
+                "security_levels": {"high": 1},
+                "severities": {"high": 1},
+            },
+        ]
+
+        result = await self.usecase.get_analysis_stats(
+            {"user": "test_user"}, date(2024, 1, 1), date(2024, 1, 7)
+        )
 
-    def test_save_analysis_record_success(self):
+        self.usecase.rollup_repository.get_stats.assert_called_once_with(
+            "test_user", "2024-01-01", "2024-01-07"
+        )
+        assert [day.day for day in result.data.days] == ["2024-01-01", "2024-01-03"]
+        assert result.data.totals.total == 4
+        assert result.data.totals.failed == 1
+        assert result.data.totals.security_levels == {"high": 2, "safe": 1}
+        assert result.data.totals.severities == {"high": 3, "low": 1}
+
+    @pytest.mark.asyncio
+    async def test_get_analysis_stats_default_range(self):
+        """Test del rango por defecto de 30 días"""
+        self.usecase.rollup_repository = MagicMock()
+        self.usecase.rollup_repository.get_stats.return_value = []
+
+        result = await self.usecase.get_analysis_stats({"user": "test_user"})
+
+        start = date.fromisoformat(result.data.date_from)
+        end = date.fromisoformat(result.data.date_to)
+        assert (end - start).days == 29
+        assert result.data.totals.total == 0
+
+    @pytest.mark.asyncio
+    async def test_get_analysis_stats_invalid_range(self):
+        """Test de rangos inválidos o demasiado largos"""
+        self.usecase.rollup_repository = MagicMock()
+
+        with pytest.raises(ValueError):
+            await self.usecase.get_analysis_stats(
+                {"user": "test_user"}, date(2024, 2, 1), date(2024, 1, 1)
+            )
+        with pytest.raises(ValueError):
+            await self.usecase.get_analysis_stats(
+                {"user": "test_user"}, date(2020, 1, 1), date(2024, 1, 1)
+            )
+
+        self.usecase.rollup_repository.get_stats.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_save_analysis_record_success(self):
         """Test guardado exitoso de registro de análisis"""
         filename = "test.txt"
         encrypted_filename = "encrypted_test"
@@ -324,12 +471,13 @@ class TestAnalysisUseCase:
         # Configurar entorno de test
         with patch.dict(os.environ, {"ENVIRONMENT": "test"}):
             # El método debe retornar inmediatamente sin llamar al repository
-            self.usecase._save_analysis_record(filename, encrypted_filename, analysis_data, auth_result, False)
+            await self.usecase._save_analysis_record(filename, encrypted_filename, analysis_data, auth_result, False)
             
             # Como está en modo test, no debe llamar al repository
-            self.usecase.repository.save_analysis_record.assert_not_called()
+            self.usecase.repository.save_analysis_record.assert_not_awaited()
 
-    def test_save_error_record_with_token(self):
+    @pytest.mark.asyncio
+    async def test_save_error_record_with_token(self):
         """Test guardado de registro de error con token"""
         # En entorno de test, el método debe retornar sin hacer nada
         filename = "test.txt"
@@ -339,19 +487,20 @@ class TestAnalysisUseCase:
         # Configurar entorno de test
         with patch.dict(os.environ, {"ENVIRONMENT": "test"}):
             # El método debe retornar inmediatamente sin llamar al repository
-            self.usecase._save_error_record(filename, error_message, auth_result)
+            await self.usecase._save_error_record(filename, error_message, auth_result)
             
             # Como está en modo test, no debe llamar al repository
-            self.usecase.repository.save_analysis_record.assert_not_called()
+            self.usecase.repository.save_analysis_record.assert_not_awaited()
 
-    def test_save_error_record_without_token(self):
+    @pytest.mark.asyncio
+    async def test_save_error_record_without_token(self):
         """Test de guardado de registro de error sin token"""
         auth_result = {}
 
-        self.usecase._save_error_record("test.txt", "Test error", auth_result)
+        await self.usecase._save_error_record("test.txt", "Test error", auth_result)
 
         # No debe llamar al repositorio si no hay token
-        self.usecase.repository.save_analysis_record.assert_not_called()
+        self.usecase.repository.save_analysis_record.assert_not_awaited()
 
     @pytest.mark.asyncio
     @patch("app.usecase.analysis_usecase.httpx.AsyncClient")
@@ -415,3 +564,325 @@ class TestAnalysisUseCase:
 
             with pytest.raises(Exception, match="Test error"):
                 await self.usecase.execute("test.txt", auth_result, False)
+
+    @pytest.mark.asyncio
+    async def test_execute_concurrent_ia_requests_share_analysis(self):
+        """Test que valida que peticiones idénticas concurrentes comparten la llamada a Gemini"""
+        self.usecase.encrypt.encrypt.return_value = "encrypted_filename"
+        self.usecase.encrypt.ofuscar_base64.return_value = "base64_filename"
+        analysis = {
+            "analysis_date": "2024-01-01T00:00:00",
+            "security_level": "high",
+            "safe": False,
+            "problems": [],
+        }
+
+        async def slow_content(*args, **kwargs):
+            return "interface eth0"
+
+        def slow_analysis(content):
+            time.sleep(0.05)
+            return analysis
+
+        with patch.object(
+            self.usecase, "_get_file_content_from_config_service", side_effect=slow_content
+        ), patch.object(
+            self.usecase, "_perform_analysis", side_effect=slow_analysis
+        ) as mock_analysis, patch.object(
+            self.usecase, "_save_analysis_record"
+        ) as mock_save_record:
+            results = await asyncio.gather(
+                self.usecase.execute("test.txt", {"token": "t1", "user": "alice"}, True),
+                self.usecase.execute("test.txt", {"token": "t2", "user": "bob"}, True),
+            )
+
+            assert mock_analysis.call_count == 1
+            assert all(result.data.security_level == "high" for result in results)
+            saved_users = {
+                call.args[3]["user"] for call in mock_save_record.call_args_list
+            }
+            assert saved_users == {"alice", "bob"}
+
+    @pytest.mark.asyncio
+    async def test_save_analysis_record_production_awaits_repository(self):
+        """Test que valida que fuera de test el registro se guarda de forma asíncrona"""
+        with patch.dict(os.environ, {"ENVIRONMENT": "production"}):
+            await self.usecase._save_analysis_record(
+                "test.txt", "encrypted_test", "content", {"user": "testuser"}, False
+            )
+
+        self.usecase.repository.save_analysis_record.assert_awaited_once()
+        kwargs = self.usecase.repository.save_analysis_record.await_args.kwargs
+        assert kwargs["success"] is True
+        assert kwargs["user"] == "testuser"
+        assert kwargs["response"]["gemini_response"] is False
+
+    @pytest.mark.asyncio
+    async def test_save_analysis_record_uses_write_behind_buffer(self):
+        """Test que valida que con el buffer activo el registro solo se encola"""
+        self.usecase.record_writer = MagicMock()
+        self.usecase.record_writer.running = True
+        self.usecase.record_writer.enqueue = AsyncMock()
+
+        with patch.dict(os.environ, {"ENVIRONMENT": "production"}):
+            await self.usecase._save_analysis_record(
+                "test.txt", "encrypted_test", {"safe": True}, {"user": "testuser"}, True
+            )
+
+        self.usecase.record_writer.enqueue.assert_awaited_once()
+        self.usecase.repository.save_analysis_record.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_save_analysis_record_passes_record_id(self):
+        """Test que valida que el UUID fijo de un trabajo llega al repositorio"""
+        with patch.dict(os.environ, {"ENVIRONMENT": "production"}):
+            await self.usecase._save_analysis_record(
+                "test.txt", "encrypted_test", "content", {"user": "testuser"}, False, "job-1"
+            )
+
+        kwargs = self.usecase.repository.save_analysis_record.await_args.kwargs
+        assert kwargs["record_id"] == "job-1"
+
+    @pytest.mark.asyncio
+    async def test_export_analyses_invalid_field(self):
+        """Test de campo de exportación inexistente, antes de empezar a responder"""
+        self.usecase.repository.export_analyses = MagicMock()
+
+        with pytest.raises(ValueError, match="password"):
+            self.usecase.export_analyses({"user": "test_user"}, fields=["filename", "password"])
+
+        self.usecase.repository.export_analyses.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_export_analyses_invalid_range(self):
+        """Test de rango de fechas invertido"""
+        with pytest.raises(ValueError):
+            self.usecase.export_analyses(
+                {"user": "test_user"}, date_from=datetime(2024, 2, 1), date_to=datetime(2024, 1, 1)
+            )
+
+    @pytest.mark.asyncio
+    async def test_export_analyses_ndjson(self):
+        """Test de exportación NDJSON con y sin gzip"""
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+
+        async def batches(user, **filters):
+            assert user == "test_user"
+            assert filters["fields"] == ["analysis_id", "created_at"]
+            yield [{"analysis_id": "a1", "created_at": created_at}]
+            yield [{"analysis_id": "a2", "created_at": created_at, "filename": "ñandú.txt"}]
+
+        self.usecase.repository.export_analyses = batches
+        fields = ["analysis_id", "created_at"]
+
+        plain = b"".join(
+            [chunk async for chunk in self.usecase.export_analyses({"user": "test_user"}, fields)]
+        )
+        compressed = b"".join(
+            [
+                chunk
+                async for chunk in self.usecase.export_analyses(
+                    {"user": "test_user"}, fields, compress=True
+                )
+            ]
+        )
+
+        lines = plain.decode("utf-8").splitlines()
+        assert [json.loads(line)["analysis_id"] for line in lines] == ["a1", "a2"]
+        assert json.loads(lines[0])["created_at"] == "2024-01-01T12:00:00"
+        assert "ñandú.txt" in lines[1]
+        assert gzip.decompress(compressed) == plain
+
+
+class TestAnalysisUseCaseMetrics:
+    """Tests de las métricas Prometheus de AnalysisUseCase"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        with patch("app.usecase.analysis_usecase.Logger"), patch(
+            "app.usecase.analysis_usecase.Encrypt"
+        ), patch("app.usecase.analysis_usecase.AsyncAnalysisRepository"):
+            self.usecase = AnalysisUseCase()
+        self.usecase.encrypt.encrypt.return_value = "encrypted_filename"
+        self.usecase.encrypt.ofuscar_base64.return_value = "base64_filename"
+        self.usecase.encrypt.desofuscar_base64.return_value = "desofuscated"
+        self.usecase.encrypt.decrypt.return_value = "interface eth0"
+        self.metrics = ServiceMetrics(CollectorRegistry())
+        self.patcher = patch("app.usecase.analysis_usecase.metrics", self.metrics)
+        self.patcher.start()
+
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.patcher.stop()
+
+    def sample(self, name, **labels):
+        return self.metrics.registry.get_sample_value(f"analysis_service_{name}", labels) or 0
+
+    def stage_count(self, stage):
+        return self.sample("stage_duration_seconds_count", component="analysis", stage=stage)
+
+    @pytest.mark.asyncio
+    @patch("app.usecase.analysis_usecase.httpx.AsyncClient")
+    async def test_execute_records_every_stage(self, mock_client_class):
+        """Test que valida una observación por etapa en un análisis con IA"""
+        mock_client = AsyncMock()
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"data": {"content": "encrypted_content"}}
+        mock_client.get.return_value = mock_response
+        mock_client.__aenter__.return_value = mock_client
+        mock_client_class.return_value = mock_client
+
+        with patch.object(
+            self.usecase, "_perform_analysis", return_value={"safe": True, "problems": []}
+        ), patch.object(self.usecase, "_save_analysis_record", AsyncMock()):
+            await self.usecase.execute("test.txt", {"token": "t", "user": "ana"}, True)
+
+        for stage in (
+            "total", "encrypt_filename", "config_fetch", "decrypt", "llm", "db_save", "response",
+        ):
+            assert self.stage_count(stage) == 1, stage
+        assert self.sample("in_flight", operation="analysis") == 0
+        assert self.sample("cache_requests_total", cache="llm_coalescer", result="miss") == 1
+
+    @pytest.mark.asyncio
+    async def test_execute_error_records_total_only_until_failure(self):
+        """Test que valida que las etapas no alcanzadas no se registran"""
+        with pytest.raises(ValueError):
+            await self.usecase.execute("", {"token": "t"}, False)
+
+        assert self.stage_count("total") == 1
+        assert self.stage_count("encrypt_filename") == 1
+        assert self.stage_count("config_fetch") == 0
+        assert self.sample("in_flight", operation="analysis") == 0
+
+    def test_perform_analysis_records_tokens(self):
+        """Test que valida los tokens consumidos en Gemini"""
+        response = SimpleNamespace(
+            text='{"safe": true, "problems": []}',
+            usage_metadata=SimpleNamespace(prompt_token_count=300, candidates_token_count=80),
+        )
+        with patch.object(self.usecase, "_configure_gemini"), patch.object(
+            self.usecase, "_call_gemini_api", return_value=response
+        ):
+            self.usecase._perform_analysis("interface eth0")
+
+        assert self.sample("llm_tokens_total", type="prompt") == 300
+        assert self.sample("llm_tokens_total", type="completion") == 80
+        assert self.sample("fallbacks_total", reason="llm_error") == 0
+
+    def test_perform_analysis_error_records_fallback(self):
+        """Test que valida el contador de respuestas de respaldo"""
+        with patch.object(self.usecase, "_configure_gemini", side_effect=ValueError("sin clave")):
+            result = self.usecase._perform_analysis("interface eth0")
+
+        assert result["security_level"] == "unknown"
+        assert self.sample("fallbacks_total", reason="llm_error") == 1
+        assert self.sample("in_flight", operation="llm") == 0
+
+    @pytest.mark.parametrize("text", ["sin json", "{no es json}"])
+    def test_parse_failures(self, text):
+        """Test que valida el contador de respuestas de Gemini sin JSON válido"""
+        self.usecase._parse_gemini_response(SimpleNamespace(text=text))
+
+        assert self.sample("llm_parse_failures_total") == 1
+        assert self.sample("fallbacks_total", reason="llm_parse") == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesced_analysis_records_cache_hits(self):
+        """Test que valida aciertos del coalescer para peticiones idénticas"""
+
+        def slow_analysis(content):
+            time.sleep(0.05)
+            return {"safe": True, "problems": []}
+
+        with patch.object(self.usecase, "_perform_analysis", side_effect=slow_analysis):
+            await asyncio.gather(
+                *(self.usecase._perform_coalesced_analysis("a.txt", "contenido") for _ in range(3))
+            )
+
+        assert self.sample("cache_requests_total", cache="llm_coalescer", result="miss") == 1
+        assert self.sample("cache_requests_total", cache="llm_coalescer", result="hit") == 2
+
+
+class _SyntheticCursor:
+    """Cursor que genera registros bajo demanda, como un cursor de pymongo"""
+
+    def __init__(self, total: int):
+        self.total = total
+
+    def sort(self, *args):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        base = datetime(2024, 1, 1)
+        for index in range(self.total):
+            yield {
+                "_id": index,
+                "uuid": f"{index:08d}-0000-0000-0000-000000000000",
+                "success": index % 10 != 0,
+                "created_at": base + timedelta(seconds=index),
+                "response": {
+                    "filename": f"switch-{index % 500}.txt",
+                    "gemini_response": True,
+                    "analysis_data": {"security_level": "high", "safe": False},
+                },
+            }
+
+
+def _rss_bytes() -> int:
+    """RSS actual del proceso (Linux)"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="Requiere /proc (Linux)")
+class TestAnalysisExportMemory:
+    """Verifica que la memoria de la exportación no crece con el número de registros"""
+
+    @pytest.mark.asyncio
+    async def test_export_500k_records_constant_rss(self):
+        """Test que exporta 500k registros sintéticos con gzip midiendo el RSS"""
+        total = 500_000
+        collection = MagicMock()
+        collection.find.return_value = _SyntheticCursor(total)
+        archive = MagicMock()
+        archive.find.return_value = _SyntheticCursor(0)
+
+        with patch("app.usecase.analysis_usecase.Logger"), patch(
+            "app.model.analysis_repository.Logger"
+        ), patch("app.usecase.analysis_usecase.Encrypt"):
+            usecase = AnalysisUseCase()
+            usecase.repository = AsyncAnalysisRepository(
+                AnalysisRepository(blob_repository=MagicMock(), rollup_repository=MagicMock())
+            )
+
+        exported_bytes = 0
+        lines = 0
+        samples = []
+        with patch.object(AnalysisRecord, "_get_collection", return_value=collection), patch.object(
+            AnalysisArchive, "_get_collection", return_value=archive
+        ), patch.dict(os.environ, {"ANALYSIS_EXPORT_BATCH_SIZE": "1000"}):
+            stream = usecase.export_analyses({"user": "auditor"}, compress=True)
+            decompressor = zlib.decompressobj(wbits=31)
+            async for chunk in stream:
+                exported_bytes += len(chunk)
+                lines += decompressor.decompress(chunk).count(b"\n")
+                samples.append(_rss_bytes())
+
+        # Se descarta el arranque (primeros lotes) y se compara el resto
+        warm = samples[len(samples) // 10]
+        growth = max(samples) - warm
+        print(
+            f"\nExportados {lines} registros ({exported_bytes / 2**20:.1f} MiB con gzip):"
+            f" RSS tras arranque {warm / 2**20:.1f} MiB, crecimiento máximo {growth / 2**20:.1f} MiB"
+        )
+
+        assert lines == total
+        assert growth < 16 * 2**20
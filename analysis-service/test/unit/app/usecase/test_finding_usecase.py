@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+from app.usecase.finding_usecase import FindingUseCase
+
+
+class TestFindingUseCase:
+    """Tests para el caso de uso de hallazgos"""
+
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        with patch("app.usecase.finding_usecase.Logger"), patch(
+            "app.usecase.finding_usecase.AnalysisFindingRepository"
+        ) as mock_repo_class:
+            mock_repo_class.return_value = MagicMock()
+            self.usecase = FindingUseCase()
+
+    @pytest.mark.asyncio
+    async def test_get_findings(self):
+        """Test que valida el armado de la página de hallazgos"""
+        self.usecase.repository.find_findings.return_value = (
+            [
+                {
+                    "analysis_uuid": "a1",
+                    "index": 0,
+                    "user": "test_user",
+                    "filename": "router.txt",
+                    "severity": "critical",
+                    "category": "telnet",
+                    "problem": "Telnet habilitado",
+                    "recommendation": "Usar SSH",
+                    "created_at": datetime(2024, 1, 1, 12, 0, 0),
+                }
+            ],
+            "next-cursor",
+        )
+
+        response = await self.usecase.get_findings(
+            {"user": "test_user"}, limit=1, severities=["critical"], categories=["telnet"]
+        )
+
+        call = self.usecase.repository.find_findings.call_args
+        assert call.args == ("test_user",)
+        assert call.kwargs["severities"] == ["critical"]
+        assert call.kwargs["categories"] == ["telnet"]
+        assert response.data.next_cursor == "next-cursor"
+        assert response.data.items[0].analysis_id == "a1"
+        assert response.data.items[0].category == "telnet"
+
+    @pytest.mark.asyncio
+    async def test_get_findings_invalid_filters(self):
+        """Test que valida el rechazo de severidades o categorías desconocidas"""
+        with pytest.raises(ValueError, match="alta, ftp"):
+            await self.usecase.get_findings(
+                {"user": "test_user"}, severities=["alta"], categories=["ftp"]
+            )
+
+        self.usecase.repository.find_findings.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_findings_error(self):
+        """Test que valida la propagación de errores de MongoDB"""
+        self.usecase.repository.find_findings.side_effect = RuntimeError("Error de MongoDB")
+
+        with pytest.raises(RuntimeError):
+            await self.usecase.get_findings({"user": "test_user"})
@@ -0,0 +1,30 @@
+import pytest
+
+from app.utils.finding_categories import categorize_finding
+
+
+class TestFindingCategories:
+    """Tests para la categorización de hallazgos"""
+
+    @pytest.mark.parametrize(
+        "problem,recommendation,expected",
+        [
+            ("Telnet habilitado en las líneas VTY", "Deshabilitar telnet y usar SSH", "telnet"),
+            ("Las líneas VTY permiten transport input all", None, "telnet"),
+            ("SSH versión 1 habilitado", "Usar ip ssh version 2", "ssh"),
+            ("Comunidad SNMP por defecto", None, "snmp"),
+            ("Servidor HTTP habilitado", "no ip http server", "http"),
+            ("Contraseña enable en texto plano", None, "password"),
+            ("Credenciales débiles", None, "password"),
+            ("Sin autenticación AAA", "Configurar TACACS+", "aaa"),
+            ("La interfaz no tiene access-list aplicada", None, "acl"),
+            ("No se envían logs a un servidor syslog", None, "logging"),
+            ("BPDU guard deshabilitado en puertos portfast", None, "spanning_tree"),
+            ("VLAN nativa 1 en troncales", None, "vlan"),
+            ("Es necesario aclarar la descripción", None, "other"),
+            (None, None, "other"),
+        ],
+    )
+    def test_categorize_finding(self, problem, recommendation, expected):
+        """Test que valida las categorías por palabras clave"""
+        assert categorize_finding(problem, recommendation) == expected
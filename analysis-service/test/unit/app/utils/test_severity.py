@@ -0,0 +1,49 @@
+import pytest
+
+from app.utils.severity import (
+    count_severities,
+    normalize_security_level,
+    normalize_severity,
+    problem_entries,
+)
+
+
+class TestSeverity:
+    """Tests para la normalización de severidades"""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("Crítica", "critical"),
+            ("critica", "critical"),
+            ("CRITICAL", "critical"),
+            ("Alta", "high"),
+            (" media ", "medium"),
+            ("Low", "low"),
+            ("desconocida", "unknown"),
+            (None, "unknown"),
+        ],
+    )
+    def test_normalize_severity(self, value, expected):
+        """Test que valida los alias en español e inglés"""
+        assert normalize_severity(value) == expected
+
+    def test_normalize_security_level(self):
+        """Test que valida los niveles de seguridad"""
+        assert normalize_security_level("safe") == "safe"
+        assert normalize_security_level("alta") == "high"
+        assert normalize_security_level("") == "unknown"
+
+    def test_problem_entries_skips_non_objects(self):
+        """Test que valida que solo se conservan los problemas que son objetos"""
+        problem = {"problem": "Telnet habilitado"}
+
+        assert problem_entries(["texto", None, problem, 3]) == [problem]
+        assert problem_entries("texto") == []
+        assert problem_entries(None) == []
+
+    def test_count_severities(self):
+        """Test que valida el conteo de severidades ignorando entradas inválidas"""
+        problems = [{"severity": "Alta"}, {"severity": "high"}, {}, "baja", None]
+
+        assert count_severities(problems) == {"high": 2, "unknown": 1}